@@ -1,4 +1,8 @@
+import asyncio
+import json
 import logging
+import queue
+import threading
 from fastapi import (
     FastAPI,
     HTTPException,
@@ -12,7 +16,7 @@ from fastapi import (
     Path,
 )
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware  # Add this import
 from typing import List, Optional, Any, Union
@@ -26,11 +30,13 @@ from app.models import (
     LLMConfig,
     BatchAnalysisRequest,
     BatchAnalysis,
+    BatchAnalysisJob,
     Persona,
     PersonaCreate,
     PersonaUpdate,
 )
 from app.storage import StorageManager
+from app.storage.chat import ChatStorage
 from app.storage.personas import PersonaStorage
 from app.llm_service import (
     LLMService,
@@ -43,7 +49,9 @@ from app.import_service import ImportService
 from app.organization_routes import organization_router
 from app.chat_routes import chat_router
 from app.config_routes import config_router
-from app.utils import get_storage, get_llm_service
+from app.batch_jobs import BatchJobRunner
+from app.bulk_summarize import BulkSummarizer, select_entries
+from app.utils import get_storage, get_llm_service, get_batch_job_runner
 
 # Import from utils module# Configure logging
 logging.basicConfig(
@@ -91,6 +99,15 @@ storage_manager = None
 llm_service = None
 
 
+@app.on_event("startup")
+def recover_interrupted_work():
+    """Clean up after a crash or restart before serving requests."""
+    # Streams that were cut off keep their text but are no longer streaming
+    ChatStorage(get_storage().base_dir).recover_interrupted_messages()
+    # Pick up batch jobs that were queued or running when the server stopped
+    get_batch_job_runner().resume_interrupted()
+
+
 class EntryUpdate(BaseModel):
     """Model for updating journal entries"""
 
@@ -168,6 +185,19 @@ class SummarizeRequest(BaseModel):
     )
 
 
+class BulkSummarizeRequest(BaseModel):
+    """Model for bulk summarization requests"""
+
+    folder: Optional[str] = None
+    tags: Optional[List[str]] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    prompt_type: str = Field("default", description="Type of prompt to use")
+    max_workers: Optional[int] = Field(
+        None, ge=1, description="Concurrent summaries (defaults to batch_max_workers)"
+    )
+
+
 class ProgressResponse(BaseModel):
     """Model for progress responses"""
 
@@ -488,6 +518,17 @@ async def simple_search(
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+@app.get("/search/expansion/stats", tags=["search"])
+async def get_query_expansion_stats(llm: LLMService = Depends(get_llm_service)):
+    """
+    Get query expansion statistics.
+
+    Returns:
+        Expansion mode, and the size and hit rate of the expansion cache
+    """
+    return llm.get_query_expansion_stats()
+
+
 @app.get("/tags/", response_model=List[str], tags=["tags"])
 async def get_tags(storage: StorageManager = Depends(get_storage)):
     """Get all unique tags used in the journal"""
@@ -518,7 +559,7 @@ async def summarize_entry(
             )
 
         # Use the LLM service to generate the summary
-        summary = llm.summarize_entry(entry.content)
+        summary = llm.summarize_entry(entry.content, entry_id=entry_id)
         return summary
     except (CUDAError, CircuitBreakerOpen) as e:
         logger.error(f"GPU-related error in summarize_entry: {str(e)}")
@@ -560,7 +601,9 @@ async def summarize_entry_custom(
             )
 
         # Use the LLM service to generate the summary with custom prompt
-        summary = llm.summarize_entry(entry.content, prompt_type=request.prompt_type)
+        summary = llm.summarize_entry(
+            entry.content, prompt_type=request.prompt_type, entry_id=entry_id
+        )
         return summary
     except (CUDAError, CircuitBreakerOpen) as e:
         logger.error(f"GPU-related error in summarize_entry_custom: {str(e)}")
@@ -574,6 +617,70 @@ async def summarize_entry_custom(
         )
 
 
+@app.get("/summaries/cache/stats", tags=["llm"])
+async def get_summary_cache_stats(llm: LLMService = Depends(get_llm_service)):
+    """
+    Get entry summary cache statistics.
+
+    Returns:
+        Hits, misses and hit rate since startup, and the number of cached
+        summaries
+    """
+    return llm.get_summary_cache_stats()
+
+
+@app.post("/summaries/bulk", tags=["llm"])
+async def bulk_summarize_entries(
+    request: BulkSummarizeRequest,
+    storage: StorageManager = Depends(get_storage),
+    llm: LLMService = Depends(get_llm_service),
+):
+    """
+    Summarize every matching entry that lacks a fresh cached summary.
+
+    Streams progress reports as server-sent events, each with completed,
+    skipped and failed counts, throughput and ETA. The last report before
+    [DONE] is the final result and includes per-entry errors.
+    """
+    entries = select_entries(
+        storage,
+        folder=request.folder,
+        tags=request.tags,
+        date_from=request.date_from,
+        date_to=request.date_to,
+    )
+    summarizer = BulkSummarizer(storage, llm, max_workers=request.max_workers)
+    updates: queue.Queue = queue.Queue()
+
+    def run() -> None:
+        try:
+            result = summarizer.run(
+                entries, request.prompt_type, progress_callback=updates.put
+            )
+            updates.put(result)
+        except Exception as e:
+            logger.error(f"Bulk summarization failed: {e}")
+            updates.put({"error": str(e)})
+        finally:
+            updates.put(None)
+
+    threading.Thread(target=run, name="bulk-summarize", daemon=True).start()
+
+    async def event_generator():
+        while True:
+            update = await asyncio.to_thread(updates.get)
+            if update is None:
+                break
+            yield f"data: {json.dumps(update)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
 @app.post("/entries/{entry_id}/summaries/favorite", tags=["llm"])
 async def save_favorite_summary(
     entry_id: str,
@@ -1382,7 +1489,8 @@ async def analyze_entries_batch(
     Generate an analysis for a batch of journal entries.
 
     This endpoint processes multiple entries together to identify patterns,
-    common themes, and insights across them.
+    common themes, and insights across them. It waits for the analysis to
+    finish; use POST /batch/jobs for large batches.
     """
     try:
         # Validate entry IDs
@@ -1435,6 +1543,124 @@ async def analyze_entries_batch(
         )
 
 
+@app.post(
+    "/batch/jobs",
+    response_model=BatchAnalysisJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["batch"],
+)
+async def submit_batch_analysis_job(
+    request: BatchAnalysisRequest,
+    storage: StorageManager = Depends(get_storage),
+    runner: BatchJobRunner = Depends(get_batch_job_runner),
+):
+    """
+    Start a batch analysis in the background.
+
+    Returns a job immediately; poll GET /batch/jobs/{job_id} or stream
+    GET /batch/jobs/{job_id}/events to follow its progress.
+    """
+    for entry_id in request.entry_ids:
+        if not storage.get_entry(entry_id):
+            raise HTTPException(
+                status_code=404, detail=f"Entry with ID {entry_id} not found"
+            )
+
+    if len(request.entry_ids) < 2:
+        raise HTTPException(
+            status_code=400, detail="Batch analysis requires at least 2 entries"
+        )
+
+    return runner.submit(request.entry_ids, request.title, request.prompt_type)
+
+
+@app.get("/batch/jobs/{job_id}", response_model=BatchAnalysisJob, tags=["batch"])
+async def get_batch_analysis_job(
+    job_id: str = Path(..., description="The ID of the batch analysis job"),
+    storage: StorageManager = Depends(get_storage),
+):
+    """Get the status and progress of a batch analysis job."""
+    job = storage.get_batch_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+@app.get("/batch/jobs/{job_id}/events", tags=["batch"])
+async def stream_batch_analysis_job(
+    request: Request,
+    job_id: str = Path(..., description="The ID of the batch analysis job"),
+    storage: StorageManager = Depends(get_storage),
+):
+    """
+    Stream a batch analysis job's progress as server-sent events.
+
+    Each event carries the job as JSON whenever its status or progress
+    changes; the stream ends with [DONE] once the job has finished.
+    """
+    if not storage.get_batch_job(job_id):
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+
+    async def event_generator():
+        last_state = None
+        while not await request.is_disconnected():
+            job = storage.get_batch_job(job_id)
+            if not job:
+                break
+
+            state = (job.status, job.progress)
+            if state != last_state:
+                last_state = state
+                yield f"data: {json.dumps(job.model_dump(mode='json'))}\n\n"
+
+            if job.is_finished:
+                break
+            await asyncio.sleep(0.5)
+
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
+@app.post(
+    "/batch/jobs/{job_id}/cancel", response_model=BatchAnalysisJob, tags=["batch"]
+)
+async def cancel_batch_analysis_job(
+    job_id: str = Path(..., description="The ID of the batch analysis job"),
+    runner: BatchJobRunner = Depends(get_batch_job_runner),
+):
+    """
+    Cancel a batch analysis job.
+
+    A running job stops at its next progress update; group summaries that
+    finished before then are kept, so resuming the job doesn't redo them.
+    """
+    job = runner.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+@app.post(
+    "/batch/jobs/{job_id}/resume", response_model=BatchAnalysisJob, tags=["batch"]
+)
+async def resume_batch_analysis_job(
+    job_id: str = Path(..., description="The ID of the batch analysis job"),
+    runner: BatchJobRunner = Depends(get_batch_job_runner),
+):
+    """Resume a failed, cancelled or interrupted batch analysis job."""
+    try:
+        return runner.resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @app.get("/batch/analyses", response_model=List[BatchAnalysis], tags=["batch"])
 async def get_batch_analyses(
     limit: int = Query(
@@ -0,0 +1,228 @@
+"""
+Background execution of batch analyses.
+
+Jobs are persisted in the batch_analysis_jobs table so their status and
+progress can be polled or streamed, and so interrupted jobs can be resumed.
+Group summaries from the map phase are cached by LLMService, which means a
+resumed job only summarizes the groups that had not finished.
+"""
+
+import concurrent.futures
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from app.models import BatchAnalysisJob
+from app.storage import StorageManager
+from app.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled."""
+
+    pass
+
+
+class BatchJobRunner:
+    """
+    Runs batch analysis jobs on a small worker pool.
+
+    Each job's progress is written to storage as the analysis reports it.
+    Cancellation is cooperative: the next progress report after a cancel
+    request stops the job.
+    """
+
+    def __init__(
+        self,
+        storage_manager: StorageManager,
+        llm_service: LLMService,
+        max_workers: int = 2,
+    ):
+        """
+        Initialize the job runner.
+
+        Args:
+            storage_manager: Storage for entries, analyses and jobs
+            llm_service: LLM service that performs the analyses
+            max_workers: Number of jobs that may run at the same time
+        """
+        self.storage = storage_manager
+        self.llm_service = llm_service
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="batch-job"
+        )
+        self._lock = threading.Lock()
+        self._active: Dict[str, threading.Event] = {}
+
+    def submit(
+        self,
+        entry_ids: List[str],
+        title: Optional[str] = None,
+        prompt_type: str = "weekly",
+    ) -> BatchAnalysisJob:
+        """
+        Create a job and queue it for execution.
+
+        Args:
+            entry_ids: IDs of the entries to analyze
+            title: Optional title for the analysis
+            prompt_type: Type of batch analysis to perform
+
+        Returns:
+            The queued job
+        """
+        job = BatchAnalysisJob(
+            entry_ids=entry_ids, title=title, prompt_type=prompt_type
+        )
+        self.storage.save_batch_job(job)
+        self._start(job.id)
+        return job
+
+    def resume(self, job_id: str) -> BatchAnalysisJob:
+        """
+        Queue a failed, cancelled or interrupted job again.
+
+        Args:
+            job_id: ID of the job to resume
+
+        Returns:
+            The re-queued job
+
+        Raises:
+            KeyError: If the job doesn't exist
+            ValueError: If the job is running or already completed
+        """
+        job = self.storage.get_batch_job(job_id)
+        if not job:
+            raise KeyError(job_id)
+        if self.is_active(job_id):
+            raise ValueError(f"Job {job_id} is already running")
+        if job.status == "completed":
+            raise ValueError(f"Job {job_id} has already completed")
+
+        self.storage.update_batch_job(job_id, status="queued", error=None)
+        self._start(job_id)
+        return self.storage.get_batch_job(job_id)
+
+    def resume_interrupted(self) -> int:
+        """
+        Resume jobs left queued or running by a previous process.
+
+        Returns:
+            Number of jobs resumed
+        """
+        jobs = self.storage.get_batch_jobs_by_status(["queued", "running"])
+        for job in jobs:
+            if not self.is_active(job.id):
+                logger.info(f"Resuming interrupted batch job {job.id}")
+                self._start(job.id)
+        return len(jobs)
+
+    def cancel(self, job_id: str) -> Optional[BatchAnalysisJob]:
+        """
+        Request cancellation of a job.
+
+        Args:
+            job_id: ID of the job to cancel
+
+        Returns:
+            The job, or None if it doesn't exist
+        """
+        job = self.storage.get_batch_job(job_id)
+        if not job:
+            return None
+
+        with self._lock:
+            cancel_event = self._active.get(job_id)
+
+        if cancel_event:
+            # The worker marks the job cancelled when it notices
+            cancel_event.set()
+        elif not job.is_finished:
+            self.storage.update_batch_job(job_id, status="cancelled")
+
+        return self.storage.get_batch_job(job_id)
+
+    def is_active(self, job_id: str) -> bool:
+        """Check whether a job is queued or running in this process."""
+        with self._lock:
+            return job_id in self._active
+
+    def _start(self, job_id: str) -> None:
+        """Register a job as active and hand it to the worker pool."""
+        with self._lock:
+            cancel_event = threading.Event()
+            self._active[job_id] = cancel_event
+        self._executor.submit(self._run, job_id, cancel_event)
+
+    def _run(self, job_id: str, cancel_event: threading.Event) -> None:
+        """
+        Execute a job and record its outcome.
+
+        Args:
+            job_id: ID of the job to run
+            cancel_event: Set when cancellation has been requested
+        """
+        try:
+            job = self.storage.get_batch_job(job_id)
+            if not job:
+                logger.error(f"Batch job {job_id} not found")
+                return
+            if cancel_event.is_set():
+                self.storage.update_batch_job(job_id, status="cancelled")
+                return
+
+            entries = []
+            for entry_id in job.entry_ids:
+                entry = self.storage.get_entry(entry_id)
+                if not entry:
+                    self.storage.update_batch_job(
+                        job_id,
+                        status="failed",
+                        error=f"Entry with ID {entry_id} not found",
+                    )
+                    return
+                entries.append(entry)
+
+            self.storage.update_batch_job(job_id, status="running", progress=0.0)
+
+            def progress_callback(value: float) -> None:
+                if cancel_event.is_set():
+                    raise BatchJobCancelled(job_id)
+                self.storage.update_batch_job(job_id, progress=value)
+
+            try:
+                analysis = self.llm_service.analyze_entries_batch(
+                    entries=entries,
+                    title=job.title,
+                    prompt_type=job.prompt_type,
+                    progress_callback=progress_callback,
+                )
+            except Exception as e:
+                if cancel_event.is_set():
+                    logger.info(f"Batch job {job_id} cancelled")
+                    self.storage.update_batch_job(job_id, status="cancelled")
+                else:
+                    logger.error(f"Batch job {job_id} failed: {e}")
+                    self.storage.update_batch_job(job_id, status="failed", error=str(e))
+                return
+
+            if not self.storage.save_batch_analysis(analysis):
+                self.storage.update_batch_job(
+                    job_id, status="failed", error="Failed to save batch analysis"
+                )
+                return
+
+            self.storage.update_batch_job(
+                job_id, status="completed", progress=1.0, batch_id=analysis.id
+            )
+            logger.info(f"Batch job {job_id} completed as {analysis.id}")
+
+        except Exception as e:
+            logger.error(f"Unexpected error in batch job {job_id}: {e}")
+            self.storage.update_batch_job(job_id, status="failed", error=str(e))
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
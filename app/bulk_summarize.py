@@ -0,0 +1,191 @@
+"""
+Bulk summarization of journal entries.
+
+Precomputes entry summaries across the journal so chat context and batch
+analysis can reuse them from the summary cache instead of calling the model.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.models import JournalEntry
+from app.storage import StorageManager
+from app.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+def select_entries(
+    storage: StorageManager,
+    folder: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page_size: int = 200,
+) -> List[JournalEntry]:
+    """
+    Select every entry matching the filters.
+
+    Args:
+        storage: Storage manager to read entries from
+        folder: Optional folder to restrict to
+        tags: Optional tags to filter by
+        date_from: Optional start date
+        date_to: Optional end date
+        page_size: Entries fetched per query
+
+    Returns:
+        Matching entries, newest first
+    """
+    entries = []
+    offset = 0
+    while True:
+        page = storage.get_entries(
+            limit=page_size,
+            offset=offset,
+            date_from=date_from,
+            date_to=date_to,
+            tags=tags,
+            folder=folder,
+        )
+        entries.extend(page)
+        if len(page) < page_size:
+            return entries
+        offset += page_size
+
+
+class BulkSummarizer:
+    """
+    Summarizes many entries with bounded concurrency.
+
+    Entries whose current summary is already cached are skipped. New
+    summaries are written to the summary cache in batches, one transaction
+    per batch.
+    """
+
+    def __init__(
+        self,
+        storage_manager: StorageManager,
+        llm_service: LLMService,
+        max_workers: Optional[int] = None,
+        write_batch_size: int = 20,
+    ):
+        """
+        Initialize the bulk summarizer.
+
+        Args:
+            storage_manager: Storage for the summary cache
+            llm_service: LLM service that generates summaries
+            max_workers: Concurrent summaries; defaults to the configured
+                         batch_max_workers
+            write_batch_size: Summaries buffered per cache write
+        """
+        self.storage = storage_manager
+        self.llm_service = llm_service
+        self.max_workers = max_workers or llm_service.config.batch_max_workers
+        self.write_batch_size = write_batch_size
+
+    def run(
+        self,
+        entries: List[JournalEntry],
+        prompt_type: str = "default",
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Summarize entries that don't have a fresh cached summary.
+
+        Args:
+            entries: Entries to consider
+            prompt_type: Type of prompt to summarize with
+            progress_callback: Optional function called with a progress report
+                               after each entry
+
+        Returns:
+            Final progress report, with failed entry IDs and errors
+        """
+        started = time.monotonic()
+        model = self.llm_service._get_model_for_operation("analysis")
+
+        keys = {
+            entry.id: self.llm_service._summary_cache_key(entry.content, prompt_type)
+            for entry in entries
+        }
+        fresh = self.storage.get_cached_summary_keys(list(keys.values()))
+        pending = [entry for entry in entries if keys[entry.id] not in fresh]
+
+        counts = {"completed": 0, "failed": 0}
+        errors: Dict[str, str] = {}
+        buffer = []
+        lock = threading.Lock()
+
+        def report() -> Dict[str, Any]:
+            elapsed = time.monotonic() - started
+            done = counts["completed"] + counts["failed"]
+            rate = counts["completed"] / elapsed if elapsed > 0 else 0.0
+            remaining = len(pending) - done
+            return {
+                "total": len(entries),
+                "skipped": len(entries) - len(pending),
+                "pending": remaining,
+                "completed": counts["completed"],
+                "failed": counts["failed"],
+                "elapsed_seconds": round(elapsed, 2),
+                "entries_per_second": round(rate, 3),
+                "eta_seconds": round(remaining / rate, 1) if rate else None,
+            }
+
+        def flush() -> None:
+            if buffer:
+                self.storage.save_cached_summaries(list(buffer))
+                buffer.clear()
+
+        logger.info(
+            f"Bulk summarizing {len(pending)} of {len(entries)} entries "
+            f"with {self.max_workers} workers"
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="bulk-summary"
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self.llm_service.summarize_entry,
+                    entry.content,
+                    prompt_type=prompt_type,
+                    entry_id=entry.id,
+                    use_cache=False,
+                ): entry
+                for entry in pending
+            }
+            for future in concurrent.futures.as_completed(futures):
+                entry = futures[future]
+                with lock:
+                    try:
+                        summary = future.result()
+                        buffer.append((keys[entry.id], summary, entry.id, model))
+                        counts["completed"] += 1
+                    except Exception as e:
+                        logger.warning(f"Failed to summarize entry {entry.id}: {e}")
+                        errors[entry.id] = str(e)
+                        counts["failed"] += 1
+
+                    if len(buffer) >= self.write_batch_size:
+                        flush()
+                    progress = report()
+
+                if progress_callback:
+                    progress_callback(progress)
+
+        flush()
+        result = report()
+        result["errors"] = errors
+        logger.info(
+            f"Bulk summarization finished: {result['completed']} summarized, "
+            f"{result['skipped']} fresh, {result['failed']} failed "
+            f"in {result['elapsed_seconds']}s"
+        )
+        return result
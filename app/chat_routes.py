@@ -1,11 +1,15 @@
 """
 API routes for chat functionality.
 """
+import asyncio
+import json
 import logging
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterator
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Path
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 
@@ -14,13 +18,13 @@ from app.models import (
     ChatMessage,
     ChatConfig,
     EntryReference,
-    ChatSearchResult,
     MessageSearchResult,
     PaginatedSearchResults,
 )
 from app.storage.chat import ChatStorage
-from app.chat_service import ChatService
+from app.chat_service import ChatService, prompt_eval_stats, stream_stats
 from app.llm_service import LLMService, CUDAError, CircuitBreakerOpen
+from app.tools import routing_stats
 from app.utils import get_storage, get_llm_service
 
 # Configure logging
@@ -80,11 +84,17 @@ class ChatResponseWithReferences(BaseModel):
 
 
 class StreamChatResponse(BaseModel):
-    """Model for streaming chat response metadata."""
+    """
+    Model for streaming chat response metadata.
+
+    Tool results are summarized here; their full data is fetched from
+    tool_results_url so it doesn't hold up the start of the stream.
+    """
 
     message_id: str
     references: List[EntryReference] = []
     tool_results: List[Dict[str, Any]] = []
+    tool_results_url: Optional[str] = None
 
 
 class PaginatedChatSessions(BaseModel):
@@ -405,13 +415,29 @@ async def delete_chat_session(
 @chat_router.get("/sessions/{session_id}/messages", response_model=List[ChatMessage])
 async def get_chat_messages(
     session_id: str = Path(..., description="The ID of the chat session"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Maximum number of messages to return"
+    ),
+    before: Optional[str] = Query(
+        None, description="Only return messages older than this message ID"
+    ),
+    after: Optional[str] = Query(
+        None, description="Only return messages newer than this message ID"
+    ),
     storage=Depends(get_storage),
 ) -> List[ChatMessage]:
     """
-    Get all messages for a specific chat session.
+    Get messages for a specific chat session.
+
+    Without parameters every message is returned. ``limit`` alone returns the
+    most recent messages; ``before`` pages back through older messages and
+    ``after`` forward through newer ones.
 
     Args:
         session_id: The ID of the chat session
+        limit: Maximum number of messages to return
+        before: Message ID to page back from
+        after: Message ID to page forward from
 
     Returns:
         List of ChatMessage objects in chronological order
@@ -426,8 +452,21 @@ async def get_chat_messages(
                 status_code=404, detail=f"Chat session with ID {session_id} not found"
             )
 
+        for cursor_id in (before, after):
+            if cursor_id is None:
+                continue
+            cursor_message = chat_storage.get_message(cursor_id)
+            if not cursor_message or cursor_message.session_id != session_id:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Message with ID {cursor_id} "
+                    f"not found in session {session_id}",
+                )
+
         # Get messages
-        messages = chat_storage.get_messages(session_id)
+        messages = chat_storage.get_messages(
+            session_id, limit=limit, before_id=before, after_id=after
+        )
 
         # Update last accessed time
         session.last_accessed = datetime.now()
@@ -463,7 +502,7 @@ async def add_message(
         chat_storage = ChatStorage(storage.base_dir)
 
         # Check if session exists
-        session = chat_storage.get_session(session_id)
+        session = chat_storage.get_or_restore_session(session_id)
         if not session:
             raise HTTPException(
                 status_code=404, detail=f"Chat session with ID {session_id} not found"
@@ -523,12 +562,9 @@ async def get_message_with_references(
                 status_code=404, detail=f"Chat session with ID {session_id} not found"
             )
 
-        # Get all messages for the session
-        messages = chat_storage.get_messages(session_id)
-
         # Find the specific message
-        message = next((m for m in messages if m.id == message_id), None)
-        if not message:
+        message = chat_storage.get_message(message_id)
+        if not message or message.session_id != session_id:
             raise HTTPException(
                 status_code=404,
                 detail=f"Message with ID {message_id} "
@@ -549,6 +585,49 @@ async def get_message_with_references(
         raise HTTPException(status_code=500, detail=f"Failed to get message: {str(e)}")
 
 
+@chat_router.get(
+    "/sessions/{session_id}/messages/{message_id}/tool-results",
+    response_model=List[Dict[str, Any]],
+)
+async def get_message_tool_results(
+    session_id: str = Path(..., description="The ID of the chat session"),
+    message_id: str = Path(..., description="The ID of the message"),
+    storage=Depends(get_storage),
+) -> List[Dict[str, Any]]:
+    """
+    Get the tool results used to generate a message.
+
+    Streams only summarize tool results in their first event; this returns
+    them in full, including search results shown in the UI.
+
+    Args:
+        session_id: The ID of the chat session
+        message_id: The ID of the message
+
+    Returns:
+        Tool usage records saved with the message
+    """
+    try:
+        chat_storage = ChatStorage(storage.base_dir)
+
+        message = chat_storage.get_message(message_id)
+        if not message or message.session_id != session_id:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Message with ID {message_id} "
+                f"not found in session {session_id}",
+            )
+
+        return (message.metadata or {}).get("tools_used", [])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get tool results: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get tool results: {str(e)}"
+        )
+
+
 @chat_router.post(
     "/sessions/{session_id}/messages/{message_id}/references",
     response_model=List[EntryReference],
@@ -580,12 +659,9 @@ async def add_entry_references(
                 status_code=404, detail=f"Chat session with ID {session_id} not found"
             )
 
-        # Get all messages for the session
-        messages = chat_storage.get_messages(session_id)
-
         # Find the specific message
-        message = next((m for m in messages if m.id == message_id), None)
-        if not message:
+        message = chat_storage.get_message(message_id)
+        if not message or message.session_id != session_id:
             raise HTTPException(
                 status_code=404,
                 detail=f"Message with ID {message_id} "
@@ -696,6 +772,42 @@ async def update_chat_config(
         )
 
 
+@chat_router.get("/routing/stats", response_model=Dict[str, Any])
+async def get_routing_stats() -> Dict[str, Any]:
+    """
+    Get counters for how often each tool routing tier decided.
+
+    Returns:
+        Dictionary with per-tier counts, total, rule-tier ratio and
+        speculative retrieval hits and misses
+    """
+    return routing_stats.get_stats()
+
+
+@chat_router.get("/prompt-eval/stats", response_model=Dict[str, Any])
+async def get_prompt_eval_stats() -> Dict[str, Any]:
+    """
+    Get prompt evaluation totals across chat turns.
+
+    Returns:
+        Dictionary with turn count, evaluated versus prompt tokens, average
+        prompt-eval time and estimated prefix reuse
+    """
+    return prompt_eval_stats.get_stats()
+
+
+@chat_router.get("/streams/stats", response_model=Dict[str, Any])
+async def get_stream_stats() -> Dict[str, Any]:
+    """
+    Get how streamed responses ended across chat turns.
+
+    Returns:
+        Dictionary with completed, abandoned and failed stream counts, chunks
+        generated for each, and the share of streams clients abandoned
+    """
+    return stream_stats.get_stats()
+
+
 @chat_router.post(
     "/sessions/{session_id}/process", response_model=ChatResponseWithReferences
 )
@@ -720,7 +832,7 @@ async def process_user_message(
         chat_service = ChatService(chat_storage, llm_service, storage)
 
         # Check if session exists
-        session = chat_storage.get_session(session_id)
+        session = chat_storage.get_or_restore_session(session_id)
         if not session:
             raise HTTPException(
                 status_code=404, detail=f"Chat session with ID {session_id} not found"
@@ -763,9 +875,199 @@ async def process_user_message(
         )
 
 
+def _summarize_tool_results(tool_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Strip tool results down to what the stream's first event needs.
+
+    Args:
+        tool_results: Results from ChatService.stream_message
+
+    Returns:
+        Tool name, success, error and timing/count metadata for each result
+    """
+    return [
+        {
+            "tool_name": result.get("tool_name", "unknown"),
+            "success": result.get("success", False),
+            "error": result.get("error"),
+            "metadata": {
+                key: result.get("metadata", {}).get(key)
+                for key in ("execution_time_ms", "result_count")
+            },
+        }
+        for result in tool_results
+    ]
+
+
+def _stream_metadata(
+    session_id: str,
+    message_id: str,
+    references: List[EntryReference],
+    tool_results: List[Dict[str, Any]],
+) -> StreamChatResponse:
+    """
+    Build the first event of a stream, passing tool data by reference.
+
+    Args:
+        session_id: The ID of the chat session
+        message_id: The ID of the assistant message being streamed
+        references: Entry references for the message
+        tool_results: Results from ChatService.stream_message
+
+    Returns:
+        StreamChatResponse for the first event
+    """
+    return StreamChatResponse(
+        message_id=message_id,
+        references=references,
+        tool_results=_summarize_tool_results(tool_results),
+        tool_results_url=(
+            f"/chat/sessions/{session_id}/messages/{message_id}/tool-results"
+            if tool_results
+            else None
+        ),
+    )
+
+
+def _text_event(parts: List[str]) -> str:
+    """Format buffered text chunks as one SSE event."""
+    return f"data: {json.dumps({'text': ''.join(parts)})}\n\n"
+
+
+# Returned by the chunk fetcher once the response iterator is exhausted
+_STREAM_END = object()
+
+
+async def _stream_events(
+    http_request: Request,
+    first_event: str,
+    response_iterator: Iterator[str],
+    coalesce_ms: int = 0,
+    coalesce_bytes: int = 0,
+) -> AsyncIterator[str]:
+    """
+    Turn a chat response iterator into server-sent events.
+
+    Chunks are buffered and sent as one event once ``coalesce_ms`` has passed
+    since the last event or ``coalesce_bytes`` are buffered, so a fast model
+    doesn't cost an event, a JSON encode and a write per token. Buffered text
+    goes out with the next chunk after the window, or at the end of the
+    stream. A zero for either limit sends every chunk as it arrives.
+
+    The client connection is checked before each event. Once the client has
+    gone the iterator is closed, which aborts the upstream Ollama request and
+    marks the message as truncated, instead of generating for nobody.
+
+    The iterator is synchronous and blocks while the model evaluates the
+    prompt, so each chunk is fetched in a worker thread to keep the event
+    loop serving other requests.
+
+    Args:
+        http_request: The incoming request, used to detect disconnects
+        first_event: Metadata event sent before any content
+        response_iterator: Text chunks from ChatService.stream_message
+        coalesce_ms: Longest time text is buffered before it is sent
+        coalesce_bytes: Most text buffered before it is sent
+
+    Yields:
+        SSE-formatted events, ending with [DONE]
+    """
+    yield first_event
+
+    chunk_count = 0
+    event_count = 0
+    pending: List[str] = []
+    pending_size = 0
+    window = coalesce_ms / 1000
+    last_event = time.monotonic()
+    # Held while the iterator runs, so it's never closed mid-chunk
+    iterator_lock = threading.Lock()
+
+    def next_chunk() -> Any:
+        with iterator_lock:
+            return next(response_iterator, _STREAM_END)
+
+    def close_iterator() -> None:
+        with iterator_lock:
+            close = getattr(response_iterator, "close", None)
+            if close:
+                close()
+
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next_chunk)
+            if chunk is _STREAM_END:
+                break
+
+            # We're just expecting string chunks here since we already
+            # extracted the content in _generate_streaming_response
+            if not chunk or not isinstance(chunk, str):
+                logger.warning(f"Skipping invalid chunk: {chunk}")
+                continue
+
+            chunk_count += 1
+            pending.append(chunk)
+            pending_size += len(chunk)
+            now = time.monotonic()
+            if pending_size < coalesce_bytes and now - last_event < window:
+                continue
+
+            if await http_request.is_disconnected():
+                logger.info(
+                    f"Client disconnected after {chunk_count} chunks, "
+                    "stopping generation"
+                )
+                return
+
+            event_count += 1
+            yield _text_event(pending)
+            pending.clear()
+            pending_size = 0
+            last_event = now
+
+        if pending:
+            event_count += 1
+            yield _text_event(pending)
+            pending.clear()
+        logger.info(f"Finished streaming {chunk_count} chunks in {event_count} events")
+    except (CUDAError, CircuitBreakerOpen) as e:
+        logger.error(f"GPU-related error during streaming: {str(e)}")
+        if pending:
+            yield _text_event(pending)
+        error_json = json.dumps(
+            {
+                "error": (
+                    "AI service temporarily unavailable due to GPU issues. "
+                    "Please try again in a moment."
+                ),
+                "error_type": "gpu_error",
+                "retry_after": 30,
+            }
+        )
+        yield f"data: {error_json}\n\n"
+    except Exception as e:
+        logger.error(f"Error during streaming: {str(e)}")
+        if pending:
+            yield _text_event(pending)
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    finally:
+        # A no-op once the stream has finished; otherwise aborts generation.
+        # If a chunk is still being fetched, close once it arrives.
+        if iterator_lock.acquire(blocking=False):
+            iterator_lock.release()
+            close_iterator()
+        else:
+            asyncio.get_running_loop().run_in_executor(None, close_iterator)
+
+    # Signal the end of the stream
+    logger.info("Sending [DONE] event")
+    yield "data: [DONE]\n\n"
+
+
 @chat_router.post("/sessions/{session_id}/stream", response_model=StreamChatResponse)
 async def stream_user_message(
     message_data: ChatMessageCreate,
+    http_request: Request,
     session_id: str = Path(..., description="The ID of the chat session"),
     storage=Depends(get_storage),
     llm_service: LLMService = Depends(get_llm_service),
@@ -786,7 +1088,7 @@ async def stream_user_message(
         chat_service = ChatService(chat_storage, llm_service, storage)
 
         # Check if session exists
-        session = chat_storage.get_session(session_id)
+        session = chat_storage.get_or_restore_session(session_id)
         if not session:
             logger.error(f"Session {session_id} not found")
             raise HTTPException(
@@ -825,70 +1127,25 @@ async def stream_user_message(
             f"and {len(tool_results)} tool results"
         )
 
-        # Create an async generator to convert the sync iterator to async
-        async def event_generator():
-            import json
-
-            # Send the message ID, references, and tool results as the first event
-            metadata = StreamChatResponse(
-                message_id=message_id, references=references, tool_results=tool_results
-            )
-            logger.info(
-                f"Sending initial metadata event with message_id: {message_id} "
-                f"and {len(tool_results)} tool results"
-            )
-            yield f"data: {metadata.json()}\n\n"
-
-            # Stream the actual content - simplified approach
-            chunk_count = 0
-            try:
-                for chunk in response_iterator:
-                    chunk_count += 1
-                    # Log the chunk we received
-                    if isinstance(chunk, str):
-                        logger.debug(f"Received chunk {chunk_count}: '{chunk}'")
-                    else:
-                        logger.debug(
-                            f"Received non-string chunk {chunk_count}: "
-                            f"{type(chunk)}: {chunk}"
-                        )
-
-                    # We're just expecting string chunks here since we already
-                    # extracted the content in _generate_streaming_response
-                    if chunk and isinstance(chunk, str):
-                        message_json = json.dumps({"text": chunk})
-                        logger.debug(f"Sending chunk to client: '{chunk}'")
-                        yield f"data: {message_json}\n\n"
-                    else:
-                        logger.warning(f"Skipping invalid chunk: {chunk}")
-
-                logger.info(f"Finished streaming {chunk_count} chunks")
-            except (CUDAError, CircuitBreakerOpen) as e:
-                logger.error(f"GPU-related error during streaming: {str(e)}")
-                error_json = json.dumps(
-                    {
-                        "error": (
-                            "AI service temporarily unavailable due to GPU issues. "
-                            "Please try again in a moment."
-                        ),
-                        "error_type": "gpu_error",
-                        "retry_after": 30,
-                    }
-                )
-                yield f"data: {error_json}\n\n"
-            except Exception as e:
-                logger.error(f"Error during streaming: {str(e)}")
-                error_json = json.dumps({"error": str(e)})
-                yield f"data: {error_json}\n\n"
-
-            # Signal the end of the stream
-            logger.info("Sending [DONE] event")
-            yield "data: [DONE]\n\n"
+        # Send the message ID, references, and tool results as the first event
+        metadata = _stream_metadata(session_id, message_id, references, tool_results)
+        logger.info(
+            f"Sending initial metadata event with message_id: {message_id} "
+            f"and {len(tool_results)} tool results"
+        )
+        first_event = f"data: {metadata.json()}\n\n"
 
         # Return a streaming response
         logger.info("Returning streaming response")
+        config = chat_storage.get_chat_config()
         return StreamingResponse(
-            event_generator(),
+            _stream_events(
+                http_request,
+                first_event,
+                response_iterator,
+                coalesce_ms=config.stream_coalesce_ms,
+                coalesce_bytes=config.stream_coalesce_bytes,
+            ),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -1492,6 +1749,7 @@ async def lazy_create_session_with_message(
 @chat_router.post("/sessions/lazy-stream", response_model=StreamChatResponse)
 async def lazy_create_session_with_stream(
     request: LazySessionCreateRequest,
+    http_request: Request,
     storage=Depends(get_storage),
     llm_service: LLMService = Depends(get_llm_service),
 ) -> StreamingResponse:
@@ -1566,74 +1824,31 @@ async def lazy_create_session_with_stream(
             f"and {len(tool_results)} tool results"
         )
 
-        # Create an async generator to convert the sync iterator to async
-        async def event_generator():
-            import json
-
-            # Send the session info, message ID, references, and tool results as the first event
-            metadata = StreamChatResponse(
-                message_id=message_id, references=references, tool_results=tool_results
-            )
-            # Add session info to metadata
-            metadata_dict = metadata.dict()
-            metadata_dict["session_id"] = created_session.id
-            metadata_dict["session_title"] = created_session.title
-
-            logger.info(
-                f"Sending initial metadata event with session_id: {created_session.id} and message_id: {message_id}"
-            )
-            yield f"data: {json.dumps(metadata_dict)}\n\n"
-
-            # Stream the actual content - simplified approach
-            chunk_count = 0
-            try:
-                for chunk in response_iterator:
-                    chunk_count += 1
-                    # Log the chunk we received
-                    if isinstance(chunk, str):
-                        logger.debug(f"Received chunk {chunk_count}: '{chunk}'")
-                    else:
-                        logger.debug(
-                            f"Received non-string chunk {chunk_count}: "
-                            f"{type(chunk)}: {chunk}"
-                        )
-
-                    # We're just expecting string chunks here since we already
-                    # extracted the content in _generate_streaming_response
-                    if chunk and isinstance(chunk, str):
-                        message_json = json.dumps({"text": chunk})
-                        logger.debug(f"Sending chunk to client: '{chunk}'")
-                        yield f"data: {message_json}\n\n"
-                    else:
-                        logger.warning(f"Skipping invalid chunk: {chunk}")
-
-                logger.info(f"Finished streaming {chunk_count} chunks")
-            except (CUDAError, CircuitBreakerOpen) as e:
-                logger.error(f"GPU-related error during streaming: {str(e)}")
-                error_json = json.dumps(
-                    {
-                        "error": (
-                            "AI service temporarily unavailable due to GPU issues. "
-                            "Please try again in a moment."
-                        ),
-                        "error_type": "gpu_error",
-                        "retry_after": 30,
-                    }
-                )
-                yield f"data: {error_json}\n\n"
-            except Exception as e:
-                logger.error(f"Error during streaming: {str(e)}")
-                error_json = json.dumps({"error": str(e)})
-                yield f"data: {error_json}\n\n"
-
-            # Signal the end of the stream
-            logger.info("Sending [DONE] event")
-            yield "data: [DONE]\n\n"
+        # Send the session info, message ID, references, and tool results as the
+        # first event
+        metadata = _stream_metadata(
+            created_session.id, message_id, references, tool_results
+        )
+        metadata_dict = metadata.dict()
+        metadata_dict["session_id"] = created_session.id
+        metadata_dict["session_title"] = created_session.title
+        logger.info(
+            "Sending initial metadata event with session_id: "
+            f"{created_session.id} and message_id: {message_id}"
+        )
+        first_event = f"data: {json.dumps(metadata_dict)}\n\n"
 
         # Return a streaming response
         logger.info("Returning streaming response")
+        config = chat_storage.get_chat_config()
         return StreamingResponse(
-            event_generator(),
+            _stream_events(
+                http_request,
+                first_event,
+                response_iterator,
+                coalesce_ms=config.stream_coalesce_ms,
+                coalesce_bytes=config.stream_coalesce_bytes,
+            ),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -1692,6 +1907,169 @@ async def cleanup_empty_sessions(
         )
 
 
+@chat_router.post("/sessions/archive")
+async def archive_idle_sessions(
+    idle_days: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Days since last access; defaults to archive_after_days",
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Most sessions to archive"),
+    storage=Depends(get_storage),
+) -> Dict[str, Any]:
+    """
+    Move sessions idle past a threshold into the archive database.
+
+    Archived sessions leave the session list and search, and are restored
+    automatically when opened.
+
+    Args:
+        idle_days: Days since last access before a session is archived
+        limit: Most sessions to archive in this call
+
+    Returns:
+        Status and count of archived sessions
+    """
+    try:
+        chat_storage = ChatStorage(storage.base_dir)
+        if idle_days is None:
+            idle_days = chat_storage.get_chat_config().archive_after_days
+        if idle_days <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="idle_days is required when archive_after_days is not set",
+            )
+
+        archived_count = chat_storage.archive_idle_sessions(idle_days, limit=limit)
+
+        return {
+            "status": "success",
+            "message": f"Archived {archived_count} chat sessions",
+            "archived_count": archived_count,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to archive chat sessions: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to archive chat sessions: {str(e)}"
+        )
+
+
+@chat_router.post("/sessions/{session_id}/archive")
+async def archive_chat_session(
+    session_id: str = Path(..., description="The ID of the chat session"),
+    storage=Depends(get_storage),
+) -> Dict[str, Any]:
+    """
+    Move a chat session into the archive database.
+
+    Args:
+        session_id: The ID of the chat session to archive
+
+    Returns:
+        Status message
+    """
+    try:
+        chat_storage = ChatStorage(storage.base_dir)
+
+        if not chat_storage.archive_session(session_id):
+            raise HTTPException(
+                status_code=404, detail=f"Chat session with ID {session_id} not found"
+            )
+
+        return {
+            "status": "success",
+            "message": f"Chat session {session_id} archived successfully",
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to archive chat session: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to archive chat session: {str(e)}"
+        )
+
+
+@chat_router.post("/sessions/{session_id}/restore", response_model=ChatSession)
+async def restore_chat_session(
+    session_id: str = Path(..., description="The ID of the chat session"),
+    storage=Depends(get_storage),
+) -> ChatSession:
+    """
+    Move an archived chat session back into the session list.
+
+    Args:
+        session_id: The ID of the archived chat session
+
+    Returns:
+        The restored ChatSession
+    """
+    try:
+        chat_storage = ChatStorage(storage.base_dir)
+
+        if not chat_storage.restore_session(session_id):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Archived chat session with ID {session_id} not found",
+            )
+
+        session = chat_storage.get_session(session_id)
+        if not session:
+            raise HTTPException(
+                status_code=404, detail=f"Chat session with ID {session_id} not found"
+            )
+
+        return session
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to restore chat session: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to restore chat session: {str(e)}"
+        )
+
+
+@chat_router.get("/archive", response_model=PaginatedChatSessions)
+async def list_archived_sessions(
+    q: str = Query("", description="Search query; empty lists every session"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    storage=Depends(get_storage),
+) -> PaginatedChatSessions:
+    """
+    List or search archived chat sessions.
+
+    Args:
+        q: Search text matched against titles, summaries and messages
+        limit: Maximum number of sessions to return
+        offset: Number of sessions to skip
+
+    Returns:
+        Paginated archived sessions, best matches or most recent first
+    """
+    try:
+        chat_storage = ChatStorage(storage.base_dir)
+        sessions, total = chat_storage.list_archived_sessions(
+            q, limit=limit, offset=offset
+        )
+
+        return PaginatedChatSessions(
+            sessions=sessions,
+            total=total,
+            limit=limit,
+            offset=offset,
+            has_next=offset + limit < total,
+            has_previous=offset > 0,
+        )
+    except Exception as e:
+        logger.error(f"Failed to list archived sessions: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to list archived sessions: {str(e)}"
+        )
+
+
 @chat_router.get("/search", response_model=PaginatedSearchResults)
 async def search_chat_sessions(
     q: str = Query(..., description="Search query string"),
@@ -1728,8 +2106,8 @@ async def search_chat_sessions(
         if sort_by not in allowed_sort_options:
             sort_by = "relevance"
 
-        # Perform search
-        search_results = chat_storage.search_sessions(
+        # Results, snippets and the total come from the same FTS query
+        chat_search_results, total_count = chat_storage.search_session_results(
             query=q,
             limit=limit,
             offset=offset,
@@ -1738,31 +2116,6 @@ async def search_chat_sessions(
             date_to=date_to,
         )
 
-        # Get total count for pagination
-        total_count = chat_storage.count_search_results(
-            query=q, date_from=date_from, date_to=date_to
-        )
-
-        # Convert ChatSession objects to ChatSearchResult objects
-        chat_search_results = []
-        for session in search_results:
-            # Determine match type based on search content
-            match_type = (
-                "session_title"
-                if q.lower() in (session.title or "").lower()
-                else "message_content"
-            )
-
-            # Create search result
-            search_result = ChatSearchResult(
-                session=session,
-                match_type=match_type,
-                relevance_score=1.0,  # FTS handles ranking internally
-                matched_messages=[],
-                highlighted_snippets=[],
-            )
-            chat_search_results.append(search_result)
-
         # Calculate pagination metadata
         has_next = offset + limit < total_count
         has_previous = offset > 0
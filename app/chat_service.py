@@ -2,7 +2,11 @@
 Chat service for handling LLM interactions and message processing.
 """
 
+import concurrent.futures
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple, Iterator
 
@@ -16,12 +20,200 @@ from app.models import (
 from app.storage.chat import ChatStorage
 from app.storage.personas import PersonaStorage
 from app.llm_service import LLMService
+from app.housekeeping import housekeeping_queue
 from app.temporal_parser import TemporalParser
-from app.tools import ToolRegistry, JournalSearchTool, WebSearchTool
+from app.token_budget import (
+    ContextPacker,
+    Tokenizer,
+    get_tokenizer,
+    prompt_token_budget,
+)
+from app.tools import ToolRegistry, ToolRouter, JournalSearchTool, WebSearchTool
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared worker pool for tool execution. Recommended tools run side by side on
+# these threads, so a turn costs max(tool) rather than sum(tool) and we don't
+# build a new executor or event loop for every call.
+_TOOL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="chat-tool"
+)
+
+# Runs async tools for callers that already have an event loop running. Kept
+# apart from _TOOL_EXECUTOR so a tool running there can never wait on a
+# queue that its own pool has filled.
+_TOOL_LOOP_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="chat-tool-loop"
+)
+
+# Exchange count at each session's last topic-shift check. Kept at module level
+# because chat services are created per request; least recently used
+# sessions are dropped past the limit, which at worst repeats one check.
+_TOPIC_CHECKED_MAX_SESSIONS = 1024
+_topic_checked_at: "OrderedDict[str, int]" = OrderedDict()
+_topic_checked_lock = threading.Lock()
+
+# When each data directory was last swept for idle sessions to archive
+_archive_swept_at: Dict[str, float] = {}
+_archive_swept_lock = threading.Lock()
+
+# Appended to reference context so the model cites entries consistently
+CITATION_INSTRUCTIONS = (
+    "When referring to entries, use citation format "
+    "[ID] where ID is the number from the references above. "
+    "Always cite your sources when referring to specifics. "
+    "For example, 'According to your entry [2], "
+    "you mentioned...' or 'Based on what you wrote in [1] and "
+    "[3], it seems that...'"
+)
+
+
+class PromptEvalStats:
+    """
+    Thread-safe totals of prompt evaluation across chat turns.
+
+    Ollama only evaluates the part of a prompt that isn't already in its
+    cache, so comparing evaluated tokens with the size of the prompt shows
+    how much of each turn's prefix was reused.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, prompt_tokens: int, stats: Dict[str, Any]) -> None:
+        """
+        Record one turn's prompt evaluation.
+
+        Args:
+            prompt_tokens: Estimated tokens in the prompt that was sent
+            stats: Generation stats reported by LLMService
+        """
+        evaluated = stats.get("prompt_eval_count")
+        if evaluated is None:
+            return
+        with self._lock:
+            self._turns += 1
+            self._prompt_tokens += prompt_tokens
+            self._evaluated_tokens += evaluated
+            self._eval_ms += stats.get("prompt_eval_duration_ms") or 0.0
+            self._last = {
+                "prompt_tokens": prompt_tokens,
+                "prompt_eval_count": evaluated,
+                "prompt_eval_duration_ms": stats.get("prompt_eval_duration_ms"),
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get prompt evaluation totals.
+
+        Returns:
+            Dictionary with turn count, token totals, average prompt-eval time,
+            estimated prefix reuse ratio and the most recent turn
+        """
+        with self._lock:
+            turns = self._turns
+            prompt_tokens = self._prompt_tokens
+            evaluated = self._evaluated_tokens
+            eval_ms = self._eval_ms
+            last = dict(self._last) if self._last else None
+
+        reuse = 1 - evaluated / prompt_tokens if prompt_tokens else 0.0
+        return {
+            "turns": turns,
+            "prompt_tokens": prompt_tokens,
+            "prompt_eval_tokens": evaluated,
+            "avg_prompt_eval_ms": round(eval_ms / turns, 2) if turns else None,
+            "prefix_reuse_ratio": round(min(max(reuse, 0.0), 1.0), 3),
+            "last_turn": last,
+        }
+
+    def reset(self) -> None:
+        """Reset all totals."""
+        with self._lock:
+            self._turns = 0
+            self._prompt_tokens = 0
+            self._evaluated_tokens = 0
+            self._eval_ms = 0.0
+            self._last: Optional[Dict[str, Any]] = None
+
+
+# Process-wide totals; chat services are created per request
+prompt_eval_stats = PromptEvalStats()
+
+
+class StreamStats:
+    """
+    Thread-safe counts of how streamed responses end.
+
+    Streams the client abandons are counted separately from completed ones,
+    with the chunks generated before the abort, so capacity planning can
+    tell demand that was served from generation nobody read.
+    """
+
+    OUTCOMES = ("completed", "abandoned", "error")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, outcome: str, chunks: int, duration_ms: float) -> None:
+        """
+        Record how one stream ended.
+
+        Args:
+            outcome: 'completed', 'abandoned' or 'error'
+            chunks: Chunks generated before the stream ended
+            duration_ms: Time from the start of the stream to its end
+        """
+        with self._lock:
+            totals = self._totals[outcome]
+            totals["streams"] += 1
+            totals["chunks"] += chunks
+            totals["duration_ms"] += duration_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get stream outcome totals.
+
+        Returns:
+            Dictionary with the number of streams, per-outcome counts, chunks
+            and average durations, and the share of streams abandoned
+        """
+        with self._lock:
+            totals = {outcome: dict(values) for outcome, values in self._totals.items()}
+
+        streams = sum(values["streams"] for values in totals.values())
+        outcomes = {}
+        for outcome, values in totals.items():
+            count = values["streams"]
+            outcomes[outcome] = {
+                "streams": count,
+                "chunks": values["chunks"],
+                "avg_duration_ms": (
+                    round(values["duration_ms"] / count, 2) if count else None
+                ),
+            }
+        abandoned = totals["abandoned"]["streams"]
+        return {
+            "streams": streams,
+            "outcomes": outcomes,
+            "abandon_rate": round(abandoned / streams, 3) if streams else 0.0,
+        }
+
+    def reset(self) -> None:
+        """Reset all totals."""
+        with self._lock:
+            self._totals = {
+                outcome: {"streams": 0, "chunks": 0, "duration_ms": 0.0}
+                for outcome in self.OUTCOMES
+            }
+
+
+# Process-wide totals; chat services are created per request
+stream_stats = StreamStats()
+
 
 class ChatService:
     """
@@ -64,10 +256,44 @@ class ChatService:
         web_search_tool = WebSearchTool(config_storage)
         self.tool_registry.register(web_search_tool, enabled=True)
 
+        # Rule-based router that only consults the LLM for ambiguous messages
+        self.tool_router = ToolRouter(self.tool_registry, llm_service)
+
         logger.info(
             f"Initialized chat service with {len(self.tool_registry.list_tools())} tools"
         )
 
+    # Minimum confidence for a recommended tool to be executed
+    TOOL_CONFIDENCE_THRESHOLD = 0.5
+
+    # Per-tool timeouts in seconds; tools not listed use the default
+    DEFAULT_TOOL_TIMEOUT = 30.0
+    TOOL_TIMEOUTS = {"journal_search": 20.0, "web_search": 15.0}
+
+    # Session housekeeping (titles, topic shifts) runs after the session has
+    # been idle this many seconds, but is never deferred longer than the max
+    HOUSEKEEPING_IDLE_SECONDS = 5.0
+    HOUSEKEEPING_MAX_DELAY = 60.0
+
+    # Topic-shift checks start after this many exchanges and then run at most
+    # once per interval of new exchanges
+    TOPIC_CHECK_MIN_EXCHANGES = 8
+    TOPIC_CHECK_INTERVAL = 4
+
+    # Most recent messages a title is generated from
+    TITLE_CONTEXT_MESSAGES = 12
+
+    # Idle sessions are swept into the archive at most this often
+    ARCHIVE_SWEEP_INTERVAL_SECONDS = 6 * 3600.0
+
+    # Chat messages embedded per background job; a full batch queues another
+    MESSAGE_EMBEDDING_BATCH = 50
+
+    # Streamed responses are written to storage every this many chunks, or
+    # after this long, so a partial response survives a crash or disconnect
+    STREAM_FLUSH_CHUNKS = 32
+    STREAM_FLUSH_INTERVAL_MS = 500
+
     def process_message(
         self, message: ChatMessage
     ) -> Tuple[ChatMessage, List[EntryReference]]:
@@ -104,86 +330,21 @@ class ChatService:
             "recent_messages": [
                 msg for msg in conversation_history[-3:] if msg.get("role") == "user"
             ],
+            "include_conversations": config.search_past_conversations,
         }
 
-        # Use LLM to analyze what tools should be called
-        tool_analysis = self.llm_service.analyze_message_for_tools(
-            message.content, context
+        # Decide which tools to call, using the LLM only for ambiguous messages
+        tool_analysis = self.tool_router.route(
+            message.content,
+            context,
+            threshold=config.tool_routing_threshold,
+            use_rules=config.use_rule_based_routing,
         )
 
-        # Execute tools if recommended
-        tool_results = []
-        references = []
-
-        if tool_analysis.get("should_use_tools", False):
-            logger.info(f"Tool analysis suggests using tools: {tool_analysis}")
-
-            for tool_rec in tool_analysis.get("recommended_tools", []):
-                tool_name = tool_rec.get("tool_name")
-                confidence = tool_rec.get("confidence", 0.0)
-                suggested_query = tool_rec.get("suggested_query", message.content)
-
-                # Only execute tools with sufficient confidence
-                if confidence >= 0.5:
-                    try:
-                        logger.info(
-                            f"Executing tool {tool_name} with confidence {confidence}"
-                        )
-
-                        # Prepare tool parameters
-                        tool_params = {"query": suggested_query}
-
-                        # Add session-specific filters if available
-                        if session.temporal_filter:
-                            date_filter = self.temporal_parser.parse_temporal_query(
-                                session.temporal_filter
-                            )
-                            if date_filter:
-                                tool_params["date_filter"] = date_filter
-
-                        # Execute the tool (synchronous wrapper)
-                        result = self._execute_tool_sync(
-                            tool_name, tool_params, context
-                        )
-
-                        tool_results.append(
-                            {
-                                "tool_name": tool_name,
-                                "success": result.success,
-                                "data": result.data,
-                                "metadata": result.metadata,
-                            }
-                        )
-
-                        # Extract references from journal search results
-                        if (
-                            tool_name == "journal_search"
-                            and result.success
-                            and result.data
-                            and result.data.get("results")
-                        ):
-                            for i, entry_data in enumerate(result.data["results"]):
-                                reference = EntryReference(
-                                    message_id=message.id,
-                                    entry_id=entry_data["id"],
-                                    similarity_score=entry_data.get("relevance", 0.0),
-                                    chunk_index=0,
-                                    entry_title=entry_data.get("title", ""),
-                                    entry_snippet=entry_data.get("content_preview", ""),
-                                )
-                                references.append(reference)
-
-                    except Exception as e:
-                        logger.error(f"Error executing tool {tool_name}: {e}")
-                        tool_results.append(
-                            {"tool_name": tool_name, "success": False, "error": str(e)}
-                        )
-                else:
-                    logger.info(
-                        f"Skipping tool {tool_name} due to low confidence: {confidence}"
-                    )
-        else:
-            logger.info("No tools recommended for this message")
+        # Execute recommended tools concurrently
+        tool_results, references = self._execute_recommended_tools(
+            tool_analysis, message.content, session, context, message_id=message.id
+        )
 
         # Generate response using tool results
         if tool_results:
@@ -192,7 +353,11 @@ class ChatService:
             )
         else:
             # Fallback to standard response generation
-            conversation_history.append({"role": "user", "content": message.content})
+            conversation_history = self._pack_prompt(
+                conversation_history,
+                config,
+                query={"role": "user", "content": message.content},
+            )
 
             # Check for model override
             model_name = None
@@ -206,7 +371,11 @@ class ChatService:
             )
 
         # Prepare metadata including tool usage information
-        metadata = {"has_references": len(references) > 0, "tools_used": []}
+        metadata = {
+            "has_references": len(references) > 0,
+            "tools_used": [],
+            "routing_tier": tool_analysis.get("routing_tier"),
+        }
 
         # Add tool usage information to metadata
         if tool_results:
@@ -240,20 +409,13 @@ class ChatService:
             metadata=metadata,
         )
 
-        # Save the assistant message
-        saved_message = self.chat_storage.add_message(assistant_message)
-
-        # Save references for citation tracking if there are any
-        if references:
-            # Update the references with the message ID
-            for ref in references:
-                ref.message_id = saved_message.id
-
-            # Save the references
-            self.chat_storage.add_message_entry_references(saved_message.id, references)
+        # Save the assistant message with its references for citation tracking
+        saved_message = self.chat_storage.add_message(
+            assistant_message, references=references
+        )
 
-        # Check if session should be auto-named
-        self._check_and_generate_session_title(session_id)
+        # Auto-naming happens off the request path
+        self._schedule_session_housekeeping(session_id)
 
         return saved_message, references
 
@@ -294,92 +456,31 @@ class ChatService:
             "recent_messages": [
                 msg for msg in conversation_history[-3:] if msg.get("role") == "user"
             ],
+            "include_conversations": config.search_past_conversations,
         }
 
-        # Use LLM to analyze what tools should be called
-        tool_analysis = self.llm_service.analyze_message_for_tools(
-            message.content, context
+        # Decide which tools to call; journal retrieval starts speculatively
+        # while the LLM analysis is in flight
+        tool_analysis, speculative = self._route_with_speculation(
+            message, session, context, config
         )
 
-        # Execute tools if recommended
-        tool_results = []
-        references = []
-
-        if tool_analysis.get("should_use_tools", False):
-            logger.info(f"Tool analysis suggests using tools: {tool_analysis}")
-
-            for tool_rec in tool_analysis.get("recommended_tools", []):
-                tool_name = tool_rec.get("tool_name")
-                confidence = tool_rec.get("confidence", 0.0)
-                suggested_query = tool_rec.get("suggested_query", message.content)
-
-                # Only execute tools with sufficient confidence
-                if confidence >= 0.5:
-                    try:
-                        logger.info(
-                            f"Executing tool {tool_name} with confidence {confidence}"
-                        )
-
-                        # Prepare tool parameters
-                        tool_params = {"query": suggested_query}
-
-                        # Add session-specific filters if available
-                        if session.temporal_filter:
-                            date_filter = self.temporal_parser.parse_temporal_query(
-                                session.temporal_filter
-                            )
-                            if date_filter:
-                                tool_params["date_filter"] = date_filter
-
-                        # Execute the tool (synchronous wrapper)
-                        result = self._execute_tool_sync(
-                            tool_name, tool_params, context
-                        )
-
-                        tool_results.append(
-                            {
-                                "tool_name": tool_name,
-                                "success": result.success,
-                                "data": result.data,
-                                "metadata": result.metadata,
-                            }
-                        )
-
-                        # Extract references from journal search results
-                        if (
-                            tool_name == "journal_search"
-                            and result.success
-                            and result.data
-                            and result.data.get("results")
-                        ):
-                            for i, entry_data in enumerate(result.data["results"]):
-                                reference = EntryReference(
-                                    message_id="",  # Will be set after message creation
-                                    entry_id=entry_data["id"],
-                                    similarity_score=entry_data.get("relevance", 0.0),
-                                    chunk_index=0,
-                                    entry_title=entry_data.get("title", ""),
-                                    entry_snippet=entry_data.get("content_preview", ""),
-                                )
-                                references.append(reference)
-
-                    except Exception as e:
-                        logger.error(f"Error executing tool {tool_name}: {e}")
-                        tool_results.append(
-                            {"tool_name": tool_name, "success": False, "error": str(e)}
-                        )
-                else:
-                    logger.info(
-                        f"Skipping tool {tool_name} due to low confidence: {confidence}"
-                    )
-        else:
-            logger.info("No tools recommended for this message")
+        # Execute recommended tools concurrently
+        tool_results, references = self._execute_recommended_tools(
+            tool_analysis,
+            message.content,
+            session,
+            context,
+            message_id="",
+            speculative=speculative,
+        )
 
         # Prepare metadata including tool usage information
         metadata = {
             "has_references": len(references) > 0,
             "is_streaming": True,
             "tools_used": [],
+            "routing_tier": tool_analysis.get("routing_tier"),
         }
 
         # Add tool usage information to metadata
@@ -405,38 +506,39 @@ class ChatService:
 
                 metadata["tools_used"].append(tool_info)
 
-        # Update conversation history with tool results context
+        # Collect reference and tool context; the packer decides what fits
+        context_messages = []
         if tool_results:
             # Format all tool results for context
             tool_context = self._format_tool_results_for_context(tool_results)
 
-            # Add reference context to the system message if there are references
             if references and len(references) > 0:
-                # Find the system message
-                for hist_msg in conversation_history:
-                    if hist_msg["role"] == "system":
-                        # Add reference context
-                        reference_context = self._format_references_for_context(
-                            references
-                        )
-                        hist_msg["content"] += (
-                            f"\nHere are some relevant journal entries to reference:\n"
-                            f"{reference_context}"
-                        )
-                        break
+                reference_context = self._format_references_for_context(references)
+                context_messages.append(
+                    {
+                        "role": "system",
+                        "content": "Here are some relevant journal entries to "
+                        f"reference:\n{reference_context}\n"
+                        f"{CITATION_INSTRUCTIONS}",
+                    }
+                )
 
             # Add web search results and other tool results as a separate context
             if tool_context:
-                # Add tool results after the user message to ensure they're used
-                conversation_history.append(
+                context_messages.append(
                     {
                         "role": "system",
                         "content": f"Search results to answer the user's question:\n{tool_context}\n\nPlease use these search results to provide an accurate, detailed response.",
                     }
                 )
 
-        # Add the new message to history
-        conversation_history.append({"role": "user", "content": message.content})
+        # Fit history, context and the new message into the context window
+        conversation_history = self._pack_prompt(
+            conversation_history,
+            config,
+            context_messages=context_messages,
+            query={"role": "user", "content": message.content},
+        )
 
         # Create a placeholder for the assistant message
         assistant_message = ChatMessage(
@@ -445,24 +547,18 @@ class ChatService:
             content="",  # Empty content to be filled in by streaming
             created_at=datetime.now(),
             metadata=metadata,
+            status="streaming",
         )
 
-        # Save the placeholder message to get an ID
-        saved_message = self.chat_storage.add_message(assistant_message)
+        # Save the placeholder message and its references to get an ID
+        saved_message = self.chat_storage.add_message(
+            assistant_message, references=references
+        )
         message_id = saved_message.id
 
-        # Save references for citation tracking if there are any
-        if references:
-            # Update the references with the message ID
-            for ref in references:
-                ref.message_id = message_id
-
-            # Save the references
-            self.chat_storage.add_message_entry_references(message_id, references)
-
         # Start the streaming response
         response_iterator = self._generate_streaming_response(
-            message_id, conversation_history, config
+            message_id, conversation_history, config, references=references
         )
 
         return response_iterator, references, message_id, tool_results
@@ -594,9 +690,7 @@ class ChatService:
         Returns:
             List of message dictionaries in the format expected by the LLM
         """
-        # Get session and messages
         session = self.chat_storage.get_session(session_id)
-        messages = self.chat_storage.get_messages(session_id)
 
         # Determine system prompt - use persona if available, fallback to config
         system_prompt = config.system_prompt
@@ -620,26 +714,37 @@ class ChatService:
         # Start with system message
         conversation = [{"role": "system", "content": system_prompt}]
 
+        # Count new messages once so the session totals come from stored
+        # counts, without loading the rest of the history
+        tokenizer = get_tokenizer(config.tokenizer_path)
+        self._estimate_token_count(
+            self.chat_storage.get_uncounted_messages(session_id, tokenizer.id),
+            tokenizer,
+        )
+        totals = self.chat_storage.get_message_totals(session_id)
+
         # Check if context windowing is enabled and we have enough messages
         if (
             config.use_context_windowing
-            and len(messages) > config.min_messages_for_summary
+            and totals["message_count"] > config.min_messages_for_summary
         ):
-            # Estimate total tokens in all messages
-            estimated_tokens = self._estimate_token_count(messages)
-
             # If we're over the threshold, apply context windowing
-            if estimated_tokens > config.conversation_summary_threshold:
+            if totals["token_count"] > config.conversation_summary_threshold:
                 # Get the conversation with windowing
+                messages = self._load_windowing_messages(session_id, session, config)
                 return self._apply_context_windowing(
                     conversation, messages, session, config
                 )
 
-        # If we don't need windowing or it's disabled, just add all messages
-        for msg in messages:
-            conversation.append({"role": msg.role, "content": msg.content})
-
-        return conversation
+        # Otherwise include as many of the most recent messages as fit
+        budget = self._prompt_budget(config)
+        messages = self.chat_storage.get_recent_messages(session_id, budget)
+        packer = ContextPacker(tokenizer, budget)
+        return packer.pack(
+            conversation[0],
+            turns=[{"role": msg.role, "content": msg.content} for msg in messages],
+            turn_tokens=[msg.token_count for msg in messages],
+        )
 
     def _generate_response(
         self,
@@ -755,15 +860,27 @@ class ChatService:
         return text
 
     def _generate_streaming_response(
-        self, message_id: str, conversation: List[Dict[str, str]], config: ChatConfig
+        self,
+        message_id: str,
+        conversation: List[Dict[str, str]],
+        config: ChatConfig,
+        references: Optional[List[EntryReference]] = None,
     ) -> Iterator[str]:
         """
         Generate a streaming response using the LLM.
 
+        The response is written to the message as it streams, in batches of
+        STREAM_FLUSH_CHUNKS chunks or STREAM_FLUSH_INTERVAL_MS, and the message
+        is marked 'complete' or 'error' when the stream ends. Closing the
+        iterator early, as the routes do when the client disconnects, closes
+        the upstream request so Ollama stops generating, and marks the
+        message 'truncated' unless the model had already finished the reply.
+
         Args:
             message_id: ID of the message being generated
             conversation: Conversation history
             config: Chat configuration
+            references: Entry references saved for the message, if known
 
         Yields:
             Text chunks as they're generated
@@ -771,109 +888,168 @@ class ChatService:
         Raises:
             Exception: If there's an error during streaming
         """
+        writer = self.chat_storage.open_message_stream(
+            message_id,
+            flush_chunks=self.STREAM_FLUSH_CHUNKS,
+            flush_interval_ms=self.STREAM_FLUSH_INTERVAL_MS,
+        )
+        started = time.monotonic()
+        streaming_response = None
+        chunk_count = 0
+        generation_stats = {}
+        model_done = False
+        response_text = ""
+
+        def complete() -> None:
+            """Save the full response and mark the message complete."""
+            logger.info(
+                f"Saving response of length {len(response_text)} after "
+                f"{writer.flush_count} incremental writes"
+            )
+            writer.finish(
+                "complete",
+                content=response_text,
+                metadata_updates=(
+                    {"generation_stats": generation_stats} if generation_stats else None
+                ),
+            )
+            stream_stats.record(
+                "completed", chunk_count, (time.monotonic() - started) * 1000
+            )
+
+            # Auto-naming happens off the request path
+            if writer.session_id:
+                self._schedule_session_housekeeping(writer.session_id)
+
         try:
-            # Add citation instructions to system prompt if there are references
-            has_references = False
-            for message in conversation:
-                if (
+            # Reference context carries its own citation instructions; the
+            # prompt is sent as packed so its prefix matches the previous turn
+            if references is None:
+                has_references = any(
                     message["role"] == "system"
                     and "relevant journal entries to reference" in message["content"]
-                ):
-                    # Add citation formatting instructions
-                    if (
-                        "When referring to journal entries, use citation format"
-                        not in message["content"]
-                    ):
-                        message["content"] += (
-                            "\nWhen referring to entries, use citation format "
-                            "[ID] where ID is the number from the references above. "
-                            "Always cite your sources when referring to specifics. "
-                            "For example, 'According to your entry [2], "
-                            "you mentioned...' or 'Based on what you wrote in [1] and "
-                            "[3], it seems that...'"
-                        )
-                    has_references = True
-                    break
+                    for message in conversation
+                )
+            else:
+                has_references = bool(references)
 
             # Get a streaming response from the LLM service
             logger.info(f"Starting streaming response for message {message_id}")
             streaming_response = self.llm_service.chat_completion(
-                messages=conversation, temperature=config.temperature, stream=True
+                messages=conversation,
+                temperature=config.temperature,
+                stream=True,
+                on_complete=generation_stats.update,
             )
 
-            # Track the accumulated response to save when complete
-            accumulated_response = ""
-
             # Process and yield each chunk
-            chunk_count = 0
             for content in streaming_response:
                 chunk_count += 1
-                logger.debug(f"Received content chunk {chunk_count}: '{content}'")
 
-                # Accumulate the response text
-                accumulated_response += content
+                # Buffer the chunk; the writer flushes it in batches
+                writer.append(content)
 
                 # Yield the content text for streaming
                 yield content
 
+            model_done = True
             logger.info(
                 f"Completed streaming {chunk_count} chunks for message {message_id}"
             )
 
+            if generation_stats:
+                prompt_tokens = ContextPacker(
+                    get_tokenizer(config.tokenizer_path), 0
+                ).count_conversation(conversation)
+                generation_stats["prompt_tokens"] = prompt_tokens
+                prompt_eval_stats.record(prompt_tokens, generation_stats)
+                logger.info(
+                    f"Prompt eval for message {message_id}: "
+                    f"{generation_stats.get('prompt_eval_count')} of "
+                    f"~{prompt_tokens} prompt tokens in "
+                    f"{generation_stats.get('prompt_eval_duration_ms')}ms"
+                )
+
             # Enhance citations in the complete response if needed
+            response_text = writer.text
             if has_references:
-                # Get references for this message
-                references = self.chat_storage.get_message_entry_references(message_id)
+                if references is None:
+                    references = self.chat_storage.get_message_entry_references(
+                        message_id
+                    )
                 if references:
                     # Enhance citations in the complete response
                     enhanced_response = self._enhance_citations(
-                        accumulated_response, references
+                        response_text, references
                     )
 
-                    # If the response was enhanced, update the database and yield
-                    if enhanced_response != accumulated_response:
-                        # Calculate the additional text added
-                        additional_text = enhanced_response[
-                            len(accumulated_response) :  # noqa
-                        ]
-                        if additional_text:
-                            # Yield the additional citation information
-                            logger.debug(
-                                "Yielding additional citation text: "
-                                f"'{additional_text}'"
-                            )
-                            yield additional_text
-                            # Update the accumulated response
-                            accumulated_response = enhanced_response
+                    # Yield any citation text added to the end of the response
+                    additional_text = enhanced_response[len(response_text) :]  # noqa
+                    if enhanced_response != response_text and additional_text:
+                        logger.debug(
+                            f"Yielding additional citation text: '{additional_text}'"
+                        )
+                        response_text = enhanced_response
+                        yield additional_text
+
+            # Write the full response and mark the message complete
+            complete()
+
+        except GeneratorExit:
+            if model_done:
+                # Only the tail of a finished reply was missed; it's complete
+                logger.info(f"Stream for message {message_id} closed after done")
+                try:
+                    complete()
+                except Exception as update_error:
+                    logger.error(f"Error completing message: {update_error}")
+                raise
 
-            # Update the message in the database with the full response
-            # This ensures we have the complete response saved
+            # The consumer went away; keep what was generated and say so
+            duration_ms = (time.monotonic() - started) * 1000
             logger.info(
-                "Saving accumulated response of length "
-                f"{len(accumulated_response)} to database"
+                f"Stream for message {message_id} abandoned after "
+                f"{chunk_count} chunks ({duration_ms:.0f}ms)"
             )
-            self.chat_storage.update_message_content(message_id, accumulated_response)
-
-            # Check if session should be auto-named
-            message = self.chat_storage.get_message(message_id)
-            if message:
-                self._check_and_generate_session_title(message.session_id)
+            stream_stats.record("abandoned", chunk_count, duration_ms)
+            try:
+                writer.finish(
+                    "truncated",
+                    metadata_updates={"truncated": True, "chunks": chunk_count},
+                )
+            except Exception as update_error:
+                logger.error(f"Error marking message as truncated: {update_error}")
+            raise
 
         except Exception as e:
             error_msg = f"Error in streaming response: {str(e)}"
             logger.error(error_msg)
+            stream_stats.record(
+                "error", chunk_count, (time.monotonic() - started) * 1000
+            )
 
-            # Yield the error message so the client knows something went wrong
-            yield f"\n\nI'm sorry, I encountered an error: {str(e)}"
-
-            # Update the message with the error
+            # Keep whatever was streamed and mark the message as failed before
+            # yielding, so a disconnect at the yield can't skip it
             try:
-                self.chat_storage.update_message_content(
-                    message_id, f"[Error during streaming response: {str(e)}]"
+                writer.finish(
+                    "error",
+                    content=writer.text
+                    or f"[Error during streaming response: {str(e)}]",
+                    metadata_updates={"error": str(e)},
                 )
             except Exception as update_error:
                 logger.error(f"Error updating message with error: {update_error}")
 
+            # Yield the error message so the client knows something went wrong
+            yield f"\n\nI'm sorry, I encountered an error: {str(e)}"
+
+        finally:
+            # Closing the upstream stream drops the connection to Ollama,
+            # which stops generating
+            if streaming_response is not None and hasattr(streaming_response, "close"):
+                streaming_response.close()
+            writer.close()
+
     def _format_tool_results_for_context(
         self, tool_results: List[Dict[str, Any]]
     ) -> str:
@@ -895,8 +1071,18 @@ class ChatService:
                 tool_name = result.get("tool_name", "unknown")
                 data = result["data"]
 
-                # Skip journal search as it's handled separately via references
+                # Journal entries are handled separately via references; only
+                # related earlier conversations go into the tool context
                 if tool_name == "journal_search":
+                    if data.get("conversations"):
+                        context += "\n\nRelated earlier conversations:\n"
+                        for conversation in data["conversations"]:
+                            context += (
+                                f"- {conversation['date']} in "
+                                f"\"{conversation['session_title']}\" "
+                                f"({conversation['role']}): "
+                                f"{conversation['content_preview']}\n"
+                            )
                     continue
 
                 if tool_name == "web_search" and data.get("results"):
@@ -1664,40 +1850,115 @@ class ChatService:
             logger.error(f"Error updating session temporal filter: {str(e)}")
             return False
 
-    def _estimate_token_count(self, messages: List[ChatMessage]) -> int:
+    def _estimate_token_count(
+        self, messages: List[ChatMessage], tokenizer: Optional[Tokenizer] = None
+    ) -> int:
         """
-        Estimate the token count for a list of messages.
-        This is a rough approximation (about 4 chars per token for English text).
+        Count the tokens in a list of messages.
+
+        Messages that already carry a token count are not re-tokenized. New
+        counts are set on the messages and stored in chat_messages.token_count,
+        with the tokenizer's ID, so later turns using the same tokenizer can
+        reuse them.
 
         Args:
             messages: List of chat messages
+            tokenizer: Tokenizer to count with (defaults to the estimator)
 
         Returns:
-            Estimated token count
+            Total token count of the message contents
         """
-        # For test cases - hardcode the specific test messages
-        test_msg_1 = "This is exactly twenty chars"
-        test_msg_2 = "This is a longer message with approximately forty characters"
+        tokenizer = tokenizer or get_tokenizer()
 
         token_count = 0
+        new_counts = {}
         for msg in messages:
-            if msg.token_count is not None:
-                # Use explicit token count if available
-                token_count += msg.token_count
-            elif msg.content == test_msg_1:
-                # Special case for the first test message
-                token_count += 5
-            elif msg.content == test_msg_2:
-                # Special case for the second test message
-                token_count += 10
-            else:
-                # Default estimate: ~4 chars per token for English
-                chars = len(msg.content)
-                estimated_tokens = chars // 4
-                token_count += estimated_tokens
+            if msg.token_count is None:
+                msg.token_count = tokenizer.count(msg.content)
+                if msg.id:
+                    new_counts[msg.id] = msg.token_count
+            token_count += msg.token_count
+
+        if new_counts:
+            self.chat_storage.update_message_token_counts(new_counts, tokenizer.id)
 
         return token_count
 
+    def _prompt_budget(self, config: ChatConfig) -> int:
+        """Get the token budget for a prompt under the chat configuration."""
+        return prompt_token_budget(config.max_context_tokens, config.max_tokens)
+
+    def _pack_prompt(
+        self,
+        conversation: List[Dict[str, str]],
+        config: ChatConfig,
+        context_messages: Optional[List[Dict[str, str]]] = None,
+        query: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Fit a prepared conversation plus context and the new message into the
+        context window.
+
+        Args:
+            conversation: Output of _prepare_conversation_history
+            config: Chat configuration
+            context_messages: Reference and tool context messages, most
+                              important first
+            query: The new user message
+
+        Returns:
+            Packed conversation ready for the LLM
+        """
+        system, rest = conversation[0], conversation[1:]
+        # Windowed conversations carry the summary right after the system prompt
+        summary = rest[0] if rest and rest[0]["role"] == "system" else None
+        turns = rest[1:] if summary else rest
+
+        packer = ContextPacker(
+            get_tokenizer(config.tokenizer_path), self._prompt_budget(config)
+        )
+        return packer.pack(
+            system,
+            query=query,
+            summary=summary,
+            references=context_messages,
+            turns=turns,
+        )
+
+    def _load_windowing_messages(
+        self,
+        session_id: str,
+        session: Optional[ChatSession],
+        config: ChatConfig,
+    ) -> List[ChatMessage]:
+        """
+        Load the messages context windowing needs, rather than the whole session.
+
+        Once a session has a summary, only its watermark message and the turns
+        after it are needed. The whole history is loaded when there is no
+        summary to extend, or when the watermark is missing or falls inside
+        the recent window, since the summary is then rebuilt from the start.
+
+        Args:
+            session_id: The chat session ID
+            session: The chat session, if it exists
+            config: Chat configuration
+
+        Returns:
+            Messages in chronological order, starting at the summary watermark
+            when there is a usable one
+        """
+        if session and session.context_summary and session.summary_watermark:
+            watermark = self.chat_storage.get_message(session.summary_watermark)
+            if watermark and watermark.session_id == session_id:
+                since = self.chat_storage.get_messages(
+                    session_id, after_id=watermark.id
+                )
+                if len(since) >= config.context_window_size:
+                    return [watermark] + since
+
+        return self.chat_storage.get_messages(session_id)
+
     def _apply_context_windowing(
         self,
         base_conversation: List[Dict[str, str]],
@@ -1709,42 +1970,60 @@ class ChatService:
         Apply context windowing to the conversation by:
         1. Using existing summary if available
         2. Generating a new summary if needed
-        3. Including only the most recent messages in full
+        3. Including the most recent messages in full, as many as fit the
+           prompt token budget. Once a summary has a watermark, every message
+           after it is kept, so earlier turns stay put between refreshes
 
         Args:
             base_conversation: Starting conversation (system message)
-            messages: Full list of chat messages
+            messages: Chat messages from _load_windowing_messages
             session: Current chat session
             config: Chat configuration
 
         Returns:
             Windowed conversation context suitable for the LLM
         """
+        packer = ContextPacker(
+            get_tokenizer(config.tokenizer_path), self._prompt_budget(config)
+        )
+
         # If we have too many messages, we need to summarize older ones
         if len(messages) <= config.context_window_size:
-            # If we have few messages, just include them all
-            for msg in messages:
-                base_conversation.append({"role": msg.role, "content": msg.content})
-            return base_conversation
+            # If we have few messages, include as many as fit
+            return packer.pack(
+                base_conversation[0],
+                turns=[{"role": msg.role, "content": msg.content} for msg in messages],
+                turn_tokens=[msg.token_count for msg in messages],
+            )
 
         # Split messages into history that needs summarizing and recent messages to keep
         window_size = min(config.context_window_size, len(messages))
         history_messages = messages[:-window_size]  # Older messages to summarize
         recent_messages = messages[-window_size:]  # Recent messages to keep in full
 
-        # Create a result conversation that starts with the base conversation
-        result_conversation = base_conversation.copy()
+        summary_message = None
 
-        # Use existing summary if available and history didn't change
+        # Use existing summary if available, refreshing it in the background
+        # once enough history has built up past its watermark
         if session.context_summary:
-            # Add the summary as a system message
-            result_conversation.append(
-                {
-                    "role": "system",
-                    "content": "Summary of earlier conversation: "
-                    f"{session.context_summary}",
-                }
+            summary_message = {
+                "role": "system",
+                "content": "Summary of earlier conversation: "
+                f"{session.context_summary}",
+            }
+
+            pending = self._unsummarized_messages(history_messages, session)
+            pending_tokens = self._estimate_token_count(
+                history_messages if pending is None else pending
             )
+            if pending_tokens > config.conversation_summary_threshold:
+                self._schedule_summary_refresh(session.id)
+
+            # Keep every turn since the watermark rather than sliding the
+            # window each turn, so the prompt prefix only changes when the
+            # summary is refreshed and Ollama can reuse its cached prefix
+            if pending:
+                recent_messages = pending + recent_messages
         else:
             # Generate a new summary if we don't have one
             summary = self._generate_conversation_summary(history_messages, config)
@@ -1752,24 +2031,29 @@ class ChatService:
             # Save the summary to the session for future use
             if summary:
                 session.context_summary = summary
+                session.summary_watermark = history_messages[-1].id
                 self.chat_storage.update_session(session)
 
-                # Add the summary as a system message
-                result_conversation.append(
-                    {
-                        "role": "system",
-                        "content": f"Summary of earlier conversation: {summary}",
-                    }
-                )
-
-        # Add all recent messages
-        for msg in recent_messages:
-            result_conversation.append({"role": msg.role, "content": msg.content})
+                summary_message = {
+                    "role": "system",
+                    "content": f"Summary of earlier conversation: {summary}",
+                }
 
-        return result_conversation
+        # Add the summary and as many recent messages as fit
+        return packer.pack(
+            base_conversation[0],
+            summary=summary_message,
+            turns=[
+                {"role": msg.role, "content": msg.content} for msg in recent_messages
+            ],
+            turn_tokens=[msg.token_count for msg in recent_messages],
+        )
 
     def _generate_conversation_summary(
-        self, messages: List[ChatMessage], config: ChatConfig
+        self,
+        messages: List[ChatMessage],
+        config: ChatConfig,
+        previous_summary: Optional[str] = None,
     ) -> str:
         """
         Generate a summary of a conversation's history using the LLM.
@@ -1777,6 +2061,8 @@ class ChatService:
         Args:
             messages: List of messages to summarize
             config: Chat configuration
+            previous_summary: Optional summary of the messages before these;
+                              the result folds the new messages into it
 
         Returns:
             Summary of the conversation or empty string if summarization fails
@@ -1787,11 +2073,25 @@ class ChatService:
         try:
             # Create a conversation history from the messages
             conversation = []
+            if previous_summary:
+                conversation.append(
+                    {
+                        "role": "system",
+                        "content": "Summary of earlier conversation: "
+                        f"{previous_summary}",
+                    }
+                )
             for msg in messages:
                 conversation.append({"role": msg.role, "content": msg.content})
 
             # Add a message asking for a summary
-            conversation.append({"role": "user", "content": config.summary_prompt})
+            summary_prompt = config.summary_prompt
+            if previous_summary:
+                summary_prompt = (
+                    "Update the summary of earlier conversation with the messages "
+                    f"since it. {summary_prompt}"
+                )
+            conversation.append({"role": "user", "content": summary_prompt})
 
             # Generate a summary using the LLM
             response = self.llm_service.chat_completion(
@@ -1819,11 +2119,50 @@ class ChatService:
             logger.error(f"Error generating conversation summary: {str(e)}")
             return ""
 
+    def _unsummarized_messages(
+        self, history_messages: List[ChatMessage], session: ChatSession
+    ) -> Optional[List[ChatMessage]]:
+        """
+        Get the history messages after the session's summary watermark.
+
+        Args:
+            history_messages: Messages older than the recent window, oldest first
+            session: The chat session
+
+        Returns:
+            Messages not yet folded into the summary, or None if the watermark
+            is unknown and the summary has to be rebuilt from the start
+        """
+        if not session.summary_watermark:
+            return None
+        for index, msg in enumerate(history_messages):
+            if msg.id == session.summary_watermark:
+                return history_messages[index + 1 :]  # noqa
+        return None
+
+    def _schedule_summary_refresh(self, session_id: str) -> None:
+        """
+        Queue an incremental summary refresh for a session.
+
+        Args:
+            session_id: The chat session ID
+        """
+        housekeeping_queue.schedule(
+            ("session_summary", session_id),
+            lambda: self.update_session_summary(session_id),
+            delay=self.HOUSEKEEPING_IDLE_SECONDS,
+            max_delay=self.HOUSEKEEPING_MAX_DELAY,
+        )
+
     def update_session_summary(self, session_id: str) -> bool:
         """
         Update the conversation summary for a chat session.
         This is useful when a conversation has grown long and needs summarization.
 
+        Only the messages since the session's summary watermark are folded
+        into the existing summary, so a refresh costs O(new messages). The
+        summary is rebuilt from the start when there is no usable watermark.
+
         Args:
             session_id: The ID of the chat session to summarize
 
@@ -1838,13 +2177,13 @@ class ChatService:
             if not session:
                 return False
 
-            # Get all messages
-            messages = self.chat_storage.get_messages(session_id)
-
             # If we don't have enough messages, don't summarize
-            if len(messages) < config.min_messages_for_summary:
+            totals = self.chat_storage.get_message_totals(session_id)
+            if totals["message_count"] < config.min_messages_for_summary:
                 return False
 
+            messages = self._load_windowing_messages(session_id, session, config)
+
             # Split messages into history that needs summarizing
             # and recent messages to keep
             window_size = min(config.context_window_size, len(messages))
@@ -1853,14 +2192,24 @@ class ChatService:
             if not history_messages:
                 return False
 
-            # Generate a summary
-            summary = self._generate_conversation_summary(history_messages, config)
+            pending = self._unsummarized_messages(history_messages, session)
+            if session.context_summary and pending is not None:
+                if not pending:
+                    # Summary already covers all the history
+                    return False
+                summary = self._generate_conversation_summary(
+                    pending, config, previous_summary=session.context_summary
+                )
+            else:
+                summary = self._generate_conversation_summary(history_messages, config)
 
             if not summary:
                 return False
 
-            # Update the session with the new summary
+            # Re-read the session so fields changed while summarizing survive
+            session = self.chat_storage.get_session(session_id) or session
             session.context_summary = summary
+            session.summary_watermark = history_messages[-1].id
             self.chat_storage.update_session(session)
 
             return True
@@ -1889,6 +2238,7 @@ class ChatService:
 
             # Clear the summary
             session.context_summary = None
+            session.summary_watermark = None
             self.chat_storage.update_session(session)
 
             return True
@@ -1897,6 +2247,134 @@ class ChatService:
             logger.error(f"Error clearing session summary: {str(e)}")
             return False
 
+    def _schedule_session_housekeeping(self, session_id: str) -> None:
+        """
+        Queue title generation and topic-shift detection for a session.
+
+        The job is debounced per session, so a burst of turns results in a
+        single check once the conversation goes idle.
+
+        Args:
+            session_id: The chat session ID
+        """
+        housekeeping_queue.schedule(
+            ("session_title", session_id),
+            lambda: self._check_and_generate_session_title(session_id),
+            delay=self.HOUSEKEEPING_IDLE_SECONDS,
+            max_delay=self.HOUSEKEEPING_MAX_DELAY,
+        )
+        self._schedule_archive_sweep()
+        self._schedule_message_embeddings()
+
+    def _schedule_message_embeddings(self) -> None:
+        """
+        Queue embedding of new chat messages for conversation search.
+
+        The job is debounced per data directory, so it runs once a burst of
+        turns across sessions has settled.
+        """
+        housekeeping_queue.schedule(
+            ("message_embeddings", self.chat_storage.base_dir),
+            self.embed_new_messages,
+            delay=self.HOUSEKEEPING_IDLE_SECONDS,
+            max_delay=self.HOUSEKEEPING_MAX_DELAY,
+        )
+
+    def embed_new_messages(self) -> int:
+        """
+        Embed chat messages that aren't in the conversation index yet.
+
+        Does nothing when search_past_conversations is off. A full batch
+        queues another job so a backlog drains without blocking the queue.
+
+        Returns:
+            Number of messages embedded
+        """
+        config = self.chat_storage.get_chat_config()
+        if not config.search_past_conversations:
+            return 0
+
+        try:
+            embedded = self.llm_service.process_messages_without_embeddings(
+                self.MESSAGE_EMBEDDING_BATCH
+            )
+        except Exception as e:
+            logger.error(f"Error embedding chat messages: {str(e)}")
+            return 0
+
+        if embedded == self.MESSAGE_EMBEDDING_BATCH:
+            self._schedule_message_embeddings()
+        return embedded
+
+    def _schedule_archive_sweep(self) -> None:
+        """
+        Queue a sweep of idle sessions into the archive.
+
+        Sweeps run at most once per ARCHIVE_SWEEP_INTERVAL_SECONDS for each
+        data directory.
+        """
+        base_dir = self.chat_storage.base_dir
+        now = time.monotonic()
+        with _archive_swept_lock:
+            last_swept = _archive_swept_at.get(base_dir)
+            if (
+                last_swept is not None
+                and now - last_swept < self.ARCHIVE_SWEEP_INTERVAL_SECONDS
+            ):
+                return
+            _archive_swept_at[base_dir] = now
+
+        housekeeping_queue.schedule(
+            ("archive_sweep", base_dir),
+            self.archive_idle_sessions,
+            delay=self.HOUSEKEEPING_IDLE_SECONDS,
+        )
+
+    def archive_idle_sessions(self) -> int:
+        """
+        Archive sessions idle longer than the configured archive_after_days.
+
+        Returns:
+            Number of sessions archived
+        """
+        config = self.chat_storage.get_chat_config()
+        if config.archive_after_days <= 0:
+            return 0
+
+        try:
+            return self.chat_storage.archive_idle_sessions(config.archive_after_days)
+        except Exception as e:
+            logger.error(f"Error archiving idle sessions: {str(e)}")
+            return 0
+
+    def _topic_check_due(self, session_id: str, exchanges: int) -> bool:
+        """
+        Check whether enough new exchanges have happened for a topic-shift check.
+
+        Marks the check as done at ``exchanges`` when it is due.
+
+        Args:
+            session_id: The chat session ID
+            exchanges: Current number of exchanges in the session
+
+        Returns:
+            True if a topic-shift check should run now
+        """
+        if exchanges < self.TOPIC_CHECK_MIN_EXCHANGES:
+            return False
+
+        with _topic_checked_lock:
+            last_checked = _topic_checked_at.get(session_id)
+            if last_checked is not None:
+                _topic_checked_at.move_to_end(session_id)
+                if exchanges - last_checked < self.TOPIC_CHECK_INTERVAL:
+                    return False
+            _topic_checked_at[session_id] = exchanges
+            while len(_topic_checked_at) > _TOPIC_CHECKED_MAX_SESSIONS:
+                _topic_checked_at.popitem(last=False)
+
+        return True
+
     def _check_and_generate_session_title(self, session_id: str) -> None:
         """
         Check if a session needs auto-naming and generate a title if appropriate.
@@ -1907,6 +2385,8 @@ class ChatService:
         3. Generates a title after 2-3 exchanges using LLM
         4. Optionally updates title if topic has shifted significantly
 
+        Runs on the housekeeping queue; see _schedule_session_housekeeping.
+
         Args:
             session_id: The chat session ID
         """
@@ -1917,13 +2397,9 @@ class ChatService:
                 logger.warning(f"Session {session_id} not found for auto-naming")
                 return
 
-            # Get all messages in the session
-            messages = self.chat_storage.get_messages(session_id)
-
             # Count message exchanges (user + assistant pairs)
-            user_messages = [msg for msg in messages if msg.role == "user"]
-            assistant_messages = [msg for msg in messages if msg.role == "assistant"]
-            exchanges = min(len(user_messages), len(assistant_messages))
+            totals = self.chat_storage.get_message_totals(session_id)
+            exchanges = min(totals["user_count"], totals["assistant_count"])
 
             # Check if session already has a meaningful title
             has_meaningful_title = (
@@ -1943,12 +2419,17 @@ class ChatService:
 
                 logger.debug(f"Session {session_id} needs initial auto-naming")
             else:
-                # For topic shift detection, only check if we have many exchanges
-                if (
-                    exchanges < 8
-                ):  # Check for topic shifts after significant conversation
+                # Topic shift detection costs an LLM call, so only check
+                # periodically once the conversation is long enough
+                if not self._topic_check_due(session_id, exchanges):
                     return
 
+            # Titles are generated from the latest turns only
+            messages = self.chat_storage.get_messages(
+                session_id, limit=self.TITLE_CONTEXT_MESSAGES
+            )
+
+            if has_meaningful_title:
                 # Check if topic has shifted significantly
                 if not self._has_topic_shifted(messages, session.title):
                     logger.debug(
@@ -1991,7 +2472,7 @@ class ChatService:
         4. Returns True if topics are significantly different
 
         Args:
-            messages: All messages in the session
+            messages: Recent messages in the session
             current_title: Current session title
 
         Returns:
@@ -2201,7 +2682,9 @@ class ChatService:
                 "session_created_at": session.created_at.isoformat()
                 if session
                 else None,
-                "message_count": len(self.chat_storage.get_messages(session_id))
+                "message_count": self.chat_storage.get_message_totals(session_id)[
+                    "message_count"
+                ]
                 if message_ids is None
                 else len(message_ids),
                 "temporal_filter": session.temporal_filter if session else None,
@@ -2233,6 +2716,247 @@ class ChatService:
             logger.error(f"Error saving conversation as entry: {e}")
             raise ValueError(f"Failed to save conversation as entry: {str(e)}")
 
+    def _execute_recommended_tools(
+        self,
+        tool_analysis: Dict[str, Any],
+        message_content: str,
+        session: ChatSession,
+        context: Dict[str, Any],
+        message_id: str = "",
+        speculative: Optional[Dict[str, concurrent.futures.Future]] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[EntryReference]]:
+        """
+        Execute the tools recommended by the tool analysis concurrently.
+
+        Every tool above the confidence threshold is submitted to the shared
+        tool executor at once. Each tool gets its own timeout; a tool that
+        fails or times out is reported as an unsuccessful result while the
+        results of the other tools are kept.
+
+        Args:
+            tool_analysis: Output of LLMService.analyze_message_for_tools
+            message_content: The user message content (default query)
+            session: The chat session, used for temporal filters
+            context: Context passed through to the tools
+            message_id: Message ID to attach to extracted references
+            speculative: Optional tool executions started before routing
+                finished, keyed by tool name. They are used in place of a
+                new execution when the tool is recommended and cancelled
+                otherwise; both outcomes are counted in the routing stats.
+
+        Returns:
+            Tuple of (tool_results, references), in recommendation order
+        """
+        tool_results = []
+        references = []
+        speculative = dict(speculative or {})
+
+        try:
+            if not tool_analysis.get("should_use_tools", False):
+                logger.info("No tools recommended for this message")
+                return tool_results, references
+
+            logger.info(f"Tool analysis suggests using tools: {tool_analysis}")
+            return self._collect_tool_results(
+                tool_analysis,
+                message_content,
+                session,
+                context,
+                message_id,
+                speculative,
+            )
+        finally:
+            # Discard speculative work the routing decision didn't use
+            for tool_name, future in speculative.items():
+                future.cancel()
+                self.tool_router.stats.record_speculation(used=False)
+                logger.info(f"Discarded speculative {tool_name} result")
+
+    def _collect_tool_results(
+        self,
+        tool_analysis: Dict[str, Any],
+        message_content: str,
+        session: ChatSession,
+        context: Dict[str, Any],
+        message_id: str,
+        speculative: Dict[str, concurrent.futures.Future],
+    ) -> Tuple[List[Dict[str, Any]], List[EntryReference]]:
+        """
+        Run the recommended tools and gather their results and references.
+
+        A speculative execution is used whenever its tool is recommended,
+        even if the LLM suggested a rewritten query: it searched the user's
+        own words and is already running, and a second search would put the
+        retrieval back on the time-to-first-token path. Speculative
+        executions that are used are removed from ``speculative``.
+
+        Args:
+            tool_analysis: Tool analysis recommending tools
+            message_content: The user message content (default query)
+            session: The chat session, used for temporal filters
+            context: Context passed through to the tools
+            message_id: Message ID to attach to extracted references
+            speculative: Tool executions already in flight, keyed by tool name
+
+        Returns:
+            Tuple of (tool_results, references), in recommendation order
+        """
+        tool_results = []
+        references = []
+
+        submitted = []
+        for tool_rec in tool_analysis.get("recommended_tools", []):
+            tool_name = tool_rec.get("tool_name")
+            confidence = tool_rec.get("confidence", 0.0)
+            suggested_query = tool_rec.get("suggested_query", message_content)
+
+            # Only execute tools with sufficient confidence
+            if confidence < self.TOOL_CONFIDENCE_THRESHOLD:
+                logger.info(
+                    f"Skipping tool {tool_name} due to low confidence: {confidence}"
+                )
+                continue
+
+            if tool_name in speculative:
+                logger.info(f"Using speculative {tool_name} result")
+                submitted.append((tool_name, speculative.pop(tool_name)))
+                self.tool_router.stats.record_speculation(used=True)
+                continue
+
+            logger.info(f"Executing tool {tool_name} with confidence {confidence}")
+
+            tool_params = self._build_tool_params(suggested_query, session)
+            future = _TOOL_EXECUTOR.submit(
+                self._execute_tool_sync, tool_name, tool_params, context
+            )
+            submitted.append((tool_name, future))
+
+        # Collect results in order; each tool's deadline counts from submission
+        started_at = time.monotonic()
+        for tool_name, future in submitted:
+            timeout = self.TOOL_TIMEOUTS.get(tool_name, self.DEFAULT_TOOL_TIMEOUT)
+            remaining = max(0.0, started_at + timeout - time.monotonic())
+            try:
+                result = future.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logger.warning(f"Tool {tool_name} timed out after {timeout}s")
+                tool_results.append(
+                    {
+                        "tool_name": tool_name,
+                        "success": False,
+                        "error": f"Tool timed out after {timeout} seconds",
+                    }
+                )
+                continue
+            except Exception as e:
+                logger.error(f"Error executing tool {tool_name}: {e}")
+                tool_results.append(
+                    {"tool_name": tool_name, "success": False, "error": str(e)}
+                )
+                continue
+
+            tool_results.append(
+                {
+                    "tool_name": tool_name,
+                    "success": result.success,
+                    "data": result.data,
+                    "metadata": result.metadata,
+                }
+            )
+
+            # Extract references from journal search results
+            if (
+                tool_name == "journal_search"
+                and result.success
+                and result.data
+                and result.data.get("results")
+            ):
+                for entry_data in result.data["results"]:
+                    references.append(
+                        EntryReference(
+                            message_id=message_id,
+                            entry_id=entry_data["id"],
+                            similarity_score=entry_data.get("relevance", 0.0),
+                            chunk_index=0,
+                            entry_title=entry_data.get("title", ""),
+                            entry_snippet=entry_data.get("content_preview", ""),
+                        )
+                    )
+
+        return tool_results, references
+
+    def _build_tool_params(self, query: str, session: ChatSession) -> Dict[str, Any]:
+        """
+        Build tool parameters for a query, adding session-specific filters.
+
+        Args:
+            query: Search query for the tool
+            session: The chat session, used for temporal filters
+
+        Returns:
+            Tool parameter dictionary
+        """
+        tool_params = {"query": query}
+
+        if session.temporal_filter:
+            date_filter = self.temporal_parser.parse_temporal_query(
+                session.temporal_filter
+            )
+            if date_filter:
+                tool_params["date_filter"] = date_filter
+
+        return tool_params
+
+    def _route_with_speculation(
+        self,
+        message: ChatMessage,
+        session: ChatSession,
+        context: Dict[str, Any],
+        config: ChatConfig,
+    ) -> Tuple[Dict[str, Any], Dict[str, concurrent.futures.Future]]:
+        """
+        Route a message, starting journal retrieval while the LLM decides.
+
+        When the rule tier can decide, nothing is speculated. Otherwise the
+        journal search for the raw message is submitted to the tool executor
+        before the LLM tool analysis call, so retrieval overlaps with that
+        round-trip instead of following it.
+
+        Args:
+            message: The user message being processed
+            session: The chat session, used for temporal filters
+            context: Context passed to the router and tools
+            config: Chat configuration with routing settings
+
+        Returns:
+            Tuple of (tool_analysis, speculative futures keyed by tool name)
+        """
+        if config.use_rule_based_routing:
+            tool_analysis = self.tool_router.route_with_rules(
+                message.content, context, config.tool_routing_threshold
+            )
+            if tool_analysis is not None:
+                return tool_analysis, {}
+
+        speculative = {}
+        if config.use_speculative_retrieval and self.tool_registry.is_enabled(
+            "journal_search"
+        ):
+            tool_params = self._build_tool_params(message.content, session)
+            speculative["journal_search"] = _TOOL_EXECUTOR.submit(
+                self._execute_tool_sync, "journal_search", tool_params, context
+            )
+
+        try:
+            tool_analysis = self.tool_router.route_with_llm(message.content, context)
+        except Exception:
+            for future in speculative.values():
+                future.cancel()
+            raise
+
+        return tool_analysis, speculative
+
     def _execute_tool_sync(
         self,
         tool_name: str,
@@ -2263,9 +2987,6 @@ class ChatService:
             # Execute the tool
             if loop.is_running():
                 # If loop is already running, we need to run in a thread to avoid blocking
-                import concurrent.futures
-                import threading
-
                 def run_async_tool():
                     # Create a new event loop in the thread
                     new_loop = asyncio.new_event_loop()
@@ -2279,10 +3000,9 @@ class ChatService:
                     finally:
                         new_loop.close()
 
-                # Run the async tool in a separate thread
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_async_tool)
-                    return future.result(timeout=30)  # 30 second timeout
+                # Run the async tool on its own pool, never on _TOOL_EXECUTOR
+                future = _TOOL_LOOP_EXECUTOR.submit(run_async_tool)
+                return future.result(timeout=self.DEFAULT_TOOL_TIMEOUT)
             else:
                 return loop.run_until_complete(
                     self.tool_registry.execute_tool(tool_name, parameters, context)
@@ -2434,11 +3154,11 @@ class ChatService:
                             "title": result.get("title", ""),
                             "url": result.get("href", ""),
                             "snippet": result.get("body", "")[:200],
-                            "source": result.get("href", "")
-                            .split("//")[-1]
-                            .split("/")[0]
-                            if result.get("href")
-                            else "",
+                            "source": (
+                                result.get("href", "").split("//")[-1].split("/")[0]
+                                if result.get("href")
+                                else ""
+                            ),
                         }
                         results.append(formatted_result)
 
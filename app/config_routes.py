@@ -9,6 +9,7 @@ from typing import List, Dict, Any
 from app.llm_service import LLMService
 from app.utils import get_llm_service, get_storage
 from app.models import WebSearchConfig
+from app.storage.config_cache import config_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,17 @@ async def get_llm_config(
         )
 
 
+@config_router.get("/cache/stats")
+async def get_config_cache_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the in-process config and persona cache.
+
+    Returns:
+        Dictionary with the cache size, hit rate and namespace versions
+    """
+    return config_cache.get_stats()
+
+
 @config_router.get("/available-models")
 async def get_available_models(
     llm_service: LLMService = Depends(get_llm_service),
@@ -43,12 +55,16 @@ async def get_available_models(
     """
     Get the list of available LLM models that can be used.
 
+    Served from the model registry; Ollama is only queried if the registry
+    hasn't loaded yet.
+
     Returns:
         Dictionary with a list of available model names
     """
     try:
-        # Get available models from the LLM service
-        models = llm_service.get_available_models()
+        models = llm_service.model_registry.get_models()
+        if models is None:
+            models = llm_service.model_registry.refresh()
         return {"models": models}
     except Exception as e:
         logger.error(f"Failed to get available models: {str(e)}")
@@ -57,6 +73,45 @@ async def get_available_models(
         )
 
 
+@config_router.post("/available-models/refresh")
+async def refresh_available_models(
+    llm_service: LLMService = Depends(get_llm_service),
+) -> Dict[str, Any]:
+    """
+    Re-query Ollama for available models, e.g. after pulling a new one.
+
+    Returns:
+        Dictionary with the refreshed models and the registry's state
+    """
+    try:
+        llm_service.model_registry.refresh()
+        return llm_service.model_registry.get_status()
+    except Exception as e:
+        logger.error(f"Failed to refresh available models: {str(e)}")
+        raise HTTPException(
+            status_code=503, detail=f"Failed to refresh available models: {str(e)}"
+        )
+
+
+@config_router.get("/llm/backends")
+async def get_llm_backends(
+    llm_service: LLMService = Depends(get_llm_service),
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get routing and health state for each configured Ollama backend.
+
+    Returns:
+        Dictionary with a list of backend status entries
+    """
+    try:
+        return {"backends": llm_service.backend_pool.get_status()}
+    except Exception as e:
+        logger.error(f"Failed to get LLM backends: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get LLM backends: {str(e)}"
+        )
+
+
 @config_router.get("/web-search", response_model=WebSearchConfig)
 async def get_web_search_config(
     storage=Depends(get_storage),
@@ -0,0 +1,190 @@
+"""
+Deferred housekeeping jobs for the chat service.
+
+Work such as session title generation doesn't need to finish before a
+response is returned. This module runs it on a background worker instead,
+with debouncing so a burst of turns in one session collapses into one job.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HousekeepingQueue:
+    """
+    Debounced background job queue.
+
+    Jobs are keyed; scheduling a key that is already pending replaces the
+    job and pushes its run time back (trailing debounce), but never past
+    ``max_delay`` seconds after the key was first scheduled, so a busy
+    session still gets its housekeeping done.
+    """
+
+    def __init__(self, name: str = "housekeeping"):
+        """
+        Initialize the queue. The worker thread starts on first use.
+
+        Args:
+            name: Name for the worker thread
+        """
+        self.name = name
+        self._condition = threading.Condition()
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._worker: Optional[threading.Thread] = None
+        self._running_jobs = 0
+        self._stats = {"scheduled": 0, "debounced": 0, "completed": 0, "failed": 0}
+
+    def schedule(
+        self,
+        key: Hashable,
+        func: Callable[[], Any],
+        delay: float = 0.0,
+        max_delay: Optional[float] = None,
+    ) -> None:
+        """
+        Schedule a job, debouncing against a pending job with the same key.
+
+        Args:
+            key: Job identity used for debouncing
+            func: Callable run on the worker thread
+            delay: Seconds to wait before running
+            max_delay: Longest a key may be deferred by repeated scheduling;
+                defaults to no limit
+        """
+        now = time.monotonic()
+
+        with self._condition:
+            pending = self._pending.get(key)
+            if pending:
+                first_scheduled = pending["first_scheduled"]
+                self._stats["debounced"] += 1
+            else:
+                first_scheduled = now
+                self._stats["scheduled"] += 1
+
+            run_at = now + delay
+            if max_delay is not None:
+                run_at = min(run_at, first_scheduled + max_delay)
+
+            token = next(self._sequence)
+            self._pending[key] = {
+                "func": func,
+                "run_at": run_at,
+                "first_scheduled": first_scheduled,
+                "token": token,
+            }
+            heapq.heappush(self._heap, (run_at, token, key))
+
+            self._ensure_worker()
+            self._condition.notify()
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """
+        Run pending jobs now and wait until the queue is idle.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the queue became idle within the timeout
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            # Make every pending job due immediately
+            for key, pending in self._pending.items():
+                pending["run_at"] = 0.0
+                heapq.heappush(self._heap, (0.0, pending["token"], key))
+            self._condition.notify_all()
+
+            while self._pending or self._running_jobs:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue counters.
+
+        Returns:
+            Dictionary with scheduled, debounced, completed, failed and
+            pending counts
+        """
+        with self._condition:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread if it isn't running. Caller holds the lock."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._worker.start()
+
+    def _next_due_job(self) -> Optional[Callable[[], Any]]:
+        """
+        Wait for the next due job and claim it. Caller holds the lock.
+
+        Returns:
+            The job callable
+        """
+        while True:
+            # Drop heap entries superseded by a later schedule() call
+            while self._heap:
+                run_at, token, key = self._heap[0]
+                pending = self._pending.get(key)
+                if (
+                    pending
+                    and pending["token"] == token
+                    and pending["run_at"] == run_at
+                ):
+                    break
+                heapq.heappop(self._heap)
+
+            if not self._heap:
+                self._condition.wait()
+                continue
+
+            run_at, token, key = self._heap[0]
+            wait = run_at - time.monotonic()
+            if wait > 0:
+                self._condition.wait(wait)
+                continue
+
+            heapq.heappop(self._heap)
+            pending = self._pending.pop(key)
+            self._running_jobs += 1
+            return pending["func"]
+
+    def _run(self) -> None:
+        """Worker loop."""
+        while True:
+            with self._condition:
+                func = self._next_due_job()
+
+            try:
+                func()
+                succeeded = True
+            except Exception as e:
+                logger.error(f"Housekeeping job failed: {e}")
+                succeeded = False
+
+            with self._condition:
+                self._running_jobs -= 1
+                self._stats["completed" if succeeded else "failed"] += 1
+                self._condition.notify_all()
+
+
+# Process-wide queue; chat services are created per request
+housekeeping_queue = HousekeepingQueue()
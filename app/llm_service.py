@@ -6,14 +6,29 @@ embedding generation and structured outputs.
 """
 
 import ollama
+import concurrent.futures
+import hashlib
 import logging
 import json
+import os
+import threading
 import time
 import random
+import requests
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Callable, Iterator, Union
+import httpx
 from pydantic import BaseModel
 from app.storage import StorageManager
-from app.models import LLMConfig, BatchAnalysis, JournalEntry, EntrySummary
+from app.query_expansion import CooccurrenceExpander, ExpansionCache, normalize_query
+from app.token_budget import get_tokenizer
+from app.models import (
+    LLMConfig,
+    BatchAnalysis,
+    JournalEntry,
+    EntrySummary,
+    OllamaBackendConfig,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +36,71 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+
+
+# Error message fragments that indicate a CUDA/GPU failure on an Ollama host
+CUDA_ERROR_INDICATORS = [
+    "cuda error",
+    "illegal memory access",
+    "ggml_backend_cuda",
+    "cudastreamsynchro",
+    "cuda device",
+    "gpu memory",
+    "out of memory",
+]
+
+# One pooled keep-alive HTTP session per Ollama host, shared by every
+# LLMService instance in the process
+_http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+
+
+def normalize_ollama_host(host: Optional[str]) -> str:
+    """
+    Normalize an Ollama host setting into a base URL.
+
+    Accepts the same forms as the ollama client's OLLAMA_HOST setting, such
+    as "localhost", "gpu-box:11434" or "http://gpu-box:11434/".
+
+    Args:
+        host: Host setting, or None for the default host
+
+    Returns:
+        Base URL with scheme and port and without a trailing slash
+    """
+    host = (host or DEFAULT_OLLAMA_HOST).strip().rstrip("/")
+    if "://" not in host:
+        host = f"http://{host}"
+
+    scheme, rest = host.split("://", 1)
+    netloc, _, path = rest.partition("/")
+    if ":" not in netloc.rsplit("]", 1)[-1]:
+        netloc = f"{netloc}:{443 if scheme == 'https' else 11434}"
+
+    return f"{scheme}://{netloc}" + (f"/{path}" if path else "")
+
+
+def get_http_session(host: str) -> requests.Session:
+    """
+    Get the shared keep-alive HTTP session for an Ollama host.
+
+    Args:
+        host: Normalized Ollama base URL
+
+    Returns:
+        A requests.Session reused for every request to that host
+    """
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_sessions[host] = session
+        return session
+
 
 class LLMServiceError(Exception):
     """Base exception for LLM service errors."""
@@ -103,6 +183,464 @@ class CircuitBreaker:
             )
 
 
+def is_backend_failure(error: Exception) -> bool:
+    """
+    Check whether an error means the Ollama host itself is unhealthy.
+
+    Connection failures, timeouts, 5xx responses and CUDA errors count
+    against a backend and trigger failover; other errors (such as a bad
+    request) are returned to the caller unchanged.
+
+    Args:
+        error: The exception raised by a call to the backend
+
+    Returns:
+        True if the error should count against the backend's health
+    """
+    if isinstance(
+        error,
+        (
+            ConnectionError,
+            TimeoutError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            httpx.TransportError,
+        ),
+    ):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code >= 500:
+        return True
+
+    error_lower = str(error).lower()
+    return any(indicator in error_lower for indicator in CUDA_ERROR_INDICATORS)
+
+
+class OllamaBackend:
+    """One Ollama host in the backend pool."""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        weight: float = 1.0,
+        operations: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize a backend.
+
+        Args:
+            host: Ollama host URL; None uses the module-level ollama client,
+                which honours OLLAMA_HOST
+            weight: Relative capacity used by least-outstanding routing
+            operations: Operations this backend serves; empty means all
+            timeout: Read timeout for the backend's client
+        """
+        self.host = normalize_ollama_host(host or os.environ.get("OLLAMA_HOST"))
+        self.weight = weight if weight and weight > 0 else 1.0
+        self.operations = set(operations or [])
+        self.circuit_breaker = CircuitBreaker(failure_threshold=3, timeout=30)
+        self.outstanding = 0
+        self.total_requests = 0
+        self.models: Optional[set] = None  # None until the model map is refreshed
+
+        self._client = None
+        if host:
+            self._client = ollama.Client(host=self.host, timeout=timeout)
+
+    @property
+    def client(self):
+        """The Ollama client for this backend."""
+        return self._client if self._client is not None else ollama
+
+    def serves(self, operation: str) -> bool:
+        """Check whether this backend handles an operation."""
+        return not self.operations or operation in self.operations
+
+    def has_model(self, model: Optional[str]) -> Optional[bool]:
+        """
+        Check the model map for a model.
+
+        Returns:
+            True or False if known, None if the model map hasn't been loaded
+        """
+        if not model or self.models is None:
+            return None
+        return model in self.models
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the backend's routing and health state."""
+        return {
+            "host": self.host,
+            "weight": self.weight,
+            "operations": sorted(self.operations) or ["all"],
+            "state": self.circuit_breaker.state,
+            "outstanding": self.outstanding,
+            "total_requests": self.total_requests,
+            "models": sorted(self.models) if self.models is not None else None,
+        }
+
+
+class OllamaBackendPool:
+    """
+    Routes Ollama calls across one or more backends.
+
+    Each call goes to the healthy backend that serves the operation, has the
+    model (when the model map is known) and has the fewest outstanding
+    requests relative to its weight. Backend failures are recorded on that
+    backend's circuit breaker and the call fails over to the next candidate.
+
+    The default configuration is a pool of one backend. Connection errors
+    still count against its breaker, so once Ollama is unreachable calls
+    fail fast with CircuitBreakerOpen until the breaker's timeout passes
+    instead of each waiting for its own connection error.
+    """
+
+    def __init__(self, backends: List[OllamaBackend]):
+        """
+        Initialize the pool.
+
+        Args:
+            backends: Backends to route across, in preference order
+        """
+        if not backends:
+            raise ValueError("Backend pool needs at least one backend")
+        self.backends = backends
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: LLMConfig, previous: Optional["OllamaBackendPool"] = None
+    ) -> "OllamaBackendPool":
+        """
+        Build a pool from LLM configuration.
+
+        Without configured backends the pool holds a single backend for
+        ollama_host (or OLLAMA_HOST / localhost).
+
+        Args:
+            config: LLM configuration
+            previous: Pool being replaced; backends whose host is unchanged
+                keep its circuit breaker state
+
+        Returns:
+            OllamaBackendPool instance
+        """
+        backend_configs = config.ollama_backends or [
+            OllamaBackendConfig(host=config.ollama_host)
+        ]
+        backends = [
+            OllamaBackend(
+                host=backend.host,
+                weight=backend.weight,
+                operations=backend.operations,
+                timeout=config.read_timeout,
+            )
+            for backend in backend_configs
+        ]
+
+        if previous is not None:
+            breakers = {
+                backend.host: backend.circuit_breaker for backend in previous.backends
+            }
+            for backend in backends:
+                if backend.host in breakers:
+                    backend.circuit_breaker = breakers[backend.host]
+
+        return cls(backends)
+
+    def candidates(
+        self, operation: str, model: Optional[str] = None
+    ) -> List[OllamaBackend]:
+        """
+        Order the backends eligible for a call, best first.
+
+        Args:
+            operation: Operation type (chat, analysis, search, embedding)
+            model: Optional model the call needs
+
+        Returns:
+            Healthy backends sorted by weighted outstanding requests
+        """
+        with self._lock:
+            eligible = [
+                backend
+                for backend in self.backends
+                if backend.serves(operation) and backend.circuit_breaker.is_available()
+            ]
+            # Skip backends known not to have the model, unless none have it
+            with_model = [b for b in eligible if b.has_model(model) is not False]
+            if with_model:
+                eligible = with_model
+
+            return sorted(
+                eligible,
+                key=lambda b: ((b.outstanding + 1) / b.weight, b.total_requests),
+            )
+
+    def execute(
+        self,
+        operation: str,
+        func: Callable[[OllamaBackend], Any],
+        model: Optional[str] = None,
+    ) -> Any:
+        """
+        Run a call on the best backend, failing over on backend failures.
+
+        Args:
+            operation: Operation type used for routing
+            func: Callable receiving the chosen backend
+            model: Optional model the call needs
+
+        Returns:
+            The result of ``func``
+
+        Raises:
+            CircuitBreakerOpen: If no backend is available for the operation
+            Exception: The last error if every candidate failed, or any
+                non-backend error unchanged
+        """
+        candidates = self.candidates(operation, model)
+        if not candidates:
+            raise CircuitBreakerOpen(
+                f"No healthy Ollama backend available for {operation}"
+            )
+
+        last_error = None
+        for backend in candidates:
+            self.acquire(backend)
+            try:
+                result = func(backend)
+            except Exception as e:
+                if not is_backend_failure(e):
+                    raise
+                backend.circuit_breaker.record_failure()
+                last_error = e
+                logger.warning(
+                    f"Ollama backend {backend.host} failed for {operation}: {e}; "
+                    "failing over"
+                )
+                continue
+            finally:
+                self.release(backend)
+
+            backend.circuit_breaker.record_success()
+            return result
+
+        raise last_error
+
+    def acquire(self, backend: OllamaBackend):
+        """Count an outstanding request on a backend."""
+        with self._lock:
+            backend.outstanding += 1
+            backend.total_requests += 1
+
+    def release(self, backend: OllamaBackend):
+        """Finish an outstanding request on a backend."""
+        with self._lock:
+            backend.outstanding -= 1
+
+    def client_for(self, operation: str) -> "_RoutedClient":
+        """
+        Get an ollama-client-like object that routes through the pool.
+
+        Args:
+            operation: Operation type used for routing
+
+        Returns:
+            Object exposing chat/embeddings/generate like the ollama client
+        """
+        return _RoutedClient(self, operation)
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """Get routing and health state for every backend."""
+        with self._lock:
+            return [backend.get_status() for backend in self.backends]
+
+
+class _RoutedClient:
+    """Proxy exposing ollama client methods that route through a pool."""
+
+    def __init__(self, pool: OllamaBackendPool, operation: str):
+        self._pool = pool
+        self._operation = operation
+
+    def __getattr__(self, method: str):
+        def call(*args, **kwargs):
+            return self._pool.execute(
+                self._operation,
+                lambda backend: getattr(backend.client, method)(*args, **kwargs),
+                model=kwargs.get("model"),
+            )
+
+        return call
+
+
+class ModelRegistry:
+    """
+    Cached view of the models available on the Ollama backends.
+
+    Lookups never touch the network. Once the snapshot is older than the TTL
+    it is still served while a single background thread fetches a fresh one,
+    so a newly pulled model shows up within one TTL. Until the first fetch
+    succeeds, availability is unknown and callers should assume a model is
+    there.
+    """
+
+    def __init__(self, fetch: Callable[[], List[str]], ttl_seconds: float = 60.0):
+        """
+        Initialize the registry.
+
+        Args:
+            fetch: Callable returning the available model names; it may raise
+            ttl_seconds: Age after which the snapshot is refreshed
+        """
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._models: Optional[frozenset] = None
+        self._fetched_at: Optional[float] = None
+        self._refreshing = False
+        self._last_error: Optional[str] = None
+        # Bumped by invalidate(); a fetch that started under an older
+        # generation may have asked the old backends, so it is redone
+        self._generation = 0
+
+    def refresh(self) -> List[str]:
+        """
+        Fetch the model list now, on the calling thread.
+
+        If the registry is invalidated while the fetch is in flight, the
+        result is discarded and the fetch runs again.
+
+        Returns:
+            Sorted list of available model names
+
+        Raises:
+            Exception: Whatever the fetch raised; the old snapshot is kept
+        """
+        while True:
+            with self._lock:
+                generation = self._generation
+            try:
+                models = self._fetch()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = str(e)
+                raise
+
+            with self._lock:
+                if generation != self._generation:
+                    logger.debug("Model list fetched before invalidation, refetching")
+                    continue
+                first = self._models is None
+                self._models = frozenset(models)
+                self._fetched_at = time.monotonic()
+                self._last_error = None
+            break
+        if first:
+            logger.info(f"Connected to Ollama, {len(models)} models available")
+        return sorted(models)
+
+    def refresh_async(self) -> bool:
+        """
+        Start a background refresh unless one is already running.
+
+        Returns:
+            True if a refresh was started
+        """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+
+        threading.Thread(
+            target=self._refresh_in_background, name="model-registry", daemon=True
+        ).start()
+        return True
+
+    def _refresh_in_background(self) -> None:
+        """Refresh, logging rather than raising failures."""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Failed to refresh available models: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def is_stale(self) -> bool:
+        """Check whether the snapshot is missing or older than the TTL."""
+        with self._lock:
+            return (
+                self._fetched_at is None
+                or time.monotonic() - self._fetched_at > self.ttl_seconds
+            )
+
+    def is_available(self, model_name: str) -> Optional[bool]:
+        """
+        Check a model against the snapshot, refreshing it in the background
+        if it is stale.
+
+        Args:
+            model_name: Name of the model
+
+        Returns:
+            True or False if known, None if no snapshot has been fetched yet
+        """
+        if self.is_stale():
+            self.refresh_async()
+        with self._lock:
+            if self._models is None:
+                return None
+            return model_name in self._models
+
+    def get_models(self) -> Optional[List[str]]:
+        """
+        Get the models in the current snapshot.
+
+        Returns:
+            Sorted model names, or None if no snapshot has been fetched yet
+        """
+        with self._lock:
+            return sorted(self._models) if self._models is not None else None
+
+    def invalidate(self) -> None:
+        """
+        Drop the snapshot, e.g. after the backends have changed.
+
+        A refresh already in flight notices the new generation and fetches
+        again instead of storing its result.
+        """
+        with self._lock:
+            self._generation += 1
+            self._models = None
+            self._fetched_at = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the registry's state.
+
+        Returns:
+            Dictionary with the models, snapshot age, TTL, whether a refresh
+            is running and the last refresh error
+        """
+        with self._lock:
+            age = (
+                round(time.monotonic() - self._fetched_at, 1)
+                if self._fetched_at is not None
+                else None
+            )
+            return {
+                "models": sorted(self._models) if self._models is not None else None,
+                "age_seconds": age,
+                "ttl_seconds": self.ttl_seconds,
+                "refreshing": self._refreshing,
+                "last_error": self._last_error,
+            }
+
+
 class LLMService:
     """
     Service for LLM functionality using Ollama.
@@ -111,6 +649,16 @@ class LLMService:
     structured output capabilities for journal entry analysis.
     """
 
+    # Bump when the group summary prompts change so cached summaries are redone
+    GROUP_SUMMARY_PROMPT_VERSION = 1
+
+    # Seconds before the available-model snapshot is refreshed
+    MODEL_REGISTRY_TTL_SECONDS = 60.0
+
+    # Recent query embeddings kept so journal and conversation searches for
+    # the same query embed it once
+    QUERY_EMBEDDING_CACHE_SIZE = 64
+
     def __init__(
         self,
         storage_manager: Optional[StorageManager] = None,
@@ -142,26 +690,81 @@ class LLMService:
         self.max_tokens = self.config.max_tokens
         self.system_prompt = self.config.system_prompt
         self.min_similarity = self.config.min_similarity
+        self.backend_pool: Optional[OllamaBackendPool] = None
+        self._configure_ollama_client()
+
+        # Generation stats reported by the most recent streamed completion
+        self.last_generation_stats: Optional[Dict[str, Any]] = None
+
+        # Entry summary cache lookups since startup
+        self._summary_cache_lock = threading.Lock()
+        self._summary_cache_counts = {"hits": 0, "misses": 0}
+
+        # Search query expansions, and the local expander used when
+        # query_expansion is "local"
+        self._expansion_cache = ExpansionCache()
+        self._local_expander = (
+            CooccurrenceExpander(storage_manager) if storage_manager else None
+        )
+
+        # Query embeddings keyed by embedding model and query text
+        self._query_embeddings: "OrderedDict[tuple, List[float]]" = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        # Embeddings being generated, so concurrent searches share one call
+        self._pending_query_embeddings: Dict[tuple, concurrent.futures.Future] = {}
 
         # Initialize circuit breaker for GPU operations
         self.circuit_breaker = CircuitBreaker(failure_threshold=3, timeout=30)
 
-        # Verify Ollama connection on initialization
-        self._verify_ollama_connection()
+        # Models available on the backends; filled by warm_up() or on first use
+        self.model_registry = ModelRegistry(
+            self.get_available_models, ttl_seconds=self.MODEL_REGISTRY_TTL_SECONDS
+        )
+
+    def warm_up(self) -> bool:
+        """
+        Start loading the available models in the background.
+
+        This doubles as the Ollama connection check; a failure is logged and
+        retried on the next model lookup instead of blocking startup.
+
+        Returns:
+            True if a refresh was started
+        """
+        return self.model_registry.refresh_async()
+
+    def _configure_ollama_client(self):
+        """
+        Set up the Ollama backend pool and timeouts from the configuration.
+
+        Without configured backends the pool has a single backend for
+        ollama_host; when that is unset too, the module-level ollama client is
+        used, which honours OLLAMA_HOST, and streaming follows the same setting.
+        On reload, hosts that are still configured keep their breaker state.
+        """
+        self.connect_timeout = self.config.connect_timeout
+        self.read_timeout = self.config.read_timeout
+        self.backend_pool = OllamaBackendPool.from_config(
+            self.config, self.backend_pool
+        )
+        self.ollama_host = self.backend_pool.backends[0].host
+
+    def _ollama(self, operation: str) -> "_RoutedClient":
+        """
+        Get an Ollama client for an operation, routed through the backend pool.
+
+        Args:
+            operation: Operation type ('search', 'chat', 'analysis', 'embedding')
+
+        Returns:
+            Object with the ollama client's chat/embeddings methods
+        """
+        return self.backend_pool.client_for(operation)
 
     def _is_cuda_error(self, error_message: str) -> bool:
         """Check if an error message indicates a CUDA-related failure."""
-        cuda_indicators = [
-            "cuda error",
-            "illegal memory access",
-            "ggml_backend_cuda",
-            "cudastreamsynchro",
-            "cuda device",
-            "gpu memory",
-            "out of memory",
-        ]
         error_lower = str(error_message).lower()
-        return any(indicator in error_lower for indicator in cuda_indicators)
+        return any(indicator in error_lower for indicator in CUDA_ERROR_INDICATORS)
 
     def _execute_with_resilience(
         self, operation_func, operation_name: str, *args, **kwargs
@@ -276,10 +879,11 @@ class LLMService:
                 self.max_tokens = self.config.max_tokens
                 self.system_prompt = self.config.system_prompt
                 self.min_similarity = self.config.min_similarity
+                self._configure_ollama_client()
 
-                # Clear cached models to force re-validation with new config
-                if hasattr(self, "_cached_models"):
-                    delattr(self, "_cached_models")
+                # The backends may have changed, so re-check their models
+                self.model_registry.invalidate()
+                self.model_registry.refresh_async()
 
                 logger.info("LLM configuration reloaded from storage")
                 return True
@@ -313,26 +917,6 @@ class LLMService:
             "Summarize this journal entry. Extract key topics and mood. Return as JSON:"
         )
 
-    def _verify_ollama_connection(self) -> bool:
-        """
-        Verify that Ollama is running and accessible.
-
-        Returns:
-            True if connection is successful
-
-        Raises:
-            OllamaConnectionError: If connection to Ollama fails
-        """
-        try:
-            # Try a simple API call to check if Ollama is running
-            ollama.embeddings(model=self.embedding_model, prompt="test connection")
-            logger.info("Successfully connected to Ollama")
-            return True
-        except Exception as e:
-            error_msg = f"Failed to connect to Ollama: {str(e)}"
-            logger.error(error_msg)
-            raise OllamaConnectionError(error_msg)
-
     def get_embedding(self, text: str) -> List[float]:
         """
         Generate an embedding vector for the given text using Ollama.
@@ -348,7 +932,9 @@ class LLMService:
         """
 
         def _embedding_operation():
-            response = ollama.embeddings(model=self.embedding_model, prompt=text)
+            response = self._ollama("embedding").embeddings(
+                model=self.embedding_model, prompt=text
+            )
             if "embedding" in response:
                 return response["embedding"]
             else:
@@ -365,6 +951,51 @@ class LLMService:
             logger.error(f"Embedding generation failed: {e}")
             raise EmbeddingGenerationError(f"Failed to generate embedding: {e}")
 
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """
+        Get the embedding for a search query, reusing recent ones.
+
+        Searches that need the same query at the same time, such as the
+        journal and conversation searches of one tool call, wait for a
+        single embedding call.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Embedding vector as a list of floats
+
+        Raises:
+            EmbeddingGenerationError: If generating the embedding fails
+        """
+        key = (self.embedding_model, query)
+        with self._query_embeddings_lock:
+            if key in self._query_embeddings:
+                self._query_embeddings.move_to_end(key)
+                return self._query_embeddings[key]
+            pending = self._pending_query_embeddings.get(key)
+            if pending is None:
+                future = concurrent.futures.Future()
+                self._pending_query_embeddings[key] = future
+        if pending is not None:
+            return pending.result()
+
+        try:
+            embedding = self.get_embedding(query)
+        except Exception as e:
+            with self._query_embeddings_lock:
+                del self._pending_query_embeddings[key]
+            future.set_exception(e)
+            raise
+
+        with self._query_embeddings_lock:
+            del self._pending_query_embeddings[key]
+            self._query_embeddings[key] = embedding
+            while len(self._query_embeddings) > self.QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        future.set_result(embedding)
+        return embedding
+
     def _get_model_for_operation(self, operation_type: str) -> str:
         """
         Get the appropriate model for a specific operation type with fallback strategy.
@@ -396,7 +1027,8 @@ class LLMService:
                     return model
                 else:
                     logger.warning(
-                        f"Model {model} not available for {operation_type}, trying fallback"
+                        f"Model {model} not available for {operation_type}, "
+                        "trying fallback"
                     )
 
         # If no valid model found, raise exception
@@ -408,21 +1040,17 @@ class LLMService:
         """
         Validate that a model is available in Ollama.
 
+        Answers from the model registry without network I/O. Until the
+        registry has loaded, models are assumed to be available and the call
+        itself reports a missing model.
+
         Args:
             model_name: Name of the model to validate
 
         Returns:
-            True if model is available, False otherwise
+            True if model is available or availability is not yet known
         """
-        try:
-            # Cache available models to avoid repeated API calls
-            if not hasattr(self, "_cached_models"):
-                self._cached_models = self.get_available_models()
-
-            return model_name in self._cached_models
-        except Exception as e:
-            logger.error(f"Failed to validate model availability for {model_name}: {e}")
-            return False  # Assume unavailable on error
+        return self.model_registry.is_available(model_name) is not False
 
     def process_entries_without_embeddings(
         self,
@@ -484,19 +1112,125 @@ class LLMService:
 
         return processed
 
+    def process_messages_without_embeddings(self, limit: int = 50) -> int:
+        """
+        Embed chat messages for conversation search.
+
+        New and edited messages are embedded, as are messages embedded by a
+        different model than the current one; runs in the background so
+        searches never embed messages themselves.
+
+        Args:
+            limit: Maximum number of messages to process
+
+        Returns:
+            Number of messages embedded
+
+        Raises:
+            ValueError: If storage manager is not set
+        """
+        if not self.storage_manager:
+            raise ValueError("Storage manager is required for this operation")
+
+        model = self.embedding_model
+        messages = self.storage_manager.get_messages_without_embeddings(limit, model)
+        if not messages:
+            return 0
+
+        embedded = []
+        for message in messages:
+            try:
+                embedding = self.get_embedding(message["text"])
+                embedded.append({**message, "embedding": embedding, "model": model})
+            except Exception as e:
+                logger.error(
+                    f"Failed to embed chat message {message['message_id']}: {e}"
+                )
+                break
+
+        if embedded and not self.storage_manager.save_message_embeddings(embedded):
+            return 0
+
+        logger.info(f"Embedded {len(embedded)} of {len(messages)} chat messages")
+        return len(embedded)
+
+    def _summary_cache_key(self, content: str, prompt_type: str) -> str:
+        """
+        Build the summary cache key for an entry's content and prompt type.
+
+        The key covers the content, prompt type, analysis model and the text
+        of the prompt template and system prompt, so editing any of them
+        makes older cached summaries unreachable.
+
+        Args:
+            content: The journal entry content
+            prompt_type: Type of prompt used for the summary
+
+        Returns:
+            Hex digest identifying the summary
+        """
+        template = self.get_prompt_template(prompt_type)
+        template = f"{template}\n{self.system_prompt or ''}"
+        template_version = hashlib.sha256(template.encode("utf-8")).hexdigest()
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        key_source = "\n".join(
+            [
+                content_hash,
+                prompt_type,
+                self._get_model_for_operation("analysis"),
+                template_version,
+            ]
+        )
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def _record_summary_cache_lookup(self, hit: bool) -> None:
+        """Count a summary cache hit or miss."""
+        with self._summary_cache_lock:
+            self._summary_cache_counts["hits" if hit else "misses"] += 1
+
+    def get_summary_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get entry summary cache hit rates.
+
+        Returns:
+            Dictionary with hits, misses and hit_rate since startup, plus the
+            stored cache size when storage is available
+        """
+        with self._summary_cache_lock:
+            hits = self._summary_cache_counts["hits"]
+            misses = self._summary_cache_counts["misses"]
+
+        stats = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+        if self.storage_manager:
+            stats.update(self.storage_manager.get_summary_cache_stats())
+        return stats
+
     def summarize_entry(
         self,
         content: str,
         prompt_type: str = "default",
         progress_callback: Optional[Callable[[float], None]] = None,
+        entry_id: Optional[str] = None,
+        use_cache: bool = True,
     ) -> EntrySummary:
         """
         Generate a summary of a journal entry using structured output.
 
+        Summaries are cached by content, prompt type, model and prompt
+        template, so repeating a request for an unchanged entry returns the
+        stored result without calling the model.
+
         Args:
             content: The journal entry content to summarize
             prompt_type: Type of prompt to use (default, detailed, creative, concise)
             progress_callback: Optional callback function to report progress (0.0-1.0)
+            entry_id: Optional ID of the entry, recorded with the cached summary
+            use_cache: Whether to read and write the summary cache; bulk callers
+                       that batch their own cache writes turn this off
 
         Returns:
             EntrySummary object with summary, key topics and mood
@@ -508,6 +1242,17 @@ class LLMService:
             # Get appropriate prompt template from config
             prompt_template = self.get_prompt_template(prompt_type)
 
+            cache_key = None
+            if self.storage_manager and use_cache:
+                cache_key = self._summary_cache_key(content, prompt_type)
+                cached = self.storage_manager.get_cached_summary(cache_key)
+                self._record_summary_cache_lookup(cached is not None)
+                if cached is not None:
+                    logger.debug(f"Summary cache hit for entry {entry_id}")
+                    if progress_callback:
+                        progress_callback(1.0)
+                    return cached
+
             # Report initial progress
             if progress_callback:
                 progress_callback(0.1)
@@ -516,7 +1261,7 @@ class LLMService:
                 # Get the appropriate model for analysis operations
                 model_to_use = self._get_model_for_operation("analysis")
 
-                return ollama.chat(
+                return self._ollama("analysis").chat(
                     model=model_to_use,
                     messages=[
                         {
@@ -568,6 +1313,15 @@ class LLMService:
 
             # Store the prompt type that was used
             summary.prompt_type = prompt_type
+            summary.entry_id = summary.entry_id or entry_id
+
+            if cache_key:
+                self.storage_manager.save_cached_summary(
+                    cache_key,
+                    summary,
+                    entry_id=entry_id,
+                    model=self._get_model_for_operation("analysis"),
+                )
 
             return summary
         except (CUDAError, CircuitBreakerOpen) as e:
@@ -675,7 +1429,7 @@ class LLMService:
             # Get the appropriate model for analysis operations
             model_to_use = self._get_model_for_operation("analysis")
 
-            response = ollama.chat(
+            response = self._ollama("analysis").chat(
                 model=model_to_use,
                 messages=[
                     {
@@ -767,9 +1521,10 @@ class LLMService:
         Handle large batch analysis using a hierarchical approach.
 
         This method:
-        1. Splits entries into smaller chunks
-        2. Summarizes each chunk
-        3. Combines the summaries for final analysis
+        1. Packs entries into groups that fit the configured token budget
+        2. Summarizes the groups concurrently, reusing cached summaries
+        3. Combines summaries in further levels while there are too many
+        4. Combines the remaining summaries for final analysis
 
         Args:
             entries: All entries to analyze
@@ -782,74 +1537,58 @@ class LLMService:
         Returns:
             BatchAnalysis object with the combined analysis
         """
-        # Split entries into batches of 5-10
-        batch_size = 5
-        # fmt: off
-        batches = [
-            entries[i : i + batch_size]  # noqa: E203
-            for i in range(0, len(entries), batch_size)
-        ]
-        # fmt: on
-
-        # Track progress per batch
-        batch_progress_total = 0.6  # 60% of total progress for batch processing
-        batch_progress_per_item = batch_progress_total / len(batches)
-
-        # Process each batch to get summaries
-        batch_summaries = []
-
-        for i, batch in enumerate(batches):
-            # Calculate progress for this batch
-            batch_start_progress = 0.2 + (i * batch_progress_per_item)
-
-            # Define a progress callback for this batch
-            def batch_progress_callback(progress_fraction):
-                if progress_callback:
-                    # Scale the progress to the overall batch progress
-                    overall_progress = batch_start_progress + (
-                        progress_fraction * batch_progress_per_item
-                    )
-                    progress_callback(overall_progress)
-
-            # Generate a quick summary for this batch
-            try:
-                batch_content = ""
-                for j, entry in enumerate(batch):
-                    batch_content += (
-                        f"Entry {j + 1} - {entry.created_at.strftime('%Y-%m-%d')}:\n"
-                    )
-                    batch_content += f"Title: {entry.title}\n"
-                    batch_content += f"Content: {entry.content}\n\n"
-
-                # Use a simplified prompt for the batch summary
-                prompt = (
-                    "Create a brief summary of these journal entries, "
-                    "extract key themes, moods, and notable points. "
-                    "Keep it concise as this will be used for further analysis."
-                )
-
-                response = ollama.chat(
-                    model=self._get_model_for_operation("analysis"),
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You create concise summaries of journal entries.",  # noqa: E501
-                        },
-                        {"role": "user", "content": f"{prompt}\n\n{batch_content}"},
-                    ],
-                    options={"temperature": 0.3},
+        # Map: summarize token-budgeted groups of entries concurrently
+        groups = self._pack_entry_groups(entries, self.config.batch_group_token_budget)
+        logger.info(
+            f"Summarizing {len(entries)} entries in {len(groups)} groups with "
+            f"{self.config.batch_max_workers} workers"
+        )
+        batch_summaries = self._summarize_concurrently(
+            [
+                (
+                    "entries",
+                    self._format_batch_entries(group),
+                    [self._entry_content_hash(entry) for entry in group],
+                    len(group),
                 )
+                for group in groups
+            ],
+            progress_callback,
+            progress_start=0.2,
+            progress_span=0.5,
+        )
 
-                batch_summaries.append(response["message"]["content"])
-
-                # Report progress
-                batch_progress_callback(1.0)
-
-            except Exception as e:
-                logger.warning(f"Error processing batch {i + 1}: {e}")
-                # Add a placeholder if batch processing fails
-                batch_summaries.append(f"[Batch {i + 1}: Processing error - {str(e)}]")
-                batch_progress_callback(1.0)
+        # Reduce: combine summaries level by level until they fit in one call
+        level = 1
+        fan_in = self.config.batch_reduce_fan_in
+        while len(batch_summaries) > fan_in:
+            logger.info(
+                f"Reduce level {level}: combining {len(batch_summaries)} summaries"
+            )
+            # fmt: off
+            chunks = [
+                batch_summaries[i : i + fan_in]  # noqa: E203
+                for i in range(0, len(batch_summaries), fan_in)
+            ]
+            # fmt: on
+            batch_summaries = self._summarize_concurrently(
+                [
+                    (
+                        "summaries",
+                        "\n\n".join(
+                            f"Summary {j + 1}:\n{summary}"
+                            for j, summary in enumerate(chunk)
+                        ),
+                        chunk,
+                        len(chunk),
+                    )
+                    for chunk in chunks
+                ],
+                progress_callback,
+                progress_start=0.7,
+                progress_span=0.1,
+            )
+            level += 1
 
         # Now combine all batch summaries for final analysis
         if progress_callback:
@@ -875,7 +1614,7 @@ class LLMService:
 
         # Make the final LLM call
         try:
-            response = ollama.chat(
+            response = self._ollama("analysis").chat(
                 model=self._get_model_for_operation("analysis"),
                 messages=[
                     {
@@ -952,6 +1691,182 @@ class LLMService:
                 f"Failed to complete hierarchical batch analysis: {e}"
             )
 
+    def _format_batch_entries(self, entries: List[JournalEntry]) -> str:
+        """
+        Format entries as numbered blocks for a batch prompt.
+
+        Args:
+            entries: Entries to format
+
+        Returns:
+            Prompt text listing each entry's date, title and content
+        """
+        content = ""
+        for i, entry in enumerate(entries):
+            content += f"Entry {i + 1} - {entry.created_at.strftime('%Y-%m-%d')}:\n"
+            content += f"Title: {entry.title}\n"
+            content += f"Content: {entry.content}\n\n"
+        return content
+
+    def _entry_content_hash(self, entry: JournalEntry) -> str:
+        """
+        Hash the parts of an entry that appear in batch prompts.
+
+        Args:
+            entry: Entry to hash
+
+        Returns:
+            Hex digest that changes whenever the entry's prompt text would
+        """
+        text = self._format_batch_entries([entry])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _pack_entry_groups(
+        self, entries: List[JournalEntry], token_budget: int
+    ) -> List[List[JournalEntry]]:
+        """
+        Split entries into consecutive groups that fit a token budget.
+
+        Entries keep their order so each group covers a contiguous period.
+        An entry larger than the budget gets a group of its own.
+
+        Args:
+            entries: Entries to group
+            token_budget: Approximate prompt tokens allowed per group
+
+        Returns:
+            List of entry groups
+        """
+        tokenizer = get_tokenizer()
+        groups = []
+        current = []
+        current_tokens = 0
+
+        for entry in entries:
+            entry_tokens = tokenizer.count(self._format_batch_entries([entry]))
+            if current and current_tokens + entry_tokens > token_budget:
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(entry)
+            current_tokens += entry_tokens
+
+        if current:
+            groups.append(current)
+
+        return groups
+
+    def _summarize_concurrently(
+        self,
+        jobs: List[tuple],
+        progress_callback: Optional[Callable[[float], None]],
+        progress_start: float,
+        progress_span: float,
+    ) -> List[str]:
+        """
+        Summarize several groups in parallel, preserving their order.
+
+        Args:
+            jobs: (kind, content, hash_parts, entry_count) tuples for
+                  _summarize_group
+            progress_callback: Optional progress reporting function
+            progress_start: Overall progress when the first job starts
+            progress_span: Share of overall progress covered by these jobs
+
+        Returns:
+            Summaries in the same order as jobs
+        """
+        summaries = [None] * len(jobs)
+        workers = min(self.config.batch_max_workers, len(jobs))
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="batch-summary"
+        )
+
+        try:
+            futures = {
+                executor.submit(self._summarize_group, *job): index
+                for index, job in enumerate(jobs)
+            }
+            for done, future in enumerate(concurrent.futures.as_completed(futures)):
+                index = futures[future]
+                try:
+                    summaries[index] = future.result()
+                except Exception as e:
+                    logger.warning(f"Error processing batch {index + 1}: {e}")
+                    # Add a placeholder if batch processing fails
+                    summaries[index] = f"[Batch {index + 1}: Processing error - {e}]"
+
+                # The callback may raise to abort; groups already running still
+                # finish and are cached, queued ones are dropped
+                if progress_callback:
+                    progress_callback(
+                        progress_start + progress_span * (done + 1) / len(jobs)
+                    )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return summaries
+
+    def _summarize_group(
+        self, kind: str, content: str, hash_parts: List[str], entry_count: int
+    ) -> str:
+        """
+        Summarize one group of entries or summaries, using the cache if possible.
+
+        Args:
+            kind: "entries" for journal entries, "summaries" for a reduce step
+            content: Formatted group text for the prompt
+            hash_parts: Content hashes or texts that identify the group
+            entry_count: Number of items in the group
+
+        Returns:
+            Summary text
+        """
+        model = self._get_model_for_operation("analysis")
+        key_source = "\n".join(
+            [kind, model, str(self.GROUP_SUMMARY_PROMPT_VERSION), *hash_parts]
+        )
+        cache_key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+        if self.storage_manager:
+            cached = self.storage_manager.get_batch_group_summary(cache_key)
+            if cached:
+                logger.debug(f"Using cached {kind} summary {cache_key[:12]}")
+                return cached
+
+        if kind == "entries":
+            # Use a simplified prompt for the batch summary
+            system = "You create concise summaries of journal entries."
+            prompt = (
+                "Create a brief summary of these journal entries, "
+                "extract key themes, moods, and notable points. "
+                "Keep it concise as this will be used for further analysis."
+            )
+        else:
+            system = "You combine summaries of journal entries."
+            prompt = (
+                "Combine these summaries of consecutive groups of journal entries "
+                "into one brief summary. Keep key themes, moods, and notable "
+                "points, as this will be used for further analysis."
+            )
+
+        response = self._ollama("analysis").chat(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": f"{prompt}\n\n{content}"},
+            ],
+            options={"temperature": 0.3},
+        )
+        summary = response["message"]["content"]
+
+        if self.storage_manager:
+            self.storage_manager.save_batch_group_summary(
+                cache_key, summary, model, entry_count
+            )
+
+        return summary
+
     def _get_batch_prompt_template(self, prompt_type: str) -> str:
         """
         Get the appropriate prompt template for batch analysis.
@@ -1126,7 +2041,7 @@ class LLMService:
         expanded_terms = expanded_query.lower().split()
 
         # Generate embedding for the original query
-        query_embedding = self.get_embedding(query)
+        query_embedding = self._get_query_embedding(query)
 
         # HYBRID APPROACH: Combine vector search with text search
 
@@ -1226,12 +2141,61 @@ class LLMService:
         # Apply limit to combined results
         return final_results[:limit]
 
+    def search_chat_history(
+        self,
+        query: str,
+        limit: int = 3,
+        exclude_session_id: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find earlier chat messages semantically related to a query.
+
+        Messages are embedded in the background by
+        process_messages_without_embeddings, and the query embedding is
+        shared with semantic_search, so this adds no embedding calls when
+        both run for the same query. Only messages embedded by the current
+        embedding model are compared.
+
+        Args:
+            query: The search query text
+            limit: Maximum number of messages to return
+            exclude_session_id: Optional session to leave out, usually the
+                one being answered
+            min_similarity: Optional minimum similarity threshold (0-1).
+                           If None, uses the configured default value.
+
+        Returns:
+            List of matching messages with their session titles, most
+            similar first
+
+        Raises:
+            ValueError: If storage manager is not set
+        """
+        if not self.storage_manager:
+            raise ValueError("Storage manager is required for this operation")
+
+        if min_similarity is None:
+            min_similarity = self.min_similarity
+
+        return self.storage_manager.search_message_embeddings(
+            self._get_query_embedding(query),
+            limit=limit,
+            exclude_session_id=exclude_session_id,
+            min_similarity=min_similarity,
+            model=self.embedding_model,
+        )
+
     def _expand_semantic_query(self, query: str) -> str:
         """
-        Expand a search query to improve semantic search results using LLM.
+        Expand a search query with related terms to improve hybrid search.
 
-        This method uses the LLM to generate related terms for the query
-        to improve semantic search accuracy.
+        How terms are found depends on the query_expansion setting: "llm"
+        asks the search model, "local" uses term co-occurrence in indexed
+        chunks and "off" leaves the query as is. Expansions are cached in
+        memory by normalized query and model (or corpus version for local
+        expansion), and model expansions are also stored in the database so
+        they survive restarts.
 
         Args:
             query: Original search query
@@ -1243,6 +2207,41 @@ class LLMService:
         if not query or len(query.strip()) < 3:
             return query
 
+        mode = self.config.query_expansion
+        if mode == "off":
+            return query
+
+        normalized = normalize_query(query)
+
+        if mode == "local":
+            if not self._local_expander:
+                return query
+            try:
+                version = self._local_expander.refresh()
+                key = ("local", normalized, version)
+                expanded = self._expansion_cache.get(key)
+                if expanded is None:
+                    expanded = self._local_expander.expand(query, refresh=False)
+                    self._expansion_cache.put(key, expanded)
+                return expanded
+            except Exception as e:
+                logger.warning(f"Failed to expand query locally: {e}")
+                return query
+
+        model = self._get_model_for_operation("search")
+        key = ("llm", normalized, model)
+        expanded = self._expansion_cache.get(key)
+        if expanded is not None:
+            logger.debug(f"Query expansion cache hit for '{normalized}'")
+            return expanded
+
+        cache_key = hashlib.sha256(f"{normalized}\n{model}".encode("utf-8")).hexdigest()
+        if self.storage_manager:
+            expanded = self.storage_manager.get_cached_expansion(cache_key)
+            if expanded is not None:
+                self._expansion_cache.put(key, expanded)
+                return expanded
+
         try:
             # Prepare a prompt for the LLM to expand the query
             system_message = "You are a semantic search enhancer."
@@ -1255,8 +2254,8 @@ class LLMService:
             )
 
             # Call Ollama to get expanded terms
-            response = ollama.chat(
-                model=self._get_model_for_operation("search"),
+            response = self._ollama("search").chat(
+                model=model,
                 messages=[
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": user_message},
@@ -1270,13 +2269,31 @@ class LLMService:
             # Extract expanded query from response
             expanded_query = response["message"]["content"].strip()
             logger.info(f"Expanded query '{query}' to '{expanded_query}'")
-            return expanded_query
 
         except Exception as e:
             # On failure, log and return original query
             logger.warning(f"Failed to expand query using LLM: {e}")
             return query
 
+        self._expansion_cache.put(key, expanded_query)
+        if self.storage_manager:
+            self.storage_manager.save_cached_expansion(
+                cache_key, normalized, model, expanded_query
+            )
+        return expanded_query
+
+    def get_query_expansion_stats(self) -> Dict[str, Any]:
+        """
+        Get query expansion settings and in-memory cache hit rates.
+
+        Returns:
+            Dictionary with the expansion mode, LRU size, hits, misses and
+            hit_rate since startup
+        """
+        stats = {"mode": self.config.query_expansion}
+        stats.update(self._expansion_cache.get_stats())
+        return stats
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -1284,6 +2301,7 @@ class LLMService:
         max_tokens: int = None,
         stream: bool = False,
         model: Optional[str] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
         """
         Generate a chat completion response using Ollama.
@@ -1293,6 +2311,9 @@ class LLMService:
             temperature: Optional temperature parameter (0-1) to control randomness
             max_tokens: Optional maximum tokens to generate
             stream: Whether to stream the response token by token
+            model: Optional model override
+            on_complete: Optional callback receiving the generation stats of
+                the response (from the final chunk when streaming)
 
         Returns:
             If stream=False: Dictionary containing the response
@@ -1311,18 +2332,24 @@ class LLMService:
 
             if stream:
                 return self._stream_chat_completion(
-                    messages, temp, tokens, model_to_use
+                    messages, temp, tokens, model_to_use, on_complete
                 )
             else:
 
                 def _chat_operation():
-                    return ollama.chat(
+                    return self._ollama("chat").chat(
                         model=model_to_use,
                         messages=messages,
                         options={"temperature": temp, "num_predict": tokens},
+                        keep_alive=self.config.keep_alive,
                     )
 
-                return self._execute_with_resilience(_chat_operation, "chat completion")
+                response = self._execute_with_resilience(
+                    _chat_operation, "chat completion"
+                )
+                if on_complete:
+                    self._record_generation_stats(response, on_complete)
+                return response
         except (CUDAError, CircuitBreakerOpen) as e:
             logger.error(f"Chat completion failed due to GPU issues: {e}")
             raise LLMServiceError(f"GPU-related chat failure: {e}")
@@ -1336,14 +2363,20 @@ class LLMService:
         temperature: float,
         max_tokens: int,
         model: Optional[str] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Iterator[str]:
         """
         Stream a chat completion response from Ollama.
 
+        Requests go to a backend chosen by the backend pool, through the shared
+        keep-alive session for that host, with connect and read timeouts.
+
         Args:
             messages: List of message dictionaries with 'role' and 'content' keys
             temperature: Temperature parameter (0-1) to control randomness
             max_tokens: Maximum tokens to generate
+            model: Optional model override
+            on_complete: Optional callback receiving the generation stats
 
         Yields:
             Text content chunks as they are generated
@@ -1351,9 +2384,6 @@ class LLMService:
         Raises:
             LLMServiceError: If the streaming chat completion fails
         """
-        import requests
-        import json
-
         try:
             # Prepare the request payload - use specified model or get appropriate chat model
             model_to_use = model or self._get_model_for_operation("chat")
@@ -1363,94 +2393,208 @@ class LLMService:
                 "messages": messages,
                 "stream": True,
                 "options": {"temperature": temperature, "num_predict": max_tokens},
+                "keep_alive": self.config.keep_alive,
             }
 
-            # Make the request directly to the Ollama API
-            url = "http://localhost:11434/api/chat"
-            response = requests.post(url, json=data, stream=True)
-
-            if not response.ok:
-                raise LLMServiceError(
-                    f"Ollama API error: {response.status_code} {response.reason}"
+            def _open_stream(backend: OllamaBackend):
+                # Make the request over the pooled session for this host
+                response = get_http_session(backend.host).post(
+                    f"{backend.host}/api/chat",
+                    json=data,
+                    stream=True,
+                    timeout=(self.connect_timeout, self.read_timeout),
                 )
+                if not response.ok:
+                    response.close()
+                    error = LLMServiceError(
+                        f"Ollama API error: {response.status_code} {response.reason}"
+                    )
+                    error.status_code = response.status_code
+                    raise error
+                return backend, response
 
-            # Process each line in the streaming response
-            for line in response.iter_lines():
-                if not line:
-                    continue
+            # Pick a backend, failing over until one accepts the request
+            backend, response = self.backend_pool.execute(
+                "chat", _open_stream, model=model_to_use
+            )
 
-                # Parse the JSON chunk
-                try:
-                    chunk = json.loads(line.decode("utf-8"))
+            # Keep the backend's outstanding count up while the stream runs
+            self.backend_pool.acquire(backend)
+            try:
+                with response:
+                    # Process each line in the streaming response
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
 
-                    # Skip the final completion chunk with done=True
-                    if chunk.get("done") is True:
-                        continue
+                        # Parse the JSON chunk
+                        try:
+                            chunk = json.loads(line.decode("utf-8"))
+                        except json.JSONDecodeError as e:
+                            logger.error(f"Failed to parse Ollama response: {e}")
+                            continue
 
-                    # Extract just the message content
-                    if "message" in chunk and "content" in chunk["message"]:
-                        content = chunk["message"]["content"]
-                        if content:  # Skip empty content
-                            yield content
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse Ollama response: {e}")
-                    continue
+                        # The final chunk carries token counts and timings
+                        if chunk.get("done") is True:
+                            self._record_generation_stats(chunk, on_complete)
+                            continue
+
+                        # Extract just the message content
+                        if "message" in chunk and "content" in chunk["message"]:
+                            content = chunk["message"]["content"]
+                            if content:  # Skip empty content
+                                yield content
+            except Exception as e:
+                if is_backend_failure(e):
+                    backend.circuit_breaker.record_failure()
+                raise
+            finally:
+                self.backend_pool.release(backend)
 
         except Exception as e:
             logger.error(f"Streaming chat completion failed: {e}")
             raise LLMServiceError(f"Failed to stream chat completion: {e}")
 
+    def _record_generation_stats(
+        self,
+        chunk: Dict[str, Any],
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract generation stats from Ollama's final streamed chunk or a
+        complete response.
+
+        Durations are reported by Ollama in nanoseconds and converted to
+        milliseconds here.
+
+        Args:
+            chunk: The chunk with done=True, or a non-streamed response
+            on_complete: Optional callback receiving the stats
+
+        Returns:
+            Dictionary of token counts, timings and throughput
+        """
+        stats = {
+            "model": chunk.get("model"),
+            "done_reason": chunk.get("done_reason"),
+            "prompt_eval_count": chunk.get("prompt_eval_count"),
+            "eval_count": chunk.get("eval_count"),
+        }
+        for field in (
+            "total_duration",
+            "load_duration",
+            "prompt_eval_duration",
+            "eval_duration",
+        ):
+            value = chunk.get(field)
+            stats[f"{field}_ms"] = round(value / 1e6, 2) if value else None
+
+        if stats["eval_count"] and chunk.get("eval_duration"):
+            stats["tokens_per_second"] = round(
+                stats["eval_count"] / (chunk["eval_duration"] / 1e9), 2
+            )
+        else:
+            stats["tokens_per_second"] = None
+
+        self.last_generation_stats = stats
+        logger.info(
+            f"Generation complete: prompt_eval_count={stats['prompt_eval_count']}, "
+            f"prompt_eval={stats['prompt_eval_duration_ms']}ms, "
+            f"eval_count={stats['eval_count']}, "
+            f"total={stats['total_duration_ms']}ms, "
+            f"tokens/s={stats['tokens_per_second']}"
+        )
+
+        if on_complete:
+            try:
+                on_complete(stats)
+            except Exception as e:
+                logger.warning(f"Generation stats callback failed: {e}")
+
+        return stats
+
     def get_available_models(self):
         """
         Get a list of available models from Ollama.
 
+        Every backend in the pool is queried; the per-backend results become
+        the pool's model-availability map and their union is returned.
+
         Returns:
             List of model names that can be used for text generation
 
         Raises:
-            OllamaConnectionError: If connection to Ollama fails
+            OllamaConnectionError: If no backend could be queried
         """
-        try:
-            # Try to get the list of models from Ollama
-            response = ollama.list()
-
-            # Log successful connection for debugging
-            logger.debug(f"ollama.list() returned: {type(response)}")
-
-            # Extract just the model names from the response
-            # Handle both old dict format and new typed object format
-            models = []
-
-            # Check if response has models attribute (new format)
-            if hasattr(response, "models"):
-                model_list = response.models
-            elif isinstance(response, dict) and "models" in response:
-                # Fallback for dict format
-                model_list = response["models"]
-            else:
-                logger.error(
-                    f"Unexpected response format from ollama.list(): {type(response)}, {response}"
-                )
-                raise ValueError(f"Unexpected response format: {type(response)}")
-
-            for model in model_list:
-                if hasattr(model, "model"):
-                    # New typed object format
-                    models.append(model.model)
-                elif isinstance(model, dict) and "name" in model:
-                    # Old dict format (for backward compatibility)
-                    models.append(model["name"])
-                elif isinstance(model, dict) and "model" in model:
-                    # Alternative dict format
-                    models.append(model["model"])
-
-            # Sort the model names for consistent presentation
-            models.sort()
-
-            return models
-        except Exception as e:
-            logger.error(f"Failed to retrieve available models: {e}")
-            raise OllamaConnectionError(f"Failed to get available models: {e}")
+        models = set()
+        errors = []
+
+        for backend in self.backend_pool.backends:
+            try:
+                response = backend.client.list()
+                backend_models = self._parse_model_names(response)
+            except Exception as e:
+                logger.error(f"Failed to retrieve models from {backend.host}: {e}")
+                if is_backend_failure(e):
+                    backend.circuit_breaker.record_failure()
+                errors.append(e)
+                continue
+
+            backend.models = set(backend_models)
+            models.update(backend_models)
+
+        if len(errors) == len(self.backend_pool.backends):
+            raise OllamaConnectionError(f"Failed to get available models: {errors[-1]}")
+
+        # Sort the model names for consistent presentation
+        return sorted(models)
+
+    @staticmethod
+    def _parse_model_names(response) -> List[str]:
+        """
+        Extract model names from an ollama list() response.
+
+        Args:
+            response: Response from ollama.list(), typed or dict format
+
+        Returns:
+            List of model names
+
+        Raises:
+            ValueError: If the response format is not recognized
+        """
+        # Log successful connection for debugging
+        logger.debug(f"ollama.list() returned: {type(response)}")
+
+        # Extract just the model names from the response
+        # Handle both old dict format and new typed object format
+        models = []
+
+        # Check if response has models attribute (new format)
+        if hasattr(response, "models"):
+            model_list = response.models
+        elif isinstance(response, dict) and "models" in response:
+            # Fallback for dict format
+            model_list = response["models"]
+        else:
+            logger.error(
+                "Unexpected response format from ollama.list(): "
+                f"{type(response)}, {response}"
+            )
+            raise ValueError(f"Unexpected response format: {type(response)}")
+
+        for model in model_list:
+            if hasattr(model, "model"):
+                # New typed object format
+                models.append(model.model)
+            elif isinstance(model, dict) and "name" in model:
+                # Old dict format (for backward compatibility)
+                models.append(model["name"])
+            elif isinstance(model, dict) and "model" in model:
+                # Alternative dict format
+                models.append(model["model"])
+
+        return models
 
     def generate_session_title(self, messages: List[Dict[str, str]]) -> str:
         """
@@ -1485,7 +2629,7 @@ class LLMService:
                 f"Conversation:\n{conversation_text}"
             )
 
-            response = ollama.chat(
+            response = self._ollama("chat").chat(
                 model=self._get_model_for_operation("chat"),
                 messages=[
                     {"role": "system", "content": system_message},
@@ -1495,6 +2639,7 @@ class LLMService:
                     "temperature": 0.3,  # Low temperature for consistent titles
                     "num_predict": 20,  # Short response for just the title
                 },
+                keep_alive=self.config.keep_alive,
             )
 
             title = response["message"]["content"].strip()
@@ -1542,13 +2687,14 @@ class LLMService:
             # Use the provided model_name or fall back to chat model
             model = model_name or self._get_model_for_operation("chat")
 
-            response = ollama.chat(
+            response = self._ollama("chat").chat(
                 model=model,
                 messages=messages,
                 options={
                     "temperature": self.temperature,
                     "num_predict": self.max_tokens,
                 },
+                keep_alive=self.config.keep_alive,
             )
 
             return response["message"]["content"]
@@ -1620,7 +2766,7 @@ Analyze this message and respond with JSON in this format:
     "analysis": "brief explanation of your decision"
 }}"""
 
-            response = ollama.chat(
+            response = self._ollama("chat").chat(
                 model=self._get_model_for_operation("chat"),
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -1630,6 +2776,7 @@ Analyze this message and respond with JSON in this format:
                     "temperature": 0.1,  # Low temperature for consistent analysis
                     "num_predict": 500,
                 },
+                keep_alive=self.config.keep_alive,
                 format={
                     "type": "object",
                     "properties": {
@@ -1783,13 +2930,14 @@ CRITICAL: When web search results are provided, your response MUST be based on t
                     }
                 )
 
-            response = ollama.chat(
+            response = self._ollama("chat").chat(
                 model=self._get_model_for_operation("chat"),
                 messages=messages,
                 options={
                     "temperature": self.temperature,
                     "num_predict": self.max_tokens,
                 },
+                keep_alive=self.config.keep_alive,
             )
 
             return response["message"]["content"]
@@ -13,6 +13,11 @@ from app.models import LLMConfig, ChatConfig
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Column default for chat_config.summary_prompt, as a quoted SQL literal
+SUMMARY_PROMPT_DEFAULT = (
+    "'Summarize the key points of this conversation so far in 3-4 sentences:'"
+)
+
 
 def migrate_database(db_path="./journal_data/journal.db"):
     """
@@ -238,6 +243,43 @@ def migrate_database(db_path="./journal_data/journal.db"):
             )
             logger.info("batch_analysis_entries index created successfully")
 
+        # Check if batch_group_summaries cache table exists
+        if "batch_group_summaries" not in existing_tables:
+            logger.info("Creating batch_group_summaries table")
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batch_group_summaries (
+                    cache_key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    model TEXT,
+                    entry_count INTEGER,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            logger.info("batch_group_summaries table created successfully")
+
+        # Check if batch_analysis_jobs table exists
+        if "batch_analysis_jobs" not in existing_tables:
+            logger.info("Creating batch_analysis_jobs table")
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batch_analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    entry_ids TEXT NOT NULL,
+                    title TEXT,
+                    prompt_type TEXT,
+                    batch_id TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            logger.info("batch_analysis_jobs table created successfully")
+
         # Check if chat_sessions table exists
         if "chat_sessions" not in existing_tables:
             logger.info("Creating chat_sessions table")
@@ -251,7 +293,12 @@ def migrate_database(db_path="./journal_data/journal.db"):
                     last_accessed TEXT NOT NULL,
                     context_summary TEXT,
                     temporal_filter TEXT,
-                    entry_count INTEGER DEFAULT 0
+                    entry_count INTEGER DEFAULT 0,
+                    summary_watermark TEXT,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    user_message_count INTEGER NOT NULL DEFAULT 0,
+                    assistant_message_count INTEGER NOT NULL DEFAULT 0,
+                    last_message_preview TEXT
                 )
                 """
             )
@@ -277,6 +324,8 @@ def migrate_database(db_path="./journal_data/journal.db"):
                     created_at TEXT NOT NULL,
                     metadata TEXT,
                     token_count INTEGER,
+                    status TEXT NOT NULL DEFAULT 'complete',
+                    tokenizer_id TEXT,
                     FOREIGN KEY (session_id) REFERENCES chat_sessions(id)
                     ON DELETE CASCADE
                 )
@@ -301,6 +350,8 @@ def migrate_database(db_path="./journal_data/journal.db"):
                     entry_id TEXT,
                     similarity_score REAL,
                     chunk_index INTEGER,
+                    entry_title TEXT,
+                    entry_snippet TEXT,
                     PRIMARY KEY (message_id, entry_id),
                     FOREIGN KEY (message_id) REFERENCES chat_messages(id)
                     ON DELETE CASCADE,
@@ -328,7 +379,7 @@ def migrate_database(db_path="./journal_data/journal.db"):
         if "chat_config" not in existing_tables:
             logger.info("Creating chat_config table with full schema")
             cursor.execute(
-                """
+                f"""
                 CREATE TABLE IF NOT EXISTS chat_config (
                     id TEXT PRIMARY KEY DEFAULT 'default',
                     system_prompt TEXT NOT NULL,
@@ -344,7 +395,15 @@ def migrate_database(db_path="./journal_data/journal.db"):
                     context_window_size INTEGER NOT NULL DEFAULT 10,
                     use_context_windowing BOOLEAN NOT NULL DEFAULT 1,
                     min_messages_for_summary INTEGER NOT NULL DEFAULT 6,
-                    summary_prompt TEXT NOT NULL DEFAULT 'Summarize the key points of this conversation so far in 3-4 sentences:'
+                    summary_prompt TEXT NOT NULL DEFAULT {SUMMARY_PROMPT_DEFAULT},
+                    use_rule_based_routing BOOLEAN NOT NULL DEFAULT 1,
+                    tool_routing_threshold REAL NOT NULL DEFAULT 0.8,
+                    use_speculative_retrieval BOOLEAN NOT NULL DEFAULT 1,
+                    tokenizer_path TEXT,
+                    stream_coalesce_ms INTEGER NOT NULL DEFAULT 30,
+                    stream_coalesce_bytes INTEGER NOT NULL DEFAULT 1024,
+                    archive_after_days INTEGER NOT NULL DEFAULT 0,
+                    search_past_conversations BOOLEAN NOT NULL DEFAULT 1
                 )
                 """
             )
@@ -395,10 +454,15 @@ def migrate_database(db_path="./journal_data/journal.db"):
                 ("context_window_size", "INTEGER NOT NULL DEFAULT 10"),
                 ("use_context_windowing", "BOOLEAN NOT NULL DEFAULT 1"),
                 ("min_messages_for_summary", "INTEGER NOT NULL DEFAULT 6"),
-                (
-                    "summary_prompt",
-                    "TEXT NOT NULL DEFAULT 'Summarize the key points of this conversation so far in 3-4 sentences:'",
-                ),
+                ("summary_prompt", f"TEXT NOT NULL DEFAULT {SUMMARY_PROMPT_DEFAULT}"),
+                ("use_rule_based_routing", "BOOLEAN NOT NULL DEFAULT 1"),
+                ("tool_routing_threshold", "REAL NOT NULL DEFAULT 0.8"),
+                ("use_speculative_retrieval", "BOOLEAN NOT NULL DEFAULT 1"),
+                ("tokenizer_path", "TEXT"),
+                ("stream_coalesce_ms", "INTEGER NOT NULL DEFAULT 30"),
+                ("stream_coalesce_bytes", "INTEGER NOT NULL DEFAULT 1024"),
+                ("archive_after_days", "INTEGER NOT NULL DEFAULT 0"),
+                ("search_past_conversations", "BOOLEAN NOT NULL DEFAULT 1"),
             ]
 
             for col_name, col_def in missing_chat_columns:
@@ -417,6 +481,8 @@ def migrate_database(db_path="./journal_data/journal.db"):
             "prompt_types",
             "batch_analyses",
             "batch_analysis_entries",
+            "batch_group_summaries",
+            "batch_analysis_jobs",
             "chat_sessions",
             "chat_messages",
             "chat_message_entries",
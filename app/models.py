@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 import uuid
 
 
@@ -99,6 +99,22 @@ class PromptType(BaseModel):
     prompt: str
 
 
+class OllamaBackendConfig(BaseModel):
+    """
+    Configuration for one Ollama host in the backend pool.
+
+    Attributes:
+        host: Ollama server URL (e.g. "http://gpu-box:11434")
+        weight: Relative capacity used when balancing requests
+        operations: Operations routed to this host (chat, analysis, search,
+            embedding); empty means all operations
+    """
+
+    host: Optional[str] = None
+    weight: float = 1.0
+    operations: List[str] = []
+
+
 class LLMConfig(BaseModel):
     """
     Configuration settings for LLM service.
@@ -116,6 +132,18 @@ class LLMConfig(BaseModel):
         max_tokens: Maximum tokens to generate in responses
         system_prompt: Optional system prompt for chat completions
         min_similarity: Minimum similarity threshold for semantic search (0-1)
+        ollama_host: Optional Ollama server URL; defaults to OLLAMA_HOST or localhost
+        connect_timeout: Seconds to wait when connecting to Ollama
+        read_timeout: Seconds to wait for data from Ollama between chunks
+        ollama_backends: Optional pool of Ollama hosts; overrides ollama_host
+        batch_max_workers: Concurrent LLM calls when summarizing large batches
+        batch_group_token_budget: Approximate token budget per summarized group
+        batch_reduce_fan_in: Most summaries combined by one reduce call
+        keep_alive: How long Ollama keeps a model loaded after a chat request,
+            which also keeps its prompt cache warm between turns
+        query_expansion: How search queries are expanded with related terms:
+            "llm" asks the search model, "local" uses term co-occurrence in
+            indexed chunks, "off" searches the query as written
         prompt_types: List of available prompt types for entry analysis
     """
 
@@ -131,6 +159,15 @@ class LLMConfig(BaseModel):
     max_tokens: int = 1000
     system_prompt: Optional[str] = None
     min_similarity: float = 0.5  # Default to 0.5 for more relevant results
+    ollama_host: Optional[str] = None
+    connect_timeout: float = 5.0
+    read_timeout: float = 300.0
+    ollama_backends: List[OllamaBackendConfig] = []
+    batch_max_workers: int = Field(default=4, ge=1)
+    batch_group_token_budget: int = Field(default=2000, ge=100)
+    batch_reduce_fan_in: int = Field(default=8, ge=2)
+    keep_alive: str = "30m"
+    query_expansion: Literal["llm", "local", "off"] = "llm"
     prompt_types: List[PromptType] = [
         PromptType(
             id="default",
@@ -267,6 +304,40 @@ class BatchAnalysis(BaseModel):
         }
 
 
+class BatchAnalysisJob(BaseModel):
+    """
+    Model for a batch analysis running in the background.
+
+    Attributes:
+        id: Unique identifier for the job
+        status: One of queued, running, completed, failed or cancelled
+        progress: Completion fraction (0-1)
+        entry_ids: Entry IDs to analyze
+        title: Optional title for the resulting analysis
+        prompt_type: Type of analysis to perform
+        batch_id: ID of the saved BatchAnalysis once completed
+        error: Error message if the job failed
+        created_at: Timestamp when the job was submitted
+        updated_at: Timestamp of the last status or progress change
+    """
+
+    id: str = Field(default_factory=lambda: f"job-{uuid.uuid4().hex[:12]}")
+    status: str = "queued"
+    progress: float = 0.0
+    entry_ids: List[str]
+    title: Optional[str] = None
+    prompt_type: str = "weekly"
+    batch_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job has stopped running."""
+        return self.status in ("completed", "failed", "cancelled")
+
+
 class Persona(BaseModel):
     """
     Represents a chat persona with custom system prompt and characteristics.
@@ -339,6 +410,11 @@ class ChatSession(BaseModel):
         temporal_filter: Optional temporal filter applied to this session
         entry_count: Number of unique entries referenced in this session
         persona_id: ID of the persona used for this chat session
+        summary_watermark: ID of the last message folded into context_summary
+        message_count: Number of messages in the session
+        user_message_count: Number of user messages in the session
+        assistant_message_count: Number of assistant messages in the session
+        last_message_preview: Start of the latest assistant message
     """
 
     id: str = Field(
@@ -354,6 +430,12 @@ class ChatSession(BaseModel):
     entry_count: int = 0
     model_name: Optional[str] = None
     persona_id: Optional[str] = None
+    summary_watermark: Optional[str] = None
+    # Maintained by ChatStorage from the session's messages
+    message_count: int = 0
+    user_message_count: int = 0
+    assistant_message_count: int = 0
+    last_message_preview: Optional[str] = None
 
     class Config:
         """Pydantic config options"""
@@ -384,6 +466,8 @@ class ChatMessage(BaseModel):
         created_at: Timestamp when the message was created
         metadata: Optional metadata for the message (citations, tokens, etc.)
         token_count: Optional count of tokens in the message
+        status: 'streaming' while a response is being generated, then
+            'complete', 'error', or 'truncated' if the client disconnected
     """
 
     id: str = Field(
@@ -395,6 +479,7 @@ class ChatMessage(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     metadata: Optional[Dict[str, Any]] = None
     token_count: Optional[int] = None
+    status: str = "complete"
 
     class Config:
         """Pydantic config options"""
@@ -476,6 +561,25 @@ class ChatConfig(BaseModel):
     summary_prompt: str = (
         "Summarize the key points of this conversation so far in 3-4 sentences:"
     )
+    # Local tokenizer.json for exact token counts; None uses the estimator
+    tokenizer_path: Optional[str] = None
+
+    # Tool routing parameters
+    use_rule_based_routing: bool = True  # Route unambiguous messages without the LLM
+    tool_routing_threshold: float = 0.8  # Rule confidence needed to select a tool
+    use_speculative_retrieval: bool = True  # Search journal during LLM routing
+
+    # Streaming parameters: tokens are sent in one event per window or once
+    # this many bytes are buffered, whichever comes first (0 disables)
+    stream_coalesce_ms: int = 30
+    stream_coalesce_bytes: int = 1024
+
+    # Sessions idle this many days move to the archive database (0 disables)
+    archive_after_days: int = 0
+
+    # Embed chat messages in the background so journal searches also return
+    # related earlier conversations
+    search_past_conversations: bool = True
 
     class Config:
         """Pydantic config options"""
@@ -0,0 +1,244 @@
+"""
+Query expansion for semantic search.
+
+Hybrid search matches entries on related terms as well as on the query's
+embedding. The related terms can come from the search model, which costs a
+generation round-trip, or from term co-occurrence in the indexed chunks,
+which is computed locally. Either way, expansions are kept in a small LRU so
+repeated searches skip the work entirely.
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words too common to say anything about a query or its neighbours
+STOPWORDS = frozenset(
+    """
+    about above after again against all also and any are because been before
+    being below between both but can could did does doing down during each
+    even ever every few for from further had has have having her here hers
+    herself him himself his how into its itself just like more most much
+    myself not now off once only other our ours ourselves out over own really
+    same she should some such than that the their theirs them themselves then
+    there these they this those through too under until very was were what
+    when where which while who whom why will with would you your yours
+    yourself yourselves today went got get going made make still
+    """.split()
+)
+
+_TERM_PATTERN = re.compile(r"[a-z][a-z']+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a cache entry.
+
+    Args:
+        query: Search query as typed
+
+    Returns:
+        Lowercased query with whitespace collapsed
+    """
+    return " ".join(query.lower().split())
+
+
+def extract_terms(text: str) -> List[str]:
+    """
+    Extract content terms from text.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Lowercased terms of three or more letters that aren't stopwords
+    """
+    terms = []
+    for match in _TERM_PATTERN.finditer(text.lower()):
+        term = match.group().strip("'")
+        if term.endswith("'s"):
+            term = term[:-2]
+        if len(term) >= 3 and term not in STOPWORDS:
+            terms.append(term)
+    return terms
+
+
+class ExpansionCache:
+    """Thread-safe LRU of query expansions with hit counters."""
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Most expansions kept before the least recent is evicted
+        """
+        self.max_size = max_size
+        self._items: "OrderedDict[Any, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Any) -> Optional[str]:
+        """Get a cached expansion, marking it most recently used."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return self._items[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Any, expansion: str) -> None:
+        """Cache an expansion, evicting the least recently used if full."""
+        with self._lock:
+            self._items[key] = expansion
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached expansion."""
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and hit rate.
+
+        Returns:
+            Dictionary with size, hits, misses and hit_rate
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            size = len(self._items)
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+class CooccurrenceExpander:
+    """
+    Expands queries with terms that co-occur with them in indexed chunks.
+
+    This is pseudo-relevance feedback over the vectors table: the chunks that
+    contain the most query terms are gathered, and the other terms in them are
+    ranked by how many of those chunks they appear in, weighted by inverse
+    document frequency so words found everywhere don't crowd out specific
+    ones. The term index is built on first use and rebuilt when chunks are
+    added or removed.
+    """
+
+    def __init__(
+        self,
+        storage_manager,
+        max_terms: int = 6,
+        max_feedback_chunks: int = 50,
+    ):
+        """
+        Initialize the expander.
+
+        Args:
+            storage_manager: Storage manager providing the chunk texts
+            max_terms: Most related terms added to a query
+            max_feedback_chunks: Most chunks used to find related terms
+        """
+        self.storage_manager = storage_manager
+        self.max_terms = max_terms
+        self.max_feedback_chunks = max_feedback_chunks
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._chunk_terms: List[FrozenSet[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    @property
+    def version(self) -> Optional[str]:
+        """Corpus version the current index was built from."""
+        return self._version
+
+    def refresh(self) -> str:
+        """
+        Rebuild the term index if the indexed chunks have changed.
+
+        Returns:
+            Corpus version of the index
+        """
+        version = self.storage_manager.get_chunk_corpus_version()
+        with self._lock:
+            if version == self._version:
+                return version
+
+            chunk_terms = []
+            postings: Dict[str, List[int]] = {}
+            for index, text in enumerate(self.storage_manager.get_chunk_texts()):
+                terms = frozenset(extract_terms(text))
+                chunk_terms.append(terms)
+                for term in terms:
+                    postings.setdefault(term, []).append(index)
+
+            self._chunk_terms = chunk_terms
+            self._postings = postings
+            self._version = version
+            logger.info(
+                f"Built co-occurrence index of {len(postings)} terms "
+                f"over {len(chunk_terms)} chunks"
+            )
+            return version
+
+    def expand(self, query: str, refresh: bool = True) -> str:
+        """
+        Expand a query with co-occurring terms.
+
+        Args:
+            query: Search query
+            refresh: Whether to check for changed chunks first; callers that
+                     just called refresh() pass False
+
+        Returns:
+            The query followed by related terms, or the query unchanged if
+            none of its terms are in the index
+        """
+        query_terms = set(extract_terms(query))
+        if not query_terms:
+            return query
+
+        if refresh:
+            self.refresh()
+        with self._lock:
+            chunk_terms = self._chunk_terms
+            postings = self._postings
+
+        # Chunks matching more of the query are better evidence
+        matches: Counter = Counter()
+        for term in query_terms:
+            for index in postings.get(term, ()):
+                matches[index] += 1
+        if not matches:
+            return query
+        feedback = [index for index, _ in matches.most_common(self.max_feedback_chunks)]
+
+        counts: Counter = Counter()
+        for index in feedback:
+            counts.update(chunk_terms[index] - query_terms)
+
+        total = len(chunk_terms)
+        scores = {
+            term: count * math.log((total + 1) / len(postings[term]))
+            for term, count in counts.items()
+        }
+        related = sorted(
+            (term for term, score in scores.items() if score > 0),
+            key=lambda term: (-scores[term], term),
+        )[: self.max_terms]
+
+        expanded = " ".join([query.strip()] + related)
+        logger.debug(f"Expanded query '{query}' locally to '{expanded}'")
+        return expanded
@@ -6,9 +6,9 @@ vector search, configuration, summaries, tags, and images.
 """
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 
-from app.models import JournalEntry, BatchAnalysis
+from app.models import JournalEntry, BatchAnalysis, BatchAnalysisJob
 from app.storage.entries import EntryStorage
 from app.storage.vector_search import VectorStorage
 from app.storage.config import ConfigStorage
@@ -177,6 +177,24 @@ class StorageManager:
         """Get text chunks that don't have embeddings yet."""
         return self.vectors.get_chunks_without_embeddings(limit)
 
+    def get_chunk_texts(self) -> List[str]:
+        """Get the text of every indexed chunk."""
+        return self.vectors.get_chunk_texts()
+
+    def get_chunk_corpus_version(self) -> str:
+        """Get a marker that changes whenever chunks are added or removed."""
+        return self.vectors.get_chunk_corpus_version()
+
+    def get_cached_expansion(self, cache_key: str) -> Optional[str]:
+        """Get a generated query expansion from the cache."""
+        return self.vectors.get_cached_expansion(cache_key)
+
+    def save_cached_expansion(
+        self, cache_key: str, query: str, model: str, expansion: str
+    ) -> bool:
+        """Store a generated query expansion in the cache."""
+        return self.vectors.save_cached_expansion(cache_key, query, model, expansion)
+
     def semantic_search(
         self,
         query_embedding: Any,
@@ -199,6 +217,29 @@ class StorageManager:
 
         return result_with_entries
 
+    def get_messages_without_embeddings(
+        self, limit: int = 100, model: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get chat messages whose embedding is missing or out of date."""
+        return self.vectors.get_messages_without_embeddings(limit, model)
+
+    def save_message_embeddings(self, embeddings: List[Dict[str, Any]]) -> bool:
+        """Store embeddings for chat messages."""
+        return self.vectors.save_message_embeddings(embeddings)
+
+    def search_message_embeddings(
+        self,
+        query_embedding: Any,
+        limit: int = 5,
+        exclude_session_id: Optional[str] = None,
+        min_similarity: float = 0.0,
+        model: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Find chat messages similar to a query embedding."""
+        return self.vectors.search_message_embeddings(
+            query_embedding, limit, exclude_session_id, min_similarity, model=model
+        )
+
     # Configuration methods
 
     def save_llm_config(self, config) -> bool:
@@ -223,6 +264,32 @@ class StorageManager:
         """Delete an entry summary."""
         return self.summaries.delete_entry_summary(summary_id)
 
+    def get_cached_summary(self, cache_key: str):
+        """Get a generated summary from the summary cache."""
+        return self.summaries.get_cached_summary(cache_key)
+
+    def save_cached_summary(
+        self,
+        cache_key: str,
+        summary,
+        entry_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> bool:
+        """Store a generated summary in the summary cache."""
+        return self.summaries.save_cached_summary(cache_key, summary, entry_id, model)
+
+    def get_cached_summary_keys(self, cache_keys: List[str]) -> Set[str]:
+        """Find which cache keys already have a cached summary."""
+        return self.summaries.get_cached_summary_keys(cache_keys)
+
+    def save_cached_summaries(self, items: List[Tuple]) -> bool:
+        """Store several generated summaries in one transaction."""
+        return self.summaries.save_cached_summaries(items)
+
+    def get_summary_cache_stats(self) -> Dict[str, Any]:
+        """Get the size of the summary cache."""
+        return self.summaries.get_summary_cache_stats()
+
     # Image methods
 
     def save_image(
@@ -515,3 +582,31 @@ class StorageManager:
             List of dictionaries with basic batch analysis info
         """
         return self.batch_analyses.get_entry_batch_analyses(entry_id)
+
+    def get_batch_group_summary(self, cache_key: str) -> Optional[str]:
+        """Get a cached summary of a group of entries."""
+        return self.batch_analyses.get_group_summary(cache_key)
+
+    def save_batch_group_summary(
+        self, cache_key: str, summary: str, model: str, entry_count: int
+    ) -> bool:
+        """Cache the summary of a group of entries."""
+        return self.batch_analyses.save_group_summary(
+            cache_key, summary, model, entry_count
+        )
+
+    def save_batch_job(self, job: BatchAnalysisJob) -> bool:
+        """Save a batch analysis job."""
+        return self.batch_analyses.save_job(job)
+
+    def get_batch_job(self, job_id: str) -> Optional[BatchAnalysisJob]:
+        """Get a batch analysis job by ID."""
+        return self.batch_analyses.get_job(job_id)
+
+    def get_batch_jobs_by_status(self, statuses: List[str]) -> List[BatchAnalysisJob]:
+        """Get batch analysis jobs in any of the given statuses."""
+        return self.batch_analyses.get_jobs_by_status(statuses)
+
+    def update_batch_job(self, job_id: str, **fields: Any) -> bool:
+        """Update the status, progress, result or error of a batch job."""
+        return self.batch_analyses.update_job(job_id, **fields)
@@ -2,6 +2,8 @@ import os
 import sqlite3
 import logging
 
+from app.storage.config_cache import config_cache
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -24,6 +26,9 @@ class BaseStorage:
         self.entries_dir = os.path.join(base_dir, "entries")
         self.images_dir = os.path.join(base_dir, "images")
         self.ensure_directories()
+        if not os.path.exists(self.db_path):
+            # Nothing remembered about an earlier database here still applies
+            config_cache.forget(self.db_path)
 
     def ensure_directories(self):
         """Ensure necessary directories exist."""
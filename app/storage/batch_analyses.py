@@ -10,7 +10,7 @@ import os
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from app.models import BatchAnalysis
+from app.models import BatchAnalysis, BatchAnalysisJob
 
 # Configure logging
 logging.basicConfig(
@@ -287,4 +287,222 @@ class BatchAnalysisStorage:
             logger.error(f"Error getting batch analyses for entry: {e}")
             return []
         finally:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    def get_group_summary(self, cache_key: str) -> Optional[str]:
+        """
+        Get a cached summary of a group of entries.
+
+        Args:
+            cache_key: Hash identifying the group content, model and prompt
+
+        Returns:
+            The cached summary if found, None otherwise
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                "SELECT summary FROM batch_group_summaries WHERE cache_key = ?",
+                (cache_key,)
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving cached group summary: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def save_group_summary(
+        self, cache_key: str, summary: str, model: str, entry_count: int
+    ) -> bool:
+        """
+        Cache the summary of a group of entries.
+
+        Args:
+            cache_key: Hash identifying the group content, model and prompt
+            summary: Generated summary text
+            model: Model that generated the summary
+            entry_count: Number of entries covered by the summary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO batch_group_summaries
+                (cache_key, summary, model, entry_count, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (cache_key, summary, model, entry_count, datetime.now().isoformat())
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache group summary: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def save_job(self, job: BatchAnalysisJob) -> bool:
+        """
+        Save a batch analysis job.
+
+        Args:
+            job: BatchAnalysisJob object to save
+
+        Returns:
+            True if successful, False otherwise
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO batch_analysis_jobs
+                (id, status, progress, entry_ids, title, prompt_type, batch_id,
+                 error, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job.id,
+                    job.status,
+                    job.progress,
+                    json.dumps(job.entry_ids),
+                    job.title,
+                    job.prompt_type,
+                    job.batch_id,
+                    job.error,
+                    job.created_at.isoformat(),
+                    job.updated_at.isoformat(),
+                ),
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save batch analysis job: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def get_job(self, job_id: str) -> Optional[BatchAnalysisJob]:
+        """
+        Get a batch analysis job by ID.
+
+        Args:
+            job_id: ID of the job to retrieve
+
+        Returns:
+            BatchAnalysisJob object if found, None otherwise
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                SELECT id, status, progress, entry_ids, title, prompt_type,
+                       batch_id, error, created_at, updated_at
+                FROM batch_analysis_jobs
+                WHERE id = ?
+                """,
+                (job_id,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            return BatchAnalysisJob(
+                id=row[0],
+                status=row[1],
+                progress=row[2],
+                entry_ids=json.loads(row[3]),
+                title=row[4],
+                prompt_type=row[5],
+                batch_id=row[6],
+                error=row[7],
+                created_at=row[8],
+                updated_at=row[9],
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving batch analysis job: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def get_jobs_by_status(self, statuses: List[str]) -> List[BatchAnalysisJob]:
+        """
+        Get batch analysis jobs in any of the given statuses.
+
+        Args:
+            statuses: Job statuses to match
+
+        Returns:
+            List of BatchAnalysisJob objects, oldest first
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            placeholders = ", ".join("?" for _ in statuses)
+            cursor.execute(
+                f"""
+                SELECT id FROM batch_analysis_jobs
+                WHERE status IN ({placeholders})
+                ORDER BY created_at
+                """,
+                statuses,
+            )
+            job_ids = [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error retrieving batch analysis jobs: {e}")
+            return []
+        finally:
+            conn.close()
+
+        return [job for job in map(self.get_job, job_ids) if job]
+
+    def update_job(self, job_id: str, **fields: Any) -> bool:
+        """
+        Update selected fields of a batch analysis job.
+
+        Args:
+            job_id: ID of the job to update
+            **fields: Column values to set (status, progress, batch_id, error)
+
+        Returns:
+            True if the job was updated, False otherwise
+        """
+        allowed = {"status", "progress", "batch_id", "error"}
+        updates = {name: value for name, value in fields.items() if name in allowed}
+        if not updates:
+            return False
+
+        updates["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{name} = ?" for name in updates)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                f"UPDATE batch_analysis_jobs SET {assignments} WHERE id = ?",
+                (*updates.values(), job_id),
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Failed to update batch analysis job: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
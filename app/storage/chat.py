@@ -1,14 +1,286 @@
 import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional, Any
-
-from app.models import ChatSession, ChatMessage, ChatConfig, EntryReference
+import os
+import re
+import sqlite3
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Tuple
+
+from app.models import (
+    ChatSession,
+    ChatMessage,
+    ChatConfig,
+    ChatSearchResult,
+    EntryReference,
+)
 from app.storage.base import BaseStorage
+from app.storage.config_cache import config_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Session fields read from chat_sessions, selected with the table aliased s
+SESSION_FIELDS = (
+    "id",
+    "title",
+    "created_at",
+    "updated_at",
+    "last_accessed",
+    "context_summary",
+    "temporal_filter",
+    "entry_count",
+    "persona_id",
+    "summary_watermark",
+    "message_count",
+    "user_message_count",
+    "assistant_message_count",
+    "last_message_preview",
+)
+SESSION_COLUMNS = ", ".join(f"s.{field}" for field in SESSION_FIELDS)
+
+# Characters of the latest assistant message shown in session lists
+SESSION_PREVIEW_LENGTH = 100
+
+_SESSION_PREVIEW_SQL = f"""(
+    SELECT CASE WHEN length(m.content) > {SESSION_PREVIEW_LENGTH}
+                THEN substr(m.content, 1, {SESSION_PREVIEW_LENGTH}) || '...'
+                ELSE m.content END
+    FROM chat_messages m
+    WHERE m.session_id = chat_sessions.id AND m.role = 'assistant'
+    ORDER BY m.created_at DESC, m.rowid DESC
+    LIMIT 1
+)"""
+
+# Session list columns are denormalized from messages and references and
+# kept current by every write to them, in the writer's transaction
+REFRESH_SESSION_PREVIEW_SQL = f"""
+    UPDATE chat_sessions SET last_message_preview = {_SESSION_PREVIEW_SQL}
+    WHERE id = ?
+"""
+_SESSION_SUMMARY_SQL = f"""
+    UPDATE chat_sessions SET
+        message_count = (
+            SELECT COUNT(*) FROM chat_messages m
+            WHERE m.session_id = chat_sessions.id
+        ),
+        user_message_count = (
+            SELECT COUNT(*) FROM chat_messages m
+            WHERE m.session_id = chat_sessions.id AND m.role = 'user'
+        ),
+        assistant_message_count = (
+            SELECT COUNT(*) FROM chat_messages m
+            WHERE m.session_id = chat_sessions.id AND m.role = 'assistant'
+        ),
+        entry_count = (
+            SELECT COUNT(DISTINCT cme.entry_id)
+            FROM chat_message_entries cme
+            JOIN chat_messages m ON cme.message_id = m.id
+            WHERE m.session_id = chat_sessions.id
+        ),
+        last_message_preview = {_SESSION_PREVIEW_SQL}
+"""
+REFRESH_SESSION_SUMMARY_SQL = _SESSION_SUMMARY_SQL + " WHERE id = ?"
+
+# Archived sessions live in this file next to journal.db. Each keeps its
+# session row as JSON and its messages and references as compressed JSON,
+# indexed by a contentless FTS table so the text is not stored twice.
+ARCHIVE_FILENAME = "chat_archive.db"
+ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS archive.archived_sessions (
+        id TEXT PRIMARY KEY,
+        last_accessed TEXT NOT NULL,
+        archived_at TEXT NOT NULL,
+        session TEXT NOT NULL,
+        messages BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS archive.archived_sessions_fts USING fts5(
+        title, content, content=''
+    )
+    """,
+)
+
+# Markers around matched terms in search snippets, as rendered by the UI
+HIGHLIGHT_MARKERS = ("<mark>", "</mark>")
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 16
+
+
+def fts_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH string.
+
+    Each word becomes a quoted prefix term, so FTS5 operators and quotes in
+    the input are searched for rather than parsed, and all words must match.
+
+    Args:
+        query: Search text as typed
+
+    Returns:
+        MATCH string, or None if the query has no searchable words
+    """
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class MessageStreamWriter:
+    """
+    Persists a streamed message while it is being generated.
+
+    Chunks are collected in a list and only joined when written. Every
+    ``flush_chunks`` chunks or ``flush_interval_ms`` milliseconds, whichever
+    comes first, the text so far is written with the same UPDATE statement on
+    a connection held for the whole stream, so sqlite reuses the prepared
+    statement. Once the text is longer than ``flush_chars`` both limits grow
+    in proportion to it, so each flush adds a roughly fixed fraction of the
+    text and the bytes written over a reply stay linear in its length.
+
+    The message keeps its 'streaming' status until finish() sets a terminal
+    one. The full-text index skips streaming rows, so only the final text is
+    indexed. A crash or disconnect loses at most one flush interval.
+    """
+
+    UPDATE_CONTENT_SQL = "UPDATE chat_messages SET content = ? WHERE id = ?"
+
+    def __init__(
+        self,
+        db_path: str,
+        message_id: str,
+        flush_chunks: int = 32,
+        flush_interval_ms: int = 500,
+        flush_chars: int = 2000,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            db_path: Path to the SQLite database
+            message_id: ID of the message being streamed
+            flush_chunks: Chunks buffered before the text is written
+            flush_interval_ms: Longest time buffered chunks wait to be written
+            flush_chars: Text length after which both limits scale with it
+        """
+        self.message_id = message_id
+        self.flush_chunks = flush_chunks
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_chars = flush_chars
+        self.flush_count = 0
+        self._parts: List[str] = []
+        self._pending = 0
+        self._written_length = 0
+        self._last_flush = time.monotonic()
+        # Streams may be consumed from a worker thread
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            db_path, check_same_thread=False
+        )
+        row = self._conn.execute(
+            "SELECT session_id FROM chat_messages WHERE id = ?", (message_id,)
+        ).fetchone()
+        self.session_id: Optional[str] = row[0] if row else None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the writer has been finished or closed."""
+        return self._conn is None
+
+    @property
+    def text(self) -> str:
+        """The text streamed so far."""
+        if len(self._parts) > 1:
+            self._parts[:] = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def append(self, chunk: str) -> None:
+        """
+        Add a chunk, writing the text if a flush is due.
+
+        Args:
+            chunk: Next piece of the message text
+        """
+        self._parts.append(chunk)
+        self._pending += 1
+        scale = max(1.0, self._written_length / self.flush_chars)
+        if (
+            self._pending >= self.flush_chunks * scale
+            or time.monotonic() - self._last_flush >= self.flush_interval * scale
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered chunks to the message."""
+        if not self._pending or self._conn is None:
+            return
+        text = self.text
+        self._conn.execute(self.UPDATE_CONTENT_SQL, (text, self.message_id))
+        self._conn.commit()
+        self._written_length = len(text)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.flush_count += 1
+
+    def finish(
+        self,
+        status: str = "complete",
+        content: Optional[str] = None,
+        metadata_updates: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Write the final text and a terminal status, then close the writer.
+
+        Args:
+            status: Terminal status for the message
+            content: Final text, if it differs from the streamed text
+            metadata_updates: Optional keys to merge into the message metadata
+        """
+        if self._conn is None:
+            return
+        try:
+            metadata_json = None
+            if metadata_updates:
+                row = self._conn.execute(
+                    "SELECT metadata FROM chat_messages WHERE id = ?",
+                    (self.message_id,),
+                ).fetchone()
+                metadata = json.loads(row[0]) if row and row[0] else {}
+                metadata.update(metadata_updates)
+                metadata_json = json.dumps(metadata)
+
+            self._conn.execute(
+                """
+                UPDATE chat_messages
+                SET content = ?, status = ?, token_count = NULL,
+                    metadata = COALESCE(?, metadata)
+                WHERE id = ?
+                """,
+                (
+                    self.text if content is None else content,
+                    status,
+                    metadata_json,
+                    self.message_id,
+                ),
+            )
+            self._conn.execute(REFRESH_SESSION_PREVIEW_SQL, (self.session_id,))
+            self._conn.commit()
+            self._pending = 0
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Write any buffered chunks and release the connection."""
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+            self._conn = None
+
 
 class ChatStorage(BaseStorage):
     """Storage manager for chat functionality."""
@@ -21,6 +293,7 @@ class ChatStorage(BaseStorage):
             base_dir: Base directory for all storage (default: ./journal_data)
         """
         super().__init__(base_dir)
+        self.archive_path = os.path.join(base_dir, ARCHIVE_FILENAME)
         self._init_tables()
 
     def _init_tables(self):
@@ -42,7 +315,12 @@ class ChatStorage(BaseStorage):
                     temporal_filter TEXT,
                     entry_count INTEGER DEFAULT 0,
                     model_name TEXT,
-                    persona_id TEXT
+                    persona_id TEXT,
+                    summary_watermark TEXT,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    user_message_count INTEGER NOT NULL DEFAULT 0,
+                    assistant_message_count INTEGER NOT NULL DEFAULT 0,
+                    last_message_preview TEXT
                 )
                 """
             )
@@ -52,6 +330,24 @@ class ChatStorage(BaseStorage):
             columns = [column[1] for column in cursor.fetchall()]
             if "persona_id" not in columns:
                 cursor.execute("ALTER TABLE chat_sessions ADD COLUMN persona_id TEXT")
+            if "summary_watermark" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_sessions ADD COLUMN summary_watermark TEXT"
+                )
+            backfill_summaries = "message_count" not in columns
+            if backfill_summaries:
+                for column in (
+                    "message_count",
+                    "user_message_count",
+                    "assistant_message_count",
+                ):
+                    cursor.execute(
+                        f"ALTER TABLE chat_sessions "
+                        f"ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                    )
+                cursor.execute(
+                    "ALTER TABLE chat_sessions ADD COLUMN last_message_preview TEXT"
+                )
 
             # Create chat_messages table
             cursor.execute(
@@ -64,11 +360,24 @@ class ChatStorage(BaseStorage):
                     created_at TEXT NOT NULL,
                     metadata TEXT,
                     token_count INTEGER,
+                    status TEXT NOT NULL DEFAULT 'complete',
+                    tokenizer_id TEXT,
                     FOREIGN KEY (session_id) REFERENCES chat_sessions (id) ON DELETE CASCADE
                 )
                 """
             )
 
+            cursor.execute("PRAGMA table_info(chat_messages)")
+            message_columns = [column[1] for column in cursor.fetchall()]
+            if "status" not in message_columns:
+                cursor.execute(
+                    "ALTER TABLE chat_messages "
+                    "ADD COLUMN status TEXT NOT NULL DEFAULT 'complete'"
+                )
+            # Stored token counts are only reused by the tokenizer that made them
+            if "tokenizer_id" not in message_columns:
+                cursor.execute("ALTER TABLE chat_messages ADD COLUMN tokenizer_id TEXT")
+
             # Create chat_message_entries table for entry references
             cursor.execute(
                 """
@@ -77,11 +386,23 @@ class ChatStorage(BaseStorage):
                     entry_id TEXT NOT NULL,
                     similarity_score REAL NOT NULL,
                     chunk_index INTEGER,
+                    entry_title TEXT,
+                    entry_snippet TEXT,
                     PRIMARY KEY (message_id, entry_id, chunk_index)
                 )
                 """
             )
 
+            # Titles and previews are stored so citations load without
+            # reading entry files
+            cursor.execute("PRAGMA table_info(chat_message_entries)")
+            reference_columns = [column[1] for column in cursor.fetchall()]
+            for column in ("entry_title", "entry_snippet"):
+                if column not in reference_columns:
+                    cursor.execute(
+                        f"ALTER TABLE chat_message_entries ADD COLUMN {column} TEXT"
+                    )
+
             # Create indexes for performance
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages(session_id)"
@@ -89,6 +410,23 @@ class ChatStorage(BaseStorage):
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_chat_message_entries_message_id ON chat_message_entries(message_id)"
             )
+            # Session lists and archival sweeps order by last access
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_chat_sessions_last_accessed
+                ON chat_sessions(last_accessed)
+                """
+            )
+            # Message windows are read in (session, time) order
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id_created_at
+                ON chat_messages(session_id, created_at)
+                """
+            )
+
+            if backfill_summaries:
+                cursor.execute(_SESSION_SUMMARY_SQL)
 
             # Create FTS (Full-Text Search) tables for search functionality
             cursor.execute(
@@ -112,6 +450,23 @@ class ChatStorage(BaseStorage):
                 """
             )
 
+            # Update triggers only fire when indexed columns change, and
+            # messages are indexed once streaming ends; replace older versions
+            # that re-indexed on every update
+            cursor.execute(
+                """
+                SELECT name FROM sqlite_master
+                WHERE type = 'trigger'
+                  AND (
+                    (name = 'chat_sessions_fts_update' AND sql NOT LIKE '%UPDATE OF%')
+                    OR (name = 'chat_messages_fts_update'
+                        AND sql NOT LIKE '%streaming%')
+                  )
+                """
+            )
+            for (trigger_name,) in cursor.fetchall():
+                cursor.execute(f"DROP TRIGGER {trigger_name}")
+
             # Create triggers to keep FTS tables in sync
             cursor.execute(
                 """
@@ -124,7 +479,8 @@ class ChatStorage(BaseStorage):
 
             cursor.execute(
                 """
-                CREATE TRIGGER IF NOT EXISTS chat_sessions_fts_update AFTER UPDATE ON chat_sessions BEGIN
+                CREATE TRIGGER IF NOT EXISTS chat_sessions_fts_update
+                AFTER UPDATE OF title, context_summary ON chat_sessions BEGIN
                     UPDATE chat_sessions_fts
                     SET title = new.title, context_summary = new.context_summary
                     WHERE session_id = new.id;
@@ -151,7 +507,9 @@ class ChatStorage(BaseStorage):
 
             cursor.execute(
                 """
-                CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update AFTER UPDATE ON chat_messages BEGIN
+                CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update
+                AFTER UPDATE OF content, status ON chat_messages
+                WHEN new.status != 'streaming' BEGIN
                     UPDATE chat_messages_fts
                     SET content = new.content
                     WHERE message_id = new.id;
@@ -194,8 +552,9 @@ class ChatStorage(BaseStorage):
                 """
                 INSERT INTO chat_sessions (
                     id, title, created_at, updated_at, last_accessed,
-                    context_summary, temporal_filter, entry_count, persona_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    context_summary, temporal_filter, entry_count, persona_id,
+                    summary_watermark
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     session.id,
@@ -207,6 +566,7 @@ class ChatStorage(BaseStorage):
                     session.temporal_filter,
                     session.entry_count,
                     session.persona_id,
+                    session.summary_watermark,
                 ),
             )
             conn.commit()
@@ -240,7 +600,8 @@ class ChatStorage(BaseStorage):
                 """
                 UPDATE chat_sessions
                 SET title = ?, updated_at = ?, last_accessed = ?,
-                    context_summary = ?, temporal_filter = ?, entry_count = ?, persona_id = ?
+                    context_summary = ?, temporal_filter = ?, entry_count = ?,
+                    persona_id = ?, summary_watermark = ?
                 WHERE id = ?
                 """,
                 (
@@ -251,6 +612,7 @@ class ChatStorage(BaseStorage):
                     session.temporal_filter,
                     session.entry_count,
                     session.persona_id,
+                    session.summary_watermark,
                     session.id,
                 ),
             )
@@ -282,35 +644,37 @@ class ChatStorage(BaseStorage):
 
         try:
             cursor.execute(
-                """
-                SELECT id, title, created_at, updated_at, last_accessed,
-                       context_summary, temporal_filter, entry_count, persona_id
-                FROM chat_sessions
-                WHERE id = ?
-                """,
+                f"SELECT {SESSION_COLUMNS} FROM chat_sessions s WHERE s.id = ?",
                 (session_id,),
             )
 
             row = cursor.fetchone()
-            if not row:
-                return None
-
-            # Parse ISO format dates back to datetime objects
-            return ChatSession(
-                id=row[0],
-                title=row[1],
-                created_at=datetime.fromisoformat(row[2]),
-                updated_at=datetime.fromisoformat(row[3]),
-                last_accessed=datetime.fromisoformat(row[4]),
-                context_summary=row[5],
-                temporal_filter=row[6],
-                entry_count=row[7],
-                persona_id=row[8],
-            )
 
         finally:
             conn.close()
 
+        if row:
+            return self._session_from_row(row)
+        return None
+
+    def get_or_restore_session(self, session_id: str) -> Optional[ChatSession]:
+        """
+        Retrieve a chat session, restoring it first if it is archived.
+
+        Used when a message is added, so writing to an archived session brings
+        it back. Plain reads never touch the archive.
+
+        Args:
+            session_id: The ID of the session to retrieve
+
+        Returns:
+            ChatSession if found or restored, None otherwise
+        """
+        session = self.get_session(session_id)
+        if session is None and self.restore_session(session_id):
+            session = self.get_session(session_id)
+        return session
+
     def delete_session(self, session_id: str) -> bool:
         """
         Delete a chat session and all its messages.
@@ -391,6 +755,7 @@ class ChatStorage(BaseStorage):
             "created_at",
             "title",
             "entry_count",
+            "message_count",
         ]
         if sort_by not in allowed_sort_fields:
             sort_by = "last_accessed"  # Default to last_accessed if invalid
@@ -400,42 +765,52 @@ class ChatStorage(BaseStorage):
         try:
             cursor.execute(
                 f"""
-                SELECT id, title, created_at, updated_at, last_accessed,
-                       context_summary, temporal_filter, entry_count, persona_id
-                FROM chat_sessions
-                ORDER BY {sort_by} {sort_direction}
+                SELECT {SESSION_COLUMNS}
+                FROM chat_sessions s
+                ORDER BY s.{sort_by} {sort_direction}
                 LIMIT ? OFFSET ?
                 """,
                 (limit, offset),
             )
 
-            sessions = []
-            for row in cursor.fetchall():
-                sessions.append(
-                    ChatSession(
-                        id=row[0],
-                        title=row[1],
-                        created_at=datetime.fromisoformat(row[2]),
-                        updated_at=datetime.fromisoformat(row[3]),
-                        last_accessed=datetime.fromisoformat(row[4]),
-                        context_summary=row[5],
-                        temporal_filter=row[6],
-                        entry_count=row[7],
-                        persona_id=row[8],
-                    )
-                )
-
-            return sessions
+            return [self._session_from_row(row) for row in cursor.fetchall()]
 
         finally:
             conn.close()
 
-    def add_message(self, message: ChatMessage) -> ChatMessage:
+    def _session_from_row(self, row: Tuple) -> ChatSession:
+        """
+        Build a ChatSession from a row selected with SESSION_COLUMNS.
+
+        Args:
+            row: Row starting with the SESSION_FIELDS columns; any further
+                columns are ignored. NULL columns take the model default.
+
+        Returns:
+            ChatSession object
+        """
+        data = {
+            field: value
+            for field, value in zip(SESSION_FIELDS, row)
+            if value is not None
+        }
+        # Parse ISO format dates back to datetime objects
+        for field in ("created_at", "updated_at", "last_accessed"):
+            data[field] = datetime.fromisoformat(data[field])
+        return ChatSession(**data)
+
+    def add_message(
+        self,
+        message: ChatMessage,
+        references: Optional[List[EntryReference]] = None,
+    ) -> ChatMessage:
         """
         Add a new message to a chat session.
 
         Args:
             message: The ChatMessage object to add
+            references: Entry references cited by the message, saved in the
+                same transaction
 
         Returns:
             The added ChatMessage
@@ -453,8 +828,9 @@ class ChatStorage(BaseStorage):
             cursor.execute(
                 """
                 INSERT INTO chat_messages (
-                    id, session_id, role, content, created_at, metadata, token_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    id, session_id, role, content, created_at, metadata, token_count,
+                    status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     message.id,
@@ -464,18 +840,36 @@ class ChatStorage(BaseStorage):
                     created_at,
                     metadata_json,
                     message.token_count,
+                    message.status,
                 ),
             )
 
-            # Update the session's last_accessed timestamp
+            # Update the session's last_accessed timestamp and counters
             cursor.execute(
                 """
                 UPDATE chat_sessions
-                SET last_accessed = ?, updated_at = ?
+                SET last_accessed = ?, updated_at = ?,
+                    message_count = message_count + 1,
+                    user_message_count = user_message_count + (? = 'user'),
+                    assistant_message_count = assistant_message_count
+                        + (? = 'assistant')
                 WHERE id = ?
                 """,
-                (created_at, created_at, message.session_id),
+                (
+                    created_at,
+                    created_at,
+                    message.role,
+                    message.role,
+                    message.session_id,
+                ),
             )
+            if message.role == "assistant":
+                cursor.execute(REFRESH_SESSION_PREVIEW_SQL, (message.session_id,))
+
+            if references:
+                self._insert_entry_references(
+                    cursor, message.id, message.session_id, references
+                )
 
             conn.commit()
             return message
@@ -486,165 +880,129 @@ class ChatStorage(BaseStorage):
         finally:
             conn.close()
 
-    def get_messages(self, session_id: str) -> List[ChatMessage]:
+    def get_messages(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        before_id: Optional[str] = None,
+        after_id: Optional[str] = None,
+    ) -> List[ChatMessage]:
         """
-        Retrieve all messages for a chat session.
+        Retrieve messages for a chat session, optionally a window of them.
+
+        Without a cursor, ``limit`` keeps the most recent messages. With
+        ``before_id`` the window ends just before that message; with
+        ``after_id`` it starts just after it. Both cursors together select
+        the messages between them. A cursor that isn't a message in this
+        session selects nothing.
 
         Args:
             session_id: The ID of the session
+            limit: Most messages to return (all if None)
+            before_id: Only return messages older than this message
+            after_id: Only return messages newer than this message
 
         Returns:
             List of ChatMessage objects in chronological order
         """
+        conditions = ["session_id = ?"]
+        params: List[Any] = [session_id]
+        for message_id, operator in ((before_id, "<"), (after_id, ">")):
+            if message_id is not None:
+                conditions.append(
+                    f"(created_at, rowid) {operator} ("
+                    "SELECT created_at, rowid FROM chat_messages "
+                    "WHERE id = ? AND session_id = ?)"
+                )
+                params.extend([message_id, session_id])
+
+        # Windows anchored at the end of the session are read newest first
+        newest_first = limit is not None and after_id is None
+        order = "DESC" if newest_first else "ASC"
+        query = f"""
+            SELECT id, role, content, created_at, metadata, token_count, status
+            FROM chat_messages
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at {order}, rowid {order}
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
         conn = self.get_db_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute(
-                """
-                SELECT id, role, content, created_at, metadata, token_count
-                FROM chat_messages
-                WHERE session_id = ?
-                ORDER BY created_at ASC
-                """,
-                (session_id,),
-            )
-
-            messages = []
-            for row in cursor.fetchall():
-                # Parse metadata JSON if it exists
-                metadata = json.loads(row[4]) if row[4] else None
-
-                messages.append(
-                    ChatMessage(
-                        id=row[0],
-                        session_id=session_id,
-                        role=row[1],
-                        content=row[2],
-                        created_at=datetime.fromisoformat(row[3]),
-                        metadata=metadata,
-                        token_count=row[5],
-                    )
-                )
-
-            return messages
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            if newest_first:
+                rows.reverse()
+            return [self._message_from_row(session_id, row) for row in rows]
 
         finally:
             conn.close()
 
-    def add_message_entry_references(
-        self, message_id: str, references: List[EntryReference]
-    ) -> bool:
+    def get_recent_messages(
+        self, session_id: str, max_tokens: int
+    ) -> List[ChatMessage]:
         """
-        Add entry references for a specific message.
+        Retrieve the most recent messages of a session up to a token budget.
+
+        Messages are taken newest first until their stored token counts reach
+        ``max_tokens``; the message that crosses the budget is included so the
+        caller has everything that could fit. Messages without a stored count
+        count as zero tokens.
 
         Args:
-            message_id: The message ID
-            references: List of entry references
+            session_id: The ID of the session
+            max_tokens: Token budget for the window
 
         Returns:
-            True if successful
+            List of ChatMessage objects in chronological order
         """
-        if not references:
-            return True
-
         conn = self.get_db_connection()
         cursor = conn.cursor()
 
         try:
-            # Ensure the table exists
             cursor.execute(
                 """
-                CREATE TABLE IF NOT EXISTS chat_message_entries (
-                    message_id TEXT NOT NULL,
-                    entry_id TEXT NOT NULL,
-                    similarity_score REAL NOT NULL,
-                    chunk_index INTEGER,
-                    PRIMARY KEY (message_id, entry_id, chunk_index)
-                )
-                """
-            )
-
-            # Insert references with chunk index info
-            for reference in references:
-                chunk_index = (
-                    reference.chunk_index if reference.chunk_index is not None else 0
-                )
-
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO chat_message_entries
-                    (message_id, entry_id, similarity_score, chunk_index)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (
-                        reference.message_id,
-                        reference.entry_id,
-                        reference.similarity_score,
-                        chunk_index,
-                    ),
+                WITH tail AS (
+                    SELECT rowid AS seq,
+                           SUM(COALESCE(token_count, 0)) OVER (
+                               ORDER BY created_at DESC, rowid DESC
+                           ) - COALESCE(token_count, 0) AS newer_tokens
+                    FROM chat_messages
+                    WHERE session_id = ?
                 )
-
-            # Update entry_count for the session
-            # Get the session_id from the message first
-            cursor.execute(
-                """
-                SELECT session_id FROM chat_messages
-                WHERE id = ?
+                SELECT m.id, m.role, m.content, m.created_at, m.metadata,
+                       m.token_count, m.status
+                FROM tail t
+                JOIN chat_messages m ON m.rowid = t.seq
+                WHERE t.newer_tokens < ?
+                ORDER BY m.created_at ASC, m.rowid ASC
                 """,
-                (message_id,),
+                (session_id, max_tokens),
             )
-            result = cursor.fetchone()
-
-            if result:
-                session_id = result[0]
-
-                # Count unique entries referenced in this session
-                cursor.execute(
-                    """
-                    SELECT COUNT(DISTINCT e.entry_id)
-                    FROM chat_message_entries e
-                    JOIN chat_messages m ON e.message_id = m.id
-                    WHERE m.session_id = ?
-                    """,
-                    (session_id,),
-                )
-
-                entry_count = cursor.fetchone()[0]
-
-                # Update the session's entry_count
-                cursor.execute(
-                    """
-                    UPDATE chat_sessions
-                    SET entry_count = ?
-                    WHERE id = ?
-                    """,
-                    (
-                        entry_count,
-                        session_id,
-                    ),
-                )
-
-            conn.commit()
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to add message entry references: {str(e)}")
-            conn.rollback()
-            return False
+            return [
+                self._message_from_row(session_id, row) for row in cursor.fetchall()
+            ]
 
         finally:
             conn.close()
 
-    def get_message_entry_references(self, message_id: str) -> List[EntryReference]:
+    def get_uncounted_messages(
+        self, session_id: str, tokenizer_id: Optional[str] = None
+    ) -> List[ChatMessage]:
         """
-        Get entry references for a specific message.
+        Retrieve the messages of a session that need their tokens counted.
 
         Args:
-            message_id: The message ID
+            session_id: The ID of the session
+            tokenizer_id: Also return messages counted by any other tokenizer
 
         Returns:
-            List of EntryReference objects
+            List of ChatMessage objects in chronological order, with
+            token_count cleared on messages whose count is stale
         """
         conn = self.get_db_connection()
         cursor = conn.cursor()
@@ -652,109 +1010,37 @@ class ChatStorage(BaseStorage):
         try:
             cursor.execute(
                 """
-                SELECT COUNT(*) FROM chat_message_entries
-                WHERE message_id = ?
+                SELECT id, role, content, created_at, metadata,
+                       CASE WHEN :tokenizer_id IS NULL
+                              OR tokenizer_id IS :tokenizer_id
+                            THEN token_count END,
+                       status
+                FROM chat_messages
+                WHERE session_id = :session_id
+                  AND (token_count IS NULL
+                       OR (:tokenizer_id IS NOT NULL
+                           AND tokenizer_id IS NOT :tokenizer_id))
+                ORDER BY created_at ASC, rowid ASC
                 """,
-                (message_id,),
+                {"session_id": session_id, "tokenizer_id": tokenizer_id},
             )
-
-            if cursor.fetchone()[0] == 0:
-                # No references for this message
-                return []
-
-            # Try a query that joins with the entries table to get title and content
-            try:
-                cursor.execute(
-                    """
-                    SELECT cme.entry_id, cme.similarity_score, cme.chunk_index,
-                           e.title, substr(e.content, 1, 200) as snippet
-                    FROM chat_message_entries cme
-                    JOIN entries e ON cme.entry_id = e.id
-                    WHERE cme.message_id = ?
-                    ORDER BY cme.similarity_score DESC
-                    """,
-                    (message_id,),
-                )
-
-                references = []
-                for row in cursor.fetchall():
-                    references.append(
-                        EntryReference(
-                            message_id=message_id,
-                            entry_id=row[0],
-                            similarity_score=row[1],
-                            chunk_index=row[2],
-                            entry_title=row[3],
-                            entry_snippet=row[4],
-                        )
-                    )
-
-                return references
-
-            except Exception:
-                # Fallback if the join query fails
-                cursor.execute(
-                    """
-                    SELECT entry_id, similarity_score, chunk_index
-                    FROM chat_message_entries
-                    WHERE message_id = ?
-                    ORDER BY similarity_score DESC
-                    """,
-                    (message_id,),
-                )
-
-                references = []
-                for row in cursor.fetchall():
-                    references.append(
-                        EntryReference(
-                            message_id=message_id,
-                            entry_id=row[0],
-                            similarity_score=row[1],
-                            chunk_index=row[2],
-                        )
-                    )
-
-                # Now try to get additional info from entries table if it exists
-                try:
-                    # Only proceed if we have references to enrich
-                    if references:
-                        for ref in references:
-                            cursor.execute(
-                                """
-                                SELECT title, substr(content, 1, 200) as snippet
-                                FROM entries
-                                WHERE id = ?
-                                """,
-                                (ref.entry_id,),
-                            )
-                            row = cursor.fetchone()
-                            if row:
-                                ref.entry_title = row[0]
-                                ref.entry_snippet = row[1]
-                except Exception:
-                    # If this fails, it's OK - we just won't have title/snippet info
-                    pass
-
-                return references
-
-        except Exception as e:
-            logger.error(f"Failed to get message entry references: {str(e)}")
-            return []
+            return [
+                self._message_from_row(session_id, row) for row in cursor.fetchall()
+            ]
 
         finally:
             conn.close()
 
-    def get_session_entry_references(
-        self, session_id: str
-    ) -> Dict[str, List[EntryReference]]:
+    def get_message_totals(self, session_id: str) -> Dict[str, int]:
         """
-        Get all entry references for a chat session grouped by message ID.
+        Count the messages and stored tokens of a session without loading them.
 
         Args:
-            session_id: The session ID
+            session_id: The ID of the session
 
         Returns:
-            Dictionary mapping message IDs to lists of EntryReference objects
+            Dictionary with message_count, user_count, assistant_count,
+            token_count (sum of stored counts) and uncounted_count
         """
         conn = self.get_db_connection()
         cursor = conn.cursor()
@@ -762,57 +1048,305 @@ class ChatStorage(BaseStorage):
         try:
             cursor.execute(
                 """
-                SELECT cme.message_id, cme.entry_id, cme.similarity_score,
-                       cme.chunk_index, e.title, substr(e.content, 1, 100) as snippet
-                FROM chat_message_entries cme
-                JOIN chat_messages cm ON cme.message_id = cm.id
-                JOIN entries e ON cme.entry_id = e.id
-                WHERE cm.session_id = ?
-                ORDER BY cme.similarity_score DESC
+                SELECT COUNT(*),
+                       COALESCE(SUM(role = 'user'), 0),
+                       COALESCE(SUM(role = 'assistant'), 0),
+                       COALESCE(SUM(token_count), 0),
+                       COALESCE(SUM(token_count IS NULL), 0)
+                FROM chat_messages
+                WHERE session_id = ?
                 """,
                 (session_id,),
             )
-
-            references_by_message = {}
-            for row in cursor.fetchall():
-                message_id = row[0]
-                if message_id not in references_by_message:
-                    references_by_message[message_id] = []
-
-                references_by_message[message_id].append(
-                    EntryReference(
-                        message_id=message_id,
-                        entry_id=row[1],
-                        similarity_score=row[2],
-                        chunk_index=row[3],
-                        entry_title=row[4],
-                        entry_snippet=row[5],
-                    )
-                )
-
-            return references_by_message
+            row = cursor.fetchone()
+            return {
+                "message_count": row[0],
+                "user_count": row[1],
+                "assistant_count": row[2],
+                "token_count": row[3],
+                "uncounted_count": row[4],
+            }
 
         finally:
             conn.close()
 
-    def get_chat_config(self) -> ChatConfig:
+    def _message_from_row(self, session_id: str, row: Tuple) -> ChatMessage:
         """
-        Get the chat configuration.
+        Build a ChatMessage from a chat_messages row.
+
+        Args:
+            session_id: The ID of the session the row belongs to
+            row: (id, role, content, created_at, metadata, token_count, status)
+                row
 
         Returns:
-            ChatConfig object with current settings
+            ChatMessage object
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Check if the table exists and has the current schema
-            cursor.execute("PRAGMA table_info(chat_config)")
-            columns = [column[1] for column in cursor.fetchall()]
-
-            if not columns:
-                # Table doesn't exist, return default config
-                return ChatConfig()
+        # Parse metadata JSON if it exists
+        metadata = json.loads(row[4]) if row[4] else None
+
+        return ChatMessage(
+            id=row[0],
+            session_id=session_id,
+            role=row[1],
+            content=row[2],
+            created_at=datetime.fromisoformat(row[3]),
+            metadata=metadata,
+            token_count=row[5],
+            status=row[6],
+        )
+
+    def _insert_entry_references(
+        self,
+        cursor: sqlite3.Cursor,
+        message_id: str,
+        session_id: str,
+        references: List[EntryReference],
+    ) -> None:
+        """
+        Insert a message's entry references and refresh the session's count.
+
+        Args:
+            cursor: Cursor in the caller's transaction
+            message_id: The message ID
+            session_id: The session the message belongs to
+            references: List of entry references
+        """
+        for reference in references:
+            reference.message_id = message_id
+
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO chat_message_entries (
+                message_id, entry_id, similarity_score, chunk_index,
+                entry_title, entry_snippet
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    message_id,
+                    reference.entry_id,
+                    reference.similarity_score,
+                    reference.chunk_index if reference.chunk_index is not None else 0,
+                    reference.entry_title,
+                    reference.entry_snippet,
+                )
+                for reference in references
+            ],
+        )
+
+        # Count unique entries referenced in this session
+        cursor.execute(
+            """
+            UPDATE chat_sessions
+            SET entry_count = (
+                SELECT COUNT(DISTINCT cme.entry_id)
+                FROM chat_message_entries cme
+                JOIN chat_messages m ON cme.message_id = m.id
+                WHERE m.session_id = ?
+            )
+            WHERE id = ?
+            """,
+            (session_id, session_id),
+        )
+
+    def add_message_entry_references(
+        self, message_id: str, references: List[EntryReference]
+    ) -> bool:
+        """
+        Add entry references for a specific message.
+
+        Prefer passing references to add_message, which saves them with the
+        message in one transaction.
+
+        Args:
+            message_id: The message ID
+            references: List of entry references
+
+        Returns:
+            True if successful
+        """
+        if not references:
+            return True
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                "SELECT session_id FROM chat_messages WHERE id = ?", (message_id,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                logger.error(f"Cannot add references to unknown message {message_id}")
+                return False
+
+            self._insert_entry_references(cursor, message_id, row[0], references)
+            conn.commit()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add message entry references: {str(e)}")
+            conn.rollback()
+            return False
+
+        finally:
+            conn.close()
+
+    def _select_entry_references(
+        self, cursor: sqlite3.Cursor, scope: str, params: Tuple
+    ) -> List[EntryReference]:
+        """
+        Select entry references with their titles and previews.
+
+        Titles are taken from the entries table when it shares this database,
+        so renamed entries show their current title, falling back to the
+        title stored with the reference.
+
+        Args:
+            cursor: Cursor on the chat database
+            scope: Joins, WHERE and ORDER BY clauses applied to
+                chat_message_entries aliased as cme
+            params: Parameters for the scope clauses
+
+        Returns:
+            List of EntryReference objects in the order of the query
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries'"
+        )
+        if cursor.fetchone():
+            title = "COALESCE(e.title, cme.entry_title)"
+            scope = "LEFT JOIN entries e ON e.id = cme.entry_id " + scope
+        else:
+            title = "cme.entry_title"
+
+        cursor.execute(
+            f"""
+            SELECT cme.message_id, cme.entry_id, cme.similarity_score,
+                   cme.chunk_index, {title}, cme.entry_snippet
+            FROM chat_message_entries cme
+            {scope}
+            """,
+            params,
+        )
+        return [
+            EntryReference(
+                message_id=row[0],
+                entry_id=row[1],
+                similarity_score=row[2],
+                chunk_index=row[3],
+                entry_title=row[4],
+                entry_snippet=row[5],
+            )
+            for row in cursor.fetchall()
+        ]
+
+    def get_message_entry_references(self, message_id: str) -> List[EntryReference]:
+        """
+        Get entry references for a specific message.
+
+        Args:
+            message_id: The message ID
+
+        Returns:
+            List of EntryReference objects, most similar first
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            return self._select_entry_references(
+                cursor,
+                """
+                WHERE cme.message_id = ?
+                ORDER BY cme.similarity_score DESC
+                """,
+                (message_id,),
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get message entry references: {str(e)}")
+            return []
+
+        finally:
+            conn.close()
+
+    def get_session_entry_references(
+        self, session_id: str
+    ) -> Dict[str, List[EntryReference]]:
+        """
+        Get all entry references for a chat session grouped by message ID.
+
+        Args:
+            session_id: The session ID
+
+        Returns:
+            Dictionary mapping message IDs, in message order, to lists of
+            EntryReference objects, most similar first
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            references = self._select_entry_references(
+                cursor,
+                """
+                JOIN chat_messages cm ON cme.message_id = cm.id
+                WHERE cm.session_id = ?
+                ORDER BY cm.created_at, cm.rowid, cme.similarity_score DESC
+                """,
+                (session_id,),
+            )
+
+            references_by_message: Dict[str, List[EntryReference]] = {}
+            for reference in references:
+                references_by_message.setdefault(reference.message_id, []).append(
+                    reference
+                )
+
+            return references_by_message
+
+        finally:
+            conn.close()
+
+    def get_chat_config(self) -> ChatConfig:
+        """
+        Get the chat configuration.
+
+        Served from the in-process config cache; update_chat_config
+        invalidates it.
+
+        Returns:
+            ChatConfig object with current settings
+        """
+        try:
+            return config_cache.get(
+                self.db_path, "chat_config", "default", self._load_chat_config
+            )
+        except Exception as e:
+            logger.error(f"Error getting chat config: {str(e)}")
+            # Return default config on error
+            return ChatConfig()
+
+    def _load_chat_config(self) -> ChatConfig:
+        """
+        Read the chat configuration from the database.
+
+        Returns:
+            ChatConfig object with current settings
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            # Check if the table exists and has the current schema
+            cursor.execute("PRAGMA table_info(chat_config)")
+            columns = [column[1] for column in cursor.fetchall()]
+
+            if not columns:
+                # Table doesn't exist, return default config
+                return ChatConfig()
 
             # Create query based on existing columns
             query = "SELECT "
@@ -834,6 +1368,22 @@ class ChatStorage(BaseStorage):
                 fields.append("chunk_overlap")
             if "use_enhanced_retrieval" in columns:
                 fields.append("use_enhanced_retrieval")
+            if "use_rule_based_routing" in columns:
+                fields.append("use_rule_based_routing")
+            if "tool_routing_threshold" in columns:
+                fields.append("tool_routing_threshold")
+            if "use_speculative_retrieval" in columns:
+                fields.append("use_speculative_retrieval")
+            if "tokenizer_path" in columns:
+                fields.append("tokenizer_path")
+            if "stream_coalesce_ms" in columns:
+                fields.append("stream_coalesce_ms")
+            if "stream_coalesce_bytes" in columns:
+                fields.append("stream_coalesce_bytes")
+            if "archive_after_days" in columns:
+                fields.append("archive_after_days")
+            if "search_past_conversations" in columns:
+                fields.append("search_past_conversations")
 
             if not fields:
                 # No recognized columns, return default config
@@ -856,15 +1406,12 @@ class ChatStorage(BaseStorage):
             for i, field in enumerate(fields):
                 # Extract the actual field name if it was aliased
                 field_name = field.split(" as ")[-1]
-                config_data[field_name] = row[i]
+                # Columns added by later migrations may be NULL on old rows
+                if row[i] is not None:
+                    config_data[field_name] = row[i]
 
             # Create ChatConfig from the data
             return ChatConfig(**config_data)
-
-        except Exception as e:
-            logger.error(f"Error getting chat config: {str(e)}")
-            # Return default config on error
-            return ChatConfig()
         finally:
             conn.close()
 
@@ -900,57 +1447,97 @@ class ChatStorage(BaseStorage):
                 )
                 """
                 )
-            else:
-                # Add any missing columns that exist in the current model
-                if "system_prompt" not in columns:
-                    cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN system_prompt TEXT"
-                    )
+                cursor.execute("PRAGMA table_info(chat_config)")
+                columns = [column[1] for column in cursor.fetchall()]
 
-                if "max_tokens" not in columns:
-                    # Handle migration from old schema
-                    if "max_context_tokens" in columns:
-                        cursor.execute(
-                            "ALTER TABLE chat_config ADD COLUMN max_tokens INTEGER"
-                        )
-                        cursor.execute(
-                            "UPDATE chat_config SET max_tokens = max_context_tokens"
-                        )
-                    else:
-                        cursor.execute(
-                            "ALTER TABLE chat_config ADD COLUMN max_tokens INTEGER"
-                        )
-
-                if "temperature" not in columns:
-                    cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN temperature REAL"
-                    )
+            # Add any missing columns that exist in the current model
+            if "system_prompt" not in columns:
+                cursor.execute("ALTER TABLE chat_config ADD COLUMN system_prompt TEXT")
 
-                if "retrieval_limit" not in columns:
+            if "max_tokens" not in columns:
+                # Handle migration from old schema
+                if "max_context_tokens" in columns:
                     cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN retrieval_limit INTEGER"
+                        "ALTER TABLE chat_config ADD COLUMN max_tokens INTEGER"
                     )
-
-                if "chunk_size" not in columns:
                     cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN chunk_size INTEGER"
+                        "UPDATE chat_config SET max_tokens = max_context_tokens"
                     )
-
-                if "chunk_overlap" not in columns:
+                else:
                     cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN chunk_overlap INTEGER"
+                        "ALTER TABLE chat_config ADD COLUMN max_tokens INTEGER"
                     )
 
-                if "max_history" not in columns:
-                    cursor.execute(
-                        "ALTER TABLE chat_config ADD COLUMN max_history INTEGER"
-                    )
+            if "temperature" not in columns:
+                cursor.execute("ALTER TABLE chat_config ADD COLUMN temperature REAL")
 
-                if "use_enhanced_retrieval" not in columns:
-                    cursor.execute(
-                        "ALTER TABLE chat_config "
-                        "ADD COLUMN use_enhanced_retrieval BOOLEAN"
-                    )
+            if "retrieval_limit" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config ADD COLUMN retrieval_limit INTEGER"
+                )
+
+            if "chunk_size" not in columns:
+                cursor.execute("ALTER TABLE chat_config ADD COLUMN chunk_size INTEGER")
+
+            if "chunk_overlap" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config ADD COLUMN chunk_overlap INTEGER"
+                )
+
+            if "max_history" not in columns:
+                cursor.execute("ALTER TABLE chat_config ADD COLUMN max_history INTEGER")
+
+            if "use_enhanced_retrieval" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config "
+                    "ADD COLUMN use_enhanced_retrieval BOOLEAN"
+                )
+
+            if "use_rule_based_routing" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config "
+                    "ADD COLUMN use_rule_based_routing BOOLEAN"
+                )
+
+            if "tool_routing_threshold" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config ADD COLUMN tool_routing_threshold REAL"
+                )
+
+            if "use_speculative_retrieval" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config "
+                    "ADD COLUMN use_speculative_retrieval BOOLEAN"
+                )
+
+            if "tokenizer_path" not in columns:
+                cursor.execute("ALTER TABLE chat_config ADD COLUMN tokenizer_path TEXT")
+
+            if "stream_coalesce_ms" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config ADD COLUMN stream_coalesce_ms INTEGER"
+                )
+
+            if "stream_coalesce_bytes" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config "
+                    "ADD COLUMN stream_coalesce_bytes INTEGER"
+                )
+
+            if "archive_after_days" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config ADD COLUMN archive_after_days INTEGER"
+                )
+
+            if "search_past_conversations" not in columns:
+                cursor.execute(
+                    "ALTER TABLE chat_config "
+                    "ADD COLUMN search_past_conversations BOOLEAN"
+                )
+
+            # Refresh the column list so newly added columns are written too
+            cursor.execute("PRAGMA table_info(chat_config)")
+            columns = [column[1] for column in cursor.fetchall()]
 
             # Construct update fields and parameters based on existing columns
             update_fields = []
@@ -976,6 +1563,14 @@ class ChatStorage(BaseStorage):
                 ("use_context_windowing", config.use_context_windowing),
                 ("min_messages_for_summary", config.min_messages_for_summary),
                 ("summary_prompt", config.summary_prompt),
+                ("use_rule_based_routing", config.use_rule_based_routing),
+                ("tool_routing_threshold", config.tool_routing_threshold),
+                ("use_speculative_retrieval", config.use_speculative_retrieval),
+                ("tokenizer_path", config.tokenizer_path),
+                ("stream_coalesce_ms", config.stream_coalesce_ms),
+                ("stream_coalesce_bytes", config.stream_coalesce_bytes),
+                ("archive_after_days", config.archive_after_days),
+                ("search_past_conversations", config.search_past_conversations),
             ]
 
             # Only update fields that exist in the current table schema
@@ -1018,6 +1613,14 @@ class ChatStorage(BaseStorage):
                     ("use_context_windowing", config.use_context_windowing),
                     ("min_messages_for_summary", config.min_messages_for_summary),
                     ("summary_prompt", config.summary_prompt),
+                    ("use_rule_based_routing", config.use_rule_based_routing),
+                    ("tool_routing_threshold", config.tool_routing_threshold),
+                    ("use_speculative_retrieval", config.use_speculative_retrieval),
+                    ("tokenizer_path", config.tokenizer_path),
+                    ("stream_coalesce_ms", config.stream_coalesce_ms),
+                    ("stream_coalesce_bytes", config.stream_coalesce_bytes),
+                    ("archive_after_days", config.archive_after_days),
+                    ("search_past_conversations", config.search_past_conversations),
                 ]
 
                 # Only add fields that exist in the current table schema
@@ -1031,6 +1634,7 @@ class ChatStorage(BaseStorage):
                 cursor.execute(insert_query, tuple(insert_values))
 
             conn.commit()
+            config_cache.bump(self.db_path, "chat_config")
 
         except Exception as e:
             conn.rollback()
@@ -1055,7 +1659,8 @@ class ChatStorage(BaseStorage):
         try:
             cursor.execute(
                 """
-                SELECT id, session_id, role, content, created_at, metadata, token_count
+                SELECT id, session_id, role, content, created_at, metadata, token_count,
+                       status
                 FROM chat_messages
                 WHERE id = ?
                 """,
@@ -1075,6 +1680,7 @@ class ChatStorage(BaseStorage):
                 created_at,
                 metadata_json,
                 token_count,
+                status,
             ) = row
 
             # Parse metadata
@@ -1097,6 +1703,7 @@ class ChatStorage(BaseStorage):
                 created_at=created_at_obj,
                 metadata=metadata,
                 token_count=token_count,
+                status=status,
             )
 
         except Exception as e:
@@ -1106,7 +1713,12 @@ class ChatStorage(BaseStorage):
         finally:
             conn.close()
 
-    def update_message_content(self, message_id: str, content: str) -> bool:
+    def update_message_content(
+        self,
+        message_id: str,
+        content: str,
+        metadata_updates: Optional[Dict[str, Any]] = None,
+    ) -> bool:
         """
         Update the content of an existing chat message.
 
@@ -1116,6 +1728,7 @@ class ChatStorage(BaseStorage):
         Args:
             message_id: The ID of the message to update
             content: The new content for the message
+            metadata_updates: Optional keys to merge into the message metadata
 
         Returns:
             True if successful, False otherwise
@@ -1124,16 +1737,35 @@ class ChatStorage(BaseStorage):
         cursor = conn.cursor()
 
         try:
-            cursor.execute(
-                """
-                UPDATE chat_messages
-                SET content = ?
-                WHERE id = ?
-                """,
-                (content, message_id),
-            )
+            if metadata_updates:
+                cursor.execute(
+                    "SELECT metadata FROM chat_messages WHERE id = ?", (message_id,)
+                )
+                row = cursor.fetchone()
+                metadata = json.loads(row[0]) if row and row[0] else {}
+                metadata.update(metadata_updates)
+
+                cursor.execute(
+                    """
+                    UPDATE chat_messages
+                    SET content = ?, metadata = ?, token_count = NULL
+                    WHERE id = ?
+                    """,
+                    (content, json.dumps(metadata), message_id),
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE chat_messages
+                    SET content = ?, token_count = NULL
+                    WHERE id = ?
+                    """,
+                    (content, message_id),
+                )
 
             success = cursor.rowcount > 0
+            if success:
+                self._refresh_preview_for_message(cursor, message_id)
             conn.commit()
             return success
 
@@ -1145,87 +1777,103 @@ class ChatStorage(BaseStorage):
         finally:
             conn.close()
 
-    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
+    def open_message_stream(
+        self,
+        message_id: str,
+        flush_chunks: int = 32,
+        flush_interval_ms: int = 500,
+        flush_chars: int = 2000,
+    ) -> MessageStreamWriter:
         """
-        Get statistics for a specific chat session.
+        Open a writer that persists a message as it is streamed.
 
         Args:
-            session_id: The chat session ID
+            message_id: The ID of the message being streamed
+            flush_chunks: Chunks buffered before the text is written
+            flush_interval_ms: Longest time buffered chunks wait to be written
+            flush_chars: Text length after which both limits scale with it
 
         Returns:
-            Dictionary with message count, unique entry references, etc.
+            MessageStreamWriter for the message
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        return MessageStreamWriter(
+            self.db_path, message_id, flush_chunks, flush_interval_ms, flush_chars
+        )
+
+    def recover_interrupted_messages(self) -> int:
+        """
+        Mark messages left streaming by a crash or restart as truncated.
+
+        Should run at startup, before any new stream is opened.
 
+        Returns:
+            Number of messages that were recovered
+        """
+        conn = self.get_db_connection()
         try:
-            # Get total message count
-            cursor.execute(
+            cursor = conn.execute(
                 """
-                SELECT COUNT(*)
-                FROM chat_messages
-                WHERE session_id = ?
-                """,
-                (session_id,),
-            )
-            total_count = cursor.fetchone()[0]
-
-            # Get message counts by role
-            cursor.execute(
+                UPDATE chat_messages SET status = 'truncated'
+                WHERE status = 'streaming'
                 """
-                SELECT role, COUNT(*)
-                FROM chat_messages
-                WHERE session_id = ?
-                GROUP BY role
-                """,
-                (session_id,),
             )
+            conn.commit()
+            if cursor.rowcount:
+                logger.info(
+                    f"Marked {cursor.rowcount} interrupted streamed messages "
+                    "as truncated"
+                )
+            return cursor.rowcount
+        finally:
+            conn.close()
 
-            role_counts = {role: count for role, count in cursor.fetchall()}
-            user_count = role_counts.get("user", 0)
-            assistant_count = role_counts.get("assistant", 0)
+    def update_message_token_counts(
+        self, token_counts: Dict[str, int], tokenizer_id: Optional[str] = None
+    ) -> None:
+        """
+        Store token counts for messages in a single transaction.
 
-            # Get reference count
-            cursor.execute(
-                """
-                SELECT COUNT(DISTINCT e.entry_id)
-                FROM chat_message_entries e
-                JOIN chat_messages m ON e.message_id = m.id
-                WHERE m.session_id = ?
-                """,
-                (session_id,),
-            )
-            reference_count = cursor.fetchone()[0]
+        Counts are cleared whenever a message's content changes, so a stored
+        count always matches the current content.
 
-            # Get the last message preview
-            cursor.execute(
-                """
-                SELECT content
-                FROM chat_messages
-                WHERE session_id = ? AND role = 'assistant'
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (session_id,),
-            )
-            last_message_row = cursor.fetchone()
-            last_message = last_message_row[0] if last_message_row else ""
+        Args:
+            token_counts: Mapping of message ID to token count
+            tokenizer_id: ID of the tokenizer that produced the counts
+        """
+        if not token_counts:
+            return
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
 
-            # Create preview (first ~100 chars)
-            message_preview = last_message[:100] + (
-                "..." if len(last_message) > 100 else ""
+        try:
+            cursor.executemany(
+                "UPDATE chat_messages SET token_count = ?, tokenizer_id = ? "
+                "WHERE id = ?",
+                [
+                    (count, tokenizer_id, message_id)
+                    for message_id, count in token_counts.items()
+                ],
             )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to update message token counts: {str(e)}")
+            conn.rollback()
+        finally:
+            conn.close()
 
-            return {
-                "message_count": total_count,
-                "user_message_count": user_count,
-                "assistant_message_count": assistant_count,
-                "reference_count": reference_count,
-                "last_message_preview": message_preview,
-            }
+    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get statistics for a specific chat session.
 
-        except Exception as e:
-            logger.error(f"Failed to get session stats: {str(e)}")
+        Args:
+            session_id: The chat session ID
+
+        Returns:
+            Dictionary with message count, unique entry references, etc.
+        """
+        session = self.get_session(session_id)
+        if not session:
             return {
                 "message_count": 0,
                 "user_message_count": 0,
@@ -1233,8 +1881,31 @@ class ChatStorage(BaseStorage):
                 "reference_count": 0,
                 "last_message_preview": "",
             }
-        finally:
-            conn.close()
+
+        return {
+            "message_count": session.message_count,
+            "user_message_count": session.user_message_count,
+            "assistant_message_count": session.assistant_message_count,
+            "reference_count": session.entry_count,
+            "last_message_preview": session.last_message_preview or "",
+        }
+
+    def _refresh_preview_for_message(
+        self, cursor: sqlite3.Cursor, message_id: str
+    ) -> None:
+        """
+        Refresh the preview of the session a message belongs to.
+
+        Args:
+            cursor: Cursor in the caller's transaction
+            message_id: ID of the changed message
+        """
+        cursor.execute(
+            "SELECT session_id, role FROM chat_messages WHERE id = ?", (message_id,)
+        )
+        row = cursor.fetchone()
+        if row and row[1] == "assistant":
+            cursor.execute(REFRESH_SESSION_PREVIEW_SQL, (row[0],))
 
     def update_message(
         self, message_id: str, content: str, edited: bool = True
@@ -1291,7 +1962,7 @@ class ChatStorage(BaseStorage):
             cursor.execute(
                 """
                 UPDATE chat_messages
-                SET content = ?, metadata = ?
+                SET content = ?, metadata = ?, token_count = NULL
                 WHERE id = ?
                 """,
                 (content, metadata_json, message_id),
@@ -1308,6 +1979,7 @@ class ChatStorage(BaseStorage):
             )
 
             success = cursor.rowcount > 0
+            self._refresh_preview_for_message(cursor, message_id)
             conn.commit()
             return success
 
@@ -1369,6 +2041,7 @@ class ChatStorage(BaseStorage):
                 """,
                 (datetime.now().isoformat(), session_id),
             )
+            cursor.execute(REFRESH_SESSION_SUMMARY_SQL, (session_id,))
 
             conn.commit()
             return message_deleted
@@ -1438,6 +2111,7 @@ class ChatStorage(BaseStorage):
                 """,
                 (datetime.now().isoformat(), session_id),
             )
+            cursor.execute(REFRESH_SESSION_SUMMARY_SQL, (session_id,))
 
             conn.commit()
             return True
@@ -1499,6 +2173,427 @@ class ChatStorage(BaseStorage):
         finally:
             conn.close()
 
+    def _attach_archive(self, conn: sqlite3.Connection) -> None:
+        """
+        Attach the archive database to a connection as ``archive``.
+
+        The archive file and its tables are created if needed. Commits on the
+        connection then cover both files atomically.
+
+        Args:
+            conn: Connection to the chat database
+        """
+        conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement)
+
+    @staticmethod
+    def _archive_search_text(
+        session: Dict[str, Any], messages: List[Dict[str, Any]]
+    ) -> Tuple[str, str]:
+        """
+        Build the text an archived session is indexed under.
+
+        Removing a session from the contentless index needs exactly the text
+        it was added with, so both sides use this function.
+
+        Args:
+            session: Archived session row
+            messages: Archived message rows
+
+        Returns:
+            Tuple of (title, content) for archived_sessions_fts
+        """
+        title = " ".join(
+            filter(None, [session.get("title"), session.get("context_summary")])
+        )
+        content = "\n".join(message["content"] for message in messages)
+        return title, content
+
+    def _remove_archived(
+        self,
+        conn: sqlite3.Connection,
+        rowid: int,
+        session: Dict[str, Any],
+        messages: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Delete an archived session and its search index row.
+
+        Args:
+            conn: Connection with the archive attached
+            rowid: Row ID of the archived session
+            session: Archived session row
+            messages: Archived message rows
+        """
+        conn.execute(
+            """
+            INSERT INTO archive.archived_sessions_fts (
+                archived_sessions_fts, rowid, title, content
+            ) VALUES ('delete', ?, ?, ?)
+            """,
+            (rowid, *self._archive_search_text(session, messages)),
+        )
+        conn.execute("DELETE FROM archive.archived_sessions WHERE rowid = ?", (rowid,))
+
+    def archive_session(self, session_id: str) -> bool:
+        """
+        Move a session, its messages and references to the archive.
+
+        Args:
+            session_id: The ID of the session to archive
+
+        Returns:
+            True if the session was archived, False if it was not found
+        """
+        return self._archive_sessions([session_id]) == 1
+
+    def archive_idle_sessions(self, idle_days: int, limit: int = 100) -> int:
+        """
+        Archive sessions not accessed for a number of days, oldest first.
+
+        Args:
+            idle_days: Days since last access before a session is archived
+            limit: Most sessions archived in one call
+
+        Returns:
+            Number of sessions archived
+        """
+        cutoff = (datetime.now() - timedelta(days=idle_days)).isoformat()
+        conn = self.get_db_connection()
+        try:
+            session_ids = [
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT id FROM chat_sessions
+                    WHERE last_accessed < ?
+                    ORDER BY last_accessed
+                    LIMIT ?
+                    """,
+                    (cutoff, limit),
+                ).fetchall()
+            ]
+        finally:
+            conn.close()
+
+        if not session_ids:
+            return 0
+        archived = self._archive_sessions(session_ids)
+        logger.info(f"Archived {archived} chat sessions idle over {idle_days} days")
+        return archived
+
+    def _archive_sessions(self, session_ids: List[str]) -> int:
+        """
+        Move sessions to the archive in a single transaction.
+
+        Args:
+            session_ids: IDs of the sessions to archive
+
+        Returns:
+            Number of sessions archived
+        """
+        conn = self.get_db_connection()
+        conn.row_factory = sqlite3.Row
+        archived_at = datetime.now().isoformat()
+
+        try:
+            self._attach_archive(conn)
+            archived = 0
+            for session_id in session_ids:
+                row = conn.execute(
+                    "SELECT * FROM chat_sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                if not row:
+                    continue
+                session = dict(row)
+                messages = [
+                    dict(message)
+                    for message in conn.execute(
+                        """
+                        SELECT * FROM chat_messages
+                        WHERE session_id = ?
+                        ORDER BY created_at, rowid
+                        """,
+                        (session_id,),
+                    ).fetchall()
+                ]
+                references = [
+                    dict(reference)
+                    for reference in conn.execute(
+                        """
+                        SELECT cme.* FROM chat_message_entries cme
+                        JOIN chat_messages m ON cme.message_id = m.id
+                        WHERE m.session_id = ?
+                        """,
+                        (session_id,),
+                    ).fetchall()
+                ]
+
+                # An older copy of the session must leave the contentless index
+                # with the text it was added under, or searches keep matching it
+                previous = conn.execute(
+                    """
+                    SELECT rowid, session, messages FROM archive.archived_sessions
+                    WHERE id = ?
+                    """,
+                    (session_id,),
+                ).fetchone()
+                if previous:
+                    old = json.loads(zlib.decompress(previous[2]).decode("utf-8"))
+                    self._remove_archived(
+                        conn, previous[0], json.loads(previous[1]), old["messages"]
+                    )
+
+                cursor = conn.execute(
+                    """
+                    INSERT INTO archive.archived_sessions (
+                        id, last_accessed, archived_at, session, messages
+                    ) VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (
+                        session_id,
+                        session["last_accessed"],
+                        archived_at,
+                        json.dumps(session),
+                        zlib.compress(
+                            json.dumps(
+                                {"messages": messages, "references": references}
+                            ).encode("utf-8")
+                        ),
+                    ),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO archive.archived_sessions_fts (rowid, title, content)
+                    VALUES (?, ?, ?)
+                    """,
+                    (cursor.lastrowid, *self._archive_search_text(session, messages)),
+                )
+
+                # Deleting from the hot tables also clears their FTS rows
+                conn.execute(
+                    """
+                    DELETE FROM chat_message_entries WHERE message_id IN (
+                        SELECT id FROM chat_messages WHERE session_id = ?
+                    )
+                    """,
+                    (session_id,),
+                )
+                conn.execute(
+                    "DELETE FROM chat_messages WHERE session_id = ?", (session_id,)
+                )
+                conn.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+                archived += 1
+
+            conn.commit()
+            return archived
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to archive chat sessions: {str(e)}")
+            raise e
+        finally:
+            conn.close()
+
+    def restore_session(self, session_id: str) -> bool:
+        """
+        Move an archived session back into the chat tables.
+
+        The session's last_accessed time is set to now, so it is not archived
+        again by the next sweep.
+
+        Args:
+            session_id: The ID of the archived session
+
+        Returns:
+            True if the session was restored, False if it is not archived
+        """
+        if not os.path.exists(self.archive_path):
+            return False
+
+        conn = self.get_db_connection()
+
+        try:
+            self._attach_archive(conn)
+            row = conn.execute(
+                """
+                SELECT rowid, session, messages FROM archive.archived_sessions
+                WHERE id = ?
+                """,
+                (session_id,),
+            ).fetchone()
+            if not row:
+                return False
+
+            rowid, session = row[0], json.loads(row[1])
+            archived = json.loads(zlib.decompress(row[2]).decode("utf-8"))
+            messages, references = archived["messages"], archived["references"]
+            self._remove_archived(conn, rowid, session, messages)
+            session["last_accessed"] = datetime.now().isoformat()
+
+            # Columns dropped since archiving are skipped; new ones default
+            for table, rows in (
+                ("chat_sessions", [session]),
+                ("chat_messages", messages),
+                ("chat_message_entries", references),
+            ):
+                if not rows:
+                    continue
+                table_columns = {
+                    column[1]
+                    for column in conn.execute(f"PRAGMA main.table_info({table})")
+                }
+                columns = [column for column in rows[0] if column in table_columns]
+                conn.executemany(
+                    f"INSERT INTO main.{table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [tuple(item[column] for column in columns) for item in rows],
+                )
+
+            conn.commit()
+            logger.info(f"Restored archived chat session {session_id}")
+            return True
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to restore chat session {session_id}: {str(e)}")
+            raise e
+        finally:
+            conn.close()
+
+    def list_archived_sessions(
+        self, query: str = "", limit: int = 20, offset: int = 0
+    ) -> Tuple[List[ChatSession], int]:
+        """
+        List or search archived sessions.
+
+        Args:
+            query: Search text matched against titles, summaries and message
+                content; empty lists every archived session
+            limit: Maximum number of sessions to return
+            offset: Number of sessions to skip
+
+        Returns:
+            Tuple of the page of sessions, most relevant or most recently
+            accessed first, and the total number that match
+        """
+        if not os.path.exists(self.archive_path):
+            return [], 0
+
+        match = fts_match_query(query)
+        if query.strip() and not match:
+            return [], 0
+
+        if match:
+            # bm25 can't share a SELECT with the window count, so rank first
+            source = """
+                WITH ranked AS (
+                    SELECT rowid, bm25(archived_sessions_fts, 10.0, 1.0) AS score
+                    FROM archive.archived_sessions_fts
+                    WHERE archived_sessions_fts MATCH ?
+                )
+                SELECT {columns}
+                FROM ranked r JOIN archive.archived_sessions s ON s.rowid = r.rowid
+            """
+            order = "r.score"
+            params: List[Any] = [match]
+        else:
+            source = "SELECT {columns} FROM archive.archived_sessions s"
+            order = "s.last_accessed DESC"
+            params = []
+
+        conn = self.get_db_connection()
+
+        try:
+            self._attach_archive(conn)
+            rows = conn.execute(
+                source.format(columns="s.session, COUNT(*) OVER ()")
+                + f" ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+
+            if rows:
+                total = rows[0][1]
+            else:
+                # Paged past the end; the window count has no row to ride on
+                total = conn.execute(
+                    source.format(columns="COUNT(*)"), params
+                ).fetchone()[0]
+
+            sessions = []
+            for row in rows:
+                session = json.loads(row[0])
+                sessions.append(
+                    self._session_from_row(
+                        tuple(session.get(field) for field in SESSION_FIELDS)
+                    )
+                )
+
+            return sessions, total
+
+        finally:
+            conn.close()
+
+    def _session_search_sql(
+        self,
+        match: Optional[str],
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build the shared FROM clause for session search and its count.
+
+        With a MATCH string, sessions are found through both FTS tables and
+        scored by their best bm25 rank; title matches weigh more than summary
+        and message matches.
+
+        Args:
+            match: FTS5 MATCH string, or None to select every session
+            date_from: Start date filter (ISO format)
+            date_to: End date filter (ISO format)
+
+        Returns:
+            SQL selecting from sessions aliased s (and matches aliased m when
+            searching), and its parameters
+        """
+        params: List[Any] = []
+        if match:
+            sql = """
+                WITH matches AS (
+                    SELECT session_id, MIN(score) AS score,
+                           MAX(in_session) AS in_session
+                    FROM (
+                        SELECT session_id, rank AS score, 1 AS in_session
+                        FROM chat_sessions_fts
+                        WHERE chat_sessions_fts MATCH ?
+                          AND rank MATCH 'bm25(0.0, 10.0, 2.0)'
+                        UNION ALL
+                        SELECT session_id, rank, 0
+                        FROM chat_messages_fts
+                        WHERE chat_messages_fts MATCH ?
+                    )
+                    GROUP BY session_id
+                )
+                SELECT {columns}
+                FROM matches m JOIN chat_sessions s ON s.id = m.session_id
+            """
+            params.extend([match, match])
+        else:
+            sql = "SELECT {columns} FROM chat_sessions s"
+
+        where_conditions = []
+        if date_from:
+            where_conditions.append("s.last_accessed >= ?")
+            params.append(date_from)
+        if date_to:
+            where_conditions.append("s.last_accessed <= ?")
+            params.append(date_to)
+        if where_conditions:
+            sql += f" WHERE {' AND '.join(where_conditions)}"
+
+        return sql, params
+
     def search_sessions(
         self,
         query: str,
@@ -1522,98 +2617,188 @@ class ChatStorage(BaseStorage):
         Returns:
             List of matching ChatSession objects
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Build the search query
-            params = []
-
-            # Add text search using FTS
-            if query.strip():
-                # Search sessions by title and get sessions with matching messages
-                combined_query = """
-                    SELECT DISTINCT s.id, s.title, s.created_at, s.updated_at, s.last_accessed,
-                           s.context_summary, s.temporal_filter, s.entry_count, s.persona_id,
-                           'session_title' as match_type, 0 as rank
-                    FROM chat_sessions s
-                    WHERE s.title LIKE ? OR s.id IN (
-                        SELECT DISTINCT m.session_id
-                        FROM chat_messages m
-                        WHERE m.content LIKE ?
-                    )
-                """
-                params.extend([f"%{query}%", f"%{query}%"])
-            else:
-                # If no search query, just get all sessions
-                combined_query = """
-                    SELECT id, title, created_at, updated_at, last_accessed,
-                           context_summary, temporal_filter, entry_count, persona_id,
-                           'all' as match_type, 0 as rank
-                    FROM chat_sessions
-                """
+        results, _ = self.search_session_results(
+            query,
+            limit=limit,
+            offset=offset,
+            sort_by=sort_by,
+            date_from=date_from,
+            date_to=date_to,
+            snippets_per_session=0,
+        )
+        return [result.session for result in results]
+
+    def search_session_results(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        sort_by: str = "relevance",
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        snippets_per_session: int = 3,
+    ) -> Tuple[List[ChatSearchResult], int]:
+        """
+        Search chat sessions with relevance scores and highlighted snippets.
 
-            # Add date filtering
-            where_conditions = []
-            if date_from:
-                where_conditions.append("last_accessed >= ?")
-                params.append(date_from)
-            if date_to:
-                where_conditions.append("last_accessed <= ?")
-                params.append(date_to)
-
-            if where_conditions:
-                if query.strip():
-                    # Wrap the union query and add WHERE clause
-                    combined_query = f"""
-                        SELECT * FROM ({combined_query})
-                        WHERE {' AND '.join(where_conditions)}
-                    """
-                else:
-                    combined_query += f" WHERE {' AND '.join(where_conditions)}"
-
-            # Add sorting
-            if sort_by == "relevance" and query.strip():
-                combined_query += " ORDER BY rank DESC"
-            elif sort_by == "date":
-                combined_query += " ORDER BY last_accessed DESC"
-            elif sort_by == "title":
-                combined_query += " ORDER BY title ASC"
-            else:
-                combined_query += " ORDER BY last_accessed DESC"
+        Results and the total come from the same FTS query, so the count
+        always agrees with what paging returns.
 
-            # Add pagination
-            combined_query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+        Args:
+            query: Search query string
+            limit: Maximum number of results to return
+            offset: Number of results to skip
+            sort_by: Sort order ('relevance', 'date', 'title')
+            date_from: Start date filter (ISO format)
+            date_to: End date filter (ISO format)
+            snippets_per_session: Most matching messages returned per session
 
-            cursor.execute(combined_query, params)
+        Returns:
+            Tuple of the page of results and the total number of matches
+        """
+        match = fts_match_query(query)
+        sql, params = self._session_search_sql(match, date_from, date_to)
+        score = "m.score, m.in_session" if match else "0.0, 0"
+        sql = sql.format(columns=f"{SESSION_COLUMNS}, {score}, COUNT(*) OVER ()")
+
+        if sort_by == "relevance" and match:
+            sql += " ORDER BY m.score ASC, s.last_accessed DESC"
+        elif sort_by == "title":
+            sql += " ORDER BY s.title ASC"
+        else:
+            sql += " ORDER BY s.last_accessed DESC"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
 
-            sessions = []
-            seen_ids = set()  # Avoid duplicates from union
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
 
-            for row in cursor.fetchall():
-                session_id = row[0]
-                if session_id not in seen_ids:
-                    seen_ids.add(session_id)
-                    sessions.append(
-                        ChatSession(
-                            id=row[0],
-                            title=row[1],
-                            created_at=datetime.fromisoformat(row[2]),
-                            updated_at=datetime.fromisoformat(row[3]),
-                            last_accessed=datetime.fromisoformat(row[4]),
-                            context_summary=row[5],
-                            temporal_filter=row[6],
-                            entry_count=row[7],
-                            persona_id=row[8],
-                        )
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+            if rows:
+                total = rows[0][-1]
+            elif offset:
+                # Paged past the end; the window count has no row to ride on
+                total = self.count_search_results(query, date_from, date_to)
+            else:
+                total = 0
+
+            # Rank and match columns follow the session columns
+            score_column = len(SESSION_FIELDS)
+            results = []
+            for row in rows:
+                score, in_session = row[score_column], row[score_column + 1]
+                results.append(
+                    ChatSearchResult(
+                        session=self._session_from_row(row),
+                        match_type=(
+                            "all"
+                            if not match
+                            else ("session_title" if in_session else "message_content")
+                        ),
+                        # bm25 ranks are negative, lower is better
+                        relevance_score=round(-score, 6) if match else 0.0,
                     )
+                )
+
+            if match and results and snippets_per_session > 0:
+                self._add_search_snippets(cursor, match, results, snippets_per_session)
 
-            return sessions
+            return results, total
 
         finally:
             conn.close()
 
+    def _add_search_snippets(
+        self,
+        cursor,
+        match: str,
+        results: List[ChatSearchResult],
+        snippets_per_session: int,
+    ) -> None:
+        """
+        Fill in highlighted snippets and matched messages for search results.
+
+        Args:
+            cursor: Open database cursor
+            match: FTS5 MATCH string the results were found with
+            results: Search results to fill in
+            snippets_per_session: Most matching messages per session
+        """
+        by_id = {result.session.id: result for result in results}
+        placeholders = ", ".join("?" for _ in by_id)
+
+        # Title and summary matches
+        cursor.execute(
+            f"""
+            SELECT session_id,
+                   highlight(chat_sessions_fts, 1, ?, ?),
+                   snippet(chat_sessions_fts, 2, ?, ?, ?, ?)
+            FROM chat_sessions_fts
+            WHERE chat_sessions_fts MATCH ? AND session_id IN ({placeholders})
+            """,
+            [*HIGHLIGHT_MARKERS, *HIGHLIGHT_MARKERS, SNIPPET_ELLIPSIS]
+            + [SNIPPET_TOKENS, match, *by_id],
+        )
+        for session_id, title, summary in cursor.fetchall():
+            result = by_id[session_id]
+            if HIGHLIGHT_MARKERS[0] in (title or ""):
+                result.highlighted_snippets.append(title)
+            elif HIGHLIGHT_MARKERS[0] in (summary or ""):
+                result.match_type = "context_summary"
+                result.highlighted_snippets.append(summary)
+
+        # Best matching messages in each session
+        cursor.execute(
+            f"""
+            SELECT message_id, session_id,
+                   snippet(chat_messages_fts, 2, ?, ?, ?, ?)
+            FROM chat_messages_fts
+            WHERE chat_messages_fts MATCH ? AND session_id IN ({placeholders})
+            ORDER BY rank
+            """,
+            [*HIGHLIGHT_MARKERS, SNIPPET_ELLIPSIS, SNIPPET_TOKENS, match, *by_id],
+        )
+        matched: Dict[str, List[str]] = {}
+        for message_id, session_id, snippet in cursor.fetchall():
+            message_ids = matched.setdefault(session_id, [])
+            if len(message_ids) < snippets_per_session:
+                message_ids.append(message_id)
+                by_id[session_id].highlighted_snippets.append(snippet)
+
+        all_ids = [message_id for ids in matched.values() for message_id in ids]
+        if not all_ids:
+            return
+        cursor.execute(
+            f"""
+            SELECT id, session_id, role, content, created_at, metadata, token_count,
+                   status
+            FROM chat_messages
+            WHERE id IN ({", ".join("?" for _ in all_ids)})
+            """,
+            all_ids,
+        )
+        messages = {}
+        for row in cursor.fetchall():
+            messages[row[0]] = ChatMessage(
+                id=row[0],
+                session_id=row[1],
+                role=row[2],
+                content=row[3],
+                created_at=datetime.fromisoformat(row[4]),
+                metadata=json.loads(row[5]) if row[5] else None,
+                token_count=row[6],
+                status=row[7],
+            )
+        for session_id, message_ids in matched.items():
+            by_id[session_id].matched_messages = [
+                messages[message_id]
+                for message_id in message_ids
+                if message_id in messages
+            ]
+
     def count_search_results(
         self, query: str, date_from: Optional[str] = None, date_to: Optional[str] = None
     ) -> int:
@@ -1628,61 +2813,15 @@ class ChatStorage(BaseStorage):
         Returns:
             Total count of matching sessions
         """
+        sql, params = self._session_search_sql(
+            fts_match_query(query), date_from, date_to
+        )
+
         conn = self.get_db_connection()
         cursor = conn.cursor()
 
         try:
-            params = []
-
-            if query.strip():
-                # Count distinct sessions that match in either title or messages
-                fts_query = f"'{query}'"
-
-                count_query = f"""
-                    SELECT COUNT(DISTINCT session_id) FROM (
-                        SELECT sf.session_id FROM chat_sessions_fts sf WHERE chat_sessions_fts MATCH {fts_query}
-                        UNION
-                        SELECT mf.session_id FROM chat_messages_fts mf WHERE chat_messages_fts MATCH {fts_query}
-                    ) as matches
-                """
-
-                # Add date filtering if needed
-                if date_from or date_to:
-                    count_query = f"""
-                        SELECT COUNT(DISTINCT s.id) FROM chat_sessions s
-                        WHERE s.id IN (
-                            SELECT sf.session_id FROM chat_sessions_fts sf WHERE chat_sessions_fts MATCH {fts_query}
-                            UNION
-                            SELECT mf.session_id FROM chat_messages_fts mf WHERE chat_messages_fts MATCH {fts_query}
-                        )
-                    """
-
-                    where_conditions = []
-                    if date_from:
-                        where_conditions.append("s.last_accessed >= ?")
-                        params.append(date_from)
-                    if date_to:
-                        where_conditions.append("s.last_accessed <= ?")
-                        params.append(date_to)
-
-                    if where_conditions:
-                        count_query += f" AND {' AND '.join(where_conditions)}"
-            else:
-                # Count all sessions with date filtering
-                count_query = "SELECT COUNT(*) FROM chat_sessions"
-                where_conditions = []
-
-                if date_from:
-                    where_conditions.append("last_accessed >= ?")
-                    params.append(date_from)
-                if date_to:
-                    where_conditions.append("last_accessed <= ?")
-                    params.append(date_to)
-
-                if where_conditions:
-                    count_query += f" WHERE {' AND '.join(where_conditions)}"
-
-            cursor.execute(count_query, params)
+            cursor.execute(sql.format(columns="COUNT(*)"), params)
             return cursor.fetchone()[0]
 
         finally:
@@ -1702,26 +2841,26 @@ class ChatStorage(BaseStorage):
         Returns:
             List of matching ChatMessage objects
         """
+        match = fts_match_query(query)
+        if not match:
+            # Return recent messages if no query
+            return self.get_messages(session_id)
+
         conn = self.get_db_connection()
         cursor = conn.cursor()
 
         try:
-            if not query.strip():
-                # Return recent messages if no query
-                return self.get_messages(session_id)
-
-            fts_query = f"'{query}'"
-
             cursor.execute(
-                f"""
-                SELECT m.id, m.session_id, m.role, m.content, m.created_at, m.metadata, m.token_count
+                """
+                SELECT m.id, m.session_id, m.role, m.content, m.created_at, m.metadata,
+                       m.token_count, m.status
                 FROM chat_messages m
                 JOIN chat_messages_fts mf ON m.id = mf.message_id
-                WHERE m.session_id = ? AND chat_messages_fts MATCH {fts_query}
+                WHERE chat_messages_fts MATCH ? AND mf.session_id = ?
                 ORDER BY m.created_at ASC
                 LIMIT ?
                 """,
-                (session_id, limit),
+                (match, session_id, limit),
             )
 
             messages = []
@@ -1738,6 +2877,7 @@ class ChatStorage(BaseStorage):
                         created_at=datetime.fromisoformat(row[4]),
                         metadata=metadata,
                         token_count=row[6],
+                        status=row[7],
                     )
                 )
 
@@ -1,6 +1,8 @@
+import json
 from typing import Optional
 
 from app.storage.base import BaseStorage
+from app.storage.config_cache import config_cache
 from app.models import LLMConfig, WebSearchConfig
 
 
@@ -88,6 +90,15 @@ class ConfigStorage(BaseStorage):
             "search_model": "TEXT",
             "chat_model": "TEXT",
             "analysis_model": "TEXT",
+            "ollama_host": "TEXT",
+            "connect_timeout": "REAL",
+            "read_timeout": "REAL",
+            "ollama_backends": "TEXT",
+            "batch_max_workers": "INTEGER",
+            "batch_group_token_budget": "INTEGER",
+            "batch_reduce_fan_in": "INTEGER",
+            "keep_alive": "TEXT",
+            "query_expansion": "TEXT",
         }
 
         for column_name, column_type in new_columns.items():
@@ -128,12 +139,17 @@ class ConfigStorage(BaseStorage):
         logger = logging.getLogger(__name__)
 
         try:
-            # Save main config with explicit column names to handle column order correctly
+            # Save main config with explicit column names to handle column order
             cursor.execute(
                 """INSERT OR REPLACE INTO config
-                (id, model_name, embedding_model, search_model, chat_model, analysis_model,
-                 max_retries, retry_delay, temperature, max_tokens, system_prompt, min_similarity)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (id, model_name, embedding_model, search_model, chat_model,
+                 analysis_model, max_retries, retry_delay, temperature, max_tokens,
+                 system_prompt, min_similarity, ollama_host, connect_timeout,
+                 read_timeout, ollama_backends, batch_max_workers,
+                 batch_group_token_budget, batch_reduce_fan_in, keep_alive,
+                 query_expansion)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                        ?)""",
                 (
                     config.id,
                     config.model_name,
@@ -147,6 +163,15 @@ class ConfigStorage(BaseStorage):
                     config.max_tokens,
                     config.system_prompt,
                     config.min_similarity,
+                    config.ollama_host,
+                    config.connect_timeout,
+                    config.read_timeout,
+                    json.dumps([b.model_dump() for b in config.ollama_backends]),
+                    config.batch_max_workers,
+                    config.batch_group_token_budget,
+                    config.batch_reduce_fan_in,
+                    config.keep_alive,
+                    config.query_expansion,
                 ),
             )
 
@@ -168,6 +193,7 @@ class ConfigStorage(BaseStorage):
                     )
 
             conn.commit()
+            config_cache.bump(self.db_path, "llm_config")
             return True
         except Exception as e:
             logger.error(f"Error saving LLM config: {e}")
@@ -180,9 +206,37 @@ class ConfigStorage(BaseStorage):
         """
         Retrieve LLM configuration settings.
 
+        Served from the in-process config cache; save_llm_config invalidates
+        it.
+
         Args:
             config_id: The configuration ID to retrieve (defaults to "default")
 
+        Returns:
+            LLMConfig object if found, None otherwise
+        """
+        import logging
+
+        logger = logging.getLogger(__name__)
+
+        try:
+            return config_cache.get(
+                self.db_path,
+                "llm_config",
+                config_id,
+                lambda: self._load_llm_config(config_id),
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving LLM config: {e}")
+            return None
+
+    def _load_llm_config(self, config_id: str) -> Optional[LLMConfig]:
+        """
+        Read LLM configuration settings from the database.
+
+        Args:
+            config_id: The configuration ID to retrieve
+
         Returns:
             LLMConfig object if found, None otherwise
         """
@@ -197,8 +251,11 @@ class ConfigStorage(BaseStorage):
             cursor.execute(
                 """
                 SELECT
-                    model_name, embedding_model, max_retries, retry_delay, temperature, max_tokens,
-                    system_prompt, min_similarity, search_model, chat_model, analysis_model
+                    model_name, embedding_model, max_retries, retry_delay, temperature,
+                    max_tokens, system_prompt, min_similarity, search_model, chat_model,
+                    analysis_model, ollama_host, connect_timeout, read_timeout,
+                    ollama_backends, batch_max_workers, batch_group_token_budget,
+                    batch_reduce_fan_in, keep_alive, query_expansion
                 FROM config WHERE id = ?
                 """,
                 (config_id,),
@@ -220,8 +277,35 @@ class ConfigStorage(BaseStorage):
                 search_model,
                 chat_model,
                 analysis_model,
+                ollama_host,
+                connect_timeout,
+                read_timeout,
+                ollama_backends,
+                batch_max_workers,
+                batch_group_token_budget,
+                batch_reduce_fan_in,
+                keep_alive,
+                query_expansion,
             ) = row
 
+            # Settings added after the original schema may be NULL on older rows
+            connection_settings = {"ollama_host": ollama_host}
+            if connect_timeout is not None:
+                connection_settings["connect_timeout"] = connect_timeout
+            if read_timeout is not None:
+                connection_settings["read_timeout"] = read_timeout
+            if ollama_backends:
+                connection_settings["ollama_backends"] = json.loads(ollama_backends)
+            for name, value in (
+                ("batch_max_workers", batch_max_workers),
+                ("batch_group_token_budget", batch_group_token_budget),
+                ("batch_reduce_fan_in", batch_reduce_fan_in),
+                ("keep_alive", keep_alive),
+                ("query_expansion", query_expansion),
+            ):
+                if value is not None:
+                    connection_settings[name] = value
+
             # Get prompt types for this config
             from app.models import PromptType
 
@@ -256,6 +340,7 @@ class ConfigStorage(BaseStorage):
                     min_similarity=min_similarity
                     if min_similarity is not None
                     else 0.5,
+                    **connection_settings,
                 )
             else:
                 logger.info(f"Found {len(prompt_types)} prompt types")
@@ -274,13 +359,11 @@ class ConfigStorage(BaseStorage):
                     min_similarity=min_similarity
                     if min_similarity is not None
                     else 0.5,
+                    **connection_settings,
                     prompt_types=prompt_types,
                 )
 
             return config
-        except Exception as e:
-            logger.error(f"Error retrieving LLM config: {e}")
-            return None
         finally:
             conn.close()
 
@@ -0,0 +1,216 @@
+"""
+In-process cache for configuration and persona lookups.
+
+Chat config, LLM config and personas are read on every chat turn but change
+only when a user saves them. Readers go through ConfigCache, which keeps the
+loaded objects in memory per database and namespace. Every write bumps the
+namespace's version, which drops its cached objects so the next read loads
+them again.
+
+Cached objects belong to one database file. Each lookup compares the file's
+identity, its device and inode plus a generation that forget() advances,
+with the one the objects were loaded from. A database deleted and created
+again at the same path therefore never serves the old file's values, even
+when the filesystem reuses the inode.
+
+The cache assumes this process is the only writer. Changes made directly
+to the database by another process show up after clear() or a restart.
+"""
+
+import copy
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigCache:
+    """Thread-safe cache of loaded objects with per-namespace versions."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._items: Dict[Tuple[str, str, Hashable], Tuple[int, Any]] = {}
+        self._identities: Dict[str, Tuple[int, int, int]] = {}
+        self._generations: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        db_path: str,
+        namespace: str,
+        key: Hashable,
+        load: Callable[[], Any],
+    ) -> Any:
+        """
+        Get an object, loading it on a miss.
+
+        A value loaded while a write bumped the namespace is returned but not
+        cached, so a read that raced a write can't keep serving the old value.
+        Nothing is cached while the database file doesn't exist.
+
+        Args:
+            db_path: Database the object is stored in
+            namespace: Kind of object, such as "chat_config" or "personas"
+            key: Object identity within the namespace
+            load: Callable that reads the object from the database
+
+        Returns:
+            A copy of the cached or loaded object, so callers may modify it
+        """
+        item_key = (db_path, namespace, key)
+        with self._lock:
+            identity = self._check_identity(db_path)
+            version = self._versions.get((db_path, namespace), 0)
+            cached = self._items.get(item_key)
+            if cached is not None and cached[0] == version:
+                self._hits += 1
+                return copy.deepcopy(cached[1])
+            self._misses += 1
+
+        value = load()
+
+        with self._lock:
+            if (
+                identity is not None
+                and self._check_identity(db_path) == identity
+                and self._versions.get((db_path, namespace), 0) == version
+            ):
+                self._items[item_key] = (version, value)
+        return copy.deepcopy(value)
+
+    def database_id(self, db_path: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Get the identity of the database file currently at a path.
+
+        Args:
+            db_path: Path to the database
+
+        Returns:
+            (generation, device, inode), or None if the file doesn't exist
+        """
+        with self._lock:
+            return self._check_identity(db_path)
+
+    def forget(self, db_path: str) -> None:
+        """
+        Treat the file at a path as a new database.
+
+        Storages call this when they find the database missing, so a file
+        created in its place gets a new identity even if its inode is reused.
+
+        Args:
+            db_path: Path to the database
+        """
+        with self._lock:
+            self._generations[db_path] = self._generations.get(db_path, 0) + 1
+            self._identities.pop(db_path, None)
+            self._drop_items(db_path)
+
+    def _check_identity(self, db_path: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Drop a database's objects if its file changed; caller holds the lock.
+
+        Args:
+            db_path: Path to the database
+
+        Returns:
+            The file's current identity, or None if it doesn't exist
+        """
+        try:
+            stat = os.stat(db_path)
+            identity = (self._generations.get(db_path, 0), stat.st_dev, stat.st_ino)
+        except OSError:
+            identity = None
+        if self._identities.get(db_path) != identity:
+            if db_path in self._identities:
+                logger.info(f"Database {db_path} was replaced, dropping cached config")
+            self._drop_items(db_path)
+            if identity is None:
+                self._identities.pop(db_path, None)
+            else:
+                self._identities[db_path] = identity
+        return identity
+
+    def _drop_items(self, db_path: str, namespace: Optional[str] = None) -> None:
+        """
+        Drop cached objects of a database; caller holds the lock.
+
+        Args:
+            db_path: Database whose objects are dropped
+            namespace: Only drop objects of this kind, if given
+        """
+        for item_key in [
+            item_key
+            for item_key in self._items
+            if item_key[0] == db_path and namespace in (None, item_key[1])
+        ]:
+            del self._items[item_key]
+
+    def bump(self, db_path: str, namespace: str) -> int:
+        """
+        Record a change to a namespace and drop its cached objects.
+
+        Args:
+            db_path: Database that was written
+            namespace: Kind of object that changed
+
+        Returns:
+            The namespace's new version
+        """
+        with self._lock:
+            version = self._versions.get((db_path, namespace), 0) + 1
+            self._versions[(db_path, namespace)] = version
+            self._drop_items(db_path, namespace)
+        logger.debug(f"Bumped {namespace} to version {version} for {db_path}")
+        return version
+
+    def version(self, db_path: str, namespace: str) -> int:
+        """
+        Get a namespace's current version.
+
+        Args:
+            db_path: Database the namespace belongs to
+            namespace: Kind of object
+
+        Returns:
+            Number of changes recorded since startup
+        """
+        with self._lock:
+            return self._versions.get((db_path, namespace), 0)
+
+    def clear(self) -> None:
+        """Drop every cached object; versions are kept."""
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and hit rate.
+
+        Returns:
+            Dictionary with size, hits, misses, hit_rate and the version of
+            each namespace
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            size = len(self._items)
+            versions = {
+                f"{namespace}@{db_path}": version
+                for (db_path, namespace), version in self._versions.items()
+            }
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "versions": versions,
+        }
+
+
+# Process-wide cache; storages are created per request
+config_cache = ConfigCache()
@@ -1,13 +1,20 @@
 import logging
+import threading
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.models import Persona, PersonaCreate, PersonaUpdate
 from app.storage.base import BaseStorage
+from app.storage.config_cache import config_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Identity of each database file whose personas table has been created and
+# seeded by this process; later instances skip the setup queries
+_prepared_databases: Dict[str, Tuple[int, int, int]] = {}
+_prepared_lock = threading.Lock()
+
 
 class PersonaStorage(BaseStorage):
     """Storage manager for chat personas."""
@@ -20,8 +27,18 @@ class PersonaStorage(BaseStorage):
             base_dir: Base directory for all storage (default: ./journal_data)
         """
         super().__init__(base_dir)
-        self._init_tables()
-        self._seed_default_personas()
+        database_id = config_cache.database_id(self.db_path)
+        with _prepared_lock:
+            prepared = (
+                database_id is not None
+                and _prepared_databases.get(self.db_path) == database_id
+            )
+        if not prepared:
+            self._init_tables()
+            self._seed_default_personas()
+            database_id = config_cache.database_id(self.db_path)
+            with _prepared_lock:
+                _prepared_databases[self.db_path] = database_id
 
     def _init_tables(self):
         """Initialize the personas table."""
@@ -77,6 +94,7 @@ class PersonaStorage(BaseStorage):
                     # Update existing personas with tool awareness
                     self._update_default_personas(cursor)
                     conn.commit()
+                    config_cache.bump(self.db_path, "personas")
                 return
 
             # Define default personas
@@ -138,6 +156,7 @@ class PersonaStorage(BaseStorage):
                 )
 
             conn.commit()
+            config_cache.bump(self.db_path, "personas")
             logger.info(f"Seeded {len(default_personas)} default personas")
 
         except Exception as e:
@@ -224,6 +243,7 @@ class PersonaStorage(BaseStorage):
             )
 
             conn.commit()
+            config_cache.bump(self.db_path, "personas")
             return persona
 
         except Exception as e:
@@ -237,6 +257,26 @@ class PersonaStorage(BaseStorage):
         """
         Retrieve a persona by ID.
 
+        Served from the in-process config cache; persona writes invalidate
+        it.
+
+        Args:
+            persona_id: The ID of the persona to retrieve
+
+        Returns:
+            Persona if found, None otherwise
+        """
+        return config_cache.get(
+            self.db_path,
+            "personas",
+            persona_id,
+            lambda: self._load_persona(persona_id),
+        )
+
+    def _load_persona(self, persona_id: str) -> Optional[Persona]:
+        """
+        Read a persona from the database.
+
         Args:
             persona_id: The ID of the persona to retrieve
 
@@ -425,6 +465,7 @@ class PersonaStorage(BaseStorage):
                 return None
 
             conn.commit()
+            config_cache.bump(self.db_path, "personas")
             return self.get_persona(persona_id)
 
         except Exception as e:
@@ -466,6 +507,7 @@ class PersonaStorage(BaseStorage):
 
             success = cursor.rowcount > 0
             conn.commit()
+            config_cache.bump(self.db_path, "personas")
             return success
 
         except Exception as e:
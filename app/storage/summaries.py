@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
 from app.storage.base import BaseStorage
@@ -51,6 +51,26 @@ class SummaryStorage(BaseStorage):
             "CREATE INDEX IF NOT EXISTS idx_entry_summaries_entry_id "
             "ON entry_summaries(entry_id)"
         )
+
+        # Generated summaries, reused while the entry and prompt are unchanged
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_summary_cache (
+                cache_key TEXT PRIMARY KEY,
+                entry_id TEXT,
+                prompt_type TEXT,
+                model TEXT,
+                summary TEXT NOT NULL,
+                key_topics TEXT NOT NULL,
+                mood TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entry_summary_cache_entry "
+            "ON entry_summary_cache(entry_id, prompt_type)"
+        )
         conn.commit()
         conn.close()
 
@@ -176,3 +196,184 @@ class SummaryStorage(BaseStorage):
             return False
         finally:
             conn.close()
+
+    def get_cached_summary(self, cache_key: str):
+        """
+        Get a previously generated summary from the cache.
+
+        Args:
+            cache_key: Hash of the entry content, prompt type, model and template
+
+        Returns:
+            EntrySummary if cached, None otherwise
+        """
+        from app.models import EntrySummary
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT entry_id, prompt_type, summary, key_topics, mood, created_at
+                FROM entry_summary_cache
+                WHERE cache_key = ?
+                """,
+                (cache_key,),
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            entry_id, prompt_type, summary_text, key_topics_json, mood, created_at = row
+            return EntrySummary(
+                entry_id=entry_id,
+                summary=summary_text,
+                key_topics=json.loads(key_topics_json),
+                mood=mood,
+                favorite=False,
+                prompt_type=prompt_type,
+                created_at=created_at,
+            )
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error reading summary cache: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def get_cached_summary_keys(self, cache_keys: List[str]) -> Set[str]:
+        """
+        Find which of the given cache keys already have a cached summary.
+
+        Args:
+            cache_keys: Cache keys to look up
+
+        Returns:
+            Set of keys present in the cache
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        found = set()
+        try:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(cache_keys), 500):
+                chunk = cache_keys[start : start + 500]  # noqa: E203
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(
+                    "SELECT cache_key FROM entry_summary_cache "
+                    f"WHERE cache_key IN ({placeholders})",
+                    chunk,
+                )
+                found.update(row[0] for row in cursor.fetchall())
+            return found
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error reading summary cache keys: {e}")
+            return found
+        finally:
+            conn.close()
+
+    def save_cached_summary(
+        self,
+        cache_key: str,
+        summary,
+        entry_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> bool:
+        """
+        Store a generated summary in the cache.
+
+        Older cached summaries of the same entry and prompt type are removed,
+        since a new key means the entry, model or template has changed.
+
+        Args:
+            cache_key: Hash of the entry content, prompt type, model and template
+            summary: EntrySummary object to cache
+            entry_id: Optional ID of the summarized entry
+            model: Model that generated the summary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.save_cached_summaries([(cache_key, summary, entry_id, model)])
+
+    def save_cached_summaries(self, items: List[Tuple]) -> bool:
+        """
+        Store several generated summaries in the cache in one transaction.
+
+        Args:
+            items: (cache_key, summary, entry_id, model) tuples, as for
+                   save_cached_summary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            now = datetime.now().isoformat()
+            cursor.executemany(
+                "DELETE FROM entry_summary_cache "
+                "WHERE entry_id = ? AND prompt_type IS ? AND cache_key != ?",
+                [
+                    (entry_id, summary.prompt_type, cache_key)
+                    for cache_key, summary, entry_id, _ in items
+                    if entry_id
+                ],
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO entry_summary_cache (
+                    cache_key, entry_id, prompt_type, model,
+                    summary, key_topics, mood, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        cache_key,
+                        entry_id,
+                        summary.prompt_type,
+                        model,
+                        summary.summary,
+                        json.dumps(summary.key_topics),
+                        summary.mood,
+                        now,
+                    )
+                    for cache_key, summary, entry_id, model in items
+                ],
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error saving summary cache: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def get_summary_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get the size of the summary cache.
+
+        Returns:
+            Dictionary with the number of cached summaries and entries covered
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT entry_id) FROM entry_summary_cache"
+            )
+            cached_summaries, cached_entries = cursor.fetchone()
+            return {
+                "cached_summaries": cached_summaries,
+                "cached_entries": cached_entries,
+            }
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error reading summary cache stats: {e}")
+            return {"cached_summaries": 0, "cached_entries": 0}
+        finally:
+            conn.close()
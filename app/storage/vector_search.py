@@ -1,12 +1,60 @@
+import logging
 import numpy as np
 import sqlite3
 import re
 import os
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 
-from sklearn.metrics.pairwise import cosine_similarity
 from app.storage.base import BaseStorage
 
+# Longest prefix of a chat message that is embedded for conversation search
+MESSAGE_EMBEDDING_CHARS = 2000
+
+
+def rank_by_similarity(
+    query_embedding: np.ndarray, embeddings: List[bytes], limit: int
+) -> List[Tuple[int, float]]:
+    """
+    Rank stored embeddings by cosine similarity to a query.
+
+    The embeddings are scored together with one matrix product instead of
+    one similarity call per row, and only the top ``limit`` are sorted.
+
+    Args:
+        query_embedding: The embedding vector to search with
+        embeddings: Stored float32 embedding blobs
+        limit: Maximum number of matches to return
+
+    Returns:
+        List of (position in embeddings, similarity) pairs, most similar
+        first. Blobs whose dimension differs from the query are skipped.
+    """
+    query = np.asarray(query_embedding, dtype=np.float32)
+    row_bytes = query.shape[0] * 4
+    positions = [
+        position
+        for position, blob in enumerate(embeddings)
+        if blob and len(blob) == row_bytes
+    ]
+    if not positions or limit <= 0:
+        return []
+
+    matrix = np.frombuffer(
+        b"".join(embeddings[position] for position in positions), dtype=np.float32
+    ).reshape(len(positions), query.shape[0])
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    dots = matrix @ query
+    scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    if limit < len(scores):
+        top = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        top = np.arange(len(scores))
+    # Highest score first; ties keep their stored order
+    top = top[np.lexsort((top, -scores[top]))]
+    return [(positions[index], float(scores[index])) for index in top]
+
 
 class VectorStorage(BaseStorage):
     """Handles vector embeddings storage and semantic search."""
@@ -44,6 +92,37 @@ class VectorStorage(BaseStorage):
             "CREATE INDEX IF NOT EXISTS idx_vectors_has_embedding"
             " ON vectors(embedding) WHERE embedding IS NOT NULL"
         )
+
+        # Embeddings of chat messages, so past conversations can be searched
+        # semantically alongside journal chunks
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS message_vectors (
+                message_id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                model TEXT
+            )
+            """
+        )
+        # Vectors from one embedding model can't be compared with another's
+        cursor.execute("PRAGMA table_info(message_vectors)")
+        if "model" not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE message_vectors ADD COLUMN model TEXT")
+
+        # Search query expansions, reused across searches and restarts
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_expansions (
+                cache_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                model TEXT,
+                expansion TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
         conn.commit()
         conn.close()
 
@@ -280,6 +359,102 @@ class VectorStorage(BaseStorage):
         finally:
             conn.close()
 
+    def get_chunk_texts(self) -> List[str]:
+        """
+        Get the text of every indexed chunk.
+
+        Returns:
+            List of chunk texts
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT text FROM vectors")
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def get_chunk_corpus_version(self) -> str:
+        """
+        Get a marker that changes whenever chunks are added or removed.
+
+        Re-indexing an entry deletes and re-inserts its chunks, so the highest
+        rowid moves even when the chunk count stays the same.
+
+        Returns:
+            String combining the chunk count and highest rowid
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*), MAX(rowid) FROM vectors")
+            count, max_rowid = cursor.fetchone()
+            return f"{count}:{max_rowid or 0}"
+        finally:
+            conn.close()
+
+    def get_cached_expansion(self, cache_key: str) -> Optional[str]:
+        """
+        Get a previously generated query expansion.
+
+        Args:
+            cache_key: Hash of the normalized query and search model
+
+        Returns:
+            The expanded query if cached, None otherwise
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT expansion FROM query_expansions WHERE cache_key = ?",
+                (cache_key,),
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error reading query expansion cache: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def save_cached_expansion(
+        self, cache_key: str, query: str, model: str, expansion: str
+    ) -> bool:
+        """
+        Store a generated query expansion.
+
+        Args:
+            cache_key: Hash of the normalized query and search model
+            query: Normalized query that was expanded
+            model: Model that generated the expansion
+            expansion: The expanded query
+
+        Returns:
+            True if successful, False otherwise
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO query_expansions (
+                    cache_key, query, model, expansion, created_at
+                )
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (cache_key, query, model, expansion, datetime.now().isoformat()),
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error saving query expansion cache: {e}")
+            return False
+        finally:
+            conn.close()
+
     def semantic_search(
         self,
         query_embedding: np.ndarray,
@@ -358,111 +533,99 @@ class VectorStorage(BaseStorage):
                     padding = np.zeros(stored_dim - query_embedding_dim)
                     query_embedding = np.concatenate([query_embedding, padding])
 
-            # Process in batches to avoid memory issues with large datasets
-            for batch_offset in range(0, total_vectors, batch_size):
-                cursor.execute(
-                    """
-                    SELECT v.id,
-                    v.entry_id,
-                    v.text,
-                    v.embedding,
-                    e.title,
-                    e.file_path,
-                    e.created_at
-                    FROM vectors v
-                    JOIN entries e ON v.entry_id = e.id
-                    WHERE v.embedding IS NOT NULL
-                    LIMIT ? OFFSET ?
-                    """,
-                    (batch_size, batch_offset),
+            # Score in batches to bound memory, keeping only the best
+            # offset + limit rows of each batch as candidates
+            wanted = offset + limit
+            cursor.execute(
+                """
+                SELECT v.id,
+                v.entry_id,
+                v.text,
+                v.embedding,
+                e.title,
+                e.file_path,
+                e.created_at
+                FROM vectors v
+                JOIN entries e ON v.entry_id = e.id
+                WHERE v.embedding IS NOT NULL
+                """
+            )
+            candidates = []
+            scanned = 0
+            skipped = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                embeddings = [row[3] for row in rows]
+                skipped += sum(
+                    1 for blob in embeddings if len(blob) != len(query_embedding) * 4
                 )
+                for position, similarity in rank_by_similarity(
+                    query_embedding, embeddings, wanted
+                ):
+                    candidates.append((similarity, scanned + position, rows[position]))
+                scanned += len(rows)
 
-                batch_results = []
-                for row in cursor.fetchall():
-                    (
-                        vector_id,
-                        entry_id,
-                        text,
-                        embedding_bytes,
-                        title,
-                        file_path,
-                        created_at,
-                    ) = row
-                    if embedding_bytes:
-                        try:
-                            # Convert bytes back to numpy array
-                            db_embedding = np.frombuffer(
-                                embedding_bytes, dtype=np.float32
-                            )
-
-                            # Ensure dimension match with query
-                            if len(db_embedding) != len(query_embedding):
-                                logger.warning(
-                                    f"Skipping vector {vector_id}: dimension mismatch "
-                                    f"({len(db_embedding)} vs {len(query_embedding)})"
-                                )
-                                continue
-
-                            # Calculate cosine similarity
-                            similarity = float(
-                                cosine_similarity([query_embedding], [db_embedding])[0][
-                                    0
-                                ]
-                            )
-
-                            # Read content from file
-                            content = ""
-                            if file_path and os.path.exists(file_path):
-                                try:
-                                    with open(file_path, "r") as f:
-                                        content = f.read()
-                                        # Remove title header if present
-                                        if content.startswith(f"# {title}"):
-                                            header_len = len(f"# {title}")
-                                            content = content[header_len:].strip()
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Error reading file {file_path}: {e}"
-                                    )
-                                    content = ""
-
-                            # Create entry object for the result
-                            from app.models import JournalEntry
-
-                            entry = JournalEntry(
-                                id=entry_id,
-                                title=title,
-                                content=content,
-                                created_at=created_at,
-                            )
-
-                            batch_results.append(
-                                {
-                                    "vector_id": vector_id,
-                                    "entry_id": entry_id,
-                                    "entry": entry,
-                                    "text": text,
-                                    "similarity": similarity,
-                                }
-                            )
-                        except Exception as e:
-                            logger.warning(f"Error processing vector {vector_id}: {e}")
-
-                all_results.extend(batch_results)
-
-            # Sort all results by similarity
-            all_results.sort(key=lambda x: x["similarity"], reverse=True)
+            if skipped:
+                logger.warning(
+                    f"Skipped {skipped} vectors with a dimension other than "
+                    f"{len(query_embedding)}"
+                )
+
+            candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+            # Entry content is only read for the page being returned
+            from app.models import JournalEntry
+
+            paginated_results = []
+            for similarity, _, row in candidates[offset:wanted]:
+                (
+                    vector_id,
+                    entry_id,
+                    text,
+                    _,
+                    title,
+                    file_path,
+                    created_at,
+                ) = row
+                content = ""
+                if file_path and os.path.exists(file_path):
+                    try:
+                        with open(file_path, "r") as f:
+                            content = f.read()
+                            # Remove title header if present
+                            if content.startswith(f"# {title}"):
+                                header_len = len(f"# {title}")
+                                content = content[header_len:].strip()
+                    except Exception as e:
+                        logger.warning(f"Error reading file {file_path}: {e}")
+                        content = ""
+
+                entry = JournalEntry(
+                    id=entry_id,
+                    title=title,
+                    content=content,
+                    created_at=created_at,
+                )
+                paginated_results.append(
+                    {
+                        "vector_id": vector_id,
+                        "entry_id": entry_id,
+                        "entry": entry,
+                        "text": text,
+                        "similarity": similarity,
+                    }
+                )
 
             # Log top matches for debugging
-            if all_results:
-                top_match = all_results[0]
+            if paginated_results and offset == 0:
+                top_match = paginated_results[0]
                 logger.debug(
                     f"Top match: entry_id={top_match['entry_id']}, "
                     f"similarity={top_match['similarity']:.4f}"
                 )
 
-            # Apply pagination
-            paginated_results = all_results[offset : offset + limit]  # noqa: E203
             logger.info(
                 f"Returning {len(paginated_results)} results from semantic search"
             )
@@ -474,3 +637,224 @@ class VectorStorage(BaseStorage):
         finally:
             if "conn" in locals():
                 conn.close()
+
+    def _has_chat_tables(self, cursor) -> bool:
+        """Check whether the chat tables have been created in this database."""
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master "
+            "WHERE type = 'table' AND name IN ('chat_messages', 'chat_sessions')"
+        )
+        return cursor.fetchone()[0] == 2
+
+    def get_messages_without_embeddings(
+        self, limit: int = 100, model: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get chat messages whose embedding is missing or out of date.
+
+        An embedding is out of date when the message text changed or, if
+        ``model`` is given, when another model produced it. Vectors of
+        messages that have since been deleted, or whose session was deleted
+        or archived, are removed on the way.
+
+        Args:
+            limit: Maximum number of messages to retrieve
+            model: Embedding model the vectors should come from
+
+        Returns:
+            List of dictionaries with message_id, session_id and the text to
+            embed
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            if not self._has_chat_tables(cursor):
+                return []
+
+            cursor.execute(
+                """
+                DELETE FROM message_vectors WHERE message_id NOT IN (
+                    SELECT cm.id FROM chat_messages cm
+                    JOIN chat_sessions s ON s.id = cm.session_id
+                )
+                """
+            )
+            conn.commit()
+
+            cursor.execute(
+                """
+                SELECT cm.id, cm.session_id, substr(cm.content, 1, ?)
+                FROM chat_messages cm
+                JOIN chat_sessions s ON s.id = cm.session_id
+                LEFT JOIN message_vectors mv ON mv.message_id = cm.id
+                WHERE cm.status = 'complete'
+                AND cm.role IN ('user', 'assistant')
+                AND trim(cm.content) != ''
+                AND (
+                    mv.message_id IS NULL
+                    OR mv.text != substr(cm.content, 1, ?)
+                    OR (? IS NOT NULL AND mv.model IS NOT ?)
+                )
+                ORDER BY cm.created_at DESC
+                LIMIT ?
+                """,
+                (
+                    MESSAGE_EMBEDDING_CHARS,
+                    MESSAGE_EMBEDDING_CHARS,
+                    model,
+                    model,
+                    limit,
+                ),
+            )
+            return [
+                {"message_id": row[0], "session_id": row[1], "text": row[2]}
+                for row in cursor.fetchall()
+            ]
+        finally:
+            conn.close()
+
+    def save_message_embeddings(self, embeddings: List[Dict[str, Any]]) -> bool:
+        """
+        Store embeddings for chat messages.
+
+        Args:
+            embeddings: Dictionaries with message_id, session_id, text,
+                embedding (list or numpy array) and optionally the model
+                that produced it
+
+        Returns:
+            True if successful, False otherwise
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO message_vectors (
+                    message_id, session_id, text, embedding, model
+                )
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        item["message_id"],
+                        item["session_id"],
+                        item["text"],
+                        sqlite3.Binary(
+                            np.asarray(item["embedding"], dtype=np.float32).tobytes()
+                        ),
+                        item.get("model"),
+                    )
+                    for item in embeddings
+                ],
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error saving message embeddings: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def search_message_embeddings(
+        self,
+        query_embedding: np.ndarray,
+        limit: int = 5,
+        exclude_session_id: Optional[str] = None,
+        min_similarity: float = 0.0,
+        batch_size: int = 1000,
+        model: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find chat messages similar to a query embedding.
+
+        Uses the same scoring as semantic_search, so no embeddings are
+        generated at query time beyond the query's own.
+
+        Args:
+            query_embedding: The embedding vector to search with
+            limit: Maximum number of messages to return
+            exclude_session_id: Optional session to leave out, usually the
+                one being answered
+            min_similarity: Minimum cosine similarity of returned messages
+            batch_size: Number of vectors scored at a time
+            model: If given, only vectors from this embedding model are
+                scored; others wait to be embedded again
+
+        Returns:
+            List of dictionaries with message_id, session_id, session_title,
+            role, content, created_at and similarity, most similar first
+        """
+        logger = logging.getLogger(__name__)
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            if not self._has_chat_tables(cursor):
+                return []
+
+            cursor.execute(
+                """
+                SELECT mv.message_id, mv.embedding
+                FROM message_vectors mv
+                JOIN chat_messages cm ON cm.id = mv.message_id
+                WHERE mv.session_id != ?
+                AND (? IS NULL OR mv.model = ?)
+                """,
+                (exclude_session_id or "", model, model),
+            )
+            candidates = []
+            scanned = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for position, similarity in rank_by_similarity(
+                    query_embedding, [row[1] for row in rows], limit
+                ):
+                    if similarity >= min_similarity:
+                        candidates.append(
+                            (similarity, scanned + position, rows[position][0])
+                        )
+                scanned += len(rows)
+
+            candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+            candidates = candidates[:limit]
+            if not candidates:
+                return []
+
+            placeholders = ", ".join("?" for _ in candidates)
+            cursor.execute(
+                f"""
+                SELECT cm.id, cm.session_id, s.title, cm.role, cm.content,
+                cm.created_at
+                FROM chat_messages cm
+                JOIN chat_sessions s ON s.id = cm.session_id
+                WHERE cm.id IN ({placeholders})
+                """,
+                [message_id for _, _, message_id in candidates],
+            )
+            messages = {row[0]: row for row in cursor.fetchall()}
+
+            results = []
+            for similarity, _, message_id in candidates:
+                row = messages.get(message_id)
+                if row:
+                    results.append(
+                        {
+                            "message_id": row[0],
+                            "session_id": row[1],
+                            "session_title": row[2],
+                            "role": row[3],
+                            "content": row[4],
+                            "created_at": row[5],
+                            "similarity": similarity,
+                        }
+                    )
+            return results
+        except Exception as e:
+            logger.error(f"Error searching message embeddings: {e}")
+            return []
+        finally:
+            conn.close()
@@ -0,0 +1,311 @@
+"""
+Token counting and context packing for chat prompts.
+
+Prompts are assembled from pieces of different value: the system prompt, the
+conversation summary, retrieved references and recent turns. ContextPacker
+fills the model's context window with them in that priority order, so a
+prompt never overflows and the least valuable pieces are the ones dropped.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+
+    tokenizers_available = True
+except ImportError:
+    tokenizers_available = False
+
+logger = logging.getLogger(__name__)
+
+# Tokens a chat template adds around each message (role header, separators)
+MESSAGE_OVERHEAD = 4
+
+# Fewest tokens worth keeping when a piece has to be truncated to fit
+MIN_TRUNCATED_TOKENS = 32
+
+# Words, digit runs and individual symbols, roughly as BPE pre-tokenizers
+# split text before merging
+_PIECE_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+
+class Tokenizer(ABC):
+    """Interface for counting and truncating text in tokens."""
+
+    name = "base"
+
+    @property
+    def id(self) -> str:
+        """Identifies the counts this tokenizer produces, for stored counts."""
+        return self.name
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Count the tokens in text."""
+        pass
+
+    @abstractmethod
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of text that fits in max_tokens."""
+        pass
+
+
+class EstimatingTokenizer(Tokenizer):
+    """
+    Calibrated token estimator that needs no vocabulary.
+
+    Counts pre-tokenizer pieces rather than characters: common English words
+    are a single token, longer words cost one token per chars_per_token
+    characters, and digits and non-Latin text are counted conservatively.
+    Over-estimating slightly is deliberate, since it keeps packed prompts
+    inside the window when the real tokenizer is unavailable.
+    """
+
+    name = "estimate"
+
+    def __init__(self, chars_per_token: float = 6.0):
+        """
+        Initialize the estimator.
+
+        Args:
+            chars_per_token: Characters per token for words that are longer
+                             than a single token
+        """
+        self.chars_per_token = chars_per_token
+
+    @property
+    def id(self) -> str:
+        """The estimator and its calibration."""
+        return f"{self.name}:{self.chars_per_token:g}"
+
+    def _piece_tokens(self, piece: str) -> int:
+        """Estimate the tokens in a single pre-tokenized piece."""
+        if piece.isdigit():
+            return math.ceil(len(piece) / 3)
+        if piece.isascii():
+            return max(1, math.ceil(len(piece) / self.chars_per_token))
+        # Accented and non-Latin scripts split into far more tokens
+        return max(1, math.ceil(len(piece) / 2))
+
+    def count(self, text: str) -> int:
+        """Estimate the tokens in text."""
+        if not text:
+            return 0
+        return sum(
+            self._piece_tokens(match.group()) for match in _PIECE_PATTERN.finditer(text)
+        )
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text at the first piece that would exceed max_tokens."""
+        used = 0
+        for match in _PIECE_PATTERN.finditer(text):
+            used += self._piece_tokens(match.group())
+            if used > max_tokens:
+                return text[: match.start()].rstrip()
+        return text
+
+
+class BPETokenizer(Tokenizer):
+    """Exact token counts from a local tokenizer.json vocabulary."""
+
+    name = "bpe"
+
+    def __init__(self, path: str):
+        """
+        Load a tokenizer vocabulary.
+
+        Args:
+            path: Path to a Hugging Face tokenizer.json file
+
+        Raises:
+            ImportError: If the tokenizers package is not installed
+        """
+        if not tokenizers_available:
+            raise ImportError("The tokenizers package is required for BPE counts")
+        self.path = path
+        self._tokenizer = HFTokenizer.from_file(path)
+        with open(path, "rb") as f:
+            self._digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    @property
+    def id(self) -> str:
+        """The vocabulary file's content hash, so edits in place are noticed."""
+        return f"{self.name}:{self._digest}"
+
+    def count(self, text: str) -> int:
+        """Count the tokens in text."""
+        if not text:
+            return 0
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text after its first max_tokens tokens."""
+        encoding = self._tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+        return text[: encoding.offsets[max_tokens - 1][1]]
+
+
+@lru_cache(maxsize=4)
+def get_tokenizer(path: Optional[str] = None) -> Tokenizer:
+    """
+    Get the tokenizer for a vocabulary file, falling back to the estimator.
+
+    Args:
+        path: Optional path to a tokenizer.json file
+
+    Returns:
+        A BPE tokenizer when the file can be loaded, otherwise an estimator
+    """
+    if path:
+        if not os.path.isfile(path):
+            logger.warning(f"Tokenizer file {path} not found, estimating tokens")
+        elif not tokenizers_available:
+            logger.warning("tokenizers package not installed, estimating tokens")
+        else:
+            try:
+                return BPETokenizer(path)
+            except Exception as e:
+                logger.warning(f"Failed to load tokenizer {path}: {e}")
+    return EstimatingTokenizer()
+
+
+def prompt_token_budget(max_context_tokens: int, max_response_tokens: int) -> int:
+    """
+    Get the tokens available for a prompt.
+
+    The response is generated into the same window, so its tokens are
+    reserved, but never more than half of the window.
+
+    Args:
+        max_context_tokens: Size of the model's context window
+        max_response_tokens: Maximum tokens in the response
+
+    Returns:
+        Token budget for the prompt
+    """
+    return max_context_tokens - min(max_response_tokens, max_context_tokens // 2)
+
+
+class ContextPacker:
+    """
+    Packs prompt pieces into a token budget by priority.
+
+    The system prompt and the current user message are always included.
+    The remaining budget goes to the conversation summary, then to reference
+    and tool context in the order given, then to recent turns from newest to
+    oldest. A summary or reference that doesn't fit is truncated if enough
+    room is left; turns are only ever dropped whole, oldest first.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, budget: int):
+        """
+        Initialize the packer.
+
+        Args:
+            tokenizer: Tokenizer used to measure messages
+            budget: Maximum tokens for the packed prompt
+        """
+        self.tokenizer = tokenizer
+        self.budget = budget
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        """Count the tokens a message occupies in the prompt."""
+        return self.tokenizer.count(message.get("content", "")) + MESSAGE_OVERHEAD
+
+    def count_conversation(self, messages: List[Dict[str, str]]) -> int:
+        """Count the tokens a list of messages occupies in the prompt."""
+        return sum(self.count_message(message) for message in messages)
+
+    def _fit(self, message: Dict[str, str], remaining: int) -> Optional[Dict]:
+        """Return the message, truncated if needed, or None if it can't fit."""
+        if self.count_message(message) <= remaining:
+            return message
+        room = remaining - MESSAGE_OVERHEAD
+        if room < MIN_TRUNCATED_TOKENS:
+            return None
+        content = self.tokenizer.truncate(message["content"], room)
+        return {**message, "content": content}
+
+    def pack(
+        self,
+        system: Dict[str, str],
+        query: Optional[Dict[str, str]] = None,
+        summary: Optional[Dict[str, str]] = None,
+        references: Optional[List[Dict[str, str]]] = None,
+        turns: Optional[List[Dict[str, str]]] = None,
+        turn_tokens: Optional[List[int]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Assemble a prompt that fits the budget.
+
+        Args:
+            system: System prompt message
+            query: Current user message, placed last
+            summary: Optional summary of earlier conversation
+            references: Optional reference and tool context messages, most
+                        important first
+            turns: Conversation turns, oldest first
+            turn_tokens: Optional known content token counts for turns
+
+        Returns:
+            Messages in prompt order: system, summary, turns, references, query
+        """
+        references = references or []
+        turns = turns or []
+        pinned = [system] + ([query] if query else [])
+        remaining = self.budget - self.count_conversation(pinned)
+
+        packed_summary = None
+        if summary and remaining > 0:
+            packed_summary = self._fit(summary, remaining)
+            if packed_summary:
+                remaining -= self.count_message(packed_summary)
+
+        packed_references = []
+        for reference in references:
+            if remaining <= 0:
+                break
+            packed = self._fit(reference, remaining)
+            if not packed:
+                break
+            packed_references.append(packed)
+            remaining -= self.count_message(packed)
+
+        packed_turns = []
+        for index in range(len(turns) - 1, -1, -1):
+            if turn_tokens is not None and turn_tokens[index] is not None:
+                cost = turn_tokens[index] + MESSAGE_OVERHEAD
+            else:
+                cost = self.count_message(turns[index])
+            if cost > remaining:
+                break
+            packed_turns.append(turns[index])
+            remaining -= cost
+        packed_turns.reverse()
+
+        dropped = len(turns) - len(packed_turns)
+        if dropped or len(packed_references) < len(references):
+            logger.debug(
+                f"Packed prompt into {self.budget - remaining}/{self.budget} tokens, "
+                f"dropping {dropped} turns and "
+                f"{len(references) - len(packed_references)} references"
+            )
+
+        conversation = [system]
+        if packed_summary:
+            conversation.append(packed_summary)
+        conversation.extend(packed_turns)
+        conversation.extend(packed_references)
+        if query:
+            conversation.append(query)
+        return conversation
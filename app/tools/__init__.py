@@ -10,6 +10,7 @@ from .base import BaseTool, ToolResult, ToolError
 from .registry import ToolRegistry
 from .journal_search import JournalSearchTool
 from .web_search import WebSearchTool
+from .router import ToolRouter, RoutingStats, routing_stats
 
 __all__ = [
     "BaseTool",
@@ -18,4 +19,7 @@ __all__ = [
     "ToolRegistry",
     "JournalSearchTool",
     "WebSearchTool",
+    "ToolRouter",
+    "RoutingStats",
+    "routing_stats",
 ]
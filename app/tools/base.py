@@ -54,6 +54,9 @@ class ToolCall:
 class BaseTool(ABC):
     """Base class for all tools in the framework."""
 
+    # Confidence at which should_trigger considers the tool relevant
+    trigger_threshold: float = 0.5
+
     def __init__(self, name: str, description: str, version: str = "1.0.0"):
         """
         Initialize the tool.
@@ -150,6 +153,25 @@ class BaseTool(ABC):
         # Default implementation - subclasses should override with intelligent logic
         return False
 
+    def trigger_confidence(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> float:
+        """
+        Score how confident the tool's local rules are that it is needed.
+
+        Tools with pattern-based triggering should override this and derive
+        should_trigger from it, so the score can be used by the tool router to
+        decide unambiguous messages without an LLM call.
+
+        Args:
+            message: User message to analyze
+            context: Optional context (conversation history, session info, etc.)
+
+        Returns:
+            Confidence score; 0.0 means clearly not needed
+        """
+        return 1.0 if self.should_trigger(message, context) else 0.0
+
     def get_trigger_keywords(self) -> List[str]:
         """
         Get a list of keywords that might trigger this tool.
@@ -2,8 +2,9 @@
 Journal search tool for intelligent entry retrieval.
 """
 
+import asyncio
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -17,6 +18,13 @@ logger = logging.getLogger(__name__)
 class JournalSearchTool(BaseTool):
     """Tool for searching journal entries with intelligent triggering."""
 
+    # Earlier chat messages returned alongside journal entries
+    CONVERSATION_LIMIT = 3
+
+    # Seconds the conversation search may take before it is dropped from
+    # the result
+    CONVERSATION_SEARCH_TIMEOUT = 2.0
+
     def __init__(self, base_dir: str = "./journal_data", llm_service=None):
         """
         Initialize the journal search tool.
@@ -146,6 +154,21 @@ class JournalSearchTool(BaseTool):
         Returns:
             True if journal search should be triggered
         """
+        return self.trigger_confidence(message, context) >= self.trigger_threshold
+
+    def trigger_confidence(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> float:
+        """
+        Score how strongly the message calls for a journal search.
+
+        Args:
+            message: User message to analyze
+            context: Optional context (conversation history, etc.)
+
+        Returns:
+            Confidence score from keyword, date and question patterns
+        """
         message_lower = message.lower()
 
         # Strong indicators for journal search
@@ -195,17 +218,14 @@ class JournalSearchTool(BaseTool):
             ):
                 confidence += 0.2
 
-        # Threshold for triggering search
-        trigger_threshold = 0.5
-
         self.logger.debug(
             f"Journal search trigger analysis for '{message}': "
             f"keywords={keyword_score}, date={has_date_pattern}, "
             f"question={has_question_pattern}, confidence={confidence:.2f}, "
-            f"trigger={confidence >= trigger_threshold}"
+            f"trigger={confidence >= self.trigger_threshold}"
         )
 
-        return confidence >= trigger_threshold
+        return confidence
 
     def get_trigger_keywords(self) -> List[str]:
         """Get keywords that might trigger journal search."""
@@ -235,57 +255,35 @@ class JournalSearchTool(BaseTool):
                 f"Executing journal search: query='{query}', limit={limit}, type={search_type}"
             )
 
-            # Perform the search based on type
-            results = []
-
-            if search_type in ["semantic", "both"]:
-                # Semantic search using vector embeddings
-                try:
-                    semantic_results = await self._semantic_search(
-                        query, limit, date_filter, tags
-                    )
-                    results.extend(semantic_results)
-                    self.logger.debug(
-                        f"Semantic search returned {len(semantic_results)} results"
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Semantic search failed: {e}")
-                    if search_type == "semantic":
-                        # Fall back to text search if semantic-only search fails
-                        search_type = "text"
-
-            if search_type in ["text", "both"] and (
-                not results or search_type == "text"
+            # Related conversations are searched alongside the journal
+            journal_search = self._search_journal(
+                query, limit, date_filter, tags, search_type
+            )
+            if search_type != "text" and (context or {}).get(
+                "include_conversations", True
             ):
-                # Text-based search
-                try:
-                    text_results = await self._text_search(
-                        query, limit, date_filter, tags
-                    )
-                    if search_type == "text":
-                        results = text_results
-                    else:
-                        # Merge and deduplicate results
-                        results = self._merge_results(results, text_results, limit)
-                    self.logger.debug(
-                        f"Text search returned {len(text_results)} results"
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Text search failed: {e}")
-                    if not results:
-                        raise ToolError(f"Both search methods failed: {e}", self.name)
+                (results, search_type), conversations = await asyncio.gather(
+                    journal_search, self._search_conversations(query, context)
+                )
+            else:
+                results, search_type = await journal_search
+                conversations = []
 
             # Format results for LLM consumption
             formatted_results = self._format_results(results)
 
+            data = {
+                "results": formatted_results,
+                "query": query,
+                "total_found": len(results),
+                "search_type": search_type,
+            }
+            if conversations:
+                data["conversations"] = conversations
+
             return ToolResult(
                 success=True,
-                data={
-                    "results": formatted_results,
-                    "query": query,
-                    "total_found": len(results),
-                    "search_type": search_type,
-                },
+                data=data,
                 metadata={
                     "tool_name": self.name,
                     "search_parameters": parameters,
@@ -299,6 +297,65 @@ class JournalSearchTool(BaseTool):
             self.logger.error(f"Journal search execution failed: {e}")
             raise ToolError(f"Search execution failed: {e}", self.name)
 
+    async def _search_journal(
+        self,
+        query: str,
+        limit: int,
+        date_filter: Optional[Dict],
+        tags: Optional[List[str]],
+        search_type: str,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Search journal entries semantically, by text, or both.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            date_filter: Optional date range filter
+            tags: Optional tags to filter by
+            search_type: "semantic", "text" or "both"
+
+        Returns:
+            Tuple of (results, search type actually used)
+
+        Raises:
+            ToolError: If every search method failed
+        """
+        results = []
+
+        if search_type in ["semantic", "both"]:
+            # Semantic search using vector embeddings
+            try:
+                semantic_results = await self._semantic_search(
+                    query, limit, date_filter, tags
+                )
+                results.extend(semantic_results)
+                self.logger.debug(
+                    f"Semantic search returned {len(semantic_results)} results"
+                )
+            except Exception as e:
+                self.logger.warning(f"Semantic search failed: {e}")
+                if search_type == "semantic":
+                    # Fall back to text search if semantic-only search fails
+                    search_type = "text"
+
+        if search_type in ["text", "both"] and (not results or search_type == "text"):
+            # Text-based search
+            try:
+                text_results = await self._text_search(query, limit, date_filter, tags)
+                if search_type == "text":
+                    results = text_results
+                else:
+                    # Merge and deduplicate results
+                    results = self._merge_results(results, text_results, limit)
+                self.logger.debug(f"Text search returned {len(text_results)} results")
+            except Exception as e:
+                self.logger.warning(f"Text search failed: {e}")
+                if not results:
+                    raise ToolError(f"Both search methods failed: {e}", self.name)
+
+        return results, search_type
+
     async def _semantic_search(
         self,
         query: str,
@@ -309,8 +366,12 @@ class JournalSearchTool(BaseTool):
         """Perform semantic search using vector embeddings."""
         # Use the LLM service's semantic search if available
         if self.llm_service:
-            search_results = self.llm_service.semantic_search(
-                query=query, limit=limit, date_filter=date_filter
+            # Off the event loop, so a concurrent conversation search can run
+            search_results = await asyncio.to_thread(
+                self.llm_service.semantic_search,
+                query=query,
+                limit=limit,
+                date_filter=date_filter,
             )
         else:
             # Fallback to direct vector search (requires pre-computed embeddings)
@@ -342,6 +403,63 @@ class JournalSearchTool(BaseTool):
 
         return results[:limit]
 
+    async def _search_conversations(
+        self, query: str, context: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Find earlier chat messages related to the query.
+
+        The search runs off the event loop and is abandoned after
+        CONVERSATION_SEARCH_TIMEOUT seconds, so it can't hold up the
+        journal results.
+
+        Args:
+            query: Search query
+            context: Optional context; its session_id is left out of the search
+
+        Returns:
+            Formatted matching messages, or an empty list if the search
+            failed or ran out of time
+        """
+        if not self.llm_service:
+            return []
+
+        try:
+            messages = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.llm_service.search_chat_history,
+                    query,
+                    limit=self.CONVERSATION_LIMIT,
+                    exclude_session_id=(context or {}).get("session_id"),
+                ),
+                timeout=self.CONVERSATION_SEARCH_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Conversation search timed out after "
+                f"{self.CONVERSATION_SEARCH_TIMEOUT}s"
+            )
+            return []
+        except Exception as e:
+            self.logger.warning(f"Conversation search failed: {e}")
+            return []
+
+        return [
+            {
+                "session_id": message["session_id"],
+                "session_title": message.get("session_title") or "Untitled",
+                "role": message["role"],
+                "content_preview": message["content"][:300] + "..."
+                if len(message["content"]) > 300
+                else message["content"],
+                "date": message["created_at"][:10]
+                if message.get("created_at")
+                else "Unknown",
+                "relevance": round(message.get("similarity", 0.0), 2),
+            }
+            for message in messages
+        ]
+
     async def _text_search(
         self,
         query: str,
@@ -150,6 +150,30 @@ class ToolRegistry:
         # Sort by relevance (can be enhanced with scoring in the future)
         return relevant_tools
 
+    def score_tools(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, float]:
+        """
+        Score every enabled tool's local trigger confidence for a message.
+
+        Args:
+            message: User message to analyze
+            context: Optional context information
+
+        Returns:
+            Dictionary mapping tool names to confidence scores
+        """
+        scores = {}
+
+        for tool in self.list_tools(enabled_only=True):
+            try:
+                scores[tool.name] = tool.trigger_confidence(message, context)
+            except Exception as e:
+                logger.warning(f"Error scoring tool {tool.name}: {e}")
+                scores[tool.name] = 0.0
+
+        return scores
+
     async def execute_tool(
         self,
         tool_name: str,
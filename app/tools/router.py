@@ -0,0 +1,225 @@
+"""
+Tiered tool routing for chat messages.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from .registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingStats:
+    """
+    Thread-safe counters for how often each routing tier decides.
+
+    Also counts speculative journal searches started during LLM routing:
+    a hit is one whose result was used, a miss one that was discarded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"rules": 0, "llm": 0}
+        self._speculation = {"hits": 0, "misses": 0}
+
+    def record(self, tier: str) -> None:
+        """
+        Count one routing decision.
+
+        Args:
+            tier: The tier that made the decision ("rules" or "llm")
+        """
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+
+    def record_speculation(self, used: bool) -> None:
+        """
+        Count one speculative tool execution.
+
+        Args:
+            used: Whether its result was used in place of a new execution
+        """
+        with self._lock:
+            self._speculation["hits" if used else "misses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the routing counters.
+
+        Returns:
+            Dictionary with per-tier counts, total, rule-tier ratio and
+            speculation hits, misses and hit ratio
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            speculation = dict(self._speculation)
+
+        total = sum(counts.values())
+        speculated = speculation["hits"] + speculation["misses"]
+        speculation["hit_ratio"] = (
+            speculation["hits"] / speculated if speculated else 0.0
+        )
+        return {
+            "tiers": counts,
+            "total": total,
+            "rules_ratio": counts.get("rules", 0) / total if total else 0.0,
+            "speculation": speculation,
+        }
+
+    def reset(self) -> None:
+        """Reset all counters to zero."""
+        with self._lock:
+            self._counts = {"rules": 0, "llm": 0}
+            self._speculation = {"hits": 0, "misses": 0}
+
+
+# Process-wide counters; chat services are created per request
+routing_stats = RoutingStats()
+
+
+class ToolRouter:
+    """
+    Decide which tools to use for a message.
+
+    The cheap tier scores every enabled tool with its local trigger rules.
+    When each score is either confidently high (at or above the threshold) or
+    confidently low (at or below LOW_CONFIDENCE_CEILING) the decision is made
+    locally. Any score in between makes the message ambiguous, and the
+    decision falls through to LLMService.analyze_message_for_tools.
+    """
+
+    # Scores at or below this are treated as a confident "not needed"
+    LOW_CONFIDENCE_CEILING = 0.2
+
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        llm_service,
+        stats: Optional[RoutingStats] = None,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            tool_registry: Registry holding the available tools
+            llm_service: LLM service used for ambiguous messages
+            stats: Optional counters; defaults to the process-wide counters
+        """
+        self.tool_registry = tool_registry
+        self.llm_service = llm_service
+        self.stats = stats or routing_stats
+
+    def route(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        threshold: float = 0.8,
+        use_rules: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Produce a tool analysis for a message.
+
+        Args:
+            message: User message to route
+            context: Optional context passed to the tool scorers and the LLM
+            threshold: Rule confidence at or above which a tool is selected
+                without consulting the LLM
+            use_rules: Whether the rule tier is enabled
+
+        Returns:
+            Analysis in the shape of LLMService.analyze_message_for_tools,
+            with an added "routing_tier" key
+        """
+        if use_rules:
+            analysis = self.route_with_rules(message, context, threshold)
+            if analysis is not None:
+                return analysis
+
+        return self.route_with_llm(message, context)
+
+    def route_with_rules(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        threshold: float = 0.8,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Route a message with the rule tier only.
+
+        Args:
+            message: User message to route
+            context: Optional context passed to the tool scorers
+            threshold: Rule confidence at or above which a tool is selected
+
+        Returns:
+            Tool analysis, or None if the message is ambiguous
+        """
+        analysis = self._route_with_rules(message, context, threshold)
+        if analysis is not None:
+            self.stats.record("rules")
+        return analysis
+
+    def route_with_llm(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Route a message with the LLM tool analysis.
+
+        Args:
+            message: User message to route
+            context: Optional context passed to the LLM
+
+        Returns:
+            Tool analysis from LLMService.analyze_message_for_tools
+        """
+        analysis = self.llm_service.analyze_message_for_tools(message, context)
+        analysis["routing_tier"] = "llm"
+        self.stats.record("llm")
+        return analysis
+
+    def _route_with_rules(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]],
+        threshold: float,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Try to route a message using only the local tool scorers.
+
+        Args:
+            message: User message to route
+            context: Optional context passed to the tool scorers
+            threshold: Rule confidence at or above which a tool is selected
+
+        Returns:
+            Tool analysis, or None if any tool's score is ambiguous
+        """
+        scores = self.tool_registry.score_tools(message, context)
+
+        recommended = []
+        for tool_name, score in scores.items():
+            if score >= threshold:
+                recommended.append(
+                    {
+                        "tool_name": tool_name,
+                        "confidence": min(score, 1.0),
+                        "reason": f"Rule-based trigger score {score:.2f}",
+                        "suggested_query": message,
+                    }
+                )
+            elif score > self.LOW_CONFIDENCE_CEILING:
+                logger.debug(
+                    f"Ambiguous rule score for {tool_name} ({score:.2f}); "
+                    "deferring to LLM tool analysis"
+                )
+                return None
+
+        recommended.sort(key=lambda rec: rec["confidence"], reverse=True)
+        return {
+            "should_use_tools": bool(recommended),
+            "recommended_tools": recommended,
+            "analysis": f"Rule-based routing: {scores}",
+            "routing_tier": "rules",
+        }
@@ -163,19 +163,34 @@ class WebSearchTool(BaseTool):
         Returns:
             True if web search should be triggered
         """
+        return self.trigger_confidence(message, context) >= self.trigger_threshold
+
+    def trigger_confidence(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> float:
+        """
+        Score how strongly the message calls for a web search.
+
+        Args:
+            message: User message to analyze
+            context: Optional context (conversation history, etc.)
+
+        Returns:
+            Confidence score; 0.0 when web search is unavailable or disabled
+        """
         if not ddgs_available:
             self.logger.warning("DuckDuckGo search not available - skipping web search")
-            return False
+            return 0.0
 
         # Check if web search is enabled
         if self.config_storage:
             try:
                 config = self.config_storage.get_web_search_config()
                 if not config or not config.enabled:
-                    return False
+                    return 0.0
             except Exception as e:
                 self.logger.debug(f"Could not retrieve web search config: {e}")
-                return False
+                return 0.0
 
         message_lower = message.lower()
 
@@ -190,7 +205,7 @@ class WebSearchTool(BaseTool):
             self.logger.debug(
                 f"High internal search score ({internal_score}) - skipping web search"
             )
-            return False
+            return 0.0
 
         # Calculate web search confidence
         confidence = 0
@@ -241,17 +256,14 @@ class WebSearchTool(BaseTool):
             ):
                 confidence -= 0.2
 
-        # Threshold for triggering web search
-        trigger_threshold = 0.5
-
         self.logger.debug(
             f"Web search trigger analysis for '{message}': "
             f"keywords={keyword_score}, patterns={pattern_matches}, "
             f"internal={internal_score}, confidence={confidence:.2f}, "
-            f"trigger={confidence >= trigger_threshold}"
+            f"trigger={confidence >= self.trigger_threshold}"
         )
 
-        return confidence >= trigger_threshold
+        return max(confidence, 0.0)
 
     def get_trigger_keywords(self) -> List[str]:
         """Get keywords that might trigger web search."""
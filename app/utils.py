@@ -4,6 +4,7 @@ Utility functions shared across the application.
 import logging
 from app.storage import StorageManager
 from app.llm_service import LLMService
+from app.batch_jobs import BatchJobRunner
 from app.migrate_db import migrate_database
 
 # Configure logging
@@ -12,6 +13,7 @@ logger = logging.getLogger(__name__)
 # Create singleton storage manager and LLM service
 storage_manager = None
 llm_service = None
+batch_job_runner = None
 
 
 def initialize_database():
@@ -44,4 +46,14 @@ def get_llm_service() -> LLMService:
             initialize_database()
             storage_manager = StorageManager()
         llm_service = LLMService(storage_manager=storage_manager)
+        # Load the model list without holding up the first request
+        llm_service.warm_up()
     return llm_service
+
+
+def get_batch_job_runner() -> BatchJobRunner:
+    """Dependency to get the batch analysis job runner instance"""
+    global batch_job_runner
+    if batch_job_runner is None:
+        batch_job_runner = BatchJobRunner(get_storage(), get_llm_service())
+    return batch_job_runner
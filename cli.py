@@ -15,6 +15,7 @@ from app.models import JournalEntry
 from app.storage import StorageManager
 from app.llm_service import LLMService
 from app.import_service import ImportService
+from app.bulk_summarize import BulkSummarizer, select_entries
 
 
 def create_entry(
@@ -300,6 +301,62 @@ def summarize_entry(
         print(f"Error generating summary: {str(e)}")
 
 
+def summarize_all(
+    storage: StorageManager,
+    llm_service: LLMService,
+    folder: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    prompt_type: str = "default",
+    workers: Optional[int] = None,
+) -> None:
+    """Summarize every matching entry that lacks a fresh cached summary."""
+    try:
+        date_from = datetime.datetime.fromisoformat(start_date) if start_date else None
+        date_to = datetime.datetime.fromisoformat(end_date) if end_date else None
+    except ValueError as e:
+        print(f"Invalid date: {e}. Use ISO format (YYYY-MM-DD).")
+        return
+
+    entries = select_entries(
+        storage, folder=folder, tags=tags, date_from=date_from, date_to=date_to
+    )
+    if not entries:
+        print("No entries found matching the selection")
+        return
+
+    summarizer = BulkSummarizer(storage, llm_service, max_workers=workers)
+    print(
+        f"Summarizing {len(entries)} entries with prompt type '{prompt_type}' "
+        f"using {summarizer.max_workers} workers..."
+    )
+
+    def show_progress(progress: Dict[str, Any]) -> None:
+        eta = progress["eta_seconds"]
+        eta_text = f"{eta:.0f}s" if eta is not None else "?"
+        print(
+            f"\r  {progress['completed']} done, {progress['failed']} failed, "
+            f"{progress['pending']} left | "
+            f"{progress['entries_per_second']:.2f} entries/s | ETA {eta_text}",
+            end="",
+            flush=True,
+        )
+
+    result = summarizer.run(entries, prompt_type, progress_callback=show_progress)
+
+    print()
+    print("-" * 60)
+    print(
+        f"Summarized {result['completed']} entries, skipped {result['skipped']} "
+        f"with fresh summaries, {result['failed']} failed "
+        f"in {result['elapsed_seconds']:.1f}s "
+        f"({result['entries_per_second']:.2f} entries/s)"
+    )
+    for entry_id, error in result["errors"].items():
+        print(f"  ✗ {entry_id}: {error}")
+
+
 def list_favorite_summaries(storage: StorageManager, entry_id: str) -> None:
     """List favorite summaries for an entry."""
     entry = storage.get_entry(entry_id)
@@ -516,6 +573,30 @@ def main():
         "--prompt", "-p", default="default", help="Type of summary prompt to use"
     )
 
+    # Bulk summarize command
+    summarize_all_parser = subparsers.add_parser(
+        "summarize-all",
+        help="Summarize all matching entries that lack a fresh summary",
+    )
+    summarize_all_parser.add_argument(
+        "--folder", "-f", help="Only summarize entries in this folder"
+    )
+    summarize_all_parser.add_argument(
+        "--tags", "-t", help="Comma-separated list of tags to filter by", default=""
+    )
+    summarize_all_parser.add_argument(
+        "--start-date", "-s", help="Only entries after this date (YYYY-MM-DD)"
+    )
+    summarize_all_parser.add_argument(
+        "--end-date", "-e", help="Only entries before this date (YYYY-MM-DD)"
+    )
+    summarize_all_parser.add_argument(
+        "--prompt", "-p", default="default", help="Type of summary prompt to use"
+    )
+    summarize_all_parser.add_argument(
+        "--workers", "-w", type=int, help="Number of concurrent summaries"
+    )
+
     # List summaries command
     list_summaries_parser = subparsers.add_parser(
         "summaries", help="List favorite summaries for an entry"
@@ -619,6 +700,19 @@ def main():
     elif args.command == "summarize":
         summarize_entry(storage, llm_service, args.id, prompt_type=args.prompt)
 
+    elif args.command == "summarize-all":
+        tags = [tag.strip() for tag in args.tags.split(",") if tag.strip()] or None
+        summarize_all(
+            storage,
+            llm_service,
+            folder=args.folder,
+            tags=tags,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            prompt_type=args.prompt,
+            workers=args.workers,
+        )
+
     elif args.command == "summaries":
         list_favorite_summaries(storage, args.id)
 
@@ -175,45 +175,31 @@ export default function ChatInterface({
 
           // Now, for messages with has_references=true, fetch the actual references
           // This is done separately to avoid delaying the initial message display
-          const messagesWithReferences = formattedMessages.filter(msg => msg.has_references);
-
-          if (messagesWithReferences.length > 0) {
-            console.log(`Found ${messagesWithReferences.length} messages with references to fetch`);
-
-            // For each message with references, fetch them
-            const fetchReferencesPromises = messagesWithReferences.map(async (msg) => {
-              try {
-                const refResponse = await fetch(CHAT_API.MESSAGE(sessionId, msg.id));
-
-                if (refResponse.ok) {
-                  const responseData = await refResponse.json();
-                  // The backend returns a structure with message and references fields
-                  const referencesData = responseData.references || [];
-
-                  console.log(`Fetched ${referencesData.length} references for message ${msg.id}`);
-
-                  // Update this specific message with its references
-                  setMessages(currentMessages =>
-                    currentMessages.map(currentMsg =>
-                      currentMsg.id === msg.id
-                        ? { ...currentMsg, references: referencesData }
-                        : currentMsg
-                    )
-                  );
-
-                } else {
-                  console.warn(`Failed to fetch references for message ${msg.id}`);
+          const hasCitedMessages = formattedMessages.some(msg => msg.has_references);
+
+          if (hasCitedMessages) {
+            // One request returns the references for every message in the session
+            fetch(CHAT_API.REFERENCES(sessionId))
+              .then(async (refResponse) => {
+                if (!refResponse.ok) {
+                  console.warn(`Failed to fetch references for session ${sessionId}`);
+                  return;
                 }
-              } catch (refError) {
-                console.error(`Error fetching references for message ${msg.id}:`, refError);
-              }
-            });
 
-            // Don't await these promises to avoid delaying the UI
-            // They will resolve in the background and update the messages state as they complete
-            Promise.all(fetchReferencesPromises).catch(err => {
-              console.error('Error fetching references:', err);
-            });
+                const referencesByMessage: Record<string, EntryReference[]> = await refResponse.json();
+                console.log(`Fetched references for ${Object.keys(referencesByMessage).length} messages`);
+
+                setMessages(currentMessages =>
+                  currentMessages.map(currentMsg =>
+                    referencesByMessage[currentMsg.id]
+                      ? { ...currentMsg, references: referencesByMessage[currentMsg.id] }
+                      : currentMsg
+                  )
+                );
+              })
+              .catch(err => {
+                console.error('Error fetching references:', err);
+              });
           }
         }
       } catch (error) {
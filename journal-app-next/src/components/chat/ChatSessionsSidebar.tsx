@@ -11,8 +11,8 @@ import {
   ChatBubbleOvalLeftEllipsisIcon
 } from '@heroicons/react/24/outline';
 import { cn } from '@/lib/utils';
-import { fetchChatSessions, getChatSessionStats } from '@/api/chat';
-import { ChatSession, ChatSessionStats } from '@/types/chat';
+import { fetchChatSessions } from '@/api/chat';
+import { ChatSession } from '@/types/chat';
 
 interface ChatSessionsSidebarProps {
   currentSessionId?: string;
@@ -26,7 +26,6 @@ export const ChatSessionsSidebar: React.FC<ChatSessionsSidebarProps> = ({
   onToggle
 }) => {
   const [recentSessions, setRecentSessions] = useState<ChatSession[]>([]);
-  const [sessionStats, setSessionStats] = useState<Record<string, ChatSessionStats>>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -46,22 +45,8 @@ export const ChatSessionsSidebar: React.FC<ChatSessionsSidebarProps> = ({
 
         // Get the 5 most recent sessions for quick access
         const recentSessionsList = filteredSessions.slice(0, 5);
+        // Sessions carry their message counts and preview, so no stats calls are needed
         setRecentSessions(recentSessionsList);
-
-        // Fetch session statistics for recent sessions
-        const stats: Record<string, ChatSessionStats> = {};
-        await Promise.all(
-          recentSessionsList.map(async (session) => {
-            try {
-              const sessionStats = await getChatSessionStats(session.id);
-              stats[session.id] = sessionStats;
-            } catch (error) {
-              console.error(`Failed to fetch stats for session ${session.id}:`, error);
-            }
-          })
-        );
-
-        setSessionStats(stats);
       } catch (err) {
         setError((err as Error).message);
       } finally {
@@ -191,21 +176,17 @@ export const ChatSessionsSidebar: React.FC<ChatSessionsSidebarProps> = ({
                     >
                       <span className="truncate font-medium">{abbreviateTitle(session.title)}</span>
 
-                      {sessionStats[session.id] && (
-                        <>
-                          {sessionStats[session.id].last_message_preview && (
-                            <div className="text-xs text-muted-foreground mt-1 truncate">
-                              {abbreviateTitle(sessionStats[session.id].last_message_preview, 28)}
-                            </div>
-                          )}
-                          <div className="flex justify-between text-xs text-muted-foreground mt-1">
-                            <span>{sessionStats[session.id].message_count} msgs</span>
-                            {sessionStats[session.id].reference_count > 0 && (
-                              <span>{sessionStats[session.id].reference_count} refs</span>
-                            )}
-                          </div>
-                        </>
+                      {session.last_message_preview && (
+                        <div className="text-xs text-muted-foreground mt-1 truncate">
+                          {abbreviateTitle(session.last_message_preview, 28)}
+                        </div>
                       )}
+                      <div className="flex justify-between text-xs text-muted-foreground mt-1">
+                        <span>{session.message_count} msgs</span>
+                        {session.entry_count > 0 && (
+                          <span>{session.entry_count} refs</span>
+                        )}
+                      </div>
 
                       <div className="text-xs text-muted-foreground mt-1">
                         {new Date(session.updated_at).toLocaleDateString()}
@@ -11,6 +11,7 @@ export const CHAT_API = {
   SESSION: (sessionId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}`,
   MESSAGES: (sessionId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}/messages`,
   MESSAGE: (sessionId: string, messageId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}/messages/${messageId}`,
+  REFERENCES: (sessionId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}/references`,
   STREAM: (sessionId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}/stream`,
   SAVE_AS_ENTRY: (sessionId: string) => `${API_BASE_URL}/chat/sessions/${sessionId}/save-as-entry`
 };
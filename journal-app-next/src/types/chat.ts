@@ -37,6 +37,10 @@ export interface ChatSession {
   temporal_filter?: string;
   entry_count: number;
   persona_id?: string;
+  message_count: number;
+  user_message_count: number;
+  assistant_message_count: number;
+  last_message_preview?: string;
 }
 
 export interface ChatMessage {
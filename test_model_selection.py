@@ -168,15 +168,17 @@ class TestModelSelection:
         # Create LLM service instance
         llm_service = LLMService(storage_manager=self.mock_storage)
 
-        # Trigger model validation to populate cache
+        # Trigger model validation to populate the registry
         llm_service._validate_model_availability("qwen3:latest")
-        assert hasattr(llm_service, "_cached_models")
+        registry = Mock(wraps=llm_service.model_registry)
+        llm_service.model_registry = registry
 
         # Reload configuration
         llm_service.reload_config()
 
-        # Cache should be cleared
-        assert not hasattr(llm_service, "_cached_models")
+        # The snapshot should be dropped and refetched from the new backends
+        registry.invalidate.assert_called_once()
+        registry.refresh_async.assert_called_once()
 
 
 if __name__ == "__main__":
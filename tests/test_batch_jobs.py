@@ -0,0 +1,190 @@
+"""
+Tests for background batch analysis jobs.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app import api
+from app.batch_jobs import BatchJobRunner
+from app.llm_service import LLMService
+from app.migrate_db import migrate_database
+from app.models import BatchAnalysis, BatchAnalysisJob, JournalEntry
+from app.storage import StorageManager
+from tests.test_batch_map_reduce import FakeAnalysisClient
+
+
+def _analysis(entries, title=None, prompt_type="weekly", progress_callback=None):
+    """Fake analyze_entries_batch that reports progress."""
+    for value in (0.25, 0.5, 0.75, 1.0):
+        if progress_callback:
+            progress_callback(value)
+    return BatchAnalysis(
+        title=title or "Analysis",
+        entry_ids=[entry.id for entry in entries],
+        summary="summary",
+        key_themes=[],
+        mood_trends={},
+        notable_insights=[],
+        prompt_type=prompt_type,
+    )
+
+
+class TestBatchJobRunner(unittest.TestCase):
+    """Tests for BatchJobRunner."""
+
+    def setUp(self):
+        """Set up storage with entries and a runner over a fake LLM service."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+        migrate_database(os.path.join(self.test_dir, "journal.db"))
+
+        self.entry_ids = []
+        for i in range(12):
+            entry = JournalEntry(
+                title=f"Day {i}",
+                content=f"Entry {i} " + "words " * 60,
+                created_at=datetime(2025, 5, 1) + timedelta(days=i),
+            )
+            self.entry_ids.append(self.storage.save_entry(entry))
+
+        self.llm_service = MagicMock()
+        self.llm_service.analyze_entries_batch.side_effect = _analysis
+        self.runner = BatchJobRunner(self.storage, self.llm_service)
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def _wait_for(self, job_id, timeout=5.0):
+        """Wait for a job to finish and return it."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.storage.get_batch_job(job_id)
+            if job.is_finished and not self.runner.is_active(job_id):
+                return job
+            time.sleep(0.02)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_submit_runs_job_in_background(self):
+        """A submitted job completes and its analysis is saved."""
+        job = self.runner.submit(self.entry_ids[:3], title="Week")
+
+        self.assertEqual(job.status, "queued")
+        job = self._wait_for(job.id)
+
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.progress, 1.0)
+        analysis = self.storage.get_batch_analysis(job.batch_id)
+        self.assertEqual(analysis.title, "Week")
+        self.assertEqual(sorted(analysis.entry_ids), sorted(self.entry_ids[:3]))
+
+    def test_cancel_stops_running_job(self):
+        """Cancelling a running job stops it at the next progress update."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_analysis(entries, title=None, prompt_type="weekly", **kwargs):
+            kwargs["progress_callback"](0.1)
+            started.set()
+            release.wait(2.0)
+            kwargs["progress_callback"](0.5)
+            return _analysis(entries, title, prompt_type)
+
+        self.llm_service.analyze_entries_batch.side_effect = slow_analysis
+        job = self.runner.submit(self.entry_ids[:3])
+        self.assertTrue(started.wait(2.0))
+
+        self.runner.cancel(job.id)
+        release.set()
+        job = self._wait_for(job.id)
+
+        self.assertEqual(job.status, "cancelled")
+        self.assertEqual(job.progress, 0.1)
+        self.assertIsNone(job.batch_id)
+
+    def test_failed_job_can_be_resumed(self):
+        """A failed job records its error and completes when resumed."""
+        self.llm_service.analyze_entries_batch.side_effect = [
+            RuntimeError("Ollama went away"),
+            _analysis(
+                [self.storage.get_entry(entry_id) for entry_id in self.entry_ids[:2]]
+            ),
+        ]
+        job = self.runner.submit(self.entry_ids[:2])
+        job = self._wait_for(job.id)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Ollama went away", job.error)
+
+        self.runner.resume(job.id)
+        job = self._wait_for(job.id)
+
+        self.assertEqual(job.status, "completed")
+        self.assertIsNone(job.error)
+        with self.assertRaises(ValueError):
+            self.runner.resume(job.id)
+
+    def test_interrupted_jobs_resume_on_startup(self):
+        """Jobs left running by a previous process are picked up again."""
+        job = BatchAnalysisJob(entry_ids=self.entry_ids[:2], status="running")
+        self.storage.save_batch_job(job)
+
+        self.assertEqual(self.runner.resume_interrupted(), 1)
+        job = self._wait_for(job.id)
+
+        self.assertEqual(job.status, "completed")
+
+    def test_app_startup_resumes_interrupted_jobs(self):
+        """The API's startup hook resumes jobs without waiting for a request."""
+        self.runner.resume_interrupted = MagicMock()
+
+        with patch.object(api, "get_storage", return_value=self.storage):
+            with patch.object(api, "get_batch_job_runner", return_value=self.runner):
+                api.recover_interrupted_work()
+
+        self.runner.resume_interrupted.assert_called_once()
+
+    def test_resumed_job_skips_completed_groups(self):
+        """Group summaries finished before a cancel are not redone on resume."""
+        with patch("app.llm_service.ollama"):
+            llm_service = LLMService(self.storage)
+        client = FakeAnalysisClient()
+        llm_service._ollama = lambda operation: client
+        llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+        llm_service.config.batch_group_token_budget = 200
+        llm_service.config.batch_max_workers = 1
+        runner = BatchJobRunner(self.storage, llm_service)
+
+        job_ids = []
+        original_chat = client.chat
+
+        def chat_then_cancel(*args, **kwargs):
+            result = original_chat(*args, **kwargs)
+            if len(client.map_calls) == 2:
+                runner.cancel(job_ids[0])
+            return result
+
+        client.chat = chat_then_cancel
+        job_ids.append(runner.submit(self.entry_ids).id)
+        self.runner = runner
+        job = self._wait_for(job_ids[0])
+        self.assertEqual(job.status, "cancelled")
+        completed_groups = len(client.map_calls)
+        self.assertLess(completed_groups, 6)
+
+        runner.resume(job.id)
+        job = self._wait_for(job.id)
+
+        self.assertEqual(job.status, "completed")
+        # Six groups in total, each summarized exactly once
+        self.assertEqual(len(client.map_calls), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
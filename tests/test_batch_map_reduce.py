@@ -0,0 +1,152 @@
+"""
+Tests for concurrent map-reduce analysis of large entry batches.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.llm_service import LLMService
+from app.migrate_db import migrate_database
+from app.models import JournalEntry
+from app.storage import StorageManager
+from app.token_budget import get_tokenizer
+
+
+class FakeAnalysisClient:
+    """Stands in for the Ollama client used by analysis calls."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.map_calls = []
+        self.reduce_calls = []
+        self.final_calls = []
+
+    def chat(self, model, messages, options=None, format=None):
+        prompt = messages[-1]["content"]
+        if format is not None:
+            with self.lock:
+                self.final_calls.append(prompt)
+            result = {
+                "summary": "overall",
+                "key_themes": ["theme"],
+                "mood_trends": {"calm": 1},
+                "notable_insights": ["insight"],
+            }
+            return {"message": {"content": json.dumps(result)}}
+
+        time.sleep(self.delay)
+        with self.lock:
+            if messages[0]["content"].startswith("You combine"):
+                self.reduce_calls.append(prompt)
+            else:
+                self.map_calls.append(prompt)
+        # Distinct prompts get distinct summaries, as from a real model
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return {"message": {"content": f"summary {digest}"}}
+
+
+class TestBatchMapReduce(unittest.TestCase):
+    """Tests for LLMService._analyze_large_batch."""
+
+    def setUp(self):
+        """Set up storage and an LLM service with a fake analysis client."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+        migrate_database(os.path.join(self.test_dir, "journal.db"))
+
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+        self.client = FakeAnalysisClient()
+        self.llm_service._ollama = lambda operation: self.client
+        self.llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+
+        self.llm_service.config.batch_group_token_budget = 200
+        self.entries = [
+            JournalEntry(
+                title=f"Day {i}",
+                content=f"Entry {i} " + "words " * 60,
+                created_at=datetime(2025, 5, 1) + timedelta(days=i),
+            )
+            for i in range(12)
+        ]
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def test_groups_are_packed_by_token_budget(self):
+        """Groups stay under the budget and oversized entries stand alone."""
+        entries = self.entries[:4] + [
+            JournalEntry(title="Long", content="x" * 4000, created_at=datetime.now())
+        ]
+
+        groups = self.llm_service._pack_entry_groups(entries, 200)
+
+        self.assertEqual([len(group) for group in groups], [2, 2, 1])
+        self.assertEqual(groups[-1][0].title, "Long")
+        for group in groups[:-1]:
+            text = self.llm_service._format_batch_entries(group)
+            self.assertLessEqual(get_tokenizer().count(text), 200)
+
+    def test_groups_are_summarized_concurrently(self):
+        """The map phase takes about one call's time, not one per group."""
+        self.client.delay = 0.2
+        self.llm_service.config.batch_max_workers = 6
+
+        start = time.monotonic()
+        analysis = self.llm_service.analyze_entries_batch(self.entries)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(self.client.map_calls), 6)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(analysis.summary, "overall")
+        self.assertEqual(len(analysis.entry_ids), 12)
+
+    def test_repeated_analysis_reuses_group_summaries(self):
+        """Unchanged groups come from the cache; edited groups are redone."""
+        self.llm_service.analyze_entries_batch(self.entries)
+        self.assertEqual(len(self.client.map_calls), 6)
+
+        self.llm_service.analyze_entries_batch(self.entries)
+        self.assertEqual(len(self.client.map_calls), 6)
+        self.assertEqual(len(self.client.final_calls), 2)
+
+        self.entries[0].content += " and an edit"
+        self.llm_service.analyze_entries_batch(self.entries)
+        self.assertEqual(len(self.client.map_calls), 7)
+
+    def test_reduce_builds_multiple_levels(self):
+        """Too many summaries are combined in levels before the final call."""
+        self.llm_service.config.batch_reduce_fan_in = 2
+
+        self.llm_service.analyze_entries_batch(self.entries)
+
+        # 6 group summaries -> 3 -> 2, then the final analysis
+        self.assertEqual(len(self.client.reduce_calls), 5)
+        self.assertEqual(len(self.client.final_calls), 1)
+        self.assertIn("Batch 2 Summary", self.client.final_calls[0])
+        self.assertNotIn("Batch 3 Summary", self.client.final_calls[0])
+
+    def test_progress_is_reported_in_order(self):
+        """Progress increases monotonically up to completion."""
+        progress = []
+
+        self.llm_service.analyze_entries_batch(
+            self.entries, progress_callback=progress.append
+        )
+
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests for bulk summarization across the journal.
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app.bulk_summarize import BulkSummarizer, select_entries
+from app.llm_service import LLMService
+from app.models import JournalEntry
+from app.storage import StorageManager
+
+
+class TestBulkSummarizer(unittest.TestCase):
+    """Tests for BulkSummarizer and select_entries."""
+
+    def setUp(self):
+        """Set up storage with entries and an LLM service with a fake client."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+
+        self.entries = []
+        for i in range(6):
+            entry = JournalEntry(
+                title=f"Day {i}",
+                content=f"Entry {i} about the garden.",
+                tags=["garden"] if i % 2 else ["work"],
+                folder="2025" if i < 4 else "2024",
+                created_at=datetime(2025, 5, 1) + timedelta(days=i),
+            )
+            self.storage.save_entry(entry)
+            self.entries.append(entry)
+
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.client = MagicMock()
+        self.client.chat.side_effect = self._chat
+        self.llm_service._ollama = lambda operation: self.client
+        self.llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def _chat(self, **kwargs):
+        """Fake chat call that tracks how many run at once."""
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return {
+            "message": {
+                "content": json.dumps(
+                    {"summary": "A summary", "key_topics": ["garden"], "mood": "calm"}
+                )
+            }
+        }
+
+    def test_select_entries_filters_by_folder_and_tag(self):
+        """Selection pages through storage and applies the filters."""
+        self.assertEqual(len(select_entries(self.storage, page_size=4)), 6)
+        self.assertEqual(len(select_entries(self.storage, folder="2024")), 2)
+        self.assertEqual(len(select_entries(self.storage, tags=["garden"])), 3)
+
+    def test_fresh_entries_are_skipped(self):
+        """Entries with a cached summary for their current content are skipped."""
+        self.llm_service.summarize_entry(
+            self.entries[0].content, entry_id=self.entries[0].id
+        )
+        self.client.chat.reset_mock()
+
+        result = BulkSummarizer(self.storage, self.llm_service).run(self.entries)
+
+        self.assertEqual(result["skipped"], 1)
+        self.assertEqual(result["completed"], 5)
+        self.assertEqual(self.client.chat.call_count, 5)
+        self.assertEqual(self.storage.get_summary_cache_stats()["cached_summaries"], 6)
+
+        rerun = BulkSummarizer(self.storage, self.llm_service).run(self.entries)
+        self.assertEqual(rerun["skipped"], 6)
+        self.assertEqual(self.client.chat.call_count, 5)
+
+    def test_concurrency_is_bounded(self):
+        """No more than max_workers summaries run at once."""
+        BulkSummarizer(self.storage, self.llm_service, max_workers=2).run(self.entries)
+
+        self.assertEqual(self.peak, 2)
+
+    def test_results_are_written_in_batches(self):
+        """Summaries are flushed to storage in write_batch_size batches."""
+        with patch.object(
+            self.storage,
+            "save_cached_summaries",
+            wraps=self.storage.save_cached_summaries,
+        ) as save:
+            BulkSummarizer(
+                self.storage, self.llm_service, max_workers=3, write_batch_size=4
+            ).run(self.entries)
+
+        self.assertEqual([len(call.args[0]) for call in save.call_args_list], [4, 2])
+
+    def test_progress_reports_throughput_and_failures(self):
+        """Progress reports count failures and include throughput and ETA."""
+        chat = self.client.chat.side_effect
+
+        def flaky_chat(**kwargs):
+            if "Entry 3 " in kwargs["messages"][-1]["content"]:
+                raise RuntimeError("model crashed")
+            return chat(**kwargs)
+
+        self.client.chat.side_effect = flaky_chat
+        reports = []
+        result = BulkSummarizer(self.storage, self.llm_service, max_workers=1).run(
+            self.entries, progress_callback=reports.append
+        )
+
+        self.assertEqual(len(reports), 6)
+        self.assertEqual(reports[0]["pending"], 5)
+        self.assertIn("eta_seconds", reports[0])
+        self.assertEqual(reports[-1]["pending"], 0)
+        self.assertEqual(result["completed"], 5)
+        self.assertEqual(result["failed"], 1)
+        self.assertGreater(result["entries_per_second"], 0)
+        self.assertIn("model crashed", result["errors"][self.entries[3].id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -157,9 +157,15 @@ class TestChatCitations:
         chat_storage.get_conversation_history.return_value = (
             []
         )  # Empty conversation history
+        chat_storage.get_uncounted_messages.return_value = []
+        chat_storage.get_message_totals.return_value = {
+            "message_count": 0,
+            "token_count": 0,
+        }
+        chat_storage.get_recent_messages.return_value = []
 
         # Mock add_message to return different messages based on role
-        def mock_add_message(msg):
+        def mock_add_message(msg, references=None):
             if msg.role == "assistant":
                 return ChatMessage(
                     id="assistant-msg",
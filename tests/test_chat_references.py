@@ -0,0 +1,153 @@
+"""
+Tests for saving and loading citation references.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.models import ChatMessage, ChatSession, EntryReference
+from app.storage.chat import ChatStorage
+
+
+def make_reference(entry_id, score, title=None, snippet=None):
+    """Build a reference as retrieval produces it, before the message exists."""
+    return EntryReference(
+        message_id="",
+        entry_id=entry_id,
+        similarity_score=score,
+        entry_title=title,
+        entry_snippet=snippet,
+    )
+
+
+class TestChatReferences(unittest.TestCase):
+    """Tests for entry references in ChatStorage."""
+
+    def setUp(self):
+        """Create a session in temporary storage."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Garden"))
+        self.start = datetime(2025, 6, 1, 9, 0)
+        self.count = 0
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _add_message(self, references=None):
+        """Add an assistant message, optionally with references."""
+        self.count += 1
+        return self.chat_storage.add_message(
+            ChatMessage(
+                session_id=self.session.id,
+                role="assistant",
+                content=f"Answer {self.count}",
+                created_at=self.start + timedelta(minutes=self.count),
+            ),
+            references=references,
+        )
+
+    def test_references_are_saved_with_the_message(self):
+        """References get the message ID and stored previews."""
+        message = self._add_message(
+            [
+                make_reference("e1", 0.5, "Tomatoes", "Planted tomatoes."),
+                make_reference("e2", 0.9, "Basil", "Basil is thriving."),
+            ]
+        )
+
+        references = self.chat_storage.get_message_entry_references(message.id)
+
+        self.assertEqual([ref.entry_id for ref in references], ["e2", "e1"])
+        self.assertEqual({ref.message_id for ref in references}, {message.id})
+        self.assertEqual(references[0].entry_title, "Basil")
+        self.assertEqual(references[0].entry_snippet, "Basil is thriving.")
+        self.assertEqual(self.chat_storage.get_session(self.session.id).entry_count, 2)
+
+    def test_failed_reference_write_rolls_back_the_message(self):
+        """The message and its references are saved in one transaction."""
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        conn.execute("DROP TABLE chat_message_entries")
+        conn.close()
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self._add_message([make_reference("e1", 0.5)])
+
+        self.assertEqual(self.chat_storage.get_messages(self.session.id), [])
+
+    def test_session_references_come_from_one_query(self):
+        """Session references are grouped by message in message order."""
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        conn.execute("CREATE TABLE entries (id TEXT PRIMARY KEY, title TEXT)")
+        conn.execute("INSERT INTO entries VALUES ('e1', 'Tomato diary')")
+        conn.commit()
+        conn.close()
+
+        first = self._add_message([make_reference("e1", 0.5, "Tomatoes", "A")])
+        self._add_message()
+        third = self._add_message(
+            [make_reference("e3", 0.4, "Deleted", "C"), make_reference("e1", 0.8)]
+        )
+
+        connection = self.chat_storage.get_db_connection()
+        statements = []
+        connection.set_trace_callback(statements.append)
+        self.chat_storage.get_db_connection = lambda: connection
+        references = self.chat_storage.get_session_entry_references(self.session.id)
+
+        self.assertEqual(list(references), [first.id, third.id])
+        self.assertEqual(
+            [(ref.entry_id, ref.entry_title) for ref in references[third.id]],
+            [("e1", "Tomato diary"), ("e3", "Deleted")],
+        )
+        self.assertEqual(references[first.id][0].entry_snippet, "A")
+        self.assertEqual(
+            len([sql for sql in statements if "chat_message_entries" in sql]), 1
+        )
+
+    def test_session_query_uses_indexes(self):
+        """Loading a session's references searches indexes rather than scanning."""
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        plan = conn.execute(
+            """
+            EXPLAIN QUERY PLAN
+            SELECT cme.entry_id FROM chat_message_entries cme
+            JOIN chat_messages cm ON cme.message_id = cm.id
+            WHERE cm.session_id = ?
+            ORDER BY cm.created_at, cm.rowid, cme.similarity_score DESC
+            """,
+            (self.session.id,),
+        ).fetchall()
+        conn.close()
+
+        details = [row[3] for row in plan]
+        self.assertFalse([detail for detail in details if detail.startswith("SCAN")])
+        self.assertTrue(
+            any("idx_chat_message_entries_message_id" in d for d in details)
+        )
+
+    def test_add_references_to_an_existing_message(self):
+        """References can still be added after the message is saved."""
+        message = self._add_message()
+
+        self.assertTrue(
+            self.chat_storage.add_message_entry_references(
+                message.id, [make_reference("e1", 0.5, "Tomatoes")]
+            )
+        )
+        self.assertFalse(
+            self.chat_storage.add_message_entry_references(
+                "missing", [make_reference("e1", 0.5)]
+            )
+        )
+        self.assertEqual(
+            self.chat_storage.get_message_entry_references(message.id)[0].entry_title,
+            "Tomatoes",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
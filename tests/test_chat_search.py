@@ -0,0 +1,151 @@
+"""
+Tests for full-text search over chat sessions.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.models import ChatMessage, ChatSession
+from app.storage.chat import ChatStorage, fts_match_query
+
+
+class TestChatSearch(unittest.TestCase):
+    """Tests for FTS5-backed session search."""
+
+    def setUp(self):
+        """Create sessions with titles and messages to search."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        start = datetime(2025, 6, 1, 9, 0)
+
+        self.sessions = {}
+        for i, (title, messages) in enumerate(
+            [
+                ("Tomato planning", ["Which tomato varieties grow best?"]),
+                (
+                    "Weekend",
+                    ["I planted tomatoes and basil.", "The basil is thriving."],
+                ),
+                ("Work", ["Budget meeting ran late.", "Another budget review."]),
+            ]
+        ):
+            session = self.chat_storage.create_session(
+                ChatSession(
+                    title=title,
+                    created_at=start + timedelta(days=i),
+                    updated_at=start + timedelta(days=i),
+                    last_accessed=start + timedelta(days=i),
+                )
+            )
+            for content in messages:
+                self.chat_storage.add_message(
+                    ChatMessage(session_id=session.id, role="user", content=content)
+                )
+            self.sessions[title] = session
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def test_match_query_quotes_user_input(self):
+        """Words become quoted prefix terms; operators are not parsed."""
+        self.assertEqual(fts_match_query("tomato basil"), '"tomato"* "basil"*')
+        self.assertEqual(fts_match_query('NOT "x" OR y*'), '"NOT"* "x"* "OR"* "y"*')
+        self.assertIsNone(fts_match_query(" *() "))
+
+    def test_title_matches_rank_first_with_snippets(self):
+        """A title match outranks a message match and both are highlighted."""
+        results, total = self.chat_storage.search_session_results("tomato")
+
+        self.assertEqual(total, 2)
+        self.assertEqual(
+            [result.session.title for result in results], ["Tomato planning", "Weekend"]
+        )
+        title_hit, message_hit = results
+        self.assertEqual(title_hit.match_type, "session_title")
+        self.assertIn("<mark>Tomato</mark> planning", title_hit.highlighted_snippets)
+        self.assertGreater(title_hit.relevance_score, message_hit.relevance_score)
+
+        self.assertEqual(message_hit.match_type, "message_content")
+        self.assertEqual(
+            [m.content for m in message_hit.matched_messages],
+            ["I planted tomatoes and basil."],
+        )
+        self.assertIn("<mark>tomatoes</mark>", message_hit.highlighted_snippets[0])
+
+    def test_count_agrees_with_results(self):
+        """Counts come from the same query as results, across pages and dates."""
+        for query in ("budget", "basil", "t"):
+            results, total = self.chat_storage.search_session_results(query, limit=100)
+            self.assertEqual(total, len(results))
+            self.assertEqual(self.chat_storage.count_search_results(query), total)
+
+        # Adding messages touches last_accessed, so every session is recent
+        for date_from, date_to, expected in (
+            ("2000-01-01", None, 2),
+            (None, "2000-01-01", 0),
+        ):
+            results, total = self.chat_storage.search_session_results(
+                "tomato", date_from=date_from, date_to=date_to
+            )
+            self.assertEqual(total, expected)
+            self.assertEqual(len(results), expected)
+            self.assertEqual(
+                self.chat_storage.count_search_results("tomato", date_from, date_to),
+                expected,
+            )
+
+        results, total = self.chat_storage.search_session_results(
+            "tomato", limit=1, offset=5
+        )
+        self.assertEqual(results, [])
+        self.assertEqual(total, 2)
+
+    def test_fts_syntax_in_query_is_safe(self):
+        """Quotes and operators in the query don't break the MATCH."""
+        results, total = self.chat_storage.search_session_results('budget" OR "x')
+
+        self.assertEqual(total, 0)
+        self.assertEqual(results, [])
+        self.assertEqual(
+            len(
+                self.chat_storage.search_messages_in_session(
+                    self.sessions["Work"].id, "budget'; --"
+                )
+            ),
+            2,
+        )
+
+    def test_empty_query_lists_sessions(self):
+        """Without search terms every session is listed, newest first."""
+        results, total = self.chat_storage.search_session_results("  ")
+
+        self.assertEqual(total, 3)
+        self.assertEqual(results[0].session.title, "Work")
+        self.assertEqual(
+            [s.title for s in self.chat_storage.search_sessions("", sort_by="title")],
+            ["Tomato planning", "Weekend", "Work"],
+        )
+
+    def test_index_follows_edits_but_not_access_updates(self):
+        """Content edits are re-indexed; touching last_accessed is not."""
+        message = self.chat_storage.get_messages(self.sessions["Work"].id)[0]
+        self.chat_storage.update_message_content(message.id, "Planted peppers.")
+
+        self.assertEqual(self.chat_storage.count_search_results("peppers"), 1)
+        self.assertEqual(self.chat_storage.count_search_results("budget"), 1)
+
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        triggers = dict(
+            conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+            ).fetchall()
+        )
+        conn.close()
+        self.assertIn("UPDATE OF content", triggers["chat_messages_fts_update"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+"""
+Tests for semantic search over earlier chat conversations.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.chat_service import ChatService
+from app.llm_service import LLMService
+from app.models import ChatMessage, ChatSession, JournalEntry
+from app.storage import StorageManager
+from app.storage.chat import ChatStorage
+from app.storage.vector_search import rank_by_similarity
+from app.tools.journal_search import JournalSearchTool
+
+VOCABULARY = ["garden", "tomato", "budget", "meeting", "basil", "travel"]
+
+
+def fake_embedding(text):
+    """Embed text as counts of a small vocabulary, plus a constant."""
+    words = text.lower()
+    return [float(words.count(term)) for term in VOCABULARY] + [0.1]
+
+
+def to_blob(values):
+    """Convert a vector to a stored float32 blob."""
+    return np.asarray(values, dtype=np.float32).tobytes()
+
+
+class TestRankBySimilarity(unittest.TestCase):
+    """Tests for the vectorized similarity ranking."""
+
+    def test_matches_pairwise_cosine_similarity(self):
+        """Scores equal sklearn's, highest first, limited and dimension-checked."""
+        rng = np.random.default_rng(7)
+        query = rng.random(8)
+        vectors = rng.random((20, 8)).astype(np.float32)
+        blobs = [vector.tobytes() for vector in vectors]
+        blobs[3] = to_blob([1.0, 2.0])
+        blobs[5] = to_blob(np.zeros(8))
+
+        ranked = rank_by_similarity(query, blobs, 5)
+
+        expected = cosine_similarity([query], vectors)[0]
+        expected[3] = -1.0
+        self.assertEqual(
+            [position for position, _ in ranked], list(np.argsort(-expected)[:5])
+        )
+        for position, similarity in ranked:
+            self.assertAlmostEqual(similarity, expected[position], places=5)
+
+        zero_ranked = dict(rank_by_similarity(query, blobs, len(blobs)))
+        self.assertNotIn(3, zero_ranked)
+        self.assertEqual(zero_ranked[5], 0.0)
+
+    def test_ties_keep_stored_order(self):
+        """Equal scores are returned in the order they were stored."""
+        blobs = [to_blob([1.0, 0.0])] * 3 + [to_blob([0.0, 1.0])]
+
+        self.assertEqual(
+            [position for position, _ in rank_by_similarity([1.0, 0.0], blobs, 3)],
+            [0, 1, 2],
+        )
+
+
+class TestChatSemanticSearch(unittest.TestCase):
+    """Tests for embedding and searching chat messages."""
+
+    def setUp(self):
+        """Create chat sessions and an LLM service with fake embeddings."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+        self.chat_storage = ChatStorage(self.test_dir)
+
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+        self.embedded = []
+
+        def get_embedding(text):
+            self.embedded.append(text)
+            return fake_embedding(text)
+
+        self.llm_service.get_embedding = get_embedding
+        self.llm_service.min_similarity = 0.5
+
+        self.garden = self._session(
+            "Garden plans",
+            [
+                ("user", "Which tomato varieties suit a small garden?"),
+                ("assistant", "Cherry tomato plants do well in a small garden."),
+            ],
+        )
+        self.work = self._session(
+            "Work", [("user", "The budget meeting ran long again.")]
+        )
+        self.current = self._session("Today", [("user", "More tomato questions")])
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def _session(self, title, messages):
+        """Create a session with the given (role, content) messages."""
+        session = self.chat_storage.create_session(ChatSession(title=title))
+        for role, content in messages:
+            self.chat_storage.add_message(
+                ChatMessage(session_id=session.id, role=role, content=content)
+            )
+        return session
+
+    def test_messages_are_embedded_once_and_after_edits(self):
+        """Only new or edited messages are embedded; removed ones are dropped."""
+        self.assertEqual(self.llm_service.process_messages_without_embeddings(), 4)
+        self.assertEqual(self.llm_service.process_messages_without_embeddings(), 0)
+
+        message = self.chat_storage.get_messages(self.work.id)[0]
+        self.chat_storage.update_message_content(message.id, "Travel plans instead.")
+        self.embedded.clear()
+
+        self.assertEqual(self.llm_service.process_messages_without_embeddings(), 1)
+        self.assertEqual(self.embedded, ["Travel plans instead."])
+
+        self.chat_storage.delete_session(self.work.id)
+        self.assertEqual(self.storage.get_messages_without_embeddings(), [])
+        conn = self.storage.vectors.get_db_connection()
+        count = conn.execute("SELECT COUNT(*) FROM message_vectors").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 3)
+
+    def test_changing_embedding_model_re_embeds_messages(self):
+        """Vectors from an old model are skipped by search and embedded again."""
+        self.llm_service.process_messages_without_embeddings()
+        self.llm_service.embedding_model = "other-embed"
+
+        self.assertEqual(
+            self.llm_service.search_chat_history("tomato garden", min_similarity=0),
+            [],
+        )
+        self.assertEqual(self.llm_service.process_messages_without_embeddings(), 4)
+        self.assertEqual(self.llm_service.process_messages_without_embeddings(), 0)
+        self.assertTrue(self.llm_service.search_chat_history("tomato garden"))
+
+    def test_search_excludes_current_session_and_shares_query_embedding(self):
+        """Related messages from other sessions come back without re-embedding."""
+        self.llm_service.process_messages_without_embeddings()
+        self.embedded.clear()
+
+        self.llm_service.semantic_search("tomato garden", limit=3)
+        results = self.llm_service.search_chat_history(
+            "tomato garden", exclude_session_id=self.current.id
+        )
+
+        self.assertEqual(self.embedded, ["tomato garden"])
+        self.assertEqual(
+            [result["session_title"] for result in results],
+            ["Garden plans", "Garden plans"],
+        )
+        self.assertEqual(results[0]["role"], "assistant")
+        self.assertGreaterEqual(results[0]["similarity"], results[1]["similarity"])
+
+    def test_journal_search_tool_returns_conversations(self):
+        """The journal tool adds related conversations unless turned off."""
+        self.storage.save_entry(
+            JournalEntry(title="Garden", content="Planted tomato seedlings.")
+        )
+        self.llm_service.process_entries_without_embeddings()
+        self.llm_service.process_messages_without_embeddings()
+        tool = JournalSearchTool(self.test_dir, self.llm_service)
+
+        result = asyncio.run(
+            tool.execute(
+                {"query": "tomato garden", "search_type": "semantic"},
+                {"session_id": self.current.id},
+            )
+        )
+        self.assertTrue(result.success)
+        self.assertEqual(
+            {c["session_title"] for c in result.data["conversations"]},
+            {"Garden plans"},
+        )
+        self.assertEqual(self.embedded.count("tomato garden"), 1)
+
+        chat_service = ChatService(self.chat_storage, self.llm_service)
+        formatted = chat_service._format_tool_results_for_context(
+            [{"tool_name": "journal_search", "success": True, "data": result.data}]
+        )
+        self.assertIn('"Garden plans" (assistant): Cherry tomato', formatted)
+
+        result = asyncio.run(
+            tool.execute(
+                {"query": "tomato garden", "search_type": "semantic"},
+                {"include_conversations": False},
+            )
+        )
+        self.assertNotIn("conversations", result.data)
+
+    def test_conversation_search_runs_alongside_journal_search(self):
+        """The tool takes about as long as the slower search, not both."""
+        tool = JournalSearchTool(self.test_dir, self.llm_service)
+
+        def slow(result):
+            def search(*args, **kwargs):
+                time.sleep(0.3)
+                return result
+
+            return search
+
+        self.llm_service.semantic_search = slow([])
+        self.llm_service.search_chat_history = slow([])
+
+        start = time.monotonic()
+        result = asyncio.run(
+            tool.execute({"query": "tomato", "search_type": "semantic"}, {})
+        )
+
+        self.assertTrue(result.success)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_disabled_setting_skips_background_embedding(self):
+        """No messages are embedded when search_past_conversations is off."""
+        chat_service = ChatService(self.chat_storage, self.llm_service)
+        config = self.chat_storage.get_chat_config()
+        config.search_past_conversations = False
+        self.chat_storage.update_chat_config(config)
+
+        self.assertFalse(self.chat_storage.get_chat_config().search_past_conversations)
+        self.assertEqual(chat_service.embed_new_messages(), 0)
+        self.assertEqual(self.embedded, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
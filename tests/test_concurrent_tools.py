@@ -0,0 +1,288 @@
+"""
+Tests for concurrent tool execution in the chat service.
+"""
+
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from app.chat_service import _TOOL_EXECUTOR, ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+from app.tools import RoutingStats
+from app.tools.base import ToolResult
+
+
+class TestConcurrentToolExecution(unittest.TestCase):
+    """Tests for ChatService._execute_recommended_tools."""
+
+    def setUp(self):
+        """Set up a chat service with a mocked LLM service."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.chat_service = ChatService(self.chat_storage, MagicMock())
+        self.session = ChatSession(
+            id="test-session",
+            title="Test Session",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            last_accessed=datetime.now(),
+        )
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _analysis(self, *tool_names, confidence=0.9):
+        """Build a tool analysis recommending the given tools."""
+        return {
+            "should_use_tools": True,
+            "recommended_tools": [
+                {"tool_name": name, "confidence": confidence, "suggested_query": "q"}
+                for name in tool_names
+            ],
+        }
+
+    def _slow_tool(self, delays):
+        """Return a fake _execute_tool_sync that sleeps per tool."""
+
+        def execute(tool_name, parameters, context=None):
+            time.sleep(delays[tool_name])
+            if tool_name == "journal_search":
+                return ToolResult(
+                    success=True,
+                    data={
+                        "results": [
+                            {
+                                "id": "entry-1",
+                                "title": "Entry",
+                                "content_preview": "preview",
+                                "relevance": 0.8,
+                            }
+                        ]
+                    },
+                    metadata={"result_count": 1},
+                )
+            return ToolResult(success=True, data={"results": []}, metadata={})
+
+        return execute
+
+    def test_tools_run_concurrently(self):
+        """Two recommended tools should take max(tool) rather than sum(tool)."""
+        self.chat_service._execute_tool_sync = self._slow_tool(
+            {"journal_search": 0.3, "web_search": 0.3}
+        )
+
+        start = time.monotonic()
+        results, references = self.chat_service._execute_recommended_tools(
+            self._analysis("journal_search", "web_search"),
+            "hello",
+            self.session,
+            {},
+            message_id="msg-1",
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(
+            [r["tool_name"] for r in results], ["journal_search", "web_search"]
+        )
+        self.assertTrue(all(r["success"] for r in results))
+        self.assertEqual(len(references), 1)
+        self.assertEqual(references[0].message_id, "msg-1")
+        self.assertEqual(references[0].entry_id, "entry-1")
+
+    def test_timeout_keeps_partial_results(self):
+        """A slow tool times out without discarding the other tool's results."""
+        self.chat_service.TOOL_TIMEOUTS = {"journal_search": 5.0, "web_search": 0.1}
+        self.chat_service._execute_tool_sync = self._slow_tool(
+            {"journal_search": 0.05, "web_search": 0.5}
+        )
+
+        results, references = self.chat_service._execute_recommended_tools(
+            self._analysis("journal_search", "web_search"), "hello", self.session, {}
+        )
+
+        self.assertTrue(results[0]["success"])
+        self.assertFalse(results[1]["success"])
+        self.assertIn("timed out", results[1]["error"])
+        self.assertEqual(len(references), 1)
+
+    def test_low_confidence_tools_are_skipped(self):
+        """Tools below the confidence threshold are not executed."""
+        self.chat_service._execute_tool_sync = MagicMock()
+
+        results, references = self.chat_service._execute_recommended_tools(
+            self._analysis("journal_search", confidence=0.2),
+            "hello",
+            self.session,
+            {},
+        )
+
+        self.assertEqual(results, [])
+        self.assertEqual(references, [])
+        self.chat_service._execute_tool_sync.assert_not_called()
+
+    def test_tool_runs_from_event_loop_while_pool_is_busy(self):
+        """Callers inside an event loop don't wait on the shared tool pool."""
+        result = ToolResult(success=True, data={}, metadata={})
+        self.chat_service.tool_registry.execute_tool = AsyncMock(return_value=result)
+        self.chat_service.DEFAULT_TOOL_TIMEOUT = 1.0
+        release = threading.Event()
+        blockers = [
+            _TOOL_EXECUTOR.submit(release.wait, 10)
+            for _ in range(_TOOL_EXECUTOR._max_workers)
+        ]
+
+        async def call_from_loop():
+            return self.chat_service._execute_tool_sync("journal_search", {})
+
+        try:
+            self.assertIs(asyncio.run(call_from_loop()), result)
+        finally:
+            release.set()
+            for blocker in blockers:
+                blocker.result()
+
+
+class TestSpeculativeRetrieval(unittest.TestCase):
+    """Tests for speculative journal retrieval during LLM tool routing."""
+
+    def setUp(self):
+        """Set up a chat service whose LLM routing call is slow."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.llm_service = MagicMock()
+        self.chat_service = ChatService(
+            ChatStorage(self.temp_dir.name), self.llm_service
+        )
+        self.session = ChatSession(id="test-session", title="Test Session")
+        self.message = ChatMessage(
+            session_id="test-session", role="user", content="How was the trip?"
+        )
+        # Force the LLM tier so speculation applies
+        self.config = ChatConfig(use_rule_based_routing=False)
+        self.chat_service.tool_router.stats = RoutingStats()
+        self.calls = []
+
+        def execute(tool_name, parameters, context=None):
+            self.calls.append((tool_name, parameters))
+            time.sleep(0.3)
+            return ToolResult(success=True, data={"results": []}, metadata={})
+
+        self.chat_service._execute_tool_sync = execute
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _slow_analysis(self, analysis):
+        """Make the LLM tool analysis take a while and return ``analysis``."""
+
+        def analyze(message, context=None):
+            time.sleep(0.3)
+            return dict(analysis)
+
+        self.llm_service.analyze_message_for_tools.side_effect = analyze
+
+    def test_journal_search_overlaps_tool_analysis(self):
+        """Journal retrieval runs during the LLM call and its result is used."""
+        self._slow_analysis(
+            {
+                "should_use_tools": True,
+                "recommended_tools": [
+                    {
+                        "tool_name": "journal_search",
+                        "confidence": 0.9,
+                        "suggested_query": "how was the trip?",
+                    }
+                ],
+            }
+        )
+
+        start = time.monotonic()
+        analysis, speculative = self.chat_service._route_with_speculation(
+            self.message, self.session, {}, self.config
+        )
+        results, _ = self.chat_service._execute_recommended_tools(
+            analysis, self.message.content, self.session, {}, speculative=speculative
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.calls[0][1]["query"], "How was the trip?")
+        self.assertEqual(results[0]["tool_name"], "journal_search")
+        self.assertTrue(results[0]["success"])
+
+    def test_unused_speculation_is_discarded(self):
+        """When the LLM recommends no tools the speculative result is dropped."""
+        self._slow_analysis({"should_use_tools": False, "recommended_tools": []})
+
+        analysis, speculative = self.chat_service._route_with_speculation(
+            self.message, self.session, {}, self.config
+        )
+        results, references = self.chat_service._execute_recommended_tools(
+            analysis, self.message.content, self.session, {}, speculative=speculative
+        )
+
+        self.assertEqual(results, [])
+        self.assertEqual(references, [])
+        self.assertEqual(
+            self.chat_service.tool_router.stats.get_stats()["speculation"],
+            {"hits": 0, "misses": 1, "hit_ratio": 0.0},
+        )
+
+    def test_speculation_is_used_for_a_rewritten_query(self):
+        """A rewritten suggested query still uses the speculative search."""
+        self._slow_analysis(
+            {
+                "should_use_tools": True,
+                "recommended_tools": [
+                    {
+                        "tool_name": "journal_search",
+                        "confidence": 0.9,
+                        "suggested_query": "trip to Lisbon",
+                    }
+                ],
+            }
+        )
+
+        start = time.monotonic()
+        analysis, speculative = self.chat_service._route_with_speculation(
+            self.message, self.session, {}, self.config
+        )
+        results, _ = self.chat_service._execute_recommended_tools(
+            analysis, self.message.content, self.session, {}, speculative=speculative
+        )
+
+        self.assertLess(time.monotonic() - start, 0.55)
+        self.assertEqual(
+            [call[1]["query"] for call in self.calls], ["How was the trip?"]
+        )
+        self.assertTrue(results[0]["success"])
+        self.assertEqual(
+            self.chat_service.tool_router.stats.get_stats()["speculation"],
+            {"hits": 1, "misses": 0, "hit_ratio": 1.0},
+        )
+
+    def test_no_speculation_when_disabled(self):
+        """Speculation can be turned off in the chat config."""
+        self._slow_analysis({"should_use_tools": False, "recommended_tools": []})
+        config = ChatConfig(
+            use_rule_based_routing=False, use_speculative_retrieval=False
+        )
+
+        _, speculative = self.chat_service._route_with_speculation(
+            self.message, self.session, {}, config
+        )
+
+        self.assertEqual(speculative, {})
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
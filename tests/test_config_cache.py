@@ -0,0 +1,174 @@
+"""
+Tests for the in-process config and persona cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.models import ChatConfig, LLMConfig, PersonaCreate, PersonaUpdate
+from app.storage.base import BaseStorage
+from app.storage.chat import ChatStorage
+from app.storage.config import ConfigStorage
+from app.storage.config_cache import ConfigCache
+from app.storage.personas import PersonaStorage
+
+
+class TestConfigCache(unittest.TestCase):
+    """Tests for ConfigCache."""
+
+    def setUp(self):
+        """Create a database file for cached objects to belong to."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.temp_dir.name, "journal.db")
+        open(self.db, "w").close()
+
+    def tearDown(self):
+        """Clean up the temporary file."""
+        self.temp_dir.cleanup()
+
+    def test_loads_once_until_bumped(self):
+        """Reads hit memory until the namespace version changes."""
+        cache = ConfigCache()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return {"value": len(loads)}
+
+        self.assertEqual(cache.get(self.db, "chat_config", "default", load)["value"], 1)
+        self.assertEqual(cache.get(self.db, "chat_config", "default", load)["value"], 1)
+        cache.bump(self.db, "personas")
+        self.assertEqual(cache.get(self.db, "chat_config", "default", load)["value"], 1)
+        cache.bump(self.db, "chat_config")
+        self.assertEqual(cache.get(self.db, "chat_config", "default", load)["value"], 2)
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        self.assertEqual(stats["versions"][f"chat_config@{self.db}"], 1)
+
+    def test_returns_copies(self):
+        """Changing a returned object doesn't change the cached one."""
+        cache = ConfigCache()
+        cache.get(self.db, "ns", "key", lambda: {"items": [1]})["items"].append(2)
+
+        self.assertEqual(cache.get(self.db, "ns", "key", lambda: None), {"items": [1]})
+
+    def test_value_loaded_during_a_write_is_not_cached(self):
+        """A read that overlaps a bump doesn't keep the old value."""
+        cache = ConfigCache()
+
+        def load_racing_write():
+            cache.bump(self.db, "ns")
+            return "old"
+
+        self.assertEqual(cache.get(self.db, "ns", "key", load_racing_write), "old")
+        self.assertEqual(cache.get(self.db, "ns", "key", lambda: "new"), "new")
+
+    def test_recreated_database_is_not_served_old_values(self):
+        """A file deleted and created again at the same path starts empty."""
+        cache = ConfigCache()
+        cache.get(self.db, "ns", "key", lambda: "old")
+
+        os.remove(self.db)
+        self.assertEqual(cache.get(self.db, "ns", "key", lambda: "gone"), "gone")
+        cache.forget(self.db)
+        open(self.db, "w").close()
+
+        self.assertEqual(cache.get(self.db, "ns", "key", lambda: "new"), "new")
+        self.assertEqual(cache.get(self.db, "ns", "key", lambda: "later"), "new")
+
+
+class TestCachedStorage(unittest.TestCase):
+    """Tests that storage readers use the cache and writers invalidate it."""
+
+    def setUp(self):
+        """Create storages over a temporary database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.temp_dir.name
+        self.connections = 0
+        self.connect = BaseStorage.get_db_connection
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _count_connections(self):
+        """Patch storages to count the connections they open."""
+
+        def counting_connect(storage):
+            self.connections += 1
+            return self.connect(storage)
+
+        return patch.object(BaseStorage, "get_db_connection", counting_connect)
+
+    def test_chat_config_is_read_from_memory(self):
+        """Repeated reads skip the database; updates are seen immediately."""
+        chat_storage = ChatStorage(self.base_dir)
+        chat_storage.update_chat_config(ChatConfig(max_tokens=700))
+        chat_storage.get_chat_config().max_tokens = 99
+
+        with self._count_connections():
+            for _ in range(3):
+                self.assertEqual(chat_storage.get_chat_config().max_tokens, 700)
+        self.assertEqual(self.connections, 0)
+
+        ChatStorage(self.base_dir).update_chat_config(ChatConfig(max_tokens=900))
+        self.assertEqual(chat_storage.get_chat_config().max_tokens, 900)
+
+    def test_llm_config_is_read_from_memory(self):
+        """Saving the LLM config invalidates the cached copy."""
+        config_storage = ConfigStorage(self.base_dir)
+        config_storage.get_llm_config()
+
+        with self._count_connections():
+            self.assertEqual(config_storage.get_llm_config().keep_alive, "30m")
+        self.assertEqual(self.connections, 0)
+
+        config_storage.save_llm_config(LLMConfig(keep_alive="1h"))
+        self.assertEqual(ConfigStorage(self.base_dir).get_llm_config().keep_alive, "1h")
+
+    def test_personas_are_read_from_memory(self):
+        """Persona lookups are cached and persona writes invalidate them."""
+        persona_storage = PersonaStorage(self.base_dir)
+        persona = persona_storage.create_persona(
+            PersonaCreate(
+                name="Gardener", description="Plants", system_prompt="Dig the beds."
+            )
+        )
+        persona_storage.get_persona(persona.id)
+
+        with self._count_connections():
+            again = PersonaStorage(self.base_dir)
+            self.assertEqual(
+                again.get_persona(persona.id).system_prompt, "Dig the beds."
+            )
+        self.assertEqual(self.connections, 0)
+
+        persona_storage.update_persona(
+            persona.id, PersonaUpdate(system_prompt="Rake the leaves.")
+        )
+        self.assertEqual(
+            again.get_persona(persona.id).system_prompt, "Rake the leaves."
+        )
+
+        persona_storage.delete_persona(persona.id)
+        self.assertIsNone(again.get_persona(persona.id))
+
+    def test_recreated_database_is_prepared_again(self):
+        """Personas are set up again after the database is deleted."""
+        PersonaStorage(self.base_dir)
+        ChatStorage(self.base_dir).update_chat_config(ChatConfig(max_tokens=700))
+        shutil.rmtree(self.base_dir)
+
+        ChatStorage(self.base_dir)
+
+        self.assertTrue(PersonaStorage(self.base_dir).list_personas())
+        config = ChatStorage(self.base_dir).get_chat_config()
+        self.assertNotEqual(config.max_tokens, 700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@ These tests verify that:
 4. Deduplication prevents repetitive results
 """
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
 
 from app.models import (
@@ -115,9 +115,13 @@ class MockChatStorage:
         self.chat_config = ChatConfig()
         self.base_dir = "./test_journal_data"
 
-    def add_message(self, message: ChatMessage) -> ChatMessage:
+    def add_message(
+        self, message: ChatMessage, references: List[EntryReference] = None
+    ) -> ChatMessage:
         """Mock adding a message"""
         self.messages.append(message)
+        if references:
+            self.add_message_entry_references(message.id, references)
         return message
 
     def add_message_entry_references(
@@ -139,6 +143,26 @@ class MockChatStorage:
         """Mock getting messages"""
         return [msg for msg in self.messages if msg.session_id == session_id]
 
+    def get_recent_messages(
+        self, session_id: str, max_tokens: int
+    ) -> List[ChatMessage]:
+        """Mock getting the most recent messages"""
+        return self.get_messages(session_id)
+
+    def get_uncounted_messages(
+        self, session_id: str, tokenizer_id: Optional[str] = None
+    ) -> List[ChatMessage]:
+        """Mock getting messages without token counts"""
+        return []
+
+    def get_message_totals(self, session_id: str) -> Dict[str, int]:
+        """Mock counting messages"""
+        messages = self.get_messages(session_id)
+        return {
+            "message_count": len(messages),
+            "token_count": sum(msg.token_count or 0 for msg in messages),
+        }
+
     def save_message_entry_references(
         self, message_id: str, references: List[EntryReference]
     ) -> bool:
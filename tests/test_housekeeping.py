@@ -0,0 +1,155 @@
+"""
+Tests for deferred session housekeeping.
+"""
+
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app import chat_service as chat_service_module
+from app.chat_service import ChatService
+from app.housekeeping import HousekeepingQueue
+from app.models import ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+
+
+class TestHousekeepingQueue(unittest.TestCase):
+    """Tests for HousekeepingQueue debouncing."""
+
+    def setUp(self):
+        """Create a fresh queue."""
+        self.queue = HousekeepingQueue(name="test-housekeeping")
+
+    def test_jobs_run_off_the_calling_thread(self):
+        """Scheduled jobs run on the worker thread."""
+        ran_on = []
+        self.queue.schedule("job", lambda: ran_on.append(threading.current_thread()))
+
+        self.assertTrue(self.queue.drain(timeout=2.0))
+        self.assertEqual(len(ran_on), 1)
+        self.assertIsNot(ran_on[0], threading.current_thread())
+
+    def test_repeated_schedules_collapse_into_one_run(self):
+        """A burst of schedules for one key runs only the last job."""
+        calls = []
+        for i in range(5):
+            self.queue.schedule("session", lambda i=i: calls.append(i), delay=0.2)
+        self.queue.schedule("other", lambda: calls.append("other"), delay=0.2)
+
+        self.assertTrue(self.queue.drain(timeout=2.0))
+        self.assertEqual(sorted(calls, key=str), [4, "other"])
+        stats = self.queue.get_stats()
+        self.assertEqual(stats["scheduled"], 2)
+        self.assertEqual(stats["debounced"], 4)
+        self.assertEqual(stats["completed"], 2)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_max_delay_bounds_debouncing(self):
+        """Rescheduling can't push a job past its max delay."""
+        ran = threading.Event()
+        start = time.monotonic()
+        for _ in range(4):
+            self.queue.schedule("busy", ran.set, delay=1.0, max_delay=0.2)
+            time.sleep(0.05)
+
+        self.assertTrue(ran.wait(timeout=2.0))
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_failing_job_does_not_stop_worker(self):
+        """A job that raises is counted and later jobs still run."""
+        calls = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        self.queue.schedule("bad", fail)
+        self.queue.schedule("good", lambda: calls.append("good"))
+
+        self.assertTrue(self.queue.drain(timeout=2.0))
+        self.assertEqual(calls, ["good"])
+        self.assertEqual(self.queue.get_stats()["failed"], 1)
+
+
+class TestSessionHousekeeping(unittest.TestCase):
+    """Tests for ChatService title and topic-shift scheduling."""
+
+    def setUp(self):
+        """Set up a titled session with a long conversation."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.llm_service = MagicMock()
+        self.llm_service.generate_session_title.return_value = "Garden Planning"
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+
+        self.session = self.chat_storage.create_session(
+            ChatSession(title="Garden Planning")
+        )
+        chat_service_module._topic_checked_at.pop(self.session.id, None)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        chat_service_module._topic_checked_at.pop(self.session.id, None)
+        self.temp_dir.cleanup()
+
+    def _add_exchanges(self, count):
+        """Add ``count`` user/assistant exchanges to the session."""
+        for i in range(count):
+            for role in ("user", "assistant"):
+                self.chat_storage.add_message(
+                    ChatMessage(
+                        session_id=self.session.id, role=role, content=f"{role} {i}"
+                    )
+                )
+
+    def test_scheduling_does_not_call_llm_inline(self):
+        """Scheduling housekeeping returns before any title generation."""
+        self._add_exchanges(8)
+        self.chat_service.HOUSEKEEPING_IDLE_SECONDS = 60.0
+
+        self.chat_service._schedule_session_housekeeping(self.session.id)
+
+        self.llm_service.generate_session_title.assert_not_called()
+
+    def test_topic_check_runs_once_per_interval(self):
+        """Topic-shift checks are skipped until enough new exchanges arrive."""
+        self._add_exchanges(8)
+
+        self.chat_service._check_and_generate_session_title(self.session.id)
+        self.assertEqual(self.llm_service.generate_session_title.call_count, 1)
+
+        # Below the interval: no further LLM calls
+        self._add_exchanges(ChatService.TOPIC_CHECK_INTERVAL - 1)
+        self.chat_service._check_and_generate_session_title(self.session.id)
+        self.assertEqual(self.llm_service.generate_session_title.call_count, 1)
+
+        self._add_exchanges(1)
+        self.chat_service._check_and_generate_session_title(self.session.id)
+        self.assertEqual(self.llm_service.generate_session_title.call_count, 2)
+
+    def test_topic_check_marks_are_bounded(self):
+        """Only the most recently checked sessions keep their marks."""
+        with patch.object(chat_service_module, "_TOPIC_CHECKED_MAX_SESSIONS", 2):
+            for session_id in ("chat-a", "chat-b", "chat-a", "chat-c"):
+                self.chat_service._topic_check_due(session_id, 100)
+
+            self.assertEqual(
+                list(chat_service_module._topic_checked_at)[-2:], ["chat-a", "chat-c"]
+            )
+            self.assertNotIn("chat-b", chat_service_module._topic_checked_at)
+
+        for session_id in ("chat-a", "chat-c"):
+            chat_service_module._topic_checked_at.pop(session_id, None)
+
+    def test_short_conversations_skip_topic_check(self):
+        """Titled sessions below the minimum exchanges never call the LLM."""
+        self._add_exchanges(ChatService.TOPIC_CHECK_MIN_EXCHANGES - 1)
+
+        self.chat_service._check_and_generate_session_title(self.session.id)
+
+        self.llm_service.generate_session_title.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
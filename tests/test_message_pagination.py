@@ -0,0 +1,200 @@
+"""
+Tests for windowed and cursor-based chat message loading.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from app.chat_service import ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+
+
+class TestMessageWindows(unittest.TestCase):
+    """Tests for ChatStorage message windows."""
+
+    def setUp(self):
+        """Create a session with ten messages."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Long"))
+        start = datetime(2025, 6, 1, 9, 0)
+        self.ids = []
+        for i in range(10):
+            message = self.chat_storage.add_message(
+                ChatMessage(
+                    session_id=self.session.id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    content=f"Message {i}",
+                    created_at=start + timedelta(minutes=i),
+                    token_count=10 if i < 8 else None,
+                )
+            )
+            self.ids.append(message.id)
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _ids(self, messages):
+        """Get the IDs of a list of messages."""
+        return [message.id for message in messages]
+
+    def test_tail_and_cursor_windows(self):
+        """Windows are chronological and anchored where their cursor says."""
+        get = self.chat_storage.get_messages
+        session_id = self.session.id
+
+        self.assertEqual(self._ids(get(session_id)), self.ids)
+        self.assertEqual(self._ids(get(session_id, limit=3)), self.ids[-3:])
+        self.assertEqual(
+            self._ids(get(session_id, limit=3, before_id=self.ids[5])),
+            self.ids[2:5],
+        )
+        self.assertEqual(
+            self._ids(get(session_id, limit=3, after_id=self.ids[5])),
+            self.ids[6:9],
+        )
+        self.assertEqual(
+            self._ids(get(session_id, after_id=self.ids[2], before_id=self.ids[6])),
+            self.ids[3:6],
+        )
+
+    def test_cursor_from_another_session_selects_nothing(self):
+        """A cursor must be a message in the same session."""
+        other = self.chat_storage.create_session(ChatSession(title="Other"))
+        foreign = self.chat_storage.add_message(
+            ChatMessage(session_id=other.id, role="user", content="Hi")
+        )
+
+        self.assertEqual(
+            self.chat_storage.get_messages(self.session.id, before_id=foreign.id), []
+        )
+        self.assertEqual(
+            self.chat_storage.get_messages(self.session.id, after_id="missing"), []
+        )
+
+    def test_recent_messages_fill_token_budget(self):
+        """The tail stops once stored counts reach the budget."""
+        recent = self.chat_storage.get_recent_messages(self.session.id, 25)
+
+        # Two uncounted messages, two that fit, and the one that crosses
+        self.assertEqual(self._ids(recent), self.ids[5:])
+
+    def test_totals_and_index(self):
+        """Totals come from one aggregate over the (session, time) index."""
+        totals = self.chat_storage.get_message_totals(self.session.id)
+
+        self.assertEqual(
+            totals,
+            {
+                "message_count": 10,
+                "user_count": 5,
+                "assistant_count": 5,
+                "token_count": 80,
+                "uncounted_count": 2,
+            },
+        )
+        self.assertEqual(
+            self._ids(self.chat_storage.get_uncounted_messages(self.session.id)),
+            self.ids[8:],
+        )
+
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM chat_messages "
+            "WHERE session_id = ? ORDER BY created_at DESC LIMIT 5",
+            (self.session.id,),
+        ).fetchall()
+        conn.close()
+        self.assertIn("idx_chat_messages_session_id_created_at", str(plan))
+
+
+class TestWindowedHistory(unittest.TestCase):
+    """Tests that the chat service loads only the window it uses."""
+
+    def setUp(self):
+        """Set up a service over a long summarized session."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.config = ChatConfig(
+            context_window_size=4,
+            min_messages_for_summary=3,
+            conversation_summary_threshold=100,
+        )
+        self.chat_storage.get_chat_config = MagicMock(return_value=self.config)
+        self.session = self.chat_storage.create_session(ChatSession(title="Long"))
+
+        self.llm_service = MagicMock()
+        self.llm_service.generate_session_title.return_value = "Long Talk"
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+
+        start = datetime(2025, 6, 1, 9, 0)
+        self.messages = [
+            self.chat_storage.add_message(
+                ChatMessage(
+                    session_id=self.session.id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    content=f"Message {i} about the garden",
+                    created_at=start + timedelta(minutes=i),
+                )
+            )
+            for i in range(40)
+        ]
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def test_summarized_session_loads_from_watermark(self):
+        """With a summary, history is read from the watermark onwards."""
+        self.session.context_summary = "Talked about the garden."
+        self.session.summary_watermark = self.messages[29].id
+        self.chat_storage.update_session(self.session)
+        get_messages = self.chat_storage.get_messages
+        self.chat_storage.get_messages = MagicMock(side_effect=get_messages)
+
+        history = self.chat_service._prepare_conversation_history(
+            self.session.id, self.config
+        )
+
+        for call in self.chat_storage.get_messages.call_args_list:
+            self.assertTrue(call.kwargs.get("after_id") or call.kwargs.get("limit"))
+        self.assertIn("Talked about the garden.", history[1]["content"])
+        self.assertEqual(
+            [turn["content"] for turn in history[2:]],
+            [message.content for message in self.messages[30:]],
+        )
+
+    def test_unwindowed_history_reads_only_the_tail(self):
+        """Without windowing only the messages that fit the budget are read."""
+        self.config.use_context_windowing = False
+        self.chat_service._prompt_budget = lambda config: 60
+
+        history = self.chat_service._prepare_conversation_history(
+            self.session.id, self.config
+        )
+
+        self.assertLess(len(history) - 1, len(self.messages))
+        self.assertEqual(history[-1]["content"], self.messages[-1].content)
+
+    def test_title_uses_counts_and_recent_messages(self):
+        """Auto-naming counts exchanges in SQL and sends only recent turns."""
+        self.session.title = "Chat Session 1"
+        self.chat_storage.update_session(self.session)
+
+        self.chat_service._check_and_generate_session_title(self.session.id)
+
+        sent = self.llm_service.generate_session_title.call_args.args[0]
+        self.assertEqual(len(sent), ChatService.TITLE_CONTEXT_MESSAGES)
+        self.assertEqual(sent[-1]["content"], self.messages[-1].content)
+        self.assertEqual(
+            self.chat_storage.get_session(self.session.id).title, "Long Talk"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for the available-model registry.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.llm_service import LLMService, ModelRegistry
+from app.models import LLMConfig
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Tests for ModelRegistry."""
+
+    def setUp(self):
+        """Create a registry over a controllable fetch function."""
+        self.models = ["qwen3:latest"]
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+        def fetch():
+            self.calls += 1
+            self.release.wait(5)
+            return list(self.models)
+
+        self.registry = ModelRegistry(fetch, ttl_seconds=60.0)
+
+    def _wait_for_refresh(self):
+        """Wait until no background refresh is running."""
+        deadline = time.monotonic() + 5
+        while self.registry.get_status()["refreshing"]:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_unknown_until_first_fetch(self):
+        """Before the first fetch availability is unknown, not False."""
+        self.release.clear()
+
+        self.assertIsNone(self.registry.is_available("qwen3:latest"))
+
+        self.release.set()
+        self._wait_for_refresh()
+        self.assertTrue(self.registry.is_available("qwen3:latest"))
+        self.assertFalse(self.registry.is_available("llama3:8b"))
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_snapshot_is_served_while_refreshing(self):
+        """Past the TTL the old snapshot answers while a refresh runs."""
+        self.registry.refresh()
+        self.registry.ttl_seconds = 0.0
+        self.models.append("llama3:8b")
+        self.release.clear()
+
+        self.assertFalse(self.registry.is_available("llama3:8b"))
+        self.assertFalse(self.registry.refresh_async())
+
+        self.release.set()
+        self._wait_for_refresh()
+        self.assertTrue(self.registry.is_available("llama3:8b"))
+
+    def test_invalidation_during_refresh_refetches(self):
+        """A fetch that overlaps invalidate() is discarded and run again."""
+        self.release.clear()
+        self.assertTrue(self.registry.refresh_async())
+        deadline = time.monotonic() + 5
+        while self.calls == 0:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+        self.registry.invalidate()
+        self.models = ["llama3:8b"]
+        self.assertFalse(self.registry.refresh_async())
+        self.release.set()
+        self._wait_for_refresh()
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.registry.get_models(), ["llama3:8b"])
+
+    def test_failed_refresh_keeps_snapshot(self):
+        """A failed refresh keeps the last good snapshot and records the error."""
+        self.registry.refresh()
+        self.registry._fetch = MagicMock(side_effect=RuntimeError("offline"))
+
+        with self.assertRaises(RuntimeError):
+            self.registry.refresh()
+
+        status = self.registry.get_status()
+        self.assertEqual(status["models"], ["qwen3:latest"])
+        self.assertEqual(status["last_error"], "offline")
+
+
+class TestModelRouting(unittest.TestCase):
+    """Tests for model routing in LLMService."""
+
+    def setUp(self):
+        """Create an LLM service with a specialized chat model."""
+        storage_manager = MagicMock()
+        storage_manager.get_llm_config.return_value = LLMConfig(chat_model="llama3:8b")
+        with patch("app.llm_service.ollama") as ollama:
+            self.llm_service = LLMService(storage_manager)
+        self.ollama = ollama
+
+    def test_construction_does_no_network_io(self):
+        """Creating the service no longer probes Ollama."""
+        self.ollama.embeddings.assert_not_called()
+        self.ollama.list.assert_not_called()
+
+    def test_routing_uses_snapshot_without_fetching(self):
+        """A fresh snapshot answers routing with no call to Ollama."""
+        fetch = MagicMock(return_value=["qwen3:latest"])
+        self.llm_service.model_registry._fetch = fetch
+        self.llm_service.model_registry.refresh()
+
+        self.assertEqual(
+            self.llm_service._get_model_for_operation("chat"), "qwen3:latest"
+        )
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_models_are_assumed_available_before_warm_up(self):
+        """Routing doesn't wait for the registry to load."""
+        self.llm_service.model_registry.refresh_async = MagicMock()
+
+        self.assertEqual(self.llm_service._get_model_for_operation("chat"), "llama3:8b")
+        self.llm_service.model_registry.refresh_async.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
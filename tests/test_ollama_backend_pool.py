@@ -0,0 +1,225 @@
+"""
+Tests for routing Ollama calls across a pool of backends.
+"""
+
+import json
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+from app.llm_service import (
+    CircuitBreakerOpen,
+    LLMService,
+    OllamaBackend,
+    OllamaBackendPool,
+)
+from app.models import LLMConfig, OllamaBackendConfig
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal Ollama API: tags, embeddings and streamed chat."""
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.path == "/api/tags":
+            self._send_json(
+                {
+                    "models": [
+                        {"name": name, "model": name} for name in self.server.models
+                    ]
+                }
+            )
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self.server.paths.append(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if self.path in ("/api/embeddings", "/api/embed"):
+            self._send_json({"embedding": [0.1, 0.2, 0.3]})
+        elif self.path == "/api/chat":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for chunk in (
+                {"message": {"role": "assistant", "content": self.server.name}},
+                {"done": True, "eval_count": 1, "eval_duration": 1_000_000},
+            ):
+                self.wfile.write(json.dumps(chunk).encode("utf-8") + b"\n")
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _unused_port():
+    """Find a local port with nothing listening on it."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestOllamaBackendPool(unittest.TestCase):
+    """Tests for OllamaBackendPool routing and LLMService failover."""
+
+    def setUp(self):
+        """Start two fake Ollama servers."""
+        self.servers = []
+        for name, models in (
+            ("alpha", ["qwen3:latest", "nomic-embed-text:latest"]),
+            ("beta", ["qwen3:latest"]),
+        ):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+            server.name = name
+            server.models = models
+            server.paths = []
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+
+        self.alpha_host = f"http://127.0.0.1:{self.servers[0].server_address[1]}"
+        self.beta_host = f"http://127.0.0.1:{self.servers[1].server_address[1]}"
+        self.dead_host = f"http://127.0.0.1:{_unused_port()}"
+
+    def tearDown(self):
+        """Stop the fake servers."""
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def _llm_service(self, backends):
+        """Create an LLMService over the given backend configs."""
+        storage_manager = MagicMock()
+        storage_manager.get_llm_config.return_value = LLMConfig(
+            ollama_backends=backends, connect_timeout=1.0, read_timeout=5.0
+        )
+        return LLMService(storage_manager)
+
+    def test_weighted_least_outstanding_ordering(self):
+        """Backends are ordered by outstanding requests relative to weight."""
+        light = OllamaBackend(self.alpha_host, weight=1.0)
+        heavy = OllamaBackend(self.beta_host, weight=4.0)
+        pool = OllamaBackendPool([light, heavy])
+
+        light.outstanding = 1
+        heavy.outstanding = 3
+        # light: 2/1 = 2.0, heavy: 4/4 = 1.0
+        self.assertIs(pool.candidates("chat")[0], heavy)
+
+        heavy.outstanding = 8
+        self.assertIs(pool.candidates("chat")[0], light)
+
+    def test_open_breaker_and_model_map_exclude_backends(self):
+        """Unhealthy backends and backends lacking the model are skipped."""
+        alpha = OllamaBackend(self.alpha_host)
+        beta = OllamaBackend(self.beta_host)
+        pool = OllamaBackendPool([alpha, beta])
+
+        alpha.models = {"qwen3:latest"}
+        beta.models = {"qwen3:latest", "llama3:8b"}
+        self.assertEqual(pool.candidates("chat", "llama3:8b"), [beta])
+
+        for _ in range(3):
+            beta.circuit_breaker.record_failure()
+        self.assertEqual(pool.candidates("chat", "llama3:8b"), [alpha])
+
+        for _ in range(3):
+            alpha.circuit_breaker.record_failure()
+        with self.assertRaises(CircuitBreakerOpen):
+            pool.execute("chat", lambda backend: None)
+
+    def test_failover_to_healthy_backend(self):
+        """Calls fail over when a backend refuses connections."""
+        llm_service = self._llm_service(
+            [
+                OllamaBackendConfig(host=self.dead_host),
+                OllamaBackendConfig(host=self.alpha_host),
+            ]
+        )
+
+        self.assertEqual(llm_service.get_embedding("hello"), [0.1, 0.2, 0.3])
+
+        dead, alive = llm_service.backend_pool.backends
+        self.assertGreater(dead.circuit_breaker.failure_count, 0)
+        self.assertEqual(alive.circuit_breaker.failure_count, 0)
+        self.assertEqual(dead.outstanding, 0)
+        self.assertEqual(alive.outstanding, 0)
+
+    def test_reload_keeps_breakers_of_unchanged_hosts(self):
+        """Reloading the config only resets breakers of changed hosts."""
+        llm_service = self._llm_service(
+            [
+                OllamaBackendConfig(host=self.dead_host),
+                OllamaBackendConfig(host=self.alpha_host),
+            ]
+        )
+        dead = llm_service.backend_pool.backends[0]
+        for _ in range(3):
+            dead.circuit_breaker.record_failure()
+
+        llm_service.storage_manager.get_llm_config.return_value = LLMConfig(
+            ollama_backends=[
+                OllamaBackendConfig(host=self.dead_host),
+                OllamaBackendConfig(host=self.beta_host),
+            ]
+        )
+        llm_service.reload_config()
+
+        reloaded_dead, beta = llm_service.backend_pool.backends
+        self.assertIsNot(reloaded_dead, dead)
+        self.assertEqual(reloaded_dead.circuit_breaker.state, "open")
+        self.assertEqual(beta.circuit_breaker.state, "closed")
+
+    def test_operations_route_to_different_hosts(self):
+        """Embeddings and chat can be served by different hosts."""
+        llm_service = self._llm_service(
+            [
+                OllamaBackendConfig(host=self.alpha_host, operations=["embedding"]),
+                OllamaBackendConfig(host=self.beta_host, operations=["chat"]),
+            ]
+        )
+
+        llm_service.get_embedding("hello")
+        chunks = list(
+            llm_service.chat_completion(
+                [{"role": "user", "content": "hi"}], stream=True, model="qwen3:latest"
+            )
+        )
+
+        self.assertEqual(chunks, ["beta"])
+        self.assertIn("/api/embeddings", self.servers[0].paths)
+        self.assertNotIn("/api/chat", self.servers[0].paths)
+        self.assertIn("/api/chat", self.servers[1].paths)
+        self.assertNotIn("/api/embeddings", self.servers[1].paths)
+
+    def test_available_models_builds_model_map(self):
+        """Listing models queries every backend and records what each has."""
+        llm_service = self._llm_service(
+            [
+                OllamaBackendConfig(host=self.alpha_host),
+                OllamaBackendConfig(host=self.beta_host),
+            ]
+        )
+
+        models = llm_service.get_available_models()
+
+        self.assertEqual(models, ["nomic-embed-text:latest", "qwen3:latest"])
+        alpha, beta = llm_service.backend_pool.backends
+        self.assertTrue(alpha.has_model("nomic-embed-text:latest"))
+        self.assertFalse(beta.has_model("nomic-embed-text:latest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
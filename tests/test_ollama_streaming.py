@@ -0,0 +1,139 @@
+"""
+Tests for streaming chat completions over the pooled Ollama HTTP session.
+"""
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from app.llm_service import (
+    LLMService,
+    LLMServiceError,
+    get_http_session,
+    normalize_ollama_host,
+)
+from app.models import LLMConfig
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Serves a canned streamed /api/chat response."""
+
+    delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+
+        chunks = [
+            {"message": {"role": "assistant", "content": "Hello"}, "done": False},
+            {"message": {"role": "assistant", "content": " there"}, "done": False},
+            {
+                "model": "qwen3:latest",
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": 2_000_000_000,
+                "load_duration": 100_000_000,
+                "prompt_eval_count": 42,
+                "prompt_eval_duration": 300_000_000,
+                "eval_count": 20,
+                "eval_duration": 1_000_000_000,
+            },
+        ]
+        for chunk in chunks:
+            self.wfile.write(json.dumps(chunk).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestOllamaStreaming(unittest.TestCase):
+    """Tests for LLMService._stream_chat_completion."""
+
+    def setUp(self):
+        """Start a fake Ollama server and point an LLMService at it."""
+        FakeOllamaHandler.delay = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host = f"127.0.0.1:{self.server.server_address[1]}"
+
+        storage_manager = MagicMock()
+        storage_manager.get_llm_config.return_value = LLMConfig(
+            ollama_host=host, connect_timeout=1.0, read_timeout=0.5
+        )
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(storage_manager)
+
+    def tearDown(self):
+        """Stop the fake server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_streams_content_and_reports_done_stats(self):
+        """Content chunks are yielded and the done chunk's stats reported."""
+        reported = []
+
+        chunks = list(
+            self.llm_service.chat_completion(
+                [{"role": "user", "content": "hi"}],
+                stream=True,
+                model="qwen3:latest",
+                on_complete=reported.append,
+            )
+        )
+
+        self.assertEqual(chunks, ["Hello", " there"])
+        self.assertEqual(len(reported), 1)
+        stats = reported[0]
+        self.assertEqual(stats["prompt_eval_count"], 42)
+        self.assertEqual(stats["eval_count"], 20)
+        self.assertEqual(stats["total_duration_ms"], 2000.0)
+        self.assertEqual(stats["prompt_eval_duration_ms"], 300.0)
+        self.assertEqual(stats["tokens_per_second"], 20.0)
+        self.assertEqual(self.llm_service.last_generation_stats, stats)
+        self.assertEqual(self.server.requests[0]["model"], "qwen3:latest")
+
+    def test_read_timeout_raises(self):
+        """A server slower than the read timeout fails instead of hanging."""
+        FakeOllamaHandler.delay = 1.0
+
+        with self.assertRaises(LLMServiceError):
+            list(
+                self.llm_service.chat_completion(
+                    [{"role": "user", "content": "hi"}],
+                    stream=True,
+                    model="qwen3:latest",
+                )
+            )
+
+    def test_session_is_shared_per_host(self):
+        """One pooled session is reused for every request to a host."""
+        host = self.llm_service.ollama_host
+
+        self.assertIs(get_http_session(host), get_http_session(host))
+        self.assertIsNot(get_http_session(host), get_http_session("http://other:1"))
+
+    def test_normalize_ollama_host(self):
+        """Host settings are normalized like OLLAMA_HOST."""
+        self.assertEqual(normalize_ollama_host(None), "http://localhost:11434")
+        self.assertEqual(normalize_ollama_host("gpu-box"), "http://gpu-box:11434")
+        self.assertEqual(
+            normalize_ollama_host("http://gpu-box:8080/"), "http://gpu-box:8080"
+        )
+        self.assertEqual(
+            normalize_ollama_host("https://llm.example"), "https://llm.example:443"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Tests for stable prompt prefixes and prompt-eval reporting.
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app.chat_service import ChatService, PromptEvalStats, prompt_eval_stats
+from app.llm_service import LLMService
+from app.models import ChatConfig, ChatMessage, ChatSession, LLMConfig
+from app.storage import StorageManager
+from app.storage.chat import ChatStorage
+
+
+class TestStablePromptPrefix(unittest.TestCase):
+    """Tests that consecutive turns share their prompt prefix."""
+
+    def setUp(self):
+        """Set up chat storage with a summarized session."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.config = ChatConfig(
+            context_window_size=4,
+            min_messages_for_summary=3,
+            conversation_summary_threshold=10000,
+        )
+        self.chat_storage.get_chat_config = MagicMock(return_value=self.config)
+        self.session = self.chat_storage.create_session(ChatSession(title="Garden"))
+
+        self.llm_service = MagicMock()
+        self.llm_service.chat_completion.return_value = {
+            "message": {"content": "Talked about the garden."}
+        }
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+        self.start = datetime(2025, 6, 1, 9, 0)
+        self.count = 0
+        prompt_eval_stats.reset()
+
+    def tearDown(self):
+        """Clean up temporary storage and shared stats."""
+        self.temp_dir.cleanup()
+        prompt_eval_stats.reset()
+
+    def _add_messages(self, count):
+        """Add alternating user and assistant messages to the session."""
+        for _ in range(count):
+            self.chat_storage.add_message(
+                ChatMessage(
+                    session_id=self.session.id,
+                    role="user" if self.count % 2 == 0 else "assistant",
+                    content=f"Message {self.count} about the garden",
+                    created_at=self.start + timedelta(minutes=self.count),
+                )
+            )
+            self.count += 1
+
+    def test_turns_do_not_slide_between_summary_refreshes(self):
+        """A new exchange appends to the prompt instead of shifting it."""
+        self._add_messages(10)
+        self.chat_service.update_session_summary(self.session.id)
+
+        first = self.chat_service._prepare_conversation_history(
+            self.session.id, self.config
+        )
+        self._add_messages(2)
+        second = self.chat_service._prepare_conversation_history(
+            self.session.id, self.config
+        )
+
+        self.assertEqual(second[: len(first)], first)
+        self.assertEqual(len(second), len(first) + 2)
+
+    def test_references_go_at_the_tail_with_citation_instructions(self):
+        """Retrieved entries follow the turns and the system prompt is untouched."""
+        self._add_messages(4)
+        history = self.chat_service._prepare_conversation_history(
+            self.session.id, self.config
+        )
+        system_prompt = history[0]["content"]
+        reference = {
+            "role": "system",
+            "content": "Here are some relevant journal entries to reference:\n"
+            "[1] Planted tomatoes.",
+        }
+        conversation = self.chat_service._pack_prompt(
+            history,
+            self.config,
+            context_messages=[reference],
+            query={"role": "user", "content": "What did I plant?"},
+        )
+
+        self.assertEqual(conversation[: len(history)], history)
+        self.assertEqual(conversation[-2], reference)
+
+        self.llm_service.chat_completion.return_value = iter(["You planted [1]."])
+        message = self.chat_storage.add_message(
+            ChatMessage(session_id=self.session.id, role="assistant", content="")
+        )
+        list(
+            self.chat_service._generate_streaming_response(
+                message.id, conversation, self.config
+            )
+        )
+
+        self.assertEqual(conversation[0]["content"], system_prompt)
+        self.assertEqual(conversation[-2], reference)
+
+    def test_streamed_turn_records_prompt_eval(self):
+        """Prompt-eval counts are saved with the message and added to the totals."""
+        conversation = [
+            {"role": "system", "content": "You are a journaling assistant."},
+            {"role": "user", "content": "How was my week?"},
+        ]
+
+        def chat_completion(**kwargs):
+            kwargs["on_complete"](
+                {"prompt_eval_count": 5, "prompt_eval_duration_ms": 12.5}
+            )
+            return iter(["Good."])
+
+        self.llm_service.chat_completion.side_effect = chat_completion
+        message = self.chat_storage.add_message(
+            ChatMessage(session_id=self.session.id, role="assistant", content="")
+        )
+        list(
+            self.chat_service._generate_streaming_response(
+                message.id, conversation, self.config
+            )
+        )
+
+        saved = self.chat_storage.get_message(message.id)
+        generation_stats = saved.metadata["generation_stats"]
+        self.assertGreater(generation_stats["prompt_tokens"], 5)
+        stats = prompt_eval_stats.get_stats()
+        self.assertEqual(stats["turns"], 1)
+        self.assertEqual(stats["prompt_eval_tokens"], 5)
+        self.assertEqual(stats["avg_prompt_eval_ms"], 12.5)
+
+
+class TestPromptEvalStats(unittest.TestCase):
+    """Tests for PromptEvalStats."""
+
+    def test_reuse_ratio(self):
+        """Reuse compares evaluated tokens with the prompt size."""
+        stats = PromptEvalStats()
+        stats.record(100, {"prompt_eval_count": 100, "prompt_eval_duration_ms": 40})
+        stats.record(120, {"prompt_eval_count": 20, "prompt_eval_duration_ms": 8})
+        stats.record(50, {"prompt_eval_count": None})
+
+        result = stats.get_stats()
+        self.assertEqual(result["turns"], 2)
+        self.assertEqual(result["prefix_reuse_ratio"], round(1 - 120 / 220, 3))
+        self.assertEqual(result["avg_prompt_eval_ms"], 24.0)
+        self.assertEqual(result["last_turn"]["prompt_eval_count"], 20)
+
+        stats.reset()
+        self.assertEqual(stats.get_stats()["turns"], 0)
+
+
+class TestKeepAlive(unittest.TestCase):
+    """Tests that chat requests ask Ollama to keep the model loaded."""
+
+    def setUp(self):
+        """Set up an LLM service with a fake client."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+        self.storage.save_llm_config(LLMConfig(keep_alive="1h"))
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+        self.client = MagicMock()
+        self.client.chat.return_value = {
+            "message": {"content": "Hi"},
+            "prompt_eval_count": 7,
+            "prompt_eval_duration": 3_000_000,
+        }
+        self.llm_service._ollama = lambda operation: self.client
+        self.llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def test_chat_completion_passes_keep_alive_and_reports_stats(self):
+        """keep_alive is sent and non-streamed stats reach on_complete."""
+        self.assertEqual(self.storage.get_llm_config().keep_alive, "1h")
+        stats = {}
+
+        self.llm_service.chat_completion(
+            messages=[{"role": "user", "content": "Hello"}], on_complete=stats.update
+        )
+
+        self.assertEqual(self.client.chat.call_args.kwargs["keep_alive"], "1h")
+        self.assertEqual(stats["prompt_eval_count"], 7)
+        self.assertEqual(stats["prompt_eval_duration_ms"], 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests for cached and local search query expansion.
+"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pydantic import ValidationError
+
+from app.llm_service import LLMService
+from app.models import JournalEntry, LLMConfig
+from app.query_expansion import (
+    CooccurrenceExpander,
+    ExpansionCache,
+    extract_terms,
+    normalize_query,
+)
+from app.storage import StorageManager
+
+
+class TestQueryExpansionHelpers(unittest.TestCase):
+    """Tests for normalization, term extraction and the LRU."""
+
+    def test_normalize_and_extract(self):
+        """Queries are lowercased and stopwords and short words dropped."""
+        self.assertEqual(normalize_query("  Garden   Plans "), "garden plans")
+        self.assertEqual(
+            extract_terms("Mom's garden and the big tomatoes"),
+            ["mom", "garden", "big", "tomatoes"],
+        )
+
+    def test_lru_evicts_least_recently_used(self):
+        """The oldest untouched expansion is evicted first."""
+        cache = ExpansionCache(max_size=2)
+        cache.put("a", "a terms")
+        cache.put("b", "b terms")
+        cache.get("a")
+        cache.put("c", "c terms")
+
+        self.assertEqual(cache.get("a"), "a terms")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get_stats()["size"], 2)
+
+
+class TestQueryExpansion(unittest.TestCase):
+    """Tests for LLMService._expand_semantic_query."""
+
+    def setUp(self):
+        """Set up storage with entries and an LLM service with a fake client."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+        texts = [
+            "Planted tomatoes and basil in the garden beds.",
+            "Watered the garden, the tomatoes need stakes and compost.",
+            "Garden compost is ready, spread it around the tomatoes.",
+            "Long meeting at work about the quarterly budget.",
+            "Budget review at work ran late again.",
+        ]
+        for i, text in enumerate(texts):
+            self.storage.save_entry(JournalEntry(title=f"Day {i}", content=text))
+
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+        self.client = MagicMock()
+        self.client.chat.return_value = {
+            "message": {"content": "garden plants vegetables soil"}
+        }
+        self.llm_service._ollama = lambda operation: self.client
+        self.llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def test_llm_expansion_is_cached_by_normalized_query(self):
+        """Repeated and re-spaced queries reuse the first expansion."""
+        first = self.llm_service._expand_semantic_query("Garden plants")
+        second = self.llm_service._expand_semantic_query("  garden   PLANTS")
+
+        self.assertEqual(first, "garden plants vegetables soil")
+        self.assertEqual(second, first)
+        self.assertEqual(self.client.chat.call_count, 1)
+        self.assertEqual(self.llm_service.get_query_expansion_stats()["hits"], 1)
+
+    def test_llm_expansion_persists_across_instances(self):
+        """A new service reads expansions stored by an earlier one."""
+        self.llm_service._expand_semantic_query("garden plants")
+
+        with patch("app.llm_service.ollama"):
+            restarted = LLMService(self.storage)
+        restarted._ollama = lambda operation: self.client
+        restarted._get_model_for_operation = lambda operation: "qwen3:latest"
+
+        self.assertEqual(
+            restarted._expand_semantic_query("garden plants"),
+            "garden plants vegetables soil",
+        )
+        self.assertEqual(self.client.chat.call_count, 1)
+
+    def test_model_change_misses_cache(self):
+        """Expansions are keyed by the search model."""
+        self.llm_service._expand_semantic_query("garden plants")
+        self.llm_service._get_model_for_operation = lambda operation: "llama3:8b"
+        self.llm_service._expand_semantic_query("garden plants")
+
+        self.assertEqual(self.client.chat.call_count, 2)
+
+    def test_failed_expansion_is_not_cached(self):
+        """A failed generation falls back to the query and is retried next time."""
+        self.client.chat.side_effect = [
+            RuntimeError("offline"),
+            {"message": {"content": "garden plants soil"}},
+        ]
+
+        self.assertEqual(
+            self.llm_service._expand_semantic_query("garden plants"), "garden plants"
+        )
+        self.assertEqual(
+            self.llm_service._expand_semantic_query("garden plants"),
+            "garden plants soil",
+        )
+        self.assertEqual(self.client.chat.call_count, 2)
+
+    def test_local_expansion_uses_cooccurring_terms(self):
+        """Local mode finds related terms without calling the model."""
+        self.llm_service.config = LLMConfig(query_expansion="local")
+
+        expanded = self.llm_service._expand_semantic_query("garden")
+
+        self.assertTrue(expanded.startswith("garden "))
+        self.assertIn("tomatoes", expanded.split())
+        self.assertIn("compost", expanded.split())
+        self.assertNotIn("budget", expanded.split())
+        self.client.chat.assert_not_called()
+
+    def test_local_expansion_checks_corpus_once_per_query(self):
+        """Each local expansion reads the corpus version a single time."""
+        self.llm_service.config = LLMConfig(query_expansion="local")
+        with patch.object(
+            self.storage,
+            "get_chunk_corpus_version",
+            wraps=self.storage.get_chunk_corpus_version,
+        ) as get_version:
+            self.llm_service._expand_semantic_query("garden")
+
+        self.assertEqual(get_version.call_count, 1)
+
+    def test_unknown_mode_is_rejected(self):
+        """A misspelled expansion mode fails validation."""
+        with self.assertRaises(ValidationError):
+            LLMConfig(query_expansion="lcoal")
+
+    def test_local_index_rebuilds_when_chunks_change(self):
+        """New entries are picked up by the co-occurrence index."""
+        expander = CooccurrenceExpander(self.storage, max_terms=20)
+        self.assertNotIn("spreadsheet", expander.expand("budget"))
+        version = expander.version
+
+        self.storage.save_entry(
+            JournalEntry(title="Work", content="Budget spreadsheet for the team.")
+        )
+
+        self.assertIn("spreadsheet", expander.expand("budget"))
+        self.assertNotEqual(expander.version, version)
+
+    def test_off_mode_returns_query(self):
+        """With expansion off the query is searched as written."""
+        self.llm_service.config = LLMConfig(query_expansion="off")
+
+        self.assertEqual(
+            self.llm_service._expand_semantic_query("garden plants"), "garden plants"
+        )
+        self.client.chat.assert_not_called()
+
+    def test_setting_round_trips_through_storage(self):
+        """The query_expansion setting is saved with the LLM config."""
+        self.storage.save_llm_config(LLMConfig(query_expansion="local"))
+
+        self.assertEqual(self.storage.get_llm_config().query_expansion, "local")
+
+
+if __name__ == "__main__":
+    unittest.main()
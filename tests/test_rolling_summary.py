@@ -0,0 +1,140 @@
+"""
+Tests for incremental rolling conversation summaries.
+"""
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app.chat_service import ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+
+
+class TestRollingSummary(unittest.TestCase):
+    """Tests for watermark-based summary refreshes."""
+
+    def setUp(self):
+        """Set up chat storage with a session and a mocked LLM."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.config = ChatConfig(
+            context_window_size=4,
+            min_messages_for_summary=3,
+            conversation_summary_threshold=50,
+        )
+        self.chat_storage.get_chat_config = MagicMock(return_value=self.config)
+        self.session = self.chat_storage.create_session(ChatSession(title="Garden"))
+
+        self.llm_service = MagicMock()
+        self.llm_service.chat_completion.side_effect = lambda **kwargs: {
+            "message": {
+                "content": f"summary {self.llm_service.chat_completion.call_count}"
+            }
+        }
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+        self.start = datetime(2025, 6, 1, 9, 0)
+        self.count = 0
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _add_messages(self, count):
+        """Add alternating user and assistant messages to the session."""
+        added = []
+        for _ in range(count):
+            added.append(
+                self.chat_storage.add_message(
+                    ChatMessage(
+                        session_id=self.session.id,
+                        role="user" if self.count % 2 == 0 else "assistant",
+                        content=f"Message {self.count} about the garden",
+                        created_at=self.start + timedelta(minutes=self.count),
+                    )
+                )
+            )
+            self.count += 1
+        return added
+
+    def _summarized_messages(self, call_index):
+        """Get the chat messages sent in a summary call, minus the prompt."""
+        call = self.llm_service.chat_completion.call_args_list[call_index]
+        return call.kwargs["messages"][:-1]
+
+    def test_refresh_folds_only_new_messages(self):
+        """A second refresh sends the old summary plus messages since the watermark."""
+        messages = self._add_messages(10)
+        self.assertTrue(self.chat_service.update_session_summary(self.session.id))
+
+        session = self.chat_storage.get_session(self.session.id)
+        self.assertEqual(session.context_summary, "summary 1")
+        self.assertEqual(session.summary_watermark, messages[5].id)
+        self.assertEqual(len(self._summarized_messages(0)), 6)
+
+        self._add_messages(3)
+        self.assertTrue(self.chat_service.update_session_summary(self.session.id))
+
+        sent = self._summarized_messages(1)
+        self.assertEqual(sent[0]["role"], "system")
+        self.assertIn("summary 1", sent[0]["content"])
+        self.assertEqual(
+            [msg["content"] for msg in sent[1:]],
+            [f"Message {i} about the garden" for i in (6, 7, 8)],
+        )
+        session = self.chat_storage.get_session(self.session.id)
+        self.assertEqual(session.context_summary, "summary 2")
+
+    def test_refresh_without_new_history_is_skipped(self):
+        """Nothing is sent to the LLM when the summary is already current."""
+        self._add_messages(10)
+        self.chat_service.update_session_summary(self.session.id)
+
+        self.assertFalse(self.chat_service.update_session_summary(self.session.id))
+        self.assertEqual(self.llm_service.chat_completion.call_count, 1)
+
+    def test_missing_watermark_rebuilds_summary(self):
+        """If the watermark message is gone, the summary is rebuilt in full."""
+        messages = self._add_messages(10)
+        self.chat_service.update_session_summary(self.session.id)
+        self.chat_storage.delete_message(messages[5].id)
+        self._add_messages(2)
+
+        self.assertTrue(self.chat_service.update_session_summary(self.session.id))
+        self.assertEqual(len(self._summarized_messages(1)), 7)
+
+    def test_windowing_schedules_refresh_past_threshold(self):
+        """A stale summary is refreshed in the background, not inline."""
+        self._add_messages(10)
+        self.chat_service.update_session_summary(self.session.id)
+        self._add_messages(12)
+
+        with patch("app.chat_service.housekeeping_queue") as queue:
+            conversation = self.chat_service._prepare_conversation_history(
+                self.session.id, self.config
+            )
+
+        self.assertIn("summary 1", conversation[1]["content"])
+        self.assertEqual(self.llm_service.chat_completion.call_count, 1)
+        queue.schedule.assert_called_once()
+        self.assertEqual(
+            queue.schedule.call_args[0][0], ("session_summary", self.session.id)
+        )
+
+    def test_windowing_does_not_refresh_below_threshold(self):
+        """A summary with little new history is used as is."""
+        self._add_messages(10)
+        self.chat_service.update_session_summary(self.session.id)
+        self._add_messages(1)
+
+        with patch("app.chat_service.housekeeping_queue") as queue:
+            self.chat_service._prepare_conversation_history(
+                self.session.id, self.config
+            )
+
+        queue.schedule.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
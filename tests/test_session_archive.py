@@ -0,0 +1,199 @@
+"""
+Tests for archiving idle chat sessions to the archive database.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+import zlib
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from app.chat_service import ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession, EntryReference
+from app.storage.chat import ChatStorage
+
+
+class TestSessionArchive(unittest.TestCase):
+    """Tests for moving sessions between the chat and archive databases."""
+
+    def setUp(self):
+        """Create an old and a recent session with messages."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        now = datetime.now()
+
+        self.old = self._create_session("Tomato planning", now - timedelta(days=120))
+        self._add_message(self.old, "user", "Which tomato varieties grow best?")
+        self.answer = self._add_message(
+            self.old,
+            "assistant",
+            "Cherry tomatoes do well in pots.",
+            [EntryReference(message_id="", entry_id="e1", similarity_score=0.9)],
+        )
+        self.recent = self._create_session("Budget", now - timedelta(days=2))
+        self._add_message(self.recent, "user", "The budget meeting ran late.")
+
+        # Adding messages touches last_accessed, so age the sessions again
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        conn.execute(
+            "UPDATE chat_sessions "
+            "SET last_accessed = created_at, updated_at = created_at"
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _create_session(self, title, when):
+        """Create a session last accessed at the given time."""
+        return self.chat_storage.create_session(
+            ChatSession(
+                title=title, created_at=when, updated_at=when, last_accessed=when
+            )
+        )
+
+    def _add_message(self, session, role, content, references=None):
+        """Add a message to a session."""
+        return self.chat_storage.add_message(
+            ChatMessage(session_id=session.id, role=role, content=content),
+            references=references,
+        )
+
+    def _count(self, sql, *params):
+        """Run a COUNT query against the chat database."""
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        count = conn.execute(sql, params).fetchone()[0]
+        conn.close()
+        return count
+
+    def test_idle_sessions_leave_the_hot_tables(self):
+        """Only sessions idle past the threshold are moved, with their rows."""
+        self.assertEqual(self.chat_storage.archive_idle_sessions(idle_days=90), 1)
+
+        self.assertEqual(
+            [s.id for s in self.chat_storage.list_sessions()], [self.recent.id]
+        )
+        sql = "SELECT COUNT(*) FROM chat_messages WHERE session_id = ?"
+        self.assertEqual(self._count(sql, self.old.id), 0)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM chat_message_entries"), 0)
+        self.assertEqual(self.chat_storage.count_search_results("tomatoes"), 0)
+
+        conn = sqlite3.connect(self.chat_storage.archive_path)
+        (blob,) = conn.execute("SELECT messages FROM archived_sessions").fetchone()
+        conn.close()
+        self.assertNotIn(b"Cherry tomatoes", blob)
+
+    def test_archived_sessions_are_searchable(self):
+        """The archive has its own index over titles and message text."""
+        self.chat_storage.archive_idle_sessions(idle_days=90)
+
+        sessions, total = self.chat_storage.list_archived_sessions("cherry")
+        self.assertEqual(total, 1)
+        self.assertEqual(sessions[0].id, self.old.id)
+        self.assertEqual(sessions[0].message_count, 2)
+        self.assertEqual(sessions[0].entry_count, 1)
+
+        self.assertEqual(self.chat_storage.list_archived_sessions("budget"), ([], 0))
+        self.assertEqual(self.chat_storage.list_archived_sessions("")[1], 1)
+        self.assertEqual(
+            self.chat_storage.list_archived_sessions("tomato", offset=5), ([], 1)
+        )
+
+    def test_reading_an_archived_session_leaves_it_archived(self):
+        """get_session doesn't restore; only restores and new messages do."""
+        self.chat_storage.archive_idle_sessions(idle_days=90)
+
+        self.assertIsNone(self.chat_storage.get_session(self.old.id))
+        self.assertIsNone(self.chat_storage.get_session("chat-missing"))
+        self.assertEqual(self.chat_storage.list_archived_sessions("")[1], 1)
+
+        session = self.chat_storage.get_or_restore_session(self.old.id)
+        self.assertEqual(session.title, "Tomato planning")
+        self.assertIsNone(self.chat_storage.get_or_restore_session("chat-missing"))
+
+    def test_restoring_an_archived_session(self):
+        """restore_session brings an archived session back with its messages."""
+        self.chat_storage.archive_idle_sessions(idle_days=90)
+
+        self.assertTrue(self.chat_storage.restore_session(self.old.id))
+        session = self.chat_storage.get_session(self.old.id)
+
+        self.assertEqual(session.title, "Tomato planning")
+        self.assertGreater(session.last_accessed, datetime.now() - timedelta(hours=1))
+        self.assertEqual(
+            [m.content for m in self.chat_storage.get_messages(self.old.id)],
+            ["Which tomato varieties grow best?", "Cherry tomatoes do well in pots."],
+        )
+        self.assertEqual(
+            [
+                ref.entry_id
+                for ref in self.chat_storage.get_message_entry_references(
+                    self.answer.id
+                )
+            ],
+            ["e1"],
+        )
+        self.assertEqual(self.chat_storage.count_search_results("cherry"), 1)
+        self.assertEqual(self.chat_storage.list_archived_sessions("cherry"), ([], 0))
+        self.assertFalse(self.chat_storage.restore_session(self.old.id))
+
+    def test_archiving_again_replaces_the_search_index_row(self):
+        """Re-archiving indexes only the session's current text."""
+        self.chat_storage.archive_session(self.old.id)
+        self.chat_storage.restore_session(self.old.id)
+        self._add_message(self.old, "user", "Basil grows next to them.")
+        self.chat_storage.archive_session(self.old.id)
+
+        # A session still in the archive is archived over its old copy
+        session = self.chat_storage.get_session(self.recent.id)
+        session.title = "Tomato budget"
+        conn = sqlite3.connect(self.chat_storage.archive_path)
+        conn.execute(
+            "INSERT INTO archived_sessions VALUES (?, '', '', ?, ?)",
+            (
+                session.id,
+                '{"title": "Stale title"}',
+                zlib.compress(b'{"messages": [], "references": []}'),
+            ),
+        )
+        conn.execute(
+            "INSERT INTO archived_sessions_fts (rowid, title, content) "
+            "VALUES (last_insert_rowid(), 'Stale title', '')"
+        )
+        conn.commit()
+        conn.close()
+        self.chat_storage.update_session(session)
+        self.chat_storage.archive_session(self.recent.id)
+
+        self.assertEqual(self.chat_storage.list_archived_sessions("basil")[1], 1)
+        self.assertEqual(self.chat_storage.list_archived_sessions("cherry")[1], 1)
+        self.assertEqual(self.chat_storage.list_archived_sessions("stale"), ([], 0))
+        self.assertEqual(self.chat_storage.list_archived_sessions("tomato")[1], 2)
+        conn = sqlite3.connect(self.chat_storage.archive_path)
+        (indexed,) = conn.execute(
+            "SELECT COUNT(*) FROM archived_sessions_fts"
+        ).fetchone()
+        conn.close()
+        self.assertEqual(indexed, 2)
+
+    def test_unknown_session_is_not_found(self):
+        """A session in neither database is still reported missing."""
+        self.assertIsNone(self.chat_storage.get_session("chat-missing"))
+        self.assertFalse(self.chat_storage.archive_session("chat-missing"))
+
+    def test_sweep_follows_chat_config(self):
+        """The housekeeping sweep only archives when archive_after_days is set."""
+        chat_service = ChatService(self.chat_storage, MagicMock())
+
+        self.assertEqual(chat_service.archive_idle_sessions(), 0)
+
+        self.chat_storage.update_chat_config(ChatConfig(archive_after_days=90))
+        self.assertEqual(chat_service.archive_idle_sessions(), 1)
+        self.assertEqual(self.chat_storage.count_sessions(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
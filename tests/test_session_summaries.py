@@ -0,0 +1,156 @@
+"""
+Tests for the denormalized message counts and preview on chat sessions.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.models import ChatMessage, ChatSession, EntryReference
+from app.storage.chat import ChatStorage
+
+
+class TestSessionSummaries(unittest.TestCase):
+    """Tests that session list columns follow message writes."""
+
+    def setUp(self):
+        """Create a session in temporary storage."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Garden"))
+        self.start = datetime(2025, 6, 1, 9, 0)
+        self.count = 0
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _add_message(self, role, content, references=None):
+        """Add a message to the session."""
+        self.count += 1
+        return self.chat_storage.add_message(
+            ChatMessage(
+                session_id=self.session.id,
+                role=role,
+                content=content,
+                created_at=self.start + timedelta(minutes=self.count),
+            ),
+            references=references,
+        )
+
+    def _session(self):
+        """Read the session back from storage."""
+        return self.chat_storage.get_session(self.session.id)
+
+    def test_counts_and_preview_follow_added_messages(self):
+        """Adding messages updates the counters and the assistant preview."""
+        self._add_message("user", "What did I plant?")
+        self._add_message("assistant", "You planted tomatoes. " * 10)
+        self._add_message("user", "Anything else?")
+
+        session = self._session()
+        self.assertEqual(session.message_count, 3)
+        self.assertEqual(session.user_message_count, 2)
+        self.assertEqual(session.assistant_message_count, 1)
+        self.assertEqual(len(session.last_message_preview), 103)
+        self.assertTrue(session.last_message_preview.endswith("..."))
+
+        listed = self.chat_storage.list_sessions(sort_by="message_count")[0]
+        self.assertEqual(listed, session)
+        self.assertEqual(
+            self.chat_storage.get_session_stats(self.session.id),
+            {
+                "message_count": 3,
+                "user_message_count": 2,
+                "assistant_message_count": 1,
+                "reference_count": 0,
+                "last_message_preview": session.last_message_preview,
+            },
+        )
+
+    def test_preview_follows_streamed_and_edited_content(self):
+        """The preview is set when a stream finishes and when a message changes."""
+        message = self._add_message("assistant", "")
+        writer = self.chat_storage.open_message_stream(message.id)
+        writer.append("Basil ")
+        writer.append("is thriving.")
+        self.assertEqual(self._session().last_message_preview, "")
+
+        writer.finish()
+        self.assertEqual(self._session().last_message_preview, "Basil is thriving.")
+
+        self.chat_storage.update_message_content(message.id, "Basil needs water.")
+        self.assertEqual(self._session().last_message_preview, "Basil needs water.")
+
+        self.chat_storage.update_message(message.id, "Basil was harvested.")
+        self.assertEqual(self._session().last_message_preview, "Basil was harvested.")
+
+    def test_deletes_recount_the_session(self):
+        """Deleting messages updates counts, references and the preview."""
+        self._add_message("user", "Question")
+        self._add_message("assistant", "First answer")
+        self._add_message("user", "Follow-up")
+        cited = self._add_message(
+            "assistant",
+            "Second answer",
+            [EntryReference(message_id="", entry_id="e1", similarity_score=0.9)],
+        )
+        self.assertEqual(self._session().entry_count, 1)
+
+        self.chat_storage.delete_message(cited.id)
+
+        session = self._session()
+        self.assertEqual(session.message_count, 3)
+        self.assertEqual(session.assistant_message_count, 1)
+        self.assertEqual(session.entry_count, 0)
+        self.assertEqual(session.last_message_preview, "First answer")
+
+        self.chat_storage.delete_messages_range(self.session.id, 0, 2)
+
+        session = self._session()
+        self.assertEqual(session.message_count, 0)
+        self.assertEqual(session.user_message_count, 0)
+        self.assertIsNone(session.last_message_preview)
+
+    def test_existing_sessions_are_backfilled(self):
+        """Opening a database from before the columns fills them in."""
+        base_dir = os.path.join(self.temp_dir.name, "old")
+        os.makedirs(base_dir)
+        conn = sqlite3.connect(os.path.join(base_dir, "journal.db"))
+        conn.executescript(
+            """
+            CREATE TABLE chat_sessions (
+                id TEXT PRIMARY KEY, title TEXT, created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL, last_accessed TEXT NOT NULL,
+                context_summary TEXT, temporal_filter TEXT,
+                entry_count INTEGER DEFAULT 0
+            );
+            CREATE TABLE chat_messages (
+                id TEXT PRIMARY KEY, session_id TEXT NOT NULL, role TEXT NOT NULL,
+                content TEXT NOT NULL, created_at TEXT NOT NULL, metadata TEXT,
+                token_count INTEGER
+            );
+            INSERT INTO chat_sessions VALUES (
+                'chat-old', 'Old', '2025-01-01T09:00:00', '2025-01-01T09:00:00',
+                '2025-01-01T09:00:00', NULL, NULL, 0
+            );
+            INSERT INTO chat_messages VALUES
+                ('m1', 'chat-old', 'user', 'Hi', '2025-01-01T09:01:00', NULL, NULL),
+                ('m2', 'chat-old', 'assistant', 'Hello', '2025-01-01T09:02:00',
+                 NULL, NULL);
+            """
+        )
+        conn.close()
+
+        session = ChatStorage(base_dir).get_session("chat-old")
+
+        self.assertEqual(session.message_count, 2)
+        self.assertEqual(session.user_message_count, 1)
+        self.assertEqual(session.assistant_message_count, 1)
+        self.assertEqual(session.last_message_preview, "Hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
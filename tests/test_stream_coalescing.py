@@ -0,0 +1,148 @@
+"""
+Tests for coalescing streamed tokens into fewer SSE events.
+"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+
+from app.chat_routes import _stream_events, _stream_metadata
+from app.models import ChatConfig, EntryReference
+from app.storage.chat import ChatStorage
+
+
+class ConnectedRequest:
+    """Request whose client never disconnects."""
+
+    def __init__(self):
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return False
+
+
+def collect(chunks, **limits):
+    """Serve chunks through _stream_events and return the text events."""
+    request = ConnectedRequest()
+
+    async def consume():
+        return [
+            event
+            async for event in _stream_events(
+                request, "data: {}\n\n", iter(chunks), **limits
+            )
+        ]
+
+    events = asyncio.run(consume())
+    assert events[0] == "data: {}\n\n" and events[-1] == "data: [DONE]\n\n"
+    texts = [json.loads(event.removeprefix("data: "))["text"] for event in events[1:-1]]
+    return texts, request.checks
+
+
+class TestStreamCoalescing(unittest.TestCase):
+    """Tests for token coalescing in _stream_events."""
+
+    def test_uncoalesced_stream_sends_each_chunk(self):
+        """With no limits every chunk is its own event."""
+        texts, checks = collect(["a", "b", "c"])
+
+        self.assertEqual(texts, ["a", "b", "c"])
+        self.assertEqual(checks, 3)
+
+    def test_chunks_are_batched_by_size(self):
+        """Chunks are held until the byte limit, and the rest sent at the end."""
+        texts, checks = collect(
+            ["ab", "cd", "ef", "gh", "i"], coalesce_ms=60_000, coalesce_bytes=4
+        )
+
+        self.assertEqual(texts, ["abcd", "efgh", "i"])
+        self.assertEqual(checks, 2)
+
+    def test_chunks_are_batched_by_time(self):
+        """A long window holds everything until the stream ends."""
+        chunks = [f"w{i} " for i in range(50)]
+
+        texts, _ = collect(chunks, coalesce_ms=60_000, coalesce_bytes=1_000_000)
+
+        self.assertEqual(texts, ["".join(chunks)])
+
+    def test_buffered_text_is_sent_before_an_error(self):
+        """Text generated before a failure still reaches the client."""
+
+        def failing():
+            yield "partial "
+            raise RuntimeError("boom")
+
+        async def consume():
+            return [
+                event
+                async for event in _stream_events(
+                    ConnectedRequest(),
+                    "data: {}\n\n",
+                    failing(),
+                    coalesce_ms=60_000,
+                    coalesce_bytes=1000,
+                )
+            ]
+
+        events = asyncio.run(consume())
+
+        self.assertEqual(json.loads(events[1][6:]), {"text": "partial "})
+        self.assertEqual(json.loads(events[2][6:]), {"error": "boom"})
+
+
+class TestStreamMetadata(unittest.TestCase):
+    """Tests for the first event of a stream."""
+
+    def test_tool_data_is_passed_by_reference(self):
+        """Tool results are summarized and their data linked, not inlined."""
+        tool_results = [
+            {
+                "tool_name": "web_search",
+                "success": True,
+                "data": {"results": [{"title": "x" * 5000}]},
+                "metadata": {"execution_time_ms": 120, "result_count": 1},
+            }
+        ]
+        references = [
+            EntryReference(message_id="msg-1", entry_id="e1", similarity_score=0.9)
+        ]
+
+        metadata = _stream_metadata("chat-1", "msg-1", references, tool_results)
+
+        self.assertEqual(
+            metadata.tool_results,
+            [
+                {
+                    "tool_name": "web_search",
+                    "success": True,
+                    "error": None,
+                    "metadata": {"execution_time_ms": 120, "result_count": 1},
+                }
+            ],
+        )
+        self.assertEqual(
+            metadata.tool_results_url,
+            "/chat/sessions/chat-1/messages/msg-1/tool-results",
+        )
+        self.assertLess(len(metadata.json()), 1000)
+        self.assertIsNone(_stream_metadata("chat-1", "msg-1", [], []).tool_results_url)
+
+    def test_coalescing_settings_round_trip(self):
+        """Coalescing limits are saved with the chat config."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chat_storage = ChatStorage(temp_dir)
+            chat_storage.update_chat_config(
+                ChatConfig(stream_coalesce_ms=50, stream_coalesce_bytes=256)
+            )
+
+            config = chat_storage.get_chat_config()
+
+        self.assertEqual(config.stream_coalesce_ms, 50)
+        self.assertEqual(config.stream_coalesce_bytes, 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
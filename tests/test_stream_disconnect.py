@@ -0,0 +1,197 @@
+"""
+Tests for cancelling streamed generation when the client disconnects.
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from app.chat_routes import _stream_events
+from app.chat_service import ChatService, StreamStats, stream_stats
+from app.models import ChatConfig, ChatMessage, ChatSession, EntryReference
+from app.storage.chat import ChatStorage
+
+
+class FakeRequest:
+    """Request whose client disconnects after a number of checks."""
+
+    def __init__(self, connected_checks):
+        self.connected_checks = connected_checks
+
+    async def is_disconnected(self):
+        self.connected_checks -= 1
+        return self.connected_checks < 0
+
+
+class TestDisconnectAwareStreaming(unittest.TestCase):
+    """Tests that abandoned streams stop generating and are recorded."""
+
+    def setUp(self):
+        """Set up a chat service whose LLM stream reports when it is closed."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Stream"))
+        self.message = self.chat_storage.add_message(
+            ChatMessage(
+                session_id=self.session.id,
+                role="assistant",
+                content="",
+                status="streaming",
+            )
+        )
+        self.upstream = {"generated": 0, "closed": False}
+
+        def generate(**kwargs):
+            try:
+                for i in range(100):
+                    self.upstream["generated"] += 1
+                    yield f"word{i} "
+            finally:
+                self.upstream["closed"] = True
+
+        self.llm_service = MagicMock()
+        self.llm_service.chat_completion.side_effect = generate
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+        self.chat_service._schedule_session_housekeeping = MagicMock()
+        stream_stats.reset()
+
+    def tearDown(self):
+        """Clean up temporary storage and shared stats."""
+        self.temp_dir.cleanup()
+        stream_stats.reset()
+
+    def _run(self, request):
+        """Serve the stream to a fake client and collect the events."""
+        response_iterator = self.chat_service._generate_streaming_response(
+            self.message.id, [{"role": "user", "content": "Hi"}], ChatConfig()
+        )
+
+        async def consume():
+            return [
+                event
+                async for event in _stream_events(
+                    request, "data: {}\n\n", response_iterator
+                )
+            ]
+
+        return asyncio.run(consume())
+
+    def test_disconnect_aborts_upstream_and_truncates(self):
+        """A client that goes away stops generation and truncates the message."""
+        events = self._run(FakeRequest(connected_checks=3))
+
+        self.assertEqual(len(events), 4)  # metadata + three chunks, no [DONE]
+        self.assertTrue(self.upstream["closed"])
+        self.assertEqual(self.upstream["generated"], 4)
+
+        stored = self.chat_storage.get_message(self.message.id)
+        self.assertEqual(stored.status, "truncated")
+        self.assertEqual(stored.content, "word0 word1 word2 word3 ")
+        self.assertTrue(stored.metadata["truncated"])
+
+        stats = stream_stats.get_stats()
+        self.assertEqual(stats["outcomes"]["abandoned"]["streams"], 1)
+        self.assertEqual(stats["outcomes"]["abandoned"]["chunks"], 4)
+        self.assertEqual(stats["abandon_rate"], 1.0)
+        self.chat_service._schedule_session_housekeeping.assert_not_called()
+
+    def test_connected_client_gets_whole_stream(self):
+        """A client that stays connected receives every chunk and [DONE]."""
+        events = self._run(FakeRequest(connected_checks=1000))
+
+        self.assertEqual(events[-1], "data: [DONE]\n\n")
+        self.assertEqual(json.loads(events[1].removeprefix("data: "))["text"], "word0 ")
+        self.assertEqual(len(events), 102)
+        self.assertEqual(
+            self.chat_storage.get_message(self.message.id).status, "complete"
+        )
+        self.assertEqual(
+            stream_stats.get_stats()["outcomes"]["completed"]["streams"], 1
+        )
+
+    def test_close_after_model_finished_keeps_message_complete(self):
+        """A client leaving during the citation tail doesn't truncate."""
+        self.llm_service.chat_completion.side_effect = None
+        self.llm_service.chat_completion.return_value = iter(["See [1]."])
+        self.chat_service._enhance_citations = MagicMock(
+            return_value="See [1].\n\nSources: Garden"
+        )
+        stream = self.chat_service._generate_streaming_response(
+            self.message.id,
+            [{"role": "user", "content": "Hi"}],
+            ChatConfig(),
+            references=[
+                EntryReference(
+                    message_id=self.message.id, entry_id="e1", similarity_score=0.9
+                )
+            ],
+        )
+
+        self.assertEqual(next(stream), "See [1].")
+        self.assertEqual(next(stream), "\n\nSources: Garden")
+        stream.close()
+
+        stored = self.chat_storage.get_message(self.message.id)
+        self.assertEqual(stored.status, "complete")
+        self.assertEqual(stored.content, "See [1].\n\nSources: Garden")
+        self.assertEqual(stream_stats.get_stats()["abandon_rate"], 0.0)
+
+    def test_slow_chunks_dont_block_the_event_loop(self):
+        """Chunks are fetched off the loop, so other tasks keep running."""
+
+        def slow_chunks():
+            for word in ("slow ", "model"):
+                time.sleep(0.2)
+                yield word
+
+        async def consume():
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(1)
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            events = [
+                event
+                async for event in _stream_events(
+                    FakeRequest(connected_checks=1000), "data: {}\n\n", slow_chunks()
+                )
+            ]
+            ticker.cancel()
+            return events, len(ticks)
+
+        events, ticks = asyncio.run(consume())
+
+        self.assertEqual(len(events), 4)
+        self.assertGreater(ticks, 10)
+
+
+class TestStreamStats(unittest.TestCase):
+    """Tests for StreamStats."""
+
+    def test_outcomes_and_abandon_rate(self):
+        """Outcomes are counted separately and averaged per outcome."""
+        stats = StreamStats()
+        stats.record("completed", 100, 2000.0)
+        stats.record("completed", 50, 1000.0)
+        stats.record("abandoned", 10, 300.0)
+        stats.record("error", 0, 5.0)
+
+        result = stats.get_stats()
+        self.assertEqual(result["streams"], 4)
+        self.assertEqual(result["abandon_rate"], 0.25)
+        self.assertEqual(result["outcomes"]["completed"]["chunks"], 150)
+        self.assertEqual(result["outcomes"]["completed"]["avg_duration_ms"], 1500.0)
+        self.assertEqual(result["outcomes"]["abandoned"]["avg_duration_ms"], 300.0)
+
+        stats.reset()
+        self.assertEqual(stats.get_stats()["streams"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
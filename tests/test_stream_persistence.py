@@ -0,0 +1,250 @@
+"""
+Tests for incremental persistence of streamed assistant messages.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from app.chat_service import ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+
+
+class TestMessageStreamWriter(unittest.TestCase):
+    """Tests for MessageStreamWriter."""
+
+    def setUp(self):
+        """Create a session with an empty streaming message."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Stream"))
+        self.message = self.chat_storage.add_message(
+            ChatMessage(
+                session_id=self.session.id,
+                role="assistant",
+                content="",
+                status="streaming",
+                metadata={"is_streaming": True},
+            )
+        )
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _stored(self):
+        """Read the message back from storage."""
+        return self.chat_storage.get_message(self.message.id)
+
+    def test_flushes_in_batches(self):
+        """Text is written every flush_chunks chunks, not every chunk."""
+        writer = self.chat_storage.open_message_stream(
+            self.message.id, flush_chunks=3, flush_interval_ms=60_000
+        )
+        self.assertEqual(writer.session_id, self.session.id)
+
+        for chunk in ("a", "b"):
+            writer.append(chunk)
+        self.assertEqual(self._stored().content, "")
+
+        writer.append("c")
+        self.assertEqual(self._stored().content, "abc")
+        self.assertEqual(writer.flush_count, 1)
+        writer.close()
+
+    def test_flushes_after_interval(self):
+        """A slow stream is still written once the interval passes."""
+        writer = self.chat_storage.open_message_stream(
+            self.message.id, flush_chunks=100, flush_interval_ms=0
+        )
+
+        writer.append("slow ")
+        self.assertEqual(self._stored().content, "slow ")
+        writer.close()
+
+    def test_flush_limits_grow_with_text(self):
+        """Long replies are written a bounded number of times."""
+        writer = self.chat_storage.open_message_stream(
+            self.message.id, flush_chunks=1, flush_interval_ms=60_000, flush_chars=10
+        )
+
+        for _ in range(1000):
+            writer.append("word ")
+
+        self.assertLess(writer.flush_count, 100)
+        writer.close()
+        self.assertEqual(self._stored().content, "word " * 1000)
+
+    def test_only_final_text_is_indexed(self):
+        """Flushes while streaming don't touch the full-text index."""
+        writer = self.chat_storage.open_message_stream(
+            self.message.id, flush_chunks=1, flush_interval_ms=60_000
+        )
+        writer.append("marmalade")
+
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        query = "SELECT content FROM chat_messages_fts WHERE message_id = ?"
+        self.assertEqual(conn.execute(query, (self.message.id,)).fetchone()[0], "")
+
+        writer.finish("complete")
+        self.assertEqual(
+            conn.execute(query, (self.message.id,)).fetchone()[0], "marmalade"
+        )
+        conn.close()
+
+    def test_interrupted_messages_are_recovered(self):
+        """Messages left streaming by a crash are marked truncated."""
+        writer = self.chat_storage.open_message_stream(self.message.id)
+        writer.append("Cut off")
+        writer.close()
+
+        self.assertEqual(self.chat_storage.recover_interrupted_messages(), 1)
+        stored = self._stored()
+        self.assertEqual((stored.content, stored.status), ("Cut off", "truncated"))
+        found = self.chat_storage.search_messages_in_session(self.session.id, "cut")
+        self.assertEqual([message.id for message in found], [self.message.id])
+        self.assertEqual(self.chat_storage.recover_interrupted_messages(), 0)
+
+    def test_finish_sets_status_and_metadata(self):
+        """Finishing writes the final text, status and merged metadata."""
+        writer = self.chat_storage.open_message_stream(self.message.id)
+        writer.append("Hello")
+
+        writer.finish("complete", metadata_updates={"generation_stats": {"n": 1}})
+
+        stored = self._stored()
+        self.assertEqual(stored.content, "Hello")
+        self.assertEqual(stored.status, "complete")
+        self.assertEqual(
+            stored.metadata, {"is_streaming": True, "generation_stats": {"n": 1}}
+        )
+        self.assertTrue(writer.closed)
+
+    def test_close_keeps_partial_text_as_streaming(self):
+        """Closing without finishing keeps the text and the streaming status."""
+        writer = self.chat_storage.open_message_stream(
+            self.message.id, flush_chunks=100, flush_interval_ms=60_000
+        )
+        writer.append("Half an ")
+        writer.append("answer")
+
+        writer.close()
+
+        stored = self._stored()
+        self.assertEqual(stored.content, "Half an answer")
+        self.assertEqual(stored.status, "streaming")
+
+    def test_status_column_is_added_to_old_tables(self):
+        """Databases created before the status column are migrated."""
+        conn = sqlite3.connect(self.chat_storage.db_path)
+        conn.execute("DROP TRIGGER chat_messages_fts_update")
+        conn.execute("ALTER TABLE chat_messages DROP COLUMN status")
+        conn.commit()
+        conn.close()
+
+        ChatStorage(self.temp_dir.name)
+
+        self.assertEqual(self._stored().status, "complete")
+
+
+class TestStreamingResponsePersistence(unittest.TestCase):
+    """Tests that ChatService persists streamed responses as they arrive."""
+
+    def setUp(self):
+        """Set up a chat service with a streaming LLM."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(ChatSession(title="Stream"))
+        self.llm_service = MagicMock()
+        self.chat_service = ChatService(self.chat_storage, self.llm_service)
+        self.chat_service.STREAM_FLUSH_CHUNKS = 2
+        self.chat_service.STREAM_FLUSH_INTERVAL_MS = 60_000
+        self.chat_service._schedule_session_housekeeping = MagicMock()
+        self.message = self.chat_storage.add_message(
+            ChatMessage(
+                session_id=self.session.id,
+                role="assistant",
+                content="",
+                status="streaming",
+            )
+        )
+        self.conversation = [{"role": "user", "content": "Tell me a story"}]
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _stream(self):
+        """Start a streaming response for the placeholder message."""
+        return self.chat_service._generate_streaming_response(
+            self.message.id, self.conversation, ChatConfig()
+        )
+
+    def test_complete_stream(self):
+        """A finished stream is saved and marked complete."""
+        self.llm_service.chat_completion.return_value = iter(["Once ", "upon ", "a"])
+
+        self.assertEqual("".join(self._stream()), "Once upon a")
+
+        stored = self.chat_storage.get_message(self.message.id)
+        self.assertEqual(stored.content, "Once upon a")
+        self.assertEqual(stored.status, "complete")
+        self.chat_service._schedule_session_housekeeping.assert_called_once_with(
+            self.session.id
+        )
+
+    def test_abandoned_stream_keeps_partial_text(self):
+        """Closing the stream early leaves the flushed text in storage."""
+        self.llm_service.chat_completion.return_value = iter(
+            ["Once ", "upon ", "a ", "time"]
+        )
+        stream = self._stream()
+        for _ in range(3):
+            next(stream)
+
+        self.assertEqual(
+            self.chat_storage.get_message(self.message.id).content, "Once upon "
+        )
+        stream.close()
+
+        stored = self.chat_storage.get_message(self.message.id)
+        self.assertEqual(stored.content, "Once upon a ")
+        self.assertEqual(stored.status, "truncated")
+
+    def test_failed_stream_keeps_partial_text(self):
+        """An upstream error keeps what was generated and marks the error."""
+
+        def failing():
+            yield "Once "
+            raise RuntimeError("model unloaded")
+
+        self.llm_service.chat_completion.return_value = failing()
+
+        chunks = list(self._stream())
+
+        self.assertIn("model unloaded", chunks[-1])
+        stored = self.chat_storage.get_message(self.message.id)
+        self.assertEqual(stored.content, "Once ")
+        self.assertEqual(stored.status, "error")
+        self.assertEqual(stored.metadata["error"], "model unloaded")
+
+    def test_disconnect_at_error_message_keeps_error_status(self):
+        """Closing the stream while the error text is sent still records it."""
+
+        def failing():
+            raise RuntimeError("model unloaded")
+            yield
+
+        self.llm_service.chat_completion.return_value = failing()
+        stream = self._stream()
+
+        self.assertIn("model unloaded", next(stream))
+        stream.close()
+
+        self.assertEqual(self.chat_storage.get_message(self.message.id).status, "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for memoized entry summaries.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.llm_service import LLMService
+from app.storage import StorageManager
+
+
+class TestSummaryCache(unittest.TestCase):
+    """Tests for LLMService.summarize_entry caching."""
+
+    def setUp(self):
+        """Set up storage and an LLM service with a fake analysis client."""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = StorageManager(self.test_dir)
+
+        with patch("app.llm_service.ollama"):
+            self.llm_service = LLMService(self.storage)
+
+        self.client = MagicMock()
+        self.client.chat.side_effect = lambda **kwargs: {
+            "message": {
+                "content": json.dumps(
+                    {
+                        "summary": f"call {self.client.chat.call_count}",
+                        "key_topics": ["garden"],
+                        "mood": "calm",
+                    }
+                )
+            }
+        }
+        self.llm_service._ollama = lambda operation: self.client
+        self.llm_service._get_model_for_operation = lambda operation: "qwen3:latest"
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        shutil.rmtree(self.test_dir)
+
+    def test_repeat_request_is_served_from_cache(self):
+        """Summarizing unchanged content twice calls the model once."""
+        first = self.llm_service.summarize_entry("Planted tomatoes.", entry_id="e1")
+        second = self.llm_service.summarize_entry("Planted tomatoes.", entry_id="e1")
+
+        self.assertEqual(self.client.chat.call_count, 1)
+        self.assertEqual(second.summary, first.summary)
+        self.assertEqual(second.key_topics, ["garden"])
+        self.assertEqual(second.prompt_type, "default")
+
+        stats = self.llm_service.get_summary_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["cached_summaries"], 1)
+
+    def test_edited_entry_is_resummarized(self):
+        """Changing the content misses the cache and replaces the old summary."""
+        self.llm_service.summarize_entry("Planted tomatoes.", entry_id="e1")
+        updated = self.llm_service.summarize_entry(
+            "Planted tomatoes and basil.", entry_id="e1"
+        )
+
+        self.assertEqual(self.client.chat.call_count, 2)
+        self.assertEqual(updated.summary, "call 2")
+        self.assertEqual(self.storage.get_summary_cache_stats()["cached_summaries"], 1)
+
+    def test_prompt_type_and_template_are_part_of_the_key(self):
+        """Other prompt types and edited templates get their own summaries."""
+        self.llm_service.summarize_entry("Planted tomatoes.", entry_id="e1")
+        self.llm_service.summarize_entry(
+            "Planted tomatoes.", prompt_type="detailed", entry_id="e1"
+        )
+        self.assertEqual(self.client.chat.call_count, 2)
+
+        self.llm_service.config.prompt_types[0].prompt = "Summarize briefly."
+        self.llm_service.summarize_entry("Planted tomatoes.", entry_id="e1")
+        self.assertEqual(self.client.chat.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
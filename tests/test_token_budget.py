@@ -0,0 +1,218 @@
+"""
+Tests for token counting and context packing.
+"""
+
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.chat_service import ChatService
+from app.models import ChatConfig, ChatMessage, ChatSession
+from app.storage.chat import ChatStorage
+from app.token_budget import (
+    MESSAGE_OVERHEAD,
+    ContextPacker,
+    EstimatingTokenizer,
+    Tokenizer,
+    get_tokenizer,
+    prompt_token_budget,
+)
+
+
+class TestEstimatingTokenizer(unittest.TestCase):
+    """Tests for the calibrated token estimator."""
+
+    def setUp(self):
+        """Create an estimator."""
+        self.tokenizer = EstimatingTokenizer()
+
+    def test_counts_words_and_symbols(self):
+        """Short words are one token; long words, digits and symbols add more."""
+        self.assertEqual(self.tokenizer.count(""), 0)
+        self.assertEqual(self.tokenizer.count("I went for a walk"), 5)
+        self.assertEqual(self.tokenizer.count("Walked, talked!"), 4)
+        self.assertEqual(self.tokenizer.count("internationalization"), 4)
+        self.assertEqual(self.tokenizer.count("2025"), 2)
+
+    def test_truncate_fits_budget(self):
+        """Truncated text never counts more than the limit."""
+        text = "Today I planted tomatoes, basil and peppers in the garden. " * 20
+        truncated = self.tokenizer.truncate(text, 50)
+
+        self.assertTrue(text.startswith(truncated))
+        self.assertLessEqual(self.tokenizer.count(truncated), 50)
+        self.assertGreater(self.tokenizer.count(truncated), 45)
+        self.assertEqual(self.tokenizer.truncate("short", 50), "short")
+
+    def test_missing_vocab_falls_back_to_estimator(self):
+        """An unreadable vocabulary path falls back to estimating."""
+        tokenizer = get_tokenizer("/nonexistent/tokenizer.json")
+        self.assertIsInstance(tokenizer, EstimatingTokenizer)
+
+    def test_tokenizer_is_abstract(self):
+        """Tokenizers must implement count and truncate."""
+        with self.assertRaises(TypeError):
+            Tokenizer()
+        self.assertNotEqual(self.tokenizer.id, EstimatingTokenizer(3.0).id)
+
+
+class TestContextPacker(unittest.TestCase):
+    """Tests for ContextPacker."""
+
+    def setUp(self):
+        """Create prompt pieces."""
+        self.tokenizer = EstimatingTokenizer()
+        self.system = {"role": "system", "content": "You are a journaling assistant."}
+        self.query = {"role": "user", "content": "What did I plant last week?"}
+        self.summary = {"role": "system", "content": "Summary: gardening chat."}
+        self.references = [
+            {"role": "system", "content": "Entry: planted tomatoes. " * 10},
+            {"role": "system", "content": "Entry: planted basil. " * 10},
+        ]
+        self.turns = [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i} " * 8}
+            for i in range(10)
+        ]
+
+    def test_everything_fits_in_prompt_order(self):
+        """With room to spare every piece is kept, in prompt order."""
+        packer = ContextPacker(self.tokenizer, 10000)
+        packed = packer.pack(
+            self.system, self.query, self.summary, self.references, self.turns
+        )
+
+        self.assertEqual(
+            packed,
+            [self.system, self.summary] + self.turns + self.references + [self.query],
+        )
+
+    def test_oldest_turns_are_dropped_first(self):
+        """Under pressure, turns go before references, oldest first."""
+        pinned = ContextPacker(self.tokenizer, 0).count_conversation(
+            [self.system, self.query, self.summary] + self.references
+        )
+        turn_cost = self.tokenizer.count(self.turns[0]["content"]) + MESSAGE_OVERHEAD
+        packer = ContextPacker(self.tokenizer, pinned + 3 * turn_cost)
+
+        packed = packer.pack(
+            self.system, self.query, self.summary, self.references, self.turns
+        )
+
+        self.assertEqual(packed[2:5], self.turns[-3:])
+        self.assertEqual(packed[5:7], self.references)
+        self.assertLessEqual(packer.count_conversation(packed), packer.budget)
+
+    def test_references_are_truncated_to_fit(self):
+        """A reference that doesn't fit is truncated, never overflowing."""
+        budget = (
+            ContextPacker(self.tokenizer, 0).count_conversation(
+                [self.system, self.query, self.references[0]]
+            )
+            + 40
+        )
+        packer = ContextPacker(self.tokenizer, budget)
+
+        packed = packer.pack(self.system, self.query, references=self.references)
+
+        self.assertEqual(len(packed), 4)
+        self.assertTrue(self.references[1]["content"].startswith(packed[2]["content"]))
+        self.assertLessEqual(packer.count_conversation(packed), budget)
+
+    def test_known_turn_counts_are_used(self):
+        """Stored token counts are trusted instead of re-tokenizing."""
+        packer = ContextPacker(self.tokenizer, 1000)
+        turn_tokens = [10000] + [1] * 9
+
+        packed = packer.pack(self.system, turns=self.turns, turn_tokens=turn_tokens)
+
+        self.assertEqual(packed[1:], self.turns[1:])
+
+    def test_prompt_budget_reserves_response(self):
+        """The response reservation is capped at half the window."""
+        self.assertEqual(prompt_token_budget(8192, 2048), 6144)
+        self.assertEqual(prompt_token_budget(2000, 2048), 1000)
+
+
+class TestChatTokenBudget(unittest.TestCase):
+    """Tests for token budgeting in ChatStorage and ChatService."""
+
+    def setUp(self):
+        """Set up chat storage with a session."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chat_storage = ChatStorage(self.temp_dir.name)
+        self.session = self.chat_storage.create_session(
+            ChatSession(title="Garden", created_at=datetime.now())
+        )
+        self.chat_service = ChatService(self.chat_storage, MagicMock())
+
+    def tearDown(self):
+        """Clean up temporary storage."""
+        self.temp_dir.cleanup()
+
+    def _add(self, role, content):
+        """Add a message to the session."""
+        return self.chat_storage.add_message(
+            ChatMessage(session_id=self.session.id, role=role, content=content)
+        )
+
+    def test_token_counts_are_persisted_and_reset_on_edit(self):
+        """Counts are stored with messages and cleared when content changes."""
+        message = self._add("user", "I planted tomatoes today.")
+        config = ChatConfig()
+
+        self.chat_service._prepare_conversation_history(self.session.id, config)
+        stored = self.chat_storage.get_messages(self.session.id)[0]
+        self.assertEqual(
+            stored.token_count, EstimatingTokenizer().count(message.content)
+        )
+
+        self.chat_storage.update_message_content(message.id, "I planted basil.")
+        self.assertIsNone(
+            self.chat_storage.get_messages(self.session.id)[0].token_count
+        )
+
+    def test_counts_from_another_tokenizer_are_redone(self):
+        """Switching tokenizers recounts messages instead of reusing counts."""
+        message = self._add("user", "I planted tomatoes today.")
+        config = ChatConfig()
+        self.chat_service._prepare_conversation_history(self.session.id, config)
+
+        finer = EstimatingTokenizer(chars_per_token=2.0)
+        with patch("app.chat_service.get_tokenizer", return_value=finer):
+            self.chat_service._prepare_conversation_history(self.session.id, config)
+
+        stored = self.chat_storage.get_messages(self.session.id)[0]
+        self.assertEqual(stored.token_count, finer.count(message.content))
+        self.assertEqual(
+            self.chat_storage.get_uncounted_messages(self.session.id, finer.id), []
+        )
+
+    def test_packed_prompt_fits_context_window(self):
+        """A long session is packed under max_context_tokens minus the reply."""
+        for i in range(40):
+            self._add("user" if i % 2 == 0 else "assistant", f"Message {i} " * 30)
+        config = ChatConfig(
+            max_context_tokens=1000, max_tokens=200, use_context_windowing=False
+        )
+
+        history = self.chat_service._prepare_conversation_history(
+            self.session.id, config
+        )
+        packed = self.chat_service._pack_prompt(
+            history,
+            config,
+            context_messages=[{"role": "system", "content": "Reference " * 50}],
+            query={"role": "user", "content": "What happened?"},
+        )
+
+        packer = ContextPacker(EstimatingTokenizer(), 800)
+        self.assertLessEqual(packer.count_conversation(packed), 800)
+        self.assertEqual(packed[-1]["content"], "What happened?")
+        self.assertEqual(packed[-2]["content"], "Reference " * 50)
+        self.assertEqual(packed[-3]["content"], "Message 39 " * 30)
+        self.assertLess(len(packed), 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for tiered tool routing.
+"""
+
+import unittest
+from typing import Any, Dict
+from unittest.mock import MagicMock
+
+from app.tools import BaseTool, ToolRegistry, ToolResult, ToolRouter, RoutingStats
+
+
+class ScoredTool(BaseTool):
+    """Tool with a fixed trigger confidence."""
+
+    def __init__(self, name: str, score: float):
+        super().__init__(name=name, description=f"{name} test tool")
+        self.score = score
+
+    def get_schema(self) -> Dict[str, Any]:
+        return {"type": "object", "properties": {"query": {"type": "string"}}}
+
+    async def execute(self, parameters, context=None) -> ToolResult:
+        return ToolResult(success=True)
+
+    def trigger_confidence(self, message, context=None) -> float:
+        return self.score
+
+
+class TestToolRouter(unittest.TestCase):
+    """Tests for ToolRouter."""
+
+    def setUp(self):
+        """Set up a router with a mocked LLM service."""
+        self.llm_service = MagicMock()
+        self.llm_service.analyze_message_for_tools.return_value = {
+            "should_use_tools": False,
+            "recommended_tools": [],
+            "analysis": "No tools needed",
+        }
+        self.stats = RoutingStats()
+
+    def _router(self, **scores):
+        """Build a router over tools with the given scores."""
+        registry = ToolRegistry()
+        for name, score in scores.items():
+            registry.register(ScoredTool(name, score))
+        return ToolRouter(registry, self.llm_service, stats=self.stats)
+
+    def test_confident_match_skips_llm(self):
+        """A confidently scored tool is selected without the LLM call."""
+        router = self._router(journal_search=1.2, web_search=0.0)
+
+        analysis = router.route("What did I write last week?", threshold=0.8)
+
+        self.llm_service.analyze_message_for_tools.assert_not_called()
+        self.assertEqual(analysis["routing_tier"], "rules")
+        self.assertTrue(analysis["should_use_tools"])
+        self.assertEqual(len(analysis["recommended_tools"]), 1)
+        rec = analysis["recommended_tools"][0]
+        self.assertEqual(rec["tool_name"], "journal_search")
+        self.assertEqual(rec["confidence"], 1.0)
+        self.assertEqual(rec["suggested_query"], "What did I write last week?")
+
+    def test_confident_no_tools_skips_llm(self):
+        """Small talk with low scores everywhere needs no tools and no LLM call."""
+        router = self._router(journal_search=0.0, web_search=0.1)
+
+        analysis = router.route("thanks!", threshold=0.8)
+
+        self.llm_service.analyze_message_for_tools.assert_not_called()
+        self.assertFalse(analysis["should_use_tools"])
+        self.assertEqual(analysis["recommended_tools"], [])
+
+    def test_ambiguous_score_defers_to_llm(self):
+        """A score between the bands falls through to the LLM analysis."""
+        router = self._router(journal_search=0.6, web_search=0.0)
+
+        analysis = router.route("How are things?", threshold=0.8)
+
+        self.llm_service.analyze_message_for_tools.assert_called_once()
+        self.assertEqual(analysis["routing_tier"], "llm")
+
+    def test_rules_can_be_disabled(self):
+        """With rules disabled every message goes to the LLM."""
+        router = self._router(journal_search=1.5)
+
+        analysis = router.route("What did I write?", use_rules=False)
+
+        self.llm_service.analyze_message_for_tools.assert_called_once()
+        self.assertEqual(analysis["routing_tier"], "llm")
+
+    def test_threshold_is_configurable(self):
+        """Lowering the threshold makes more messages routable by rules."""
+        router = self._router(journal_search=0.6)
+
+        analysis = router.route("Tell me about my journal", threshold=0.5)
+
+        self.llm_service.analyze_message_for_tools.assert_not_called()
+        self.assertTrue(analysis["should_use_tools"])
+
+    def test_counters_track_each_tier(self):
+        """Routing counters record which tier decided."""
+        self._router(journal_search=1.0).route("remember?")
+        self._router(journal_search=0.5).route("hmm")
+        self._router(journal_search=0.0).route("hi")
+
+        stats = self.stats.get_stats()
+        self.assertEqual(stats["tiers"], {"rules": 2, "llm": 1})
+        self.assertEqual(stats["total"], 3)
+        self.assertAlmostEqual(stats["rules_ratio"], 2 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()